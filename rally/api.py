@@ -353,6 +353,33 @@ class Task(object):
         status = None if force else consts.TaskStatus.FINISHED
         objects.Task.delete_by_uuid(task_uuid, status=status)
 
+    @classmethod
+    def cleanup(cls, task_uuid):
+        """Delete resources recorded to the cleanup journal of the task.
+
+        Useful when Rally crashed or was killed and the cleanup contexts
+        were not executed. Recorded resources are deleted on behalf of
+        the deployment admin, Swift ones by temporary users of their
+        tenants. The journal is removed once all its resources are deleted.
+
+        :param task_uuid: The UUID of the task
+        :raises RallyException: if some recorded resources were not deleted
+        """
+        # NOTE: Import OpenStack plugins only when they are needed
+        from rally.plugins.openstack.context.cleanup import (
+            manager as cleanup_manager)
+
+        task = objects.Task.get(task_uuid)
+        deployment = objects.Deployment.get(task["deployment_uuid"])
+        admin = {"credential": objects.Credential(**deployment["admin"])}
+
+        left = cleanup_manager.cleanup_task(task_uuid, admin)
+        if left:
+            raise exceptions.RallyException(
+                _("Failed to delete %(count)d resources of task %(task)s, "
+                  "run cleanup again to retry")
+                % {"count": len(left), "task": task_uuid})
+
 
 class Verification(object):
 
@@ -16,13 +16,17 @@
 """ Rally command: task """
 
 from __future__ import print_function
+import collections
 import json
 import os
 import sys
+import time
 import webbrowser
 
 import jsonschema
+from oslo_config import cfg
 from oslo_utils import uuidutils
+import requests
 import six
 import yaml
 
@@ -37,6 +41,9 @@ from rally.common import utils as rutils
 from rally import consts
 from rally import exceptions
 from rally import plugins
+# NOTE: Import metrics to register options of live metrics endpoint
+from rally.task import metrics  # noqa
+from rally.task import profiler
 from rally.task.processing import plot
 from rally.task.processing import utils
 
@@ -275,6 +282,21 @@ class TaskCommands(object):
 
         print("Task %s successfully stopped." % task_id)
 
+    @cliutils.args("--uuid", type=str, dest="task_id", help="UUID of task.")
+    @envutils.with_default_task_id
+    def cleanup(self, task_id=None):
+        """Delete resources recorded to the cleanup journal of a task.
+
+        Use it to remove resources left by a task that was interrupted
+        before its cleanup contexts were executed. Resources are recorded
+        to the journal only if the cleanup.use_journal option is set or
+        tenants are leased from a resource pool.
+
+        :param task_id: Task uuid
+        """
+        api.Task.cleanup(task_id)
+        print("Resources of task %s successfully cleaned up." % task_id)
+
     @cliutils.args("--uuid", type=str, dest="task_id", help="UUID of task")
     @envutils.with_default_task_id
     def status(self, task_id=None):
@@ -288,6 +310,178 @@ class TaskCommands(object):
         print(_("Task %(task_id)s: %(status)s")
               % {"task_id": task_id, "status": task["status"]})
 
+    @cliutils.args("--uuid", type=str, dest="task_id", help="UUID of task.")
+    @cliutils.args("--url", type=str, dest="url",
+                   help="URL of live metrics endpoint of the running task. "
+                        "Defaults to the endpoint configured by "
+                        "metrics_host and metrics_port options.")
+    @cliutils.args("--interval", type=float, dest="interval", default=2.0,
+                   help="Interval between updates in seconds.")
+    @cliutils.args("--once", action="store_true", dest="once",
+                   help="Display metrics once and exit.")
+    @envutils.with_default_task_id
+    def watch(self, task_id=None, url=None, interval=2.0, once=False):
+        """Display live metrics of a running task.
+
+        Metrics are fetched from the endpoint that is served by `rally task
+        start` if metrics_port option is set. Use them to abort a runaway
+        task with `rally task abort` instead of waiting for its report.
+
+        :param task_id: Task uuid
+        :param url: URL of live metrics endpoint
+        :param interval: interval between updates in seconds
+        :param once: display metrics once and exit
+        """
+        if url is None:
+            if not cfg.CONF.benchmark.metrics_port:
+                print(_("Live metrics endpoint is disabled. Set "
+                        "metrics_port option in [benchmark] section of the "
+                        "config file before starting the task."))
+                return 1
+            url = "http://%s:%s" % (cfg.CONF.benchmark.metrics_host,
+                                    cfg.CONF.benchmark.metrics_port)
+
+        finished = (consts.TaskStatus.FINISHED, consts.TaskStatus.FAILED,
+                    consts.TaskStatus.ABORTED)
+        while True:
+            status = api.Task.get(task_id)["status"]
+            try:
+                snapshot = requests.get("%s/metrics.json" % url.rstrip("/"),
+                                        timeout=interval).json()
+            except (requests.RequestException, ValueError) as e:
+                snapshot = None
+                if status not in finished:
+                    print(_("Failed to fetch live metrics from %(url)s: "
+                            "%(error)s") % {"url": url, "error": e})
+
+            print(_("Task %(task_id)s: %(status)s")
+                  % {"task_id": task_id, "status": status})
+            if snapshot and snapshot["task"] != task_id:
+                print(_("Endpoint %(url)s serves metrics of task %(task)s")
+                      % {"url": url, "task": snapshot["task"]})
+                return 1
+            if snapshot:
+                self._print_live_metrics(snapshot)
+
+            if once or status in finished:
+                break
+            time.sleep(interval)
+
+    @cliutils.args("--uuid", type=str, dest="task_id", help="UUID of task.")
+    @cliutils.args("--scenario", type=str, dest="scenario",
+                   help="Show profiles only of this scenario.")
+    @cliutils.args("--run", type=int, dest="run",
+                   help="Show profiles only of this run of the scenario "
+                        "(runs of the scenario in the task are counted in "
+                        "order of start, starting from 0).")
+    @cliutils.args("--format", dest="out_format", default="text",
+                   choices=["text", "pstats", "stacks"],
+                   help="Output format: text summary, pstats file (profiles "
+                        "of cprofile mode) or collapsed stacks for "
+                        "flamegraph.pl (profiles of sampling mode).")
+    @cliutils.args("--out", metavar="<path>", type=str, dest="out",
+                   help="Path to output file, required for pstats format.")
+    @cliutils.args("--limit", type=int, dest="limit", default=20,
+                   help="Amount of functions or stacks in text summary.")
+    @envutils.with_default_task_id
+    def profile(self, task_id=None, scenario=None, run=None,
+                out_format="text", out=None, limit=20):
+        """Display or export profiles of scenario iterations.
+
+        Iterations are profiled if runner config of the workload has
+        "profile" section, e.g. {"sample_rate": 0.1, "mode": "cprofile"}.
+        Profiles of all selected workloads are aggregated.
+
+        :param task_id: Task uuid
+        :param scenario: show profiles only of this scenario
+        :param run: show profiles only of this run of the scenario
+        :param out_format: output format: text, pstats or stacks
+        :param out: path to output file
+        :param limit: amount of functions or stacks in text summary
+        """
+        workloads = [(name, index, path)
+                     for name, index, path in profiler.list_workloads(task_id)
+                     if (scenario is None or name == scenario) and
+                     (run is None or index == run)]
+        if not workloads:
+            print(_("There are no profiles of task %s") % task_id)
+            return 1
+
+        stacks = collections.Counter()
+        stats = None
+        for name, index, path in workloads:
+            stacks.update(profiler.load_stacks(path))
+            workload_stats = profiler.load_pstats(path)
+            if workload_stats is None:
+                continue
+            if stats is None:
+                stats = workload_stats
+            else:
+                stats.add(workload_stats)
+
+        if out_format == "pstats":
+            if stats is None or not out:
+                print(_("pstats format requires --out and profiles of "
+                        "cprofile mode"))
+                return 1
+            stats.dump_stats(os.path.expanduser(out))
+            print(_("Profile is saved to %s") % out)
+        elif out_format == "stacks":
+            if not stacks:
+                print(_("stacks format requires profiles of sampling mode"))
+                return 1
+            lines = ["%s %d\n" % stack for stack in sorted(stacks.items())]
+            if out:
+                with open(os.path.expanduser(out), "w") as f:
+                    f.writelines(lines)
+                print(_("Stacks are saved to %s") % out)
+            else:
+                sys.stdout.writelines(lines)
+        else:
+            print(_("Profiles of: %s") % ", ".join(
+                "%s (run %d)" % (name, index)
+                for name, index, path in workloads))
+            if stats is not None:
+                stats.stream = sys.stdout
+                stats.sort_stats("cumulative").print_stats(limit)
+            if stacks:
+                print(_("Most sampled stacks:"))
+                for stack, count in stacks.most_common(limit):
+                    print("%8d %s" % (count, stack.split(";")[-1]))
+
+    @staticmethod
+    def _print_live_metrics(snapshot):
+        headers = ["position", "scenario", "iterations", "failures",
+                   "error rate", "iterations/s", "in flight", "p50", "p95",
+                   "p99"]
+        float_cols = ["error rate", "iterations/s", "p50", "p95", "p99"]
+        formatters = dict(zip(float_cols,
+                              [cliutils.pretty_float_formatter(col, 3)
+                               for col in float_cols]))
+        rows = []
+        for w in snapshot["workloads"]:
+            rows.append(rutils.Struct(**dict(zip(headers, [
+                w["position"], w["name"], w["iterations"], w["failures"],
+                w["error_rate"], w["iterations_per_second"],
+                w["in_flight"] if w["in_flight"] is not None else "n/a",
+                w["duration"]["p50"], w["duration"]["p95"],
+                w["duration"]["p99"]]))))
+        cliutils.print_list(rows, fields=headers, formatters=formatters)
+
+        if snapshot["workloads"]:
+            workload = snapshot["workloads"][-1]
+            headers = ["action", "mean", "p50", "p95", "p99", "max"]
+            formatters = dict(zip(headers[1:],
+                                  [cliutils.pretty_float_formatter(col, 3)
+                                   for col in headers[1:]]))
+            rows = [rutils.Struct(action=action, **latency)
+                    for action, latency
+                    in workload["atomic_actions"].items()]
+            if rows:
+                cliutils.print_list(rows, fields=headers,
+                                    formatters=formatters)
+        print()
+
     @cliutils.args("--uuid", type=str, dest="task_id",
                    help=("UUID of task. If --uuid is \"last\" the results of "
                          " the most recently created task will be displayed."))
@@ -272,6 +272,36 @@ def resource_get_all(deployment_uuid, provider_name=None, type=None):
                                        type=type)
 
 
+def resource_update(id, values):
+    """Update a resource.
+
+    :param id: ID of a resource.
+    :param values: a dict with new data on the resource.
+    :raises ResourceNotFound: if the resource does not exist.
+    :returns: a dict with updated data on the resource.
+    """
+    return get_impl().resource_update(id, values)
+
+
+def resource_lease(deployment_uuid, provider_name, type, count, leased_by,
+                   released=()):
+    """Atomically mark free resources as leased.
+
+    A resource is free if "leased_by" key of its info is None or is one of
+    released ones.
+
+    :param deployment_uuid: uuid of a deployment
+    :param provider_name: provider_name of resources
+    :param type: type of resources
+    :param count: maximum amount of resources to lease
+    :param leased_by: value to set to "leased_by" key of info
+    :param released: values of "leased_by" that mean a free resource
+    :returns: a list of dicts with data on leased resources
+    """
+    return get_impl().resource_lease(deployment_uuid, provider_name, type,
+                                     count, leased_by, released=released)
+
+
 def resource_delete(id):
     """Delete a resource.
 
@@ -24,6 +24,7 @@ import sqlalchemy as sa
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.orm import load_only as sa_loadonly
 
+from rally.common import costilius
 from rally.common.db.sqlalchemy import models
 from rally.common.i18n import _
 from rally import exceptions
@@ -266,6 +267,54 @@ class Connection(object):
             query = query.filter_by(type=type)
         return query.all()
 
+    def resource_update(self, id, values):
+        session = get_session()
+        with session.begin():
+            resource = (self.model_query(models.Resource, session=session).
+                        filter_by(id=id).first())
+            if not resource:
+                raise exceptions.ResourceNotFound(id=id)
+            resource.update(values)
+        return resource
+
+    def resource_lease(self, deployment_uuid, provider_name, type, count,
+                       leased_by, released=()):
+        # NOTE: SELECT ... FOR UPDATE is ignored by SQLite, so every
+        #       resource is leased by a conditional UPDATE, that succeeds
+        #       only if info of the resource has not been changed since it
+        #       was read.
+        raw_info = sa.cast(models.Resource.info, sa.Text)
+        session = get_session()
+        leased = []
+        with session.begin():
+            query = (session.query(models.Resource.id, raw_info).
+                     filter_by(deployment_uuid=deployment_uuid,
+                               provider_name=provider_name, type=type).
+                     order_by(models.Resource.id))
+            for resource_id, info_text in query.all():
+                if len(leased) >= count:
+                    break
+                info = costilius.json_loads(
+                    info_text, object_pairs_hook=costilius.OrderedDict)
+                owner = info.get("leased_by")
+                if owner is not None and owner not in released:
+                    continue
+                info["leased_by"] = leased_by
+                updated = (self.model_query(models.Resource,
+                                            session=session).
+                           filter(models.Resource.id == resource_id,
+                                  raw_info == info_text).
+                           update({"info": info},
+                                  synchronize_session=False))
+                if updated:
+                    leased.append(resource_id)
+            if not leased:
+                return []
+            resources = (self.model_query(models.Resource, session=session).
+                         filter(models.Resource.id.in_(leased)).
+                         order_by(models.Resource.id).all())
+        return resources
+
     def resource_delete(self, id):
         count = (self.model_query(models.Resource).
                  filter_by(id=id).delete(synchronize_session=False))
@@ -14,10 +14,12 @@
 #    under the License.
 
 import functools
+import threading
 
 from oslo_config import cfg
 from oslo_log import handlers
 from oslo_log import log as oslogging
+from six.moves import queue as Queue
 
 from rally.common.i18n import _
 
@@ -170,6 +172,81 @@ class LogCatcher(object):
         return [record.msg for record in self.handler.buffer]
 
 
+class QueueHandler(log.Handler):
+    """Handler that passes records to other handlers in a separate thread.
+
+    emit() never blocks on I/O of the wrapped handlers, so threads that
+    produce logs don't contend on their locks.
+    """
+
+    def __init__(self, handlers):
+        log.Handler.__init__(self)
+        self.handlers = handlers
+        self.queue = Queue.Queue()
+        self._thread = threading.Thread(target=self._dispatch)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def emit(self, record):
+        # NOTE: Message is formatted here, because arguments could be
+        #       changed by the caller before the record is dispatched.
+        try:
+            record.msg = record.getMessage()
+            record.args = None
+        except Exception:
+            self.handleError(record)
+            return
+        self.queue.put(record)
+
+    def _dispatch(self):
+        while True:
+            record = self.queue.get()
+            if record is None:
+                break
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+
+    def close(self):
+        if self._thread.is_alive():
+            self.queue.put(None)
+            self._thread.join()
+        log.Handler.close(self)
+
+
+class AsyncLogging(object):
+    """Context manager that makes handlers of a logger asynchronous.
+
+    All handlers of the logger are replaced by QueueHandler, that passes
+    records to them from a background thread. Pending records are written
+    and the original handlers are restored on exit.
+
+    Usage::
+        with AsyncLogging():
+            run_a_lot_of_threads_that_log()
+    """
+
+    def __init__(self, logger=None):
+        logger = logger or log.getLogger()
+        self.logger = getattr(logger, "logger", logger)
+        self.handlers = []
+        self.handler = None
+
+    def __enter__(self):
+        self.handlers = list(self.logger.handlers)
+        self.handler = QueueHandler(self.handlers)
+        for handler in self.handlers:
+            self.logger.removeHandler(handler)
+        self.logger.addHandler(self.handler)
+        return self
+
+    def __exit__(self, type_, value, traceback):
+        self.logger.removeHandler(self.handler)
+        self.handler.close()
+        for handler in self.handlers:
+            self.logger.addHandler(handler)
+
+
 def _log_wrapper(obj, log_function, msg, **kw):
     """A logging wrapper for any method of a class.
 
@@ -17,5 +17,6 @@
 from rally.common.objects.credential import Credential  # noqa
 from rally.common.objects.deploy import Deployment  # noqa
 from rally.common.objects.endpoint import Endpoint  # noqa
+from rally.common.objects.pool import ResourcePool  # noqa
 from rally.common.objects.task import Task  # noqa
 from rally.common.objects.verification import Verification  # noqa
@@ -0,0 +1,102 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_utils import timeutils
+
+from rally.common import db
+from rally import consts
+from rally import exceptions
+
+
+FINISHED_TASK_STATUSES = (consts.TaskStatus.FINISHED,
+                          consts.TaskStatus.FAILED,
+                          consts.TaskStatus.ABORTED)
+
+
+class ResourcePool(object):
+    """Named pool of pre-created resources of a deployment.
+
+    Pooled resources are stored in the resources table of the deployment
+    with "pool:<name>" provider name, so the deployment can't be deleted
+    while the pool isn't empty. Every resource is leased by one task at a
+    time, leases of tasks that are not running anymore are free.
+
+    A killed task stays "running" in the database, so its leases are never
+    freed by itself. If lease_timeout is given to lease(), leases of tasks
+    that have not been updated for lease_timeout seconds are free as well,
+    so draining the pool with a timeout longer than any task reclaims them.
+    """
+
+    def __init__(self, deployment_uuid, name):
+        self.deployment_uuid = deployment_uuid
+        self.name = name
+        self.provider_name = "pool:%s" % name
+
+    @staticmethod
+    def _is_running(task_uuid, lease_timeout=None):
+        try:
+            task = db.task_get(task_uuid)
+        except exceptions.TaskNotFound:
+            return False
+        if task["status"] in FINISHED_TASK_STATUSES:
+            return False
+        return (lease_timeout is None
+                or not timeutils.is_older_than(task["updated_at"],
+                                               lease_timeout))
+
+    def list(self, type=None):
+        """Return pooled resources as dicts with id, leased_by and data."""
+        return [{"id": r["id"], "leased_by": r["info"].get("leased_by"),
+                 "data": r["info"].get("data")}
+                for r in db.resource_get_all(self.deployment_uuid,
+                                             provider_name=self.provider_name,
+                                             type=type)]
+
+    def lease(self, type, count, task_uuid, lease_timeout=None):
+        """Lease up to count free resources of the type.
+
+        :param lease_timeout: seconds since the last update of a running
+                              task after which its leases expire, leases
+                              of running tasks never expire if it is None
+        :returns: list of dicts with id and data of leased resources
+        """
+        owners = set(r["leased_by"] for r in self.list(type))
+        released = [owner for owner in owners
+                    if owner is not None
+                    and not self._is_running(owner, lease_timeout)]
+        return [{"id": r["id"], "data": r["info"].get("data")}
+                for r in db.resource_lease(self.deployment_uuid,
+                                           self.provider_name, type, count,
+                                           task_uuid, released=released)]
+
+    def add(self, type, data, task_uuid):
+        """Add a resource to the pool, leased by the task.
+
+        :returns: ID of the pooled resource
+        """
+        return db.resource_create({
+            "deployment_uuid": self.deployment_uuid,
+            "provider_name": self.provider_name,
+            "type": type,
+            "info": {"leased_by": task_uuid, "data": data}})["id"]
+
+    def release(self, resource_id, data):
+        """Return the leased resource with its updated data to the pool."""
+        db.resource_update(resource_id,
+                           {"info": {"leased_by": None, "data": data}})
+
+    @staticmethod
+    def delete(resource_id):
+        """Remove the resource from the pool."""
+        db.resource_delete(resource_id)
@@ -23,6 +23,36 @@ from rally import consts
 from rally import exceptions
 
 
+ATOMIC_ACTIONS_TRACE_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "parent": {"type": ["integer", "null"]},
+            "offset": {"type": "number"},
+            "duration": {"type": ["number", "null"]},
+            "failed": {"type": "boolean"}
+        },
+        "required": ["name", "parent", "offset", "duration", "failed"],
+        "additionalProperties": False
+    }
+}
+
+SLA_VIOLATIONS_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "started_at": {"type": "number"},
+            "finished_at": {"type": "number"},
+            "detail": {"type": "string"}
+        },
+        "required": ["started_at", "finished_at", "detail"],
+        "additionalProperties": False
+    }
+}
+
 OUTPUT_SCHEMA = {
     "type": "object",
     "properties": {
@@ -124,7 +154,8 @@ TASK_RESULT_SCHEMA = {
                     },
                     "success": {
                         "type": "boolean"
-                    }
+                    },
+                    "violations": SLA_VIOLATIONS_SCHEMA
                 }
             }
         },
@@ -159,7 +190,14 @@ TASK_RESULT_SCHEMA = {
                         },
                         "required": ["data", "errors"]
                     },
-                    "output": OUTPUT_SCHEMA
+                    "output": OUTPUT_SCHEMA,
+                    "atomic_actions_trace": ATOMIC_ACTIONS_TRACE_SCHEMA,
+                    "scheduled_at": {
+                        "type": "number"
+                    },
+                    "profiled": {
+                        "type": "boolean"
+                    }
                 },
                 "required": ["atomic_actions", "duration", "error",
                              "idle_duration"]
@@ -211,7 +249,8 @@ TASK_EXTENDED_RESULT_SCHEMA = {
                     },
                     "success": {
                         "type": "boolean"
-                    }
+                    },
+                    "violations": SLA_VIOLATIONS_SCHEMA
                 }
             }
         },
@@ -235,7 +274,14 @@ TASK_EXTENDED_RESULT_SCHEMA = {
                     "idle_duration": {
                         "type": "number"
                     },
-                    "output": OUTPUT_SCHEMA
+                    "output": OUTPUT_SCHEMA,
+                    "atomic_actions_trace": ATOMIC_ACTIONS_TRACE_SCHEMA,
+                    "scheduled_at": {
+                        "type": "number"
+                    },
+                    "profiled": {
+                        "type": "boolean"
+                    }
                 },
                 "required": ["atomic_actions", "duration", "error",
                              "idle_duration", "output"]
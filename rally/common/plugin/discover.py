@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import imp
 import os
 import sys
@@ -42,22 +43,35 @@ def itersubclasses(cls, seen=None):
                 yield sub
 
 
-def import_modules_from_package(package):
-    """Import modules from package and append into sys.modules
+def find_modules(package):
+    """Return modules of package with paths to their files.
 
     :param: package - Full package name. For example: rally.deployment.engines
+    :returns: OrderedDict with full module names as keys and paths to
+              module files as values
     """
     path = [os.path.dirname(rally.__file__), ".."] + package.split(".")
     path = os.path.join(*path)
+    modules = collections.OrderedDict()
     for root, dirs, files in os.walk(path):
         for filename in files:
             if filename.startswith("__") or not filename.endswith(".py"):
                 continue
             new_package = ".".join(root.split(os.sep)).split("....")[1]
             module_name = "%s.%s" % (new_package, filename[:-3])
-            if module_name not in sys.modules:
-                sys.modules[module_name] = importutils.import_module(
-                    module_name)
+            modules[module_name] = os.path.join(root, filename)
+    return modules
+
+
+def import_modules_from_package(package):
+    """Import modules from package and append into sys.modules
+
+    :param: package - Full package name. For example: rally.deployment.engines
+    """
+    for module_name in find_modules(package):
+        if module_name not in sys.modules:
+            sys.modules[module_name] = importutils.import_module(
+                module_name)
 
 
 def load_plugins(dir_or_file):
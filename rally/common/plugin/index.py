@@ -0,0 +1,155 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Persisted index of plugins that allows importing plugins on demand.
+
+Index maps plugins (their base classes, name and namespace) to the modules
+where they are defined. It is valid only while the set of modules and their
+modification times are the same as at the moment of building.
+"""
+
+import json
+import os
+
+from oslo_utils import importutils
+
+from rally.common import logging
+from rally.common.plugin import discover
+
+LOG = logging.getLogger(__name__)
+
+_ACTIVE_INDEX = None
+
+
+def _modules_mtimes(packages):
+    mtimes = {}
+    for package in packages:
+        for module, path in discover.find_modules(package).items():
+            mtimes[module] = os.path.getmtime(path)
+    return mtimes
+
+
+def _full_name(cls):
+    return "%s.%s" % (cls.__module__, cls.__name__)
+
+
+class PluginIndex(object):
+    """Maps plugins to modules that define them."""
+
+    def __init__(self, modules, plugins):
+        """Init index.
+
+        :param modules: dict with names of indexed modules as keys and their
+                        modification times as values
+        :param plugins: list of dicts with bases (full names of plugin base
+                        classes), name, namespace and module keys
+        """
+        self.modules = modules
+        self.plugins = plugins
+        self._by_base = {}
+        for plugin in plugins:
+            for base in plugin["bases"]:
+                self._by_base.setdefault(base, []).append(plugin)
+
+    @classmethod
+    def build(cls, packages, plugin_classes):
+        """Build index of already imported plugins.
+
+        :param packages: names of packages to index
+        :param plugin_classes: classes of configured plugins. Plugins that
+                               are defined outside of packages are skipped
+        """
+        modules = _modules_mtimes(packages)
+        plugins = []
+        for plugin_cls in plugin_classes:
+            module = getattr(plugin_cls, "func_ref", plugin_cls).__module__
+            if module not in modules:
+                continue
+            plugins.append({
+                "bases": sorted(set(_full_name(base)
+                                    for base in plugin_cls.__mro__
+                                    if hasattr(base, "get_name"))),
+                "name": plugin_cls.get_name(),
+                "namespace": plugin_cls.get_namespace(),
+                "module": module})
+        return cls(modules, plugins)
+
+    @classmethod
+    def load(cls, path):
+        """Load index from file, returns None if it is missing or broken."""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            return cls(data["modules"], data["plugins"])
+        except (IOError, OSError, ValueError, KeyError, TypeError) as e:
+            LOG.debug("Failed to load plugin index %(path)s: %(e)s"
+                      % {"path": path, "e": e})
+            return None
+
+    def save(self, path):
+        """Save index to file, failures are only logged."""
+        try:
+            directory = os.path.dirname(path)
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            tmp_path = "%s.%d" % (path, os.getpid())
+            with open(tmp_path, "w") as f:
+                json.dump({"modules": self.modules, "plugins": self.plugins},
+                          f)
+            os.rename(tmp_path, path)
+        except (IOError, OSError) as e:
+            LOG.debug("Failed to save plugin index %(path)s: %(e)s"
+                      % {"path": path, "e": e})
+
+    def is_valid(self, packages):
+        """Check that indexed modules were not added, removed or changed."""
+        return self.modules == _modules_mtimes(packages)
+
+    def find_modules(self, base, name=None, namespace=None):
+        """Return modules that define plugins of the base class.
+
+        :param base: plugin base class
+        :param name: return only modules with plugins of this name
+        :param namespace: return only modules with plugins from namespace
+        """
+        modules = []
+        for plugin in self._by_base.get(_full_name(base), []):
+            if name is not None and plugin["name"] != name:
+                continue
+            if namespace and plugin["namespace"] != namespace:
+                continue
+            if plugin["module"] not in modules:
+                modules.append(plugin["module"])
+        return modules
+
+    def import_modules(self, base, name=None, namespace=None):
+        """Import modules that define plugins of the base class.
+
+        :returns: True if any module was found
+        """
+        modules = self.find_modules(base, name=name, namespace=namespace)
+        for module in modules:
+            importutils.import_module(module)
+        return bool(modules)
+
+
+def activate(plugin_index):
+    """Make Plugin.get() and Plugin.get_all() import plugins on demand."""
+    global _ACTIVE_INDEX
+    _ACTIVE_INDEX = plugin_index
+
+
+def get_active():
+    """Return activated PluginIndex or None."""
+    return _ACTIVE_INDEX
@@ -16,6 +16,7 @@
 import sys
 
 from rally.common.plugin import discover
+from rally.common.plugin import index
 from rally.common.plugin import info
 from rally.common.plugin import meta
 from rally import exceptions
@@ -118,6 +119,12 @@ def from_func(plugin_baseclass=None):
     return decorator
 
 
+# NOTE: Registry of configured plugins. Every plugin is registered for each
+#       of its plugin base classes by (base, namespace, name) and by
+#       (base, None, name) keys, so lookups don't walk the subclasses tree.
+_REGISTRY = {}
+
+
 class Plugin(meta.MetaMixin, info.InfoMixin):
     """Base class for all Plugins in Rally."""
 
@@ -139,15 +146,42 @@ class Plugin(meta.MetaMixin, info.InfoMixin):
     @classmethod
     def unregister(cls):
         """Removes all pluign meta information and makes it indiscoverable."""
+        cls._unregister_name()
         cls._meta_clear()
 
+    @classmethod
+    def _registry_keys(cls, name, namespace):
+        for base in cls.__mro__:
+            if issubclass(base, Plugin):
+                yield (base, namespace, name)
+                yield (base, None, name)
+
+    @classmethod
+    def _register_name(cls):
+        for key in cls._registry_keys(cls.get_name(), cls.get_namespace()):
+            _REGISTRY.setdefault(key, []).append(cls)
+
+    @classmethod
+    def _unregister_name(cls):
+        if not cls._meta_is_inited(raise_exc=False):
+            return
+        for key in cls._registry_keys(cls._meta_get("name"),
+                                      cls._meta_get("namespace")):
+            plugins = _REGISTRY.get(key, [])
+            if cls in plugins:
+                plugins.remove(cls)
+            if not plugins:
+                _REGISTRY.pop(key, None)
+
     @classmethod
     def _set_name_and_namespace(cls, name, namespace):
         try:
             existing_plugin = Plugin.get(name, namespace=namespace)
         except exceptions.PluginNotFound:
+            cls._unregister_name()
             cls._meta_set("name", name)
             cls._meta_set("namespace", namespace)
+            cls._register_name()
         else:
             raise exceptions.PluginWithSuchNameExists(
                 name=name, namespace=namespace,
@@ -174,22 +208,44 @@ class Plugin(meta.MetaMixin, info.InfoMixin):
     def get(cls, name, namespace=None):
         """Return plugin by its name from specified namespace.
 
-        This method iterates over all subclasses of cls and returns plugin
-        by name from specified namespace.
+        Lookup takes constant time: plugins are registered for all of their
+        base classes when they are configured.
 
         If namespace is not specified it will return first found plugin from
         any of namespaces.
 
+        If plugin index is activated (see rally.plugins.load()) and plugin
+        is not imported yet, only the module that defines it is imported.
+
         :param name: Plugin's name
         :param namespace: Namespace where to search for plugins
         """
-        for p in cls.get_all(namespace=namespace):
-            if p.get_name() == name:
-                return p
+        plugin = cls._get_registered(name, namespace)
+        if plugin is not None:
+            return plugin
+
+        plugin_index = index.get_active()
+        if plugin_index and plugin_index.import_modules(
+                cls, name=name, namespace=namespace):
+            plugin = cls._get_registered(name, namespace)
+            if plugin is not None:
+                return plugin
 
         raise exceptions.PluginNotFound(
             name=name, namespace=namespace or "any of")
 
+    @classmethod
+    def _get_registered(cls, name, namespace=None):
+        """Return already imported plugin by name or None."""
+        for p in _REGISTRY.get((cls, namespace, name), []):
+            # NOTE: Skip plugins that were reconfigured or unregistered
+            #       bypassing unregister()
+            if (p._meta_is_inited(raise_exc=False)
+                    and p.get_name() == name
+                    and (not namespace or p.get_namespace() == namespace)):
+                return getattr(p, "func_ref", p)
+        return None
+
     @classmethod
     def get_all(cls, namespace=None):
         """Return all subclass plugins of plugin.
@@ -198,6 +254,14 @@ class Plugin(meta.MetaMixin, info.InfoMixin):
 
         :param namespace: return only plugins from specified namespace.
         """
+        plugin_index = index.get_active()
+        if plugin_index:
+            plugin_index.import_modules(cls, namespace=namespace)
+        return cls._get_loaded(namespace=namespace)
+
+    @classmethod
+    def _get_loaded(cls, namespace=None):
+        """Return all already imported subclass plugins of plugin."""
         plugins = []
 
         for p in discover.itersubclasses(cls):
@@ -15,6 +15,7 @@
 
 import abc
 import math
+import random
 
 import six
 
@@ -181,6 +182,243 @@ class PercentileComputation(StreamingAlgorithm):
         return None
 
 
+class QuantileComputation(StreamingAlgorithm):
+    """Estimate percentile of a stream of numbers in bounded memory.
+
+    Values are counted in buckets with logarithmically growing bounds, like
+    DDSketch does, so the estimation has relative error not greater than
+    accuracy, and computations with the same accuracy are merged without
+    loss. If amount of buckets exceeds max_buckets, the lowest buckets are
+    collapsed, that affects only the lowest percentiles.
+    """
+
+    # NOTE: Values below this one are counted as zeros
+    MIN_VALUE = 1e-9
+
+    def __init__(self, percent, accuracy=0.01, max_buckets=2048):
+        """Init streaming computation.
+
+        :param percent: numeric percent (from 0.00..1 to 0.999..)
+        :param accuracy: relative accuracy of the estimation
+        :param max_buckets: maximum amount of buckets
+        """
+        if not 0 < percent < 1:
+            raise ValueError("Unexpected percent: %s" % percent)
+        if not 0 < accuracy < 1:
+            raise ValueError("Unexpected accuracy: %s" % accuracy)
+        self._percent = percent
+        self.accuracy = accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets = {}
+        self._zeros = 0
+        self.count = 0
+        self._min = MinComputation()
+        self._max = MaxComputation()
+
+    def add(self, value):
+        value = self._cast_to_float(value)
+        self.count += 1
+        self._min.add(value)
+        self._max.add(value)
+        if value < self.MIN_VALUE:
+            self._zeros += 1
+            return
+        key = int(math.ceil(math.log(value) / self._log_gamma))
+        self._buckets[key] = self._buckets.get(key, 0) + 1
+        if len(self._buckets) > self.max_buckets:
+            self._collapse()
+
+    def add_range(self, first, step, count):
+        """Add values first, first - step, ..., first - (count - 1) * step.
+
+        Values are counted per bucket, so it takes time proportional to
+        amount of buckets they fall into rather than to count.
+
+        :param first: the largest value
+        :param step: positive difference between consecutive values
+        :param count: amount of values
+        """
+        if count < 1:
+            return
+        first = self._cast_to_float(first)
+        self.count += count
+        self._max.add(first)
+        self._min.add(first - (count - 1) * step)
+        index = 0
+        while index < count:
+            value = first - index * step
+            if value < self.MIN_VALUE:
+                self._zeros += count - index
+                break
+            key = int(math.ceil(math.log(value) / self._log_gamma))
+            # NOTE: Values greater than the lower bound of the bucket
+            lower = self._gamma ** (key - 1)
+            end = min(count, max(index + 1,
+                                 int(math.ceil((first - lower) / step))))
+            self._buckets[key] = self._buckets.get(key, 0) + end - index
+            index = end
+        if len(self._buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        keys = sorted(self._buckets)
+        lowest = keys[-self.max_buckets]
+        for key in keys[:-self.max_buckets]:
+            self._buckets[lowest] += self._buckets.pop(key)
+
+    def merge(self, other):
+        if self.accuracy != other.accuracy:
+            raise ValueError("Can't merge computations with different "
+                             "accuracy: %s, %s"
+                             % (self.accuracy, other.accuracy))
+        for key, count in other._buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + count
+        self._zeros += other._zeros
+        self.count += other.count
+        self._min.merge(other._min)
+        self._max.merge(other._max)
+        if len(self._buckets) > self.max_buckets:
+            self._collapse()
+
+    def quantile(self, percent):
+        """Return estimation of the given percentile (from 0 to 1)."""
+        if not self.count:
+            return None
+        # NOTE: The lowest and the highest values are known exactly
+        if percent <= 0:
+            return self._min.result()
+        if percent >= 1:
+            return self._max.result()
+        rank = percent * (self.count - 1)
+        cumulative = self._zeros
+        if rank < cumulative:
+            return self._min.result()
+        for key in sorted(self._buckets):
+            cumulative += self._buckets[key]
+            if rank < cumulative:
+                value = 2 * self._gamma ** key / (self._gamma + 1)
+                return min(max(value, self._min.result()),
+                           self._max.result())
+        return self._max.result()
+
+    def result(self):
+        return self.quantile(self._percent)
+
+
+# NOTE: Limits amount of values back-filled for one iteration if expected
+#       interval is much less than durations of stalled iterations
+MAX_BACKFILLED_VALUES = 10000
+
+
+class CorrectedDurationComputation(object):
+    """Compute durations of iterations corrected for coordinated omission.
+
+    If the runner saved the planned start of the iteration ("scheduled_at"),
+    the delay of the start is added to the duration. Otherwise, iterations
+    that took longer than the expected interval delayed the start of
+    iterations that were not run, so durations of these iterations are
+    back-filled like HdrHistogram does: duration - interval,
+    duration - 2 * interval, ... while the value is not less than the
+    interval. If the expected interval is not specified, the median of
+    durations of previous iterations is used.
+
+    Raw and corrected durations are kept in streaming quantile sketches,
+    so memory and time per iteration are bounded.
+    """
+
+    def __init__(self, expected_interval=None):
+        self.expected_interval = expected_interval
+        self.raw = QuantileComputation(0.5)
+        self.raw_sum = 0.0
+        self.corrected = QuantileComputation(0.5)
+        self.corrected_sum = 0.0
+
+    def interval(self):
+        """Returns expected interval between iterations of one worker."""
+        return self.expected_interval or self.raw.quantile(0.5)
+
+    def add(self, iteration):
+        """Add duration of a successful iteration."""
+        duration = iteration["duration"]
+        interval = self.interval()
+        self.raw.add(duration)
+        self.raw_sum += duration
+        if iteration.get("scheduled_at") is not None:
+            duration += max(0.0,
+                            iteration["timestamp"] - iteration["scheduled_at"])
+            interval = None
+        count = 1
+        if interval:
+            count += max(0, min(MAX_BACKFILLED_VALUES,
+                                int(math.floor(duration / interval)) - 1))
+        if count > 1:
+            self.corrected.add_range(duration, interval, count)
+            self.corrected_sum += (count * duration
+                                   - interval * count * (count - 1) / 2.0)
+        else:
+            self.corrected.add(duration)
+            self.corrected_sum += duration
+
+    def merge(self, other):
+        self.raw.merge(other.raw)
+        self.raw_sum += other.raw_sum
+        self.corrected.merge(other.corrected)
+        self.corrected_sum += other.corrected_sum
+
+
+class SampleComputation(StreamingAlgorithm):
+    """Keep uniform random sample of a stream of numbers.
+
+    Reservoir sampling is used, so every value of the stream gets to the
+    sample with the same probability whatever the size of the stream is.
+    """
+
+    def __init__(self, size, seed=None):
+        """Init streaming computation.
+
+        :param size: maximum amount of values in the sample
+        :param seed: seed of random generator, to get reproducible samples
+        """
+        self.size = size
+        self.count = 0
+        self._values = []
+        self._random = random.Random(seed)
+
+    def add(self, value):
+        value = self._cast_to_float(value)
+        self.count += 1
+        if len(self._values) < self.size:
+            self._values.append(value)
+            return
+        index = self._random.randrange(self.count)
+        if index < self.size:
+            self._values[index] = value
+
+    def merge(self, other):
+        # NOTE: Values are taken from samples in proportion to amounts of
+        #       values of streams that are still not represented
+        ours, theirs = list(self._values), list(other._values)
+        self._random.shuffle(ours)
+        self._random.shuffle(theirs)
+        left = [self.count, other.count]
+        values = []
+        while len(values) < self.size and (ours or theirs):
+            if theirs and (not ours or self._random.random() * sum(left) >=
+                           left[0]):
+                values.append(theirs.pop())
+                left[1] -= 1
+            else:
+                values.append(ours.pop())
+                left[0] -= 1
+        self._values = values
+        self.count += other.count
+
+    def result(self):
+        return list(self._values)
+
+
 class IncrementComputation(StreamingAlgorithm):
     """Simple incremental counter."""
 
@@ -0,0 +1,124 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tracing of HTTP requests made by scenario iterations.
+
+Iterations are run one per thread, so traced requests are collected in
+thread local storage: the runner calls start() before the iteration and
+stop() after it. Every request sent via TracingSession is linked to the
+innermost atomic action that is running in the same thread.
+"""
+
+import re
+import threading
+import time
+
+import requests
+from six.moves.urllib import parse
+
+
+_local = threading.local()
+
+_ID_SEGMENT = re.compile(r"^([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-"
+                         r"[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{32}|"
+                         r"\d+)$")
+
+
+def endpoint_template(url):
+    """Return host and path of url with IDs replaced by {id}.
+
+    For example, "http://nova:8774/v2/<tenant id>/servers/1?a=b" becomes
+    "nova:8774/v2/{id}/servers/{id}".
+    """
+    parts = parse.urlsplit(url)
+    path = "/".join("{id}" if _ID_SEGMENT.match(segment) else segment
+                    for segment in parts.path.split("/"))
+    return parts.netloc + path
+
+
+def start():
+    """Start collecting HTTP requests made by the current thread."""
+    _local.requests = []
+    _local.actions = []
+
+
+def stop():
+    """Stop collecting HTTP requests and return collected ones."""
+    traced = getattr(_local, "requests", None) or []
+    _local.requests = None
+    _local.actions = []
+    return traced
+
+
+def push_action(name):
+    """Mark the atomic action as running in the current thread."""
+    if not hasattr(_local, "actions"):
+        _local.actions = []
+    _local.actions.append(name)
+
+
+def pop_action():
+    if getattr(_local, "actions", None):
+        _local.actions.pop()
+
+
+def current_action():
+    actions = getattr(_local, "actions", None)
+    return actions[-1] if actions else None
+
+
+def record(method, url, status, size, ttfb, duration):
+    """Save the HTTP request if requests are collected by the thread.
+
+    :param method: HTTP method
+    :param url: URL of the request
+    :param status: status code of response, None if it is not received
+    :param size: size of response body in bytes
+    :param ttfb: time to the first byte of response
+    :param duration: total time of the request, including reading of body
+    """
+    traced = getattr(_local, "requests", None)
+    if traced is None:
+        return
+    traced.append({"action": current_action(),
+                   "method": method,
+                   "endpoint": endpoint_template(url),
+                   "status": status,
+                   "bytes": size,
+                   "ttfb": ttfb,
+                   "duration": duration})
+
+
+class TracingSession(requests.Session):
+    """requests.Session that records every sent request.
+
+    Redirects, retries and authentication requests are sent separately,
+    so each of them is recorded as a separate request.
+    """
+
+    def send(self, request, **kwargs):
+        started_at = time.time()
+        try:
+            resp = super(TracingSession, self).send(request, **kwargs)
+        except Exception:
+            record(request.method, request.url, None, 0, None,
+                   time.time() - started_at)
+            raise
+        if kwargs.get("stream"):
+            size = int(resp.headers.get("Content-Length") or 0)
+        else:
+            size = len(resp.content)
+        record(request.method, request.url, resp.status_code, size,
+               resp.elapsed.total_seconds(), time.time() - started_at)
+        return resp
@@ -23,6 +23,7 @@ import random
 import re
 import string
 import sys
+import threading
 import time
 
 from six import moves
@@ -135,6 +136,57 @@ class RAMInt(object):
             self.__int.value = 0
 
 
+class RateLimiter(object):
+    """Thread-safe token bucket, that limits rate of calls.
+
+    The rate is adaptive: decrease() halves it, e.g. when a service is
+    overloaded, and increase() restores it step by step up to the maximum.
+    """
+
+    def __init__(self, rate, burst=1, min_rate=0.1):
+        """Init rate limiter.
+
+        :param rate: maximum rate of calls per second
+        :param burst: maximum number of calls made without waiting
+        :param min_rate: rate is not decreased below this value
+        """
+        self.max_rate = float(rate)
+        self.rate = self.max_rate
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.burst = burst
+        self._step = self.max_rate / 100
+        self._tokens = float(burst)
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.time()
+        self._tokens = min(self.burst,
+                           self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Wait until a call is allowed."""
+        with self._lock:
+            self._refill()
+            # NOTE: The token is reserved at once, so concurrent callers
+            #       wait for their own tokens instead of racing for them.
+            self._tokens -= 1
+            delay = -self._tokens / self.rate
+        if delay > 0:
+            time.sleep(delay)
+
+    def decrease(self):
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def increase(self):
+        with self._lock:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self._step)
+
+
 def get_method_class(func):
     """Return the class that defined the given method.
 
@@ -205,6 +257,9 @@ def retry(times, func, *args, **kwargs):
     for i in range(times):
         try:
             return func(*args, **kwargs)
+        except NotImplementedError:
+            # NOTE: Unsupported operation doesn't become supported on retry
+            raise
         except Exception:
             if i == times - 1:
                 raise
@@ -22,6 +22,7 @@ from rally.common.i18n import _
 from rally.common import logging
 from rally.common import objects
 from rally.common.plugin import plugin
+from rally.common import tracing
 from rally import consts
 from rally import exceptions
 
@@ -154,7 +155,8 @@ class OSClient(plugin.Plugin):
             auth = token_endpoint.Token(endpoint, kc.auth_token)
 
         return ks_session.Session(auth=auth, verify=self.credential.insecure,
-                                  timeout=CONF.openstack_client_http_timeout)
+                                  timeout=CONF.openstack_client_http_timeout,
+                                  session=tracing.TracingSession())
 
     def _get_endpoint(self, service_type=None):
         kc = self.keystone()
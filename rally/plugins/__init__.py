@@ -13,31 +13,79 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import hashlib
 import os
+import sys
 
 import decorator
 
 from rally.common.plugin import discover
+from rally.common.plugin import index
+from rally.common.plugin import plugin
+from rally.common import version
 
 
 PLUGINS_LOADED = False
 
+PACKAGES = ("rally.deployment.engines",
+            "rally.deployment.serverprovider",
+            "rally.plugins")
 
-def load():
+INDEX_DIR = os.path.expanduser("~/.rally")
+
+
+def index_path():
+    """Return path of the plugin index of this environment.
+
+    Virtualenvs and versions of Rally share the home directory, so the
+    index is kept per Python prefix and Rally version.
+    """
+    key = "%s %s" % (sys.prefix, version.version_string())
+    return os.path.join(INDEX_DIR, "plugins-%s.index"
+                        % hashlib.sha1(key.encode("utf-8")).hexdigest()[:12])
+
+
+def _load_external_plugins():
+    discover.load_plugins("/opt/rally/plugins/")
+    discover.load_plugins(os.path.expanduser("~/.rally/plugins/"))
+
+
+def load(lazy=False):
+    """Load Rally plugins.
+
+    :param lazy: If True, modules with plugins are imported on demand by
+                 Plugin.get() and Plugin.get_all() using the plugin index
+                 stored in index_path(). Index is rebuilt, if modules with
+                 plugins were changed. Plugins from /opt/rally/plugins and
+                 ~/.rally/plugins are always imported.
+    """
     global PLUGINS_LOADED
 
-    if not PLUGINS_LOADED:
-        discover.import_modules_from_package("rally.deployment.engines")
-        discover.import_modules_from_package("rally.deployment.serverprovider")
-        discover.import_modules_from_package("rally.plugins")
+    if PLUGINS_LOADED or (lazy and index.get_active()):
+        return
+
+    if lazy:
+        plugin_index = index.PluginIndex.load(index_path())
+        if plugin_index and plugin_index.is_valid(PACKAGES):
+            index.activate(plugin_index)
+            _load_external_plugins()
+            return
+
+    for package in PACKAGES:
+        discover.import_modules_from_package(package)
+
+    if lazy:
+        index.PluginIndex.build(
+            PACKAGES,
+            [p for p in discover.itersubclasses(plugin.Plugin)
+             if p._meta_is_inited(raise_exc=False)]).save(index_path())
 
-        discover.load_plugins("/opt/rally/plugins/")
-        discover.load_plugins(os.path.expanduser("~/.rally/plugins/"))
+    _load_external_plugins()
 
     PLUGINS_LOADED = True
 
 
 @decorator.decorator
 def ensure_plugins_are_loaded(f, *args, **kwargs):
-    load()
+    load(lazy=True)
     return f(*args, **kwargs)
@@ -73,7 +73,7 @@ def _worker_process(queue, iteration_gen, timeout, concurrency, times,
     while iteration < times and not aborted.is_set():
         scenario_context = runner._get_scenario_context(context)
         scenario_args = (iteration, cls, method_name, scenario_context, args)
-        worker_args = (queue, scenario_args)
+        worker_args = (queue, scenario_args, time.time())
 
         thread = threading.Thread(target=runner._worker_thread,
                                   args=worker_args)
@@ -179,6 +179,7 @@ class ConstantScenarioRunner(runner.ScenarioRunner):
         times = self.config.get("times", 1)
         concurrency = self.config.get("concurrency", 1)
         iteration_gen = utils.RAMInt()
+        self.iteration_gen = iteration_gen
 
         cpu_count = multiprocessing.cpu_count()
         max_cpu_used = min(cpu_count,
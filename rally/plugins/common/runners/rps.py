@@ -76,7 +76,9 @@ def _worker_process(queue, iteration_gen, timeout, rps, times,
         scenario_context = runner._get_scenario_context(context)
         scenario_args = (next(iteration_gen), cls, method_name,
                          scenario_context, args)
-        worker_args = (queue, scenario_args)
+        # NOTE: i-th iteration of the worker is planned to start at
+        #       start + i / rps
+        worker_args = (queue, scenario_args, start + i * sleep, True)
         thread = threading.Thread(target=runner._worker_thread,
                                   args=worker_args)
 
@@ -175,6 +177,7 @@ class RPSScenarioRunner(runner.ScenarioRunner):
         times = self.config["times"]
         timeout = self.config.get("timeout", 0)  # 0 means no timeout
         iteration_gen = utils.RAMInt()
+        self.iteration_gen = iteration_gen
 
         cpu_count = multiprocessing.cpu_count()
         max_cpu_used = min(cpu_count,
@@ -0,0 +1,85 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+SLA (Service-level agreement) is set of details for determining compliance
+with contracted values such as maximum error rate or minimum response time.
+"""
+
+from rally.common.i18n import _
+from rally.common import streaming_algorithms
+from rally import consts
+from rally.task import sla
+
+
+@sla.configure(name="max_corrected_duration")
+class MaxCorrectedDuration(sla.SLA):
+    """Maximum percentile of durations corrected for coordinated omission.
+
+    Delays of the start of iterations run by "rps" runner are added to
+    their durations. Durations of other iterations, that are longer than
+    expected interval between iterations, are back-filled with values that
+    iterations delayed by them would have had. If "expected_interval" is not
+    set, median duration of previous iterations is used, like in the
+    corrected durations table of the report.
+    """
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "$schema": consts.JSON_SCHEMA,
+        "properties": {
+            "max": {"type": "number", "minimum": 0.0,
+                    "exclusiveMinimum": True},
+            "percentile": {"type": "number", "minimum": 0.0,
+                           "exclusiveMinimum": True, "maximum": 100.0,
+                           "exclusiveMaximum": True},
+            "expected_interval": {"type": "number", "minimum": 0.0,
+                                  "exclusiveMinimum": True}
+        },
+        "required": ["max"],
+        "additionalProperties": False
+    }
+
+    def __init__(self, criterion_value):
+        super(MaxCorrectedDuration, self).__init__(criterion_value)
+        self.max_duration = self.criterion_value["max"]
+        self.percentile = self.criterion_value.get("percentile", 95.0)
+        self.durations = streaming_algorithms.CorrectedDurationComputation(
+            self.criterion_value.get("expected_interval"))
+        self.value = None
+
+    def _check(self):
+        self.value = self.durations.corrected.quantile(
+            self.percentile / 100.0)
+        self.success = self.value is None or self.value <= self.max_duration
+        return self.success
+
+    def add_iteration(self, iteration):
+        if not iteration.get("error"):
+            self.durations.add(iteration)
+        return self._check()
+
+    def merge(self, other):
+        self.durations.merge(other.durations)
+        return self._check()
+
+    def details(self):
+        if self.value is None:
+            return (_("%(p)g%% of corrected durations <= %(max).2fs - "
+                      "%(status)s") % {"p": self.percentile,
+                                       "max": self.max_duration,
+                                       "status": self.status()})
+        return (_("%(p)g%% of corrected durations %(value).2fs <= "
+                  "%(max).2fs - %(status)s")
+                % {"p": self.percentile, "value": self.value,
+                   "max": self.max_duration, "status": self.status()})
@@ -19,6 +19,8 @@ SLA (Service-level agreement) is set of details for determining compliance
 with contracted values such as maximum error rate or minimum response time.
 """
 
+import array
+
 from rally.common.i18n import _
 from rally.common import streaming_algorithms
 from rally import consts
@@ -31,6 +33,11 @@ class Outliers(sla.SLA):
 
     The outliers are detected automatically using the computation of the mean
     and standard deviation (std) of the data.
+
+    While the workload is running, each iteration is compared to the
+    threshold computed from the previous ones, that gives approximate
+    amount of outliers used to abort the load early. The final result
+    compares all durations to the threshold computed from all of them.
     """
     CONFIG_SCHEMA = {
         "type": "object",
@@ -54,19 +61,21 @@ class Outliers(sla.SLA):
         self.threshold = None
         self.mean_comp = streaming_algorithms.MeanComputation()
         self.std_comp = streaming_algorithms.StdDevComputation()
+        # NOTE: Durations are stored as C doubles, that takes 8 bytes
+        #       per iteration, to count outliers exactly in result()
+        self.durations = array.array("d")
 
     def add_iteration(self, iteration):
-        # NOTE(ikhudoshyn): This method can not be implemented properly.
-        # After adding a new iteration, both mean and standard deviation
-        # may change. Hence threshold will change as well. In this case we
-        # should again compare durations of all accounted iterations
-        # to the threshold. Unfortunately we can not do it since
-        # we do not store durations.
-        # Implementation provided here only gives rough approximation
-        # of outliers number.
+        # NOTE: After adding a new iteration, both mean and standard
+        #       deviation may change, hence threshold changes as well.
+        #       Comparing durations of all accounted iterations to the
+        #       threshold after each iteration is too expensive, so this
+        #       method only gives rough approximation of outliers number,
+        #       the exact number is computed by result().
         if not iteration.get("error"):
             duration = iteration["duration"]
             self.iterations += 1
+            self.durations.append(duration)
 
             # NOTE(msdubov): First check if the current iteration is an outlier
             if ((self.iterations >= self.min_iterations and self.threshold and
@@ -85,27 +94,32 @@ class Outliers(sla.SLA):
         return self.success
 
     def merge(self, other):
-        # NOTE(ikhudoshyn): This method can not be implemented properly.
-        # After merge, both mean and standard deviation may change.
-        # Hence threshold will change as well. In this case we
-        # should again compare durations of all accounted iterations
-        # to the threshold. Unfortunately we can not do it since
-        # we do not store durations.
-        # Implementation provided here only gives rough approximation
-        # of outliers number.
         self.iterations += other.iterations
-        self.outliers += other.outliers
         self.mean_comp.merge(other.mean_comp)
         self.std_comp.merge(other.std_comp)
+        self.durations.extend(other.durations)
+        return self._count_outliers()
+
+    def _count_outliers(self):
+        """Compare all durations to the threshold computed from all of them.
 
+        :returns: True if the SLA check passed, False otherwise
+        """
+        self.outliers = 0
         if self.iterations >= 2:
             mean = self.mean_comp.result()
             std = self.std_comp.result()
             self.threshold = mean + self.sigmas * std
-
+            if self.iterations >= self.min_iterations:
+                self.outliers = sum(1 for duration in self.durations
+                                    if duration > self.threshold)
         self.success = self.outliers <= self.max_outliers
         return self.success
 
+    def result(self):
+        self._count_outliers()
+        return super(Outliers, self).result()
+
     def details(self):
         return (_("Maximum number of outliers %i <= %i - %s") %
                 (self.outliers, self.max_outliers, self.status()))
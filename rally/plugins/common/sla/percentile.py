@@ -0,0 +1,141 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+SLA (Service-level agreement) is set of details for determining compliance
+with contracted values such as maximum error rate or minimum response time.
+"""
+
+import collections
+
+from rally.common.i18n import _
+from rally.common import streaming_algorithms
+from rally import consts
+from rally.task import sla
+
+
+TOTAL = "total"
+
+
+def durations(iteration):
+    """Return durations of iteration and of calls of atomic actions."""
+    values = collections.defaultdict(list)
+    if iteration.get("error"):
+        trace = [span for span in iteration.get("atomic_actions_trace", [])
+                 if not span["failed"]]
+    else:
+        values[TOTAL].append(iteration["duration"])
+        trace = iteration.get("atomic_actions_trace")
+    if trace is None:
+        for action, duration in iteration["atomic_actions"].items():
+            if duration is not None:
+                values[action].append(duration)
+    else:
+        for span in trace:
+            if not span["failed"] and span["duration"] is not None:
+                values[span["name"]].append(span["duration"])
+    return values
+
+
+@sla.configure(name="max_duration_percentiles")
+class MaxDurationPercentiles(sla.SLA):
+    """Maximum percentiles of durations of iterations or atomic actions.
+
+    Criteria are set per "total" (duration of iteration) or per name of
+    atomic action, e.g. {"total": {"p95": 60}, "nova.boot_server":
+    {"p50": 10, "p99": 30}}. Separate calls of atomic actions are used if
+    atomic actions trace is available.
+
+    A percentile is exceeded once more than (100 - percentile)% of values
+    exceed the maximum, so criteria are checked exactly after every
+    iteration, while reported percentiles are estimated in bounded memory.
+    Criteria of an action are not checked until it has at least
+    "min_iterations" values, so a few slow warm-up iterations don't abort
+    the load.
+    """
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "$schema": consts.JSON_SCHEMA,
+        "minProperties": 1,
+        "properties": {
+            "min_iterations": {"type": "integer", "minimum": 1}
+        },
+        "patternProperties": {
+            "^(?!min_iterations$)": {
+                "type": "object",
+                "minProperties": 1,
+                "patternProperties": {
+                    "^p(0\\.[0-9]*[1-9]|[1-9][0-9]?(\\.[0-9]+)?)$": {
+                        "type": "number", "minimum": 0.0,
+                        "exclusiveMinimum": True}
+                },
+                "additionalProperties": False
+            }
+        }
+    }
+
+    def __init__(self, criterion_value):
+        super(MaxDurationPercentiles, self).__init__(criterion_value)
+        criteria = dict(self.criterion_value)
+        # NOTE: Having 3 as default is reasonable (need enough data).
+        self.min_iterations = criteria.pop("min_iterations", 3)
+        # NOTE: (action, percentile) -> [max duration, values exceeding it]
+        self.criteria = collections.OrderedDict()
+        self.sketches = {}
+        for action, percentiles in sorted(criteria.items()):
+            self.sketches[action] = streaming_algorithms.QuantileComputation(
+                0.5)
+            for key, max_duration in sorted(percentiles.items(),
+                                            key=lambda p: float(p[0][1:])):
+                self.criteria[(action, float(key[1:]))] = [max_duration, 0]
+
+    def _check(self):
+        self.success = all(
+            self.sketches[action].count < self.min_iterations
+            or exceeded * 100 <= (100 - percentile) * self.sketches[
+                action].count
+            for (action, percentile), (max_duration, exceeded)
+            in self.criteria.items())
+        return self.success
+
+    def add_iteration(self, iteration):
+        for action, values in durations(iteration).items():
+            if action not in self.sketches:
+                continue
+            for value in values:
+                self.sketches[action].add(value)
+            for (name, percentile), criterion in self.criteria.items():
+                if name == action:
+                    criterion[1] += sum(1 for value in values
+                                        if value > criterion[0])
+        return self._check()
+
+    def merge(self, other):
+        for action, sketch in other.sketches.items():
+            self.sketches[action].merge(sketch)
+        for key, (max_duration, exceeded) in other.criteria.items():
+            self.criteria[key][1] += exceeded
+        return self._check()
+
+    def details(self):
+        results = []
+        for (action, percentile), (max_duration, exceeded) in (
+                self.criteria.items()):
+            value = self.sketches[action].quantile(percentile / 100.0)
+            results.append(_("%(p)g%%ile of %(action)s %(value)s <= "
+                             "%(max).2fs") % {
+                "p": percentile, "action": action,
+                "value": "n/a" if value is None else "%.2fs" % value,
+                "max": max_duration})
+        return "%s - %s" % (", ".join(results), self.status())
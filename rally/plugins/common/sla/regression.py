@@ -0,0 +1,212 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+SLA (Service-level agreement) is set of details for determining compliance
+with contracted values such as maximum error rate or minimum response time.
+"""
+
+import json
+import os
+
+from rally.common.i18n import _
+from rally.common import objects
+from rally.common import streaming_algorithms
+from rally import consts
+from rally import exceptions
+from rally.plugins.common.sla import percentile
+from rally.task import sla
+from rally.task.processing import utils
+
+
+BOOTSTRAP = "bootstrap"
+MANN_WHITNEY = "mann_whitney"
+
+# NOTE: Durations are compared by random samples of this size, that keeps
+#       both memory and time of comparison bounded
+MAX_SAMPLES = 500
+MIN_SAMPLES = 10
+BOOTSTRAP_ROUNDS = 1000
+SEED = 0
+
+
+def load_baseline(baseline, workload=None, pos=None):
+    """Return iterations of the baseline workload.
+
+    :param baseline: UUID of task or path to file with results of task,
+                     that is saved by `rally task results`
+    :param workload: name of scenario of the workload, it is required
+                     if the task has several workloads
+    :param pos: position of the workload in the task
+    """
+    path = os.path.expanduser(baseline)
+    if os.path.exists(path):
+        with open(path) as f:
+            results = [(r["key"], r["result"]) for r in json.load(f)]
+    else:
+        results = [(r["key"], r["data"]["raw"])
+                   for r in objects.Task.get(baseline).get_results()]
+    found = [raw for key, raw in results
+             if (workload is None or key["name"] == workload) and
+             (pos is None or key["pos"] == pos)]
+    if len(found) != 1:
+        raise exceptions.NotFoundException(message=_(
+            "%(count)d workloads of baseline %(baseline)s match "
+            "workload=%(workload)s, pos=%(pos)s, expected 1") % {
+                "count": len(found), "baseline": baseline,
+                "workload": workload, "pos": pos})
+    return found[0]
+
+
+def _ratio(values, baseline, percent):
+    value = utils.percentile(values, percent)
+    base = utils.percentile(baseline, percent)
+    if base <= 0:
+        return float("inf") if value > 0 else 1.0
+    return value / base
+
+
+@sla.configure(name="max_regression")
+class MaxRegression(sla.SLA):
+    """Durations are not greater than durations of a baseline workload.
+
+    The baseline is a task UUID or a file saved by `rally task results`,
+    e.g. {"baseline": "<uuid>", "max_increase": 10, "percentile": 95}
+    fails if 95%ile of duration of iteration or of any atomic action is
+    greater than the baseline one by more than 10% with 95% confidence.
+
+    The "bootstrap" method estimates confidence interval of ratio of
+    percentiles, the "mann_whitney" method tests whether durations are
+    greater than baseline ones increased by max_increase, regardless of
+    percentile. Actions with less than 10 durations in any workload are
+    not compared.
+    """
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "$schema": consts.JSON_SCHEMA,
+        "properties": {
+            "baseline": {"type": "string"},
+            "workload": {"type": "string"},
+            "pos": {"type": "integer", "minimum": 0},
+            "max_increase": {"type": "number", "minimum": 0.0},
+            "percentile": {"type": "number", "minimum": 0.0,
+                           "maximum": 100.0},
+            "confidence": {"type": "number", "minimum": 0.5,
+                           "maximum": 1.0, "exclusiveMaximum": True},
+            "method": {"enum": [BOOTSTRAP, MANN_WHITNEY]},
+            "actions": {"type": "array", "items": {"type": "string"},
+                        "minItems": 1}
+        },
+        "required": ["baseline"],
+        "additionalProperties": False
+    }
+
+    def __init__(self, criterion_value):
+        super(MaxRegression, self).__init__(criterion_value)
+        self.max_increase = self.criterion_value.get("max_increase", 10.0)
+        self.percentile = self.criterion_value.get("percentile", 95.0)
+        self.confidence = self.criterion_value.get("confidence", 0.95)
+        self.method = self.criterion_value.get("method", BOOTSTRAP)
+        self.actions = self.criterion_value.get("actions")
+        self.samples = {}
+        self.comparisons = []
+        self.error = None
+
+    def _sample(self):
+        return streaming_algorithms.SampleComputation(MAX_SAMPLES, SEED)
+
+    def add_iteration(self, iteration):
+        for action, values in percentile.durations(iteration).items():
+            if self.actions is not None and action not in self.actions:
+                continue
+            if action not in self.samples:
+                self.samples[action] = self._sample()
+            for value in values:
+                self.samples[action].add(value)
+        return self.success
+
+    def merge(self, other):
+        for action, sample in other.samples.items():
+            if action not in self.samples:
+                self.samples[action] = self._sample()
+            self.samples[action].merge(sample)
+        return self.success
+
+    def _baseline_samples(self):
+        samples = {}
+        for iteration in load_baseline(self.criterion_value["baseline"],
+                                       self.criterion_value.get("workload"),
+                                       self.criterion_value.get("pos")):
+            for action, values in percentile.durations(iteration).items():
+                if action not in self.samples:
+                    continue
+                if action not in samples:
+                    samples[action] = self._sample()
+                for value in values:
+                    samples[action].add(value)
+        return dict((action, sample.result())
+                    for action, sample in samples.items())
+
+    def _compare(self, values, baseline):
+        threshold = 1 + self.max_increase / 100.0
+        if self.method == MANN_WHITNEY:
+            p_value = utils.mann_whitney(
+                values, [value * threshold for value in baseline])
+            return p_value < 1 - self.confidence, "p=%.3f" % p_value
+        low, high = utils.bootstrap(
+            values, baseline,
+            lambda v, b: _ratio(v, b, self.percentile / 100.0),
+            confidence=self.confidence, rounds=BOOTSTRAP_ROUNDS, seed=SEED)
+        ratio = _ratio(list(values), list(baseline), self.percentile / 100.0)
+        return low > threshold, _(
+            "%(p)g%%ile %(ratio)+.1f%% (%(c)g%% CI %(low)+.1f%%.."
+            "%(high)+.1f%%)") % {
+                "p": self.percentile, "ratio": (ratio - 1) * 100,
+                "c": self.confidence * 100, "low": (low - 1) * 100,
+                "high": (high - 1) * 100}
+
+    def _check(self):
+        self.comparisons = []
+        self.error = None
+        try:
+            baseline = self._baseline_samples()
+        except (exceptions.RallyException, IOError, ValueError,
+                KeyError) as e:
+            self.error = _("Failed to load baseline: %s") % e
+            self.success = False
+            return
+        failed = False
+        for action in sorted(self.samples):
+            values = self.samples[action].result()
+            if (len(values) < MIN_SAMPLES or
+                    len(baseline.get(action, [])) < MIN_SAMPLES):
+                continue
+            regression, detail = self._compare(values, baseline[action])
+            failed = failed or regression
+            self.comparisons.append("%s %s%s" % (
+                action, detail, " > +%g%%" % self.max_increase
+                if regression else ""))
+        self.success = not failed
+
+    def result(self):
+        self._check()
+        return super(MaxRegression, self).result()
+
+    def details(self):
+        if self.error:
+            return "%s - %s" % (self.error, self.status())
+        if not self.comparisons:
+            return _("Not enough durations to compare with baseline - %s") % (
+                self.status())
+        return "%s - %s" % (", ".join(self.comparisons), self.status())
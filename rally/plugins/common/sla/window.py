@@ -0,0 +1,276 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+SLA (Service-level agreement) is set of details for determining compliance
+with contracted values such as maximum error rate or minimum response time.
+"""
+
+import math
+
+from rally.common.i18n import _
+from rally.common import streaming_algorithms
+from rally import consts
+from rally.task import sla
+
+
+MAX_VIOLATIONS = 100
+
+
+class _Bucket(object):
+    """Iterations finished during one step of the window."""
+
+    def __init__(self, with_durations):
+        self.iterations = 0
+        self.failures = 0
+        self.durations = (streaming_algorithms.QuantileComputation(0.5)
+                          if with_durations else None)
+
+    def add(self, iteration):
+        self.iterations += 1
+        if iteration["error"]:
+            self.failures += 1
+        elif self.durations is not None:
+            self.durations.add(iteration["duration"])
+
+    def merge(self, other):
+        self.iterations += other.iterations
+        self.failures += other.failures
+        if self.durations is not None:
+            self.durations.merge(other.durations)
+
+
+@sla.configure(name="window")
+class Window(sla.SLA):
+    """Failure rate and percentiles of durations in every time window.
+
+    Iterations are grouped by time of their finish into windows of
+    "window" seconds which start every "step" seconds, so windows are
+    tumbling by default and sliding if step is less than window, e.g.
+    {"window": 60, "step": 10, "max_failure_rate": 1} checks failure rate
+    in any minute of the workload. Windows with less than "min_iterations"
+    iterations are not checked.
+
+    Results of iterations come a bit out of order, so a window is checked
+    only after results of "grace" seconds (one step by default) after its
+    end have come. Iterations that come after their windows were checked
+    are not taken into account, but their amount is reported.
+
+    Only the steps of the latest window are kept, so the check takes
+    bounded memory however long the workload is. Violating windows which
+    overlap are reported as one time range.
+    """
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "$schema": consts.JSON_SCHEMA,
+        "properties": {
+            "window": {"type": "number", "minimum": 0.0,
+                       "exclusiveMinimum": True},
+            "step": {"type": "number", "minimum": 0.0,
+                     "exclusiveMinimum": True},
+            "grace": {"type": "number", "minimum": 0.0},
+            "min_iterations": {"type": "integer", "minimum": 1},
+            "max_failure_rate": {"type": "number", "minimum": 0.0,
+                                 "maximum": 100.0},
+            "max_percentiles": {
+                "type": "object",
+                "minProperties": 1,
+                "patternProperties": {
+                    "^p(0\\.[0-9]*[1-9]|[1-9][0-9]?(\\.[0-9]+)?)$": {
+                        "type": "number", "minimum": 0.0,
+                        "exclusiveMinimum": True}
+                },
+                "additionalProperties": False
+            }
+        },
+        "required": ["window"],
+        "anyOf": [{"required": ["max_failure_rate"]},
+                  {"required": ["max_percentiles"]}],
+        "additionalProperties": False
+    }
+
+    def __init__(self, criterion_value):
+        super(Window, self).__init__(criterion_value)
+        self.window = float(self.criterion_value["window"])
+        self.step = float(self.criterion_value.get("step", self.window))
+        self.size = max(1, int(round(self.window / self.step)))
+        self.grace = int(math.ceil(
+            self.criterion_value.get("grace", self.step) / self.step))
+        self.min_iterations = self.criterion_value.get("min_iterations", 1)
+        self.max_failure_rate = self.criterion_value.get("max_failure_rate")
+        self.max_percentiles = sorted(
+            (float(key[1:]), max_duration) for key, max_duration
+            in self.criterion_value.get("max_percentiles", {}).items())
+        self.buckets = {}
+        # NOTE: Windows that end at this step or earlier are checked
+        self.checked = None
+        self.windows = 0
+        self.violated_windows = 0
+        self.violations = []
+        self.late_iterations = 0
+        self.late_failures = 0
+
+    def add_iteration(self, iteration):
+        index = int((iteration["timestamp"] + iteration["duration"])
+                    // self.step)
+        if (self.checked is not None and
+                index <= self.checked - self.size + 1):
+            # NOTE: All windows of the iteration are already checked
+            self.late_iterations += 1
+            if iteration["error"]:
+                self.late_failures += 1
+            return self.success
+        if index not in self.buckets:
+            self.buckets[index] = _Bucket(bool(self.max_percentiles))
+        self.buckets[index].add(iteration)
+        self._check_until(index - 1 - self.grace)
+        return self.success
+
+    def _check_until(self, last):
+        if not self.buckets:
+            return
+        first = (min(self.buckets) if self.checked is None
+                 else self.checked + 1)
+        ends = set()
+        for index in self.buckets:
+            ends.update(range(max(index, first),
+                              min(index + self.size, last + 1)))
+        for end in sorted(ends):
+            self._check_window(end)
+        if self.checked is None or last > self.checked:
+            self.checked = last
+        for index in list(self.buckets):
+            if index <= self.checked - self.size + 1:
+                del self.buckets[index]
+
+    def _check_window(self, end):
+        buckets = [self.buckets[index]
+                   for index in range(end - self.size + 1, end + 1)
+                   if index in self.buckets]
+        iterations = sum(b.iterations for b in buckets)
+        if not iterations or iterations < self.min_iterations:
+            return
+        self.windows += 1
+        exceeded = {}
+        if self.max_failure_rate is not None:
+            failure_rate = sum(b.failures for b in buckets) * 100.0 / (
+                iterations)
+            if failure_rate > self.max_failure_rate:
+                exceeded["failure_rate"] = failure_rate
+        if self.max_percentiles:
+            durations = streaming_algorithms.QuantileComputation(0.5)
+            for bucket in buckets:
+                durations.merge(bucket.durations)
+            for percentile, max_duration in self.max_percentiles:
+                value = durations.quantile(percentile / 100.0)
+                if value is not None and value > max_duration:
+                    exceeded["p%g" % percentile] = value
+        if exceeded:
+            self.violated_windows += 1
+            self.success = False
+            self._add_violation({"started_at": (end - self.size + 1) *
+                                 self.step,
+                                 "finished_at": (end + 1) * self.step,
+                                 "values": exceeded})
+
+    def _add_violation(self, violation):
+        last = self.violations[-1] if self.violations else None
+        if last and violation["started_at"] <= last["finished_at"]:
+            last["finished_at"] = max(last["finished_at"],
+                                      violation["finished_at"])
+            for key, value in violation["values"].items():
+                last["values"][key] = max(last["values"].get(key, value),
+                                          value)
+        elif len(self.violations) < MAX_VIOLATIONS:
+            self.violations.append({"started_at": violation["started_at"],
+                                    "finished_at": violation["finished_at"],
+                                    "values": dict(violation["values"])})
+
+    def _finish(self):
+        if self.buckets:
+            self._check_until(max(self.buckets))
+
+    def _checked_before(self):
+        if self.checked is None and self.buckets:
+            return min(self.buckets) - 1
+        return self.checked
+
+    def merge(self, other):
+        # NOTE: Windows that are not checked by both instances are checked
+        #       after merge, so merge is exact for instances that handle
+        #       iterations of distinct time ranges.
+        checked = [sla._checked_before() for sla in (self, other)]
+        for index, bucket in other.buckets.items():
+            if index in self.buckets:
+                self.buckets[index].merge(bucket)
+            else:
+                self.buckets[index] = bucket
+        violations, self.violations = self.violations, []
+        for violation in sorted(violations + other.violations,
+                                key=lambda v: v["started_at"]):
+            self._add_violation(violation)
+        self.windows += other.windows
+        self.violated_windows += other.violated_windows
+        self.late_iterations += other.late_iterations
+        self.late_failures += other.late_failures
+        checked = [index for index in checked if index is not None]
+        self.checked = min(checked) if checked else None
+        self.success = self.success and other.success
+        return self.success
+
+    def _describe(self, values):
+        results = []
+        if "failure_rate" in values:
+            results.append(_("failure rate %(value).1f%% > %(max).1f%%") % {
+                "value": values["failure_rate"],
+                "max": self.max_failure_rate})
+        for percentile, max_duration in self.max_percentiles:
+            key = "p%g" % percentile
+            if key in values:
+                results.append(_("%(p)g%%ile %(value).2fs > %(max).2fs") % {
+                    "p": percentile, "value": values[key],
+                    "max": max_duration})
+        return ", ".join(results)
+
+    def result(self):
+        self._finish()
+        result = super(Window, self).result()
+        result["violations"] = [
+            {"started_at": v["started_at"], "finished_at": v["finished_at"],
+             "detail": self._describe(v["values"])}
+            for v in self.violations]
+        result["late_iterations"] = self.late_iterations
+        return result
+
+    def details(self):
+        criteria = []
+        if self.max_failure_rate is not None:
+            criteria.append(_("failure rate <= %.1f%%")
+                            % self.max_failure_rate)
+        for percentile, max_duration in self.max_percentiles:
+            criteria.append(_("%(p)g%%ile <= %(max).2fs") % {
+                "p": percentile, "max": max_duration})
+        late = ""
+        if self.late_iterations:
+            late = _(" - %(late)d late iterations (%(failed)d failed) are "
+                     "not checked") % {"late": self.late_iterations,
+                                       "failed": self.late_failures}
+        return (_("%(criteria)s in every %(window)gs window - "
+                  "%(violated)d of %(windows)d windows violated%(late)s - "
+                  "%(status)s") % {"criteria": " and ".join(criteria),
+                                   "window": self.window,
+                                   "violated": self.violated_windows,
+                                   "windows": self.windows,
+                                   "late": late,
+                                   "status": self.status()})
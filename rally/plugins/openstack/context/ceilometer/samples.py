@@ -12,6 +12,10 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import sys
+import threading
+
+import six
 from six import moves
 
 from rally.common.i18n import _
@@ -86,6 +90,10 @@ class CeilometerSampleGenerator(context.Context):
             "batches_allow_lose": {
                 "type": "integer",
                 "minimum": 0
+            },
+            "resource_management_workers": {
+                "type": "integer",
+                "minimum": 1
             }
         },
         "required": ["counter_name", "counter_type", "counter_unit",
@@ -96,27 +104,16 @@ class CeilometerSampleGenerator(context.Context):
     DEFAULT_CONFIG = {
         "resources_per_tenant": 5,
         "samples_per_resource": 5,
-        "timestamp_interval": 60
+        "timestamp_interval": 60,
+        "resource_management_workers": 10
     }
 
-    def _store_batch_samples(self, scenario, batches, batches_allow_lose):
-        batches_allow_lose = batches_allow_lose or 0
-        unsuccess = 0
-        for i, batch in enumerate(batches, start=1):
-            try:
-                samples = scenario._create_samples(batch)
-            except Exception:
-                unsuccess += 1
-                LOG.warning(_("Failed to store batch %d of Ceilometer samples"
-                              " during context creation") % i)
-        if unsuccess > batches_allow_lose:
-            raise exceptions.ContextSetupFailure(
-                ctx_name=self.get_name(),
-                msg=_("Context failed to store too many batches of samples"))
-        return samples
+    def _generate_batches(self):
+        """Generate batches of samples of all resources lazily.
 
-    @logging.log_task_wrapper(LOG.info, _("Enter context: `Ceilometer`"))
-    def setup(self):
+        :returns: generator of tuples (user, tenant_id, resource number,
+                  batch number, list of samples)
+        """
         new_sample = {
             "counter_name": self.config["counter_name"],
             "counter_type": self.config["counter_type"],
@@ -125,22 +122,110 @@ class CeilometerSampleGenerator(context.Context):
         }
         for user, tenant_id in rutils.iterate_per_tenants(
                 self.context["users"]):
-            self.context["tenants"][tenant_id]["samples"] = []
-            self.context["tenants"][tenant_id]["resources"] = []
             scenario = ceilo_utils.CeilometerScenario(
                 context={"user": user, "task": self.context["task"]}
             )
             for i in moves.xrange(self.config["resources_per_tenant"]):
-                samples_to_create = scenario._make_samples(
+                batches = scenario._make_samples(
                     count=self.config["samples_per_resource"],
                     interval=self.config["timestamp_interval"],
                     metadata_list=self.config.get("metadata_list"),
                     batch_size=self.config.get("batch_size"),
                     **new_sample)
-                samples = self._store_batch_samples(
-                    scenario, samples_to_create,
-                    self.config.get("batches_allow_lose")
-                )
+                for j, batch in enumerate(batches, start=1):
+                    yield user, tenant_id, i, j, batch
+
+    def _store_batch_samples(self, batches, threads):
+        """Store batches of samples concurrently.
+
+        Workers take batches from the generator one by one, so only
+        batches that are being stored are kept in memory.
+
+        :param batches: generator of batches, see _generate_batches()
+        :param threads: number of workers
+        :returns: tuple of dicts with created samples of the last stored
+                  batch and with number of lost batches, both are keyed
+                  by (tenant_id, resource number), and number of stored
+                  samples
+        """
+        lock = threading.Lock()
+        created = {}
+        lost = {}
+        stored = [0]
+        errors = []
+
+        def worker():
+            scenarios = {}
+            while True:
+                with lock:
+                    try:
+                        user, tenant_id, i, j, batch = next(batches)
+                    except StopIteration:
+                        return
+                    except Exception:
+                        # NOTE: The generator is closed after a failure,
+                        # so the rest of workers stop too and the error
+                        # is re-raised once all of them are joined.
+                        errors.append(sys.exc_info())
+                        return
+                key = (tenant_id, i)
+                try:
+                    if user["id"] not in scenarios:
+                        scenarios[user["id"]] = (
+                            ceilo_utils.CeilometerScenario(
+                                context={"user": user,
+                                         "task": self.context["task"]}))
+                    samples = scenarios[user["id"]]._create_samples(batch)
+                except Exception as e:
+                    LOG.warning(_("Failed to store batch %(batch)d of "
+                                  "Ceilometer samples during context "
+                                  "creation: %(error)s")
+                                % {"batch": j, "error": e})
+                    with lock:
+                        lost[key] = lost.get(key, 0) + 1
+                    continue
+                with lock:
+                    stored[0] += len(batch)
+                    if key not in created or created[key][0] < j:
+                        created[key] = (j, samples)
+
+        workers = [threading.Thread(target=worker) for i in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        if errors:
+            six.reraise(*errors[0])
+        return (dict((key, samples) for key, (j, samples) in created.items()),
+                lost, stored[0])
+
+    @logging.log_task_wrapper(LOG.info, _("Enter context: `Ceilometer`"))
+    def setup(self):
+        with rutils.Timer() as timer:
+            created, lost, stored = self._store_batch_samples(
+                self._generate_batches(),
+                self.config["resource_management_workers"])
+        LOG.info(_("Stored %(stored)d Ceilometer samples in %(duration).1f "
+                   "seconds, %(rate).1f samples/s, %(lost)d batches lost") % {
+                       "stored": stored, "duration": timer.duration(),
+                       "rate": stored / max(timer.duration(), 1e-6),
+                       "lost": sum(lost.values())})
+
+        batches_allow_lose = self.config.get("batches_allow_lose") or 0
+        if any(count > batches_allow_lose for count in lost.values()):
+            raise exceptions.ContextSetupFailure(
+                ctx_name=self.get_name(),
+                msg=_("Context failed to store too many batches of samples"))
+
+        for user, tenant_id in rutils.iterate_per_tenants(
+                self.context["users"]):
+            self.context["tenants"][tenant_id]["samples"] = []
+            self.context["tenants"][tenant_id]["resources"] = []
+            for i in moves.xrange(self.config["resources_per_tenant"]):
+                samples = created.get((tenant_id, i))
+                if not samples:
+                    continue
                 for sample in samples:
                     self.context["tenants"][tenant_id]["samples"].append(
                         sample.to_dict())
@@ -24,7 +24,7 @@ from rally.task import context
 LOG = logging.getLogger(__name__)
 
 
-@context.configure(name="volumes", order=420)
+@context.configure(name="volumes", order=410)
 class VolumeGenerator(context.Context):
     """Context class for adding volumes to each user for benchmarks."""
 
@@ -23,7 +23,16 @@ CONF = cfg.CONF
 
 CLEANUP_OPTS = [
     cfg.IntOpt("resource_deletion_timeout", default=600,
-               help="A timeout in seconds for deleting resources")
+               help="A timeout in seconds for deleting resources"),
+    cfg.IntOpt("cleanup_threads", default=60,
+               help="Maximum amount of threads that are deleting resources "
+                    "of all resource managers simultaneously"),
+    cfg.StrOpt("journal_dir", default="~/.rally/cleanup_journal",
+               help="Directory for journals of resources created by tasks"),
+    cfg.BoolOpt("use_journal", default=False,
+                help="Delete resources recorded in the task journal instead "
+                     "of listing all resources of users, where it is "
+                     "possible")
 ]
 cleanup_group = cfg.OptGroup(name="cleanup", title="Cleanup Options")
 CONF.register_group(cleanup_group)
@@ -33,7 +42,7 @@ CONF.register_opts(CLEANUP_OPTS, cleanup_group)
 def resource(service, resource, order=0, admin_required=False,
              perform_for_admin_only=False, tenant_resource=False,
              max_attempts=3, timeout=CONF.cleanup.resource_deletion_timeout,
-             interval=1, threads=20):
+             interval=1, threads=20, depends_on=None, batch_size=1):
     """Decorator that overrides resource specification.
 
     Just put it on top of your resource class and specify arguments that you
@@ -53,6 +62,17 @@ def resource(service, resource, order=0, admin_required=False,
     :param interval: Resource status pooling interval
     :param threads: Amount of threads (workers) that are deleting resources
                     simultaneously
+    :param depends_on: List of names in format <service> or
+                       <service>.<resource> of resource managers that should
+                       finish their cleanup before this one starts. Resource
+                       managers of the same service with lower order are
+                       always treated as dependencies. None means that
+                       resource manager depends on all resource managers with
+                       lower order.
+    :param batch_size: Max amount of resources that are deleted and checked
+                       for deletion by one worker at once. It makes sense only
+                       for resource managers that implement bulk_delete() or
+                       list_deleted()
     """
 
     def inner(cls):
@@ -67,6 +87,8 @@ def resource(service, resource, order=0, admin_required=False,
         cls._interval = interval
         cls._threads = threads
         cls._tenant_resource = tenant_resource
+        cls._depends_on = depends_on
+        cls._batch_size = batch_size
 
         return cls
 
@@ -82,6 +104,10 @@ class ResourceManager(object):
 
     If project python client is very specific, you can override delete(),
     list() and is_deleted() methods to make them fit to your case.
+
+    If service API allows to delete or to check many resources by one request,
+    you can override bulk_delete() and list_deleted() methods and specify
+    batch_size in @resource decorator.
     """
 
     def __init__(self, resource=None, admin=None, user=None, tenant_uuid=None):
@@ -119,3 +145,29 @@ class ResourceManager(object):
     def list(self):
         """List all resources specific for admin or user."""
         return self._manager().list()
+
+    def get(self, resource_id):
+        """Returns raw resource by id.
+
+        It is used for resources recorded in the task journal instead of
+        list().
+        """
+        return self._manager().get(resource_id)
+
+    def bulk_delete(self, resources):
+        """Delete many resources by one request.
+
+        :param resources: List of raw resources
+        :raises NotImplementedError: if service doesn't support bulk deletion
+        """
+        raise NotImplementedError()
+
+    def list_deleted(self, ids):
+        """Check many resources for deletion by one request.
+
+        :param ids: List of resources ids
+        :returns: List of ids of deleted resources
+        :raises NotImplementedError: if resources should be checked one by
+                                     one via is_deleted()
+        """
+        raise NotImplementedError()
@@ -19,6 +19,7 @@ from rally.common.i18n import _
 from rally.common import logging
 from rally import consts
 from rally import exceptions
+from rally.plugins.openstack.context.cleanup import journal
 from rally.plugins.openstack.context.cleanup import manager
 from rally.task import context
 
@@ -44,6 +45,13 @@ class CleanupMixin(object):
     def setup(self):
         pass
 
+    def _task_uuid(self):
+        """Returns UUID of the task, if its journal should be used."""
+        # NOTE: Tenants leased from a resource pool contain resources of
+        #       previous tasks, so only recorded ones are deleted.
+        if journal.is_enabled(self.context):
+            return self.context["task"]["uuid"]
+
 
 # NOTE(amaretskiy): Set order to run this just before UserCleanup
 @context.configure(name="admin_cleanup", order=(sys.maxsize - 1), hidden=True)
@@ -67,7 +75,8 @@ class AdminCleanup(CleanupMixin, context.Context):
         manager.cleanup(names=self.config,
                         admin_required=True,
                         admin=self.context["admin"],
-                        users=self.context.get("users", []))
+                        users=self.context.get("users", []),
+                        task_uuid=self._task_uuid())
 
 
 # NOTE(amaretskiy): Set maximum order to run this last
@@ -91,4 +100,5 @@ class UserCleanup(CleanupMixin, context.Context):
     def cleanup(self):
         manager.cleanup(names=self.config,
                         admin_required=False,
-                        users=self.context.get("users", []))
+                        users=self.context.get("users", []),
+                        task_uuid=self._task_uuid())
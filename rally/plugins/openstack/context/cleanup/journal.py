@@ -0,0 +1,215 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Append-only journal of resources created by a task.
+
+Every line of the journal file is a JSON object that describes one created
+resource. Lines are written by a single write() call to a file opened in
+append mode, so concurrent writers (runner processes and threads) don't mix
+their records and the journal survives a crash of Rally.
+"""
+
+import errno
+import json
+import os
+
+from oslo_config import cfg
+
+from rally.common.i18n import _
+from rally.common import logging
+# NOTE: Import base to register cleanup options
+from rally.plugins.openstack.context.cleanup import base  # noqa
+
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+# NOTE: Names of resource managers (in format <service>.<resource>), whose
+#       resources are recorded into the journal on creation.
+RECORDED_RESOURCES = set([
+    "nova.servers",
+    "cinder.volumes",
+    "glance.images",
+    "neutron.network",
+    "neutron.subnet",
+    "neutron.router",
+    "neutron.port",
+    "swift.container",
+    "swift.object"
+])
+
+# NOTE: Names of recorded resource managers, whose resources can be deleted
+#       only with credentials of the tenant that owns them.
+TENANT_RESOURCES = set([
+    "swift.container",
+    "swift.object"
+])
+
+
+def _path(task_uuid):
+    return os.path.join(os.path.expanduser(CONF.cleanup.journal_dir),
+                        "%s.journal" % task_uuid)
+
+
+def is_enabled(context):
+    """Returns whether resources of the task are recorded to the journal.
+
+    The journal is used by cleanup only if CONF.cleanup.use_journal is set
+    or tenants are leased from a resource pool, otherwise nothing is
+    recorded.
+
+    :param context: task, context or scenario context dict
+    """
+    return bool(CONF.cleanup.use_journal or "resource_pool" in context)
+
+
+def _write(task_uuid, lines):
+    path = _path(task_uuid)
+    try:
+        os.makedirs(os.path.dirname(path))
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+    try:
+        os.write(fd, "".join(lines).encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+def record(task_uuid, service, resource, resource_id, tenant_id=None):
+    """Append created resource to the journal of the task.
+
+    Journal failures never break the caller, they are just logged.
+
+    :param task_uuid: UUID of the task that created the resource
+    :param service: service name of the resource manager, e.g. "nova"
+    :param resource: resource name of the resource manager, e.g. "servers"
+    :param resource_id: ID of the created resource
+    :param tenant_id: ID of the tenant that owns the resource
+    """
+    record_many(task_uuid, [(service, resource, resource_id)],
+                tenant_id=tenant_id)
+
+
+def record_many(task_uuid, resources, tenant_id=None):
+    """Append created resources to the journal of the task at once.
+
+    :param task_uuid: UUID of the task that created resources
+    :param resources: list of (service, resource, resource_id) tuples
+    :param tenant_id: ID of the tenant that owns resources
+    """
+    lines = []
+    for service, resource, resource_id in resources:
+        try:
+            lines.append(json.dumps({"service": service,
+                                     "resource": resource,
+                                     "id": resource_id,
+                                     "tenant_id": tenant_id}) + "\n")
+        except (TypeError, ValueError) as e:
+            LOG.warning(_("Failed to record %(service)s.%(resource)s "
+                          "%(id)s to the cleanup journal: %(reason)s")
+                        % {"service": service, "resource": resource,
+                           "id": resource_id, "reason": e})
+    if not lines:
+        return
+    try:
+        _write(task_uuid, lines)
+    except (IOError, OSError) as e:
+        LOG.warning(_("Failed to record %(count)d resources to the cleanup "
+                      "journal: %(reason)s")
+                    % {"count": len(lines), "reason": e})
+
+
+def record_resource(context, service, resource, resource_id):
+    """Append created resource to the journal of the task from context.
+
+    :param context: scenario or context context dict. If it doesn't contain
+                    a task, the journal is not enabled for the task (see
+                    is_enabled()) or resources are "pooled", i.e. kept in
+                    a resource pool for next tasks, nothing is recorded
+    """
+    record_resources(context, [(service, resource, resource_id)])
+
+
+def record_resources(context, resources):
+    """Append created resources to the journal of the task from context.
+
+    :param context: see record_resource()
+    :param resources: list of (service, resource, resource_id) tuples
+    """
+    task = context.get("task")
+    if not task or context.get("pooled") or not is_enabled(context):
+        return
+    tenant_id = (context.get("tenant") or {}).get("id")
+    if tenant_id is None:
+        tenant_id = (context.get("user") or {}).get("tenant_id")
+    record_many(task["uuid"], resources, tenant_id=tenant_id)
+
+
+def load(task_uuid):
+    """Returns all records of the task journal.
+
+    Unparsable lines (e.g. the last one, if Rally crashed while writing it)
+    are skipped.
+
+    :param task_uuid: UUID of the task
+    :returns: list of dicts with service, resource, id and tenant_id keys
+    """
+    path = _path(task_uuid)
+    if not os.path.exists(path):
+        return []
+
+    records = []
+    with open(path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                LOG.warning(_("Skipping broken line of the cleanup journal "
+                              "%(path)s: %(line)s")
+                            % {"path": path, "line": line.strip()})
+    return records
+
+
+def discard(task_uuid, names):
+    """Remove records of deleted resources from the journal of the task.
+
+    The journal is removed, once it has no records left. It should not be
+    called while resources of the task are still being recorded.
+
+    :param task_uuid: UUID of the task
+    :param names: names of resource managers (in format
+                  <service>.<resource>), whose recorded resources are
+                  deleted
+    """
+    names = set(names)
+    records = [record for record in load(task_uuid)
+               if "%s.%s" % (record["service"], record["resource"])
+               not in names]
+    if not records:
+        delete(task_uuid)
+        return
+    path = _path(task_uuid)
+    with open(path + ".tmp", "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    os.rename(path + ".tmp", path)
+
+
+def delete(task_uuid):
+    """Remove the journal of the task."""
+    path = _path(task_uuid)
+    if os.path.exists(path):
+        os.remove(path)
@@ -13,23 +13,39 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import sys
+import threading
 import time
+import uuid
+
+from oslo_config import cfg
+import six
 
 from rally.common import broker
 from rally.common.i18n import _
 from rally.common import logging
+from rally.common import objects
 from rally.common.plugin import discover
 from rally.common import utils as rutils
+from rally import consts
 from rally import osclients
 from rally.plugins.openstack.context.cleanup import base
+from rally.plugins.openstack.context.cleanup import journal
+from rally.plugins.openstack.wrappers import keystone
+# NOTE: Import resources to register resource managers, even if plugins
+#       are loaded lazily
+from rally.plugins.openstack.context.cleanup import (  # noqa
+    resources as _resources)
 
 
+CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
 
 class SeekAndDestroy(object):
 
-    def __init__(self, manager_cls, admin, users):
+    def __init__(self, manager_cls, admin, users, records=None):
         """Resource deletion class.
 
         This class contains method exterminate() that finds and deletes
@@ -38,10 +54,18 @@ class SeekAndDestroy(object):
         :param manager_cls: subclass of base.ResourceManager
         :param admin: admin credential like in context["admin"]
         :param users: users credentials like in context["users"]
+        :param records: records of the task journal (see journal.load())
+                        for resources of manager_cls. If it is specified,
+                        only these resources are deleted without listing
         """
         self.manager_cls = manager_cls
         self.admin = admin
         self.users = users or []
+        self.records = records
+        # NOTE: Amount of resources, that were found but failed to be
+        #       deleted, or recorded ones that could not be checked
+        self.failed = 0
+        self._failed_lock = threading.Lock()
 
     @staticmethod
     def _get_cached_client(user, cache=None):
@@ -59,63 +83,150 @@ class SeekAndDestroy(object):
 
         return cache[key]
 
-    def _delete_single_resource(self, resource):
-        """Safe resource deletion with retries and timeouts.
-
-        Send request to delete resource, in case of failures repeat it few
-        times. After that pull status of resource until it's deleted.
-
-        Writes in LOG warning with UUID of resource that wasn't deleted
-
-        :param resource: instance of resource manager initiated with resource
-                         that should be deleted.
-        """
-
-        msg_kw = {
+    @staticmethod
+    def _msg_kw(resource):
+        return {
             "uuid": resource.id(),
             "service": resource._service,
             "resource": resource._resource
         }
 
-        LOG.debug("Deleting %(service)s %(resource)s object %(uuid)s" %
-                  msg_kw)
+    def _delete(self, resources):
+        """Send requests to delete resources, in case of failures repeat it.
 
-        try:
-            rutils.retry(resource._max_attempts, resource.delete)
-        except Exception as e:
-            msg_kw["reason"] = e
-            LOG.warning(
-                _("Resource deletion failed, max retries exceeded for "
-                  "%(service)s.%(resource)s: %(uuid)s. Reason: %(reason)s")
-                % msg_kw)
-            if logging.is_debug():
-                LOG.exception(e)
-        else:
-            started = time.time()
-            failures_count = 0
-            while time.time() - started < resource._timeout:
-                try:
-                    if resource.is_deleted():
-                        return
-                except Exception as e:
-                    LOG.warning(
-                        _("Seems like %s.%s.is_deleted(self) method is broken "
-                          "It shouldn't raise any exceptions.")
-                        % (resource.__module__, type(resource).__name__))
+        Resources are deleted by one bulk_delete() request, if it is
+        supported by resource manager, otherwise one by one.
+
+        :param resources: list of instances of resource manager initiated with
+                          resources that should be deleted
+        :returns: list of resources that were successfully requested for
+                  deletion
+        """
+        resource = resources[0]
+        if len(resources) > 1:
+            try:
+                rutils.retry(resource._max_attempts, resource.bulk_delete,
+                             [res.raw_resource for res in resources])
+                return list(resources)
+            except NotImplementedError:
+                pass
+            except Exception as e:
+                LOG.warning(
+                    _("Bulk deletion of %(count)s %(service)s.%(resource)s "
+                      "resources failed, falling back to deletion one by "
+                      "one. Reason: %(reason)s")
+                    % {"count": len(resources),
+                       "service": resource._service,
+                       "resource": resource._resource,
+                       "reason": e})
+
+        deleted = []
+        for resource in resources:
+            msg_kw = self._msg_kw(resource)
+            LOG.debug("Deleting %(service)s %(resource)s object %(uuid)s" %
+                      msg_kw)
+            try:
+                rutils.retry(resource._max_attempts, resource.delete)
+            except Exception as e:
+                msg_kw["reason"] = e
+                LOG.warning(
+                    _("Resource deletion failed, max retries exceeded for "
+                      "%(service)s.%(resource)s: %(uuid)s. Reason: "
+                      "%(reason)s") % msg_kw)
+                if logging.is_debug():
                     LOG.exception(e)
+            else:
+                deleted.append(resource)
+        return deleted
 
-                    # NOTE(boris-42): Avoid LOG spamming in case of bad
-                    #                 is_deleted() method
-                    failures_count += 1
-                    if failures_count > resource._max_attempts:
-                        break
+    @staticmethod
+    def _list_deleted(resources):
+        """Returns deleted resources.
 
-                finally:
-                    time.sleep(resource._interval)
+        Resources are checked by one list_deleted() request, if it is
+        supported by resource manager, otherwise one by one.
+        """
+        if len(resources) > 1:
+            try:
+                deleted = set(resources[0].list_deleted(
+                    [resource.id() for resource in resources]))
+                return [res for res in resources if res.id() in deleted]
+            except NotImplementedError:
+                pass
+        return [res for res in resources if res.is_deleted()]
+
+    def _delete_resources(self, resources):
+        """Safe deletion of resources with retries and timeouts.
+
+        Send requests to delete resources, in case of failures repeat it few
+        times. After that pull statuses of resources until they are deleted.
+
+        Writes in LOG warning with UUID of every resource that wasn't deleted
+
+        :param resources: list of instances of resource manager initiated with
+                          resources that should be deleted. All of them
+                          should belong to the same user.
+        """
+        pending = self._delete(resources)
+        self._add_failed(len(resources) - len(pending))
+        if not pending:
+            return
+
+        resource = pending[0]
+        started = time.time()
+        failures_count = 0
+        while time.time() - started < resource._timeout:
+            try:
+                for deleted in self._list_deleted(pending):
+                    pending.remove(deleted)
+                if not pending:
+                    return
+            except Exception as e:
+                LOG.warning(
+                    _("Seems like %s.%s.is_deleted(self) method is broken "
+                      "It shouldn't raise any exceptions.")
+                    % (resource.__module__, type(resource).__name__))
+                LOG.exception(e)
+
+                # NOTE(boris-42): Avoid LOG spamming in case of bad
+                #                 is_deleted() method
+                failures_count += 1
+                if failures_count > resource._max_attempts:
+                    break
+
+            finally:
+                time.sleep(resource._interval)
 
+        for resource in pending:
             LOG.warning(_("Resource deletion failed, timeout occurred for "
                           "%(service)s.%(resource)s: %(uuid)s.")
-                        % msg_kw)
+                        % self._msg_kw(resource))
+        self._add_failed(len(pending))
+
+    def _add_failed(self, count):
+        if count:
+            with self._failed_lock:
+                self.failed += count
+
+    def _get_recorded_resources(self, manager, ids):
+        """Returns raw resources by ids, skipping already deleted ones."""
+        raw_resources = []
+        for resource_id in ids:
+            try:
+                raw_resources.append(manager.get(resource_id))
+            except Exception as e:
+                code = (getattr(e, "code", None)
+                        or getattr(e, "http_status", None)
+                        or getattr(e, "status_code", None))
+                if code != 404:
+                    LOG.warning(
+                        _("Failed to get %(service)s.%(resource)s "
+                          "%(uuid)s: %(reason)s")
+                        % {"service": manager._service,
+                           "resource": manager._resource,
+                           "uuid": resource_id, "reason": e})
+                    self._add_failed(1)
+        return raw_resources
 
     def _gen_publisher(self):
         """Returns publisher for deletion jobs.
@@ -123,19 +234,30 @@ class SeekAndDestroy(object):
         This method iterates over all users, lists all resources
         (using manager_cls) and puts jobs for deletion.
 
-        Every deletion job contains tuple with two values: user and resource
-        uuid that should be deleted.
+        Every deletion job contains tuple with three values: admin, user and
+        list of raw resources that should be deleted. Size of the list is
+        limited by manager_cls._batch_size.
 
         In case of tenant based resource, uuids are fetched only from one user
         per tenant.
+
+        If journal records are specified, jobs contain ids of recorded
+        resources instead of raw resources and nothing is listed. Resources
+        of tenants without users (e.g. users were already deleted) are deleted
+        by admin.
         """
 
         def publisher(queue):
 
+            def _append(admin, user, raw_resources):
+                batch_size = self.manager_cls._batch_size
+                for i in range(0, len(raw_resources), batch_size):
+                    queue.append((admin, user,
+                                  raw_resources[i:i + batch_size]))
+
             def _publish(admin, user, manager):
                 try:
-                    for raw_resource in rutils.retry(3, manager.list):
-                        queue.append((admin, user, raw_resource))
+                    _append(admin, user, list(rutils.retry(3, manager.list)))
                 except Exception as e:
                     LOG.warning(
                         _("Seems like %s.%s.list(self) method is broken. "
@@ -143,8 +265,25 @@ class SeekAndDestroy(object):
                         % (manager.__module__, type(manager).__name__))
                     LOG.exception(e)
 
-            if self.admin and (not self.users
-                               or self.manager_cls._perform_for_admin_only):
+            if self.records is not None:
+                users = dict((user["tenant_id"], user) for user in self.users)
+                tenants = collections.OrderedDict()
+                for record in self.records:
+                    tenants.setdefault(record["tenant_id"], []).append(
+                        record["id"])
+
+                for tenant_id, ids in tenants.items():
+                    user = users.get(tenant_id)
+                    if not user and self.admin:
+                        user = {"credential": self.admin["credential"],
+                                "tenant_id": tenant_id}
+                    if user:
+                        _append(self.admin, user, ids)
+                    else:
+                        self._add_failed(len(ids))
+
+            elif self.admin and (not self.users
+                                 or self.manager_cls._perform_for_admin_only):
                 manager = self.manager_cls(
                     admin=self._get_cached_client(self.admin))
                 _publish(self.admin, None, manager)
@@ -172,23 +311,70 @@ class SeekAndDestroy(object):
 
         def consumer(cache, args):
             """Execute deletion job."""
-            admin, user, raw_resource = args
-
-            manager = self.manager_cls(
-                resource=raw_resource,
-                admin=self._get_cached_client(admin, cache=cache),
-                user=self._get_cached_client(user, cache=cache),
-                tenant_uuid=user and user["tenant_id"])
-
-            self._delete_single_resource(manager)
+            admin, user, raw_resources = args
+
+            if self.records is not None:
+                raw_resources = self._get_recorded_resources(
+                    self.manager_cls(
+                        admin=self._get_cached_client(admin, cache=cache),
+                        user=self._get_cached_client(user, cache=cache),
+                        tenant_uuid=user and user["tenant_id"]),
+                    raw_resources)
+                if not raw_resources:
+                    return
+
+            managers = [
+                self.manager_cls(
+                    resource=raw_resource,
+                    admin=self._get_cached_client(admin, cache=cache),
+                    user=self._get_cached_client(user, cache=cache),
+                    tenant_uuid=user and user["tenant_id"])
+                for raw_resource in raw_resources]
+
+            self._delete_resources(managers)
 
         return consumer
 
-    def exterminate(self):
-        """Delete all resources for passed users, admin and resource_mgr."""
+    def exterminate(self, consumers_count=None):
+        """Delete all resources for passed users, admin and resource_mgr.
+
+        :param consumers_count: Amount of threads that are deleting resources,
+                                by default it is manager_cls._threads
+        """
 
+        consumers_count = consumers_count or self.manager_cls._threads
         broker.run(self._gen_publisher(), self._gen_consumer(),
-                   consumers_count=self.manager_cls._threads)
+                   consumers_count=consumers_count)
+
+
+class ThreadsBudget(object):
+
+    def __init__(self, size):
+        """Amount of threads shared between concurrent resource managers.
+
+        :param size: Total amount of threads
+        """
+        self.free = max(size, 1)
+        self._condition = threading.Condition()
+
+    def acquire(self, count):
+        """Wait for at least one free thread and take up to count of them.
+
+        :param count: Desired amount of threads
+        :returns: Amount of taken threads
+        """
+        with self._condition:
+            while self.free < 1:
+                self._condition.wait()
+            taken = min(max(count, 1), self.free)
+            self.free -= taken
+            return taken
+
+    def release(self, count):
+        """Return threads taken by acquire() back to the budget."""
+        with self._condition:
+            self.free += count
+            self._condition.notify_all()
 
 
 def list_resource_names(admin_required=None):
@@ -248,7 +434,33 @@ def find_resource_managers(names=None, admin_required=None):
     return resource_managers
 
 
-def cleanup(names=None, admin_required=None, admin=None, users=None):
+def _is_dependency(manager, other):
+    """Checks that other resource manager should be cleaned before manager."""
+    if other._order >= manager._order:
+        # NOTE: Dependencies are allowed only on resource managers with
+        #       lower order, so the graph can not have cycles.
+        return False
+    if manager._depends_on is None or manager._service == other._service:
+        return True
+    return (other._service in manager._depends_on
+            or "%s.%s" % (other._service, other._resource)
+            in manager._depends_on)
+
+
+def build_dependency_graph(resource_managers):
+    """Returns dependencies of every resource manager.
+
+    :param resource_managers: List of resource managers
+    :returns: dict where key is resource manager and value is a set of
+              resource managers that should be cleaned before it
+    """
+    return dict((mgr, set(other for other in resource_managers
+                          if _is_dependency(mgr, other)))
+                for mgr in resource_managers)
+
+
+def cleanup(names=None, admin_required=None, admin=None, users=None,
+            task_uuid=None):
     """Generic cleaner.
 
     This method goes through all plugins. Filter those and left only plugins
@@ -257,6 +469,19 @@ def cleanup(names=None, admin_required=None, admin=None, users=None):
     Then goes through all passed users and using cleaners cleans all related
     resources.
 
+    Resource managers are cleaned concurrently: each of them waits only for
+    its dependencies (see base.resource depends_on argument), while the
+    total amount of deleting threads is limited by
+    CONF.cleanup.cleanup_threads.
+
+    If task_uuid is specified, resources of managers from
+    journal.RECORDED_RESOURCES are taken from the journal of this task
+    instead of listing. Records of managers, whose resources are all
+    deleted, are removed from the journal.
+
+    If cleanup of some managers fails, the others are still cleaned up,
+    and then the first error is re-raised.
+
     :param names: Use only resource manages that has name from this list.
                   There are in as _service or
                   (%s.%s % (_service, _resource)) from
@@ -274,9 +499,114 @@ def cleanup(names=None, admin_required=None, admin=None, users=None):
                     "credential": <rally.common.objects.Credential>
 
                   }
+    :param task_uuid: UUID of the task, whose journal should be used
+    """
+    resource_managers = find_resource_managers(names, admin_required)
+    records = {}
+    if task_uuid:
+        for record in journal.load(task_uuid):
+            name = "%s.%s" % (record["service"], record["resource"])
+            records.setdefault(name, []).append(record)
+    graph = build_dependency_graph(resource_managers)
+    finished = dict((mgr, threading.Event()) for mgr in resource_managers)
+    budget = ThreadsBudget(CONF.cleanup.cleanup_threads)
+    cleaned = []
+    errors = []
+
+    def _cleanup(manager):
+        try:
+            for dependency in graph[manager]:
+                finished[dependency].wait()
+
+            threads = budget.acquire(manager._threads)
+            try:
+                LOG.debug("Cleaning up %(service)s %(resource)s objects" %
+                          {"service": manager._service,
+                           "resource": manager._resource})
+                name = "%s.%s" % (manager._service, manager._resource)
+                recorded = task_uuid and name in journal.RECORDED_RESOURCES
+                if recorded:
+                    destroyer = SeekAndDestroy(manager, admin, users,
+                                               records=records.get(name, []))
+                else:
+                    destroyer = SeekAndDestroy(manager, admin, users)
+                destroyer.exterminate(consumers_count=threads)
+                if recorded and not destroyer.failed:
+                    cleaned.append(name)
+            finally:
+                budget.release(threads)
+        except Exception as e:
+            errors.append(sys.exc_info())
+            LOG.warning(_("Cleanup of %(service)s.%(resource)s failed: "
+                          "%(reason)s") % {"service": manager._service,
+                                           "resource": manager._resource,
+                                           "reason": e})
+            if logging.is_debug():
+                LOG.exception(e)
+        finally:
+            finished[manager].set()
+
+    workers = []
+    for manager in resource_managers:
+        worker = threading.Thread(target=_cleanup, args=(manager,))
+        worker.start()
+        workers.append(worker)
+
+    for worker in workers:
+        worker.join()
+
+    if cleaned:
+        journal.discard(task_uuid, cleaned)
+    if errors:
+        six.reraise(*errors[0])
+
+
+def _create_tenant_users(admin, tenant_ids):
+    """Create temporary users with admin credential in the given tenants."""
+    credential = admin["credential"]
+    client = keystone.wrap(osclients.Clients(credential).keystone())
+    tenants = dict((project.id, project.name)
+                   for project in client.list_projects()
+                   if project.id in tenant_ids)
+    users = []
+    for tenant_id, tenant_name in tenants.items():
+        username = "rally_cleanup_%s" % uuid.uuid4().hex[:8]
+        password = str(uuid.uuid4())
+        user = client.create_user(username, password,
+                                  "%s@email.me" % username, tenant_id)
+        users.append({
+            "id": user.id, "tenant_id": tenant_id,
+            "credential": objects.Credential(
+                client.auth_url, username, password, tenant_name,
+                consts.EndpointPermission.USER, credential.region_name,
+                endpoint_type=credential.endpoint_type,
+                https_insecure=credential.insecure,
+                https_cacert=credential.cacert)})
+    return client, users
+
+
+def cleanup_task(task_uuid, admin):
+    """Delete resources recorded to the journal of the task.
+
+    Resources are deleted on behalf of the admin, except resources from
+    journal.TENANT_RESOURCES, which are deleted by temporary users created
+    in their tenants.
+
+    :param task_uuid: UUID of the task
+    :param admin: admin credential like in context["admin"]
+    :returns: records of resources that were not deleted
     """
-    for manager in find_resource_managers(names, admin_required):
-        LOG.debug("Cleaning up %(service)s %(resource)s objects" %
-                  {"service": manager._service,
-                   "resource": manager._resource})
-        SeekAndDestroy(manager, admin, users).exterminate()
+    tenant_ids = set(
+        record["tenant_id"] for record in journal.load(task_uuid)
+        if record["tenant_id"] and "%s.%s" % (
+            record["service"], record["resource"]) in journal.TENANT_RESOURCES)
+    client, users = None, []
+    if tenant_ids:
+        client, users = _create_tenant_users(admin, tenant_ids)
+    try:
+        cleanup(names=sorted(journal.RECORDED_RESOURCES), admin=admin,
+                users=users, task_uuid=task_uuid)
+    finally:
+        for user in users:
+            client.delete_user(user["id"])
+    return journal.load(task_uuid)
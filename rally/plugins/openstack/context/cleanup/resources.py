@@ -13,13 +13,17 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from boto import exception as boto_exception
-from neutronclient.common import exceptions as neutron_exceptions
-from saharaclient.api import base as saharaclient_base
+import inspect
+import json
+import threading
+import time
+
+from six.moves.urllib import parse
 
 from rally.common import logging
 from rally.common.plugin import discover
 from rally.common import utils
+from rally import exceptions
 from rally.plugins.openstack.context.cleanup import base
 from rally.plugins.openstack.scenarios.fuel import utils as futils
 from rally.plugins.openstack.scenarios.keystone import utils as kutils
@@ -39,6 +43,60 @@ class SynchronizedDeletion(object):
         return True
 
 
+def _credential_key(manager):
+    """Returns key of the credential used by resource manager or None."""
+    client = manager._admin_required and manager.admin or manager.user
+    credential = getattr(client, "credential", None)
+    if credential is None:
+        return None
+    return (credential.auth_url, credential.region_name,
+            credential.username, credential.tenant_name)
+
+
+# NOTE: Listings of resources per credential, tenant and resource manager
+#       class, that are shared by batches of resources polled for deletion
+#       by different threads, each of them having its own clients
+_listings = {}
+_listings_lock = threading.Lock()
+# NOTE: Listings that weren't used for this time are forgotten
+_LISTINGS_MAX_AGE = 600
+
+
+def _list_existing_ids(manager):
+    """Returns ids of existing resources, listed at most once per interval."""
+    credential_key = _credential_key(manager)
+    if credential_key is None:
+        return set(resource.id for resource in manager.list())
+    key = (type(manager), manager.tenant_uuid) + credential_key
+    now = time.time()
+    with _listings_lock:
+        for stale in [k for k, v in _listings.items()
+                      if now - v["used_at"] > _LISTINGS_MAX_AGE]:
+            del _listings[stale]
+        listing = _listings.setdefault(
+            key, {"lock": threading.Lock(), "listed_at": None})
+        listing["used_at"] = now
+    with listing["lock"]:
+        if (listing["listed_at"] is None
+                or time.time() - listing["listed_at"] >= manager._interval):
+            listing["ids"] = set(resource.id for resource in manager.list())
+            listing["listed_at"] = time.time()
+        return listing["ids"]
+
+
+class ListDeletedMixin(object):
+    """Checks resources for deletion by one list() request.
+
+    Batches of resources of the same user are polled concurrently, so a
+    listing is shared by them for the polling interval instead of being
+    requested by every batch.
+    """
+
+    def list_deleted(self, ids):
+        existing = _list_existing_ids(self)
+        return [id_ for id_ in ids if id_ not in existing]
+
+
 class QuotaMixin(SynchronizedDeletion):
 
     def id(self):
@@ -53,18 +111,21 @@ class QuotaMixin(SynchronizedDeletion):
 
 # HEAT
 
-@base.resource("heat", "stacks", order=100, tenant_resource=True)
+@base.resource("heat", "stacks", order=100, tenant_resource=True,
+               depends_on=[])
 class HeatStack(base.ResourceManager):
     pass
 
 
 # NOVA
 
+_nova_depends_on = ["heat"]
 _nova_order = get_order(200)
 
 
-@base.resource("nova", "servers", order=next(_nova_order))
-class NovaServer(base.ResourceManager):
+@base.resource("nova", "servers", order=next(_nova_order),
+               depends_on=_nova_depends_on, batch_size=20)
+class NovaServer(ListDeletedMixin, base.ResourceManager):
     def list(self):
         """List all servers."""
 
@@ -96,17 +157,20 @@ class NovaServer(base.ResourceManager):
         super(NovaServer, self).delete()
 
 
-@base.resource("nova", "floating_ips", order=next(_nova_order))
+@base.resource("nova", "floating_ips", order=next(_nova_order),
+               depends_on=_nova_depends_on)
 class NovaFloatingIPs(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
-@base.resource("nova", "keypairs", order=next(_nova_order))
+@base.resource("nova", "keypairs", order=next(_nova_order),
+               depends_on=_nova_depends_on)
 class NovaKeypair(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
-@base.resource("nova", "security_groups", order=next(_nova_order))
+@base.resource("nova", "security_groups", order=next(_nova_order),
+               depends_on=_nova_depends_on)
 class NovaSecurityGroup(SynchronizedDeletion, base.ResourceManager):
 
     def list(self):
@@ -115,12 +179,14 @@ class NovaSecurityGroup(SynchronizedDeletion, base.ResourceManager):
 
 
 @base.resource("nova", "quotas", order=next(_nova_order),
+               depends_on=_nova_depends_on,
                admin_required=True, tenant_resource=True)
 class NovaQuotas(QuotaMixin, base.ResourceManager):
     pass
 
 
 @base.resource("nova", "floating_ips_bulk", order=next(_nova_order),
+               depends_on=_nova_depends_on,
                admin_required=True)
 class NovaFloatingIpsBulk(SynchronizedDeletion, base.ResourceManager):
 
@@ -134,6 +200,7 @@ class NovaFloatingIpsBulk(SynchronizedDeletion, base.ResourceManager):
 
 
 @base.resource("nova", "networks", order=next(_nova_order),
+               depends_on=_nova_depends_on,
                admin_required=True, tenant_resource=True)
 class NovaNetworks(SynchronizedDeletion, base.ResourceManager):
 
@@ -160,10 +227,15 @@ class EC2Mixin(object):
         return getattr(self.user, self._service)()
 
 
-@base.resource("ec2", "servers", order=next(_ec2_order))
+@base.resource("ec2", "servers", order=next(_ec2_order),
+               depends_on=["heat"])
 class EC2Server(EC2Mixin, base.ResourceManager):
 
     def is_deleted(self):
+        # NOTE: Client libraries are imported on first use, so loading
+        #       cleanup doesn't import clients of all services
+        from boto import exception as boto_exception
+
         try:
             instances = self._manager().get_only_instances(
                 instance_ids=[self.id()])
@@ -189,6 +261,7 @@ class EC2Server(EC2Mixin, base.ResourceManager):
 
 # NEUTRON
 
+_neutron_depends_on = ["heat", "nova.servers", "ec2.servers"]
 _neutron_order = get_order(300)
 
 
@@ -213,6 +286,10 @@ class NeutronMixin(SynchronizedDeletion, base.ResourceManager):
         delete_method = getattr(self._manager(), "delete_%s" % self._resource)
         delete_method(self.id())
 
+    def get(self, resource_id):
+        show_method = getattr(self._manager(), "show_%s" % self._resource)
+        return show_method(resource_id)[self._resource]
+
     def list(self):
         resources = self._resource + "s"
         list_method = getattr(self._manager(), "list_%s" % resources)
@@ -230,24 +307,28 @@ class NeutronLbaasV1Mixin(NeutronMixin):
 
 
 @base.resource("neutron", "vip", order=next(_neutron_order),
+               depends_on=_neutron_depends_on,
                tenant_resource=True)
 class NeutronV1Vip(NeutronLbaasV1Mixin):
     pass
 
 
 @base.resource("neutron", "health_monitor", order=next(_neutron_order),
+               depends_on=_neutron_depends_on,
                tenant_resource=True)
 class NeutronV1Healthmonitor(NeutronLbaasV1Mixin):
     pass
 
 
 @base.resource("neutron", "pool", order=next(_neutron_order),
+               depends_on=_neutron_depends_on,
                tenant_resource=True)
 class NeutronV1Pool(NeutronLbaasV1Mixin):
     pass
 
 
 @base.resource("neutron", "port", order=next(_neutron_order),
+               depends_on=_neutron_depends_on,
                tenant_resource=True)
 class NeutronPort(NeutronMixin):
 
@@ -259,6 +340,8 @@ class NeutronPort(NeutronMixin):
                 self.raw_resource["device_id"],
                 {"port_id": self.raw_resource["id"]})
         else:
+            from neutronclient.common import exceptions as neutron_exceptions
+
             try:
                 self._manager().delete_port(self.id())
             except neutron_exceptions.PortNotFoundClient:
@@ -269,36 +352,42 @@ class NeutronPort(NeutronMixin):
 
 
 @base.resource("neutron", "router", order=next(_neutron_order),
+               depends_on=_neutron_depends_on,
                tenant_resource=True)
 class NeutronRouter(NeutronMixin):
     pass
 
 
 @base.resource("neutron", "subnet", order=next(_neutron_order),
+               depends_on=_neutron_depends_on,
                tenant_resource=True)
 class NeutronSubnet(NeutronMixin):
     pass
 
 
 @base.resource("neutron", "network", order=next(_neutron_order),
+               depends_on=_neutron_depends_on,
                tenant_resource=True)
 class NeutronNetwork(NeutronMixin):
     pass
 
 
 @base.resource("neutron", "floatingip", order=next(_neutron_order),
+               depends_on=_neutron_depends_on,
                tenant_resource=True)
 class NeutronFloatingIP(NeutronMixin):
     pass
 
 
 @base.resource("neutron", "security_group", order=next(_neutron_order),
+               depends_on=_neutron_depends_on,
                tenant_resource=True)
 class NeutronSecurityGroup(NeutronMixin):
     pass
 
 
 @base.resource("neutron", "quota", order=next(_neutron_order),
+               depends_on=_neutron_depends_on,
                admin_required=True, tenant_resource=True)
 class NeutronQuota(QuotaMixin, NeutronMixin):
 
@@ -308,34 +397,40 @@ class NeutronQuota(QuotaMixin, NeutronMixin):
 
 # CINDER
 
+_cinder_depends_on = ["heat", "nova.servers"]
 _cinder_order = get_order(400)
 
 
 @base.resource("cinder", "backups", order=next(_cinder_order),
+               depends_on=_cinder_depends_on,
                tenant_resource=True)
 class CinderVolumeBackup(base.ResourceManager):
     pass
 
 
 @base.resource("cinder", "volume_snapshots", order=next(_cinder_order),
+               depends_on=_cinder_depends_on,
                tenant_resource=True)
 class CinderVolumeSnapshot(base.ResourceManager):
     pass
 
 
 @base.resource("cinder", "transfers", order=next(_cinder_order),
+               depends_on=_cinder_depends_on,
                tenant_resource=True)
 class CinderVolumeTransfer(base.ResourceManager):
     pass
 
 
 @base.resource("cinder", "volumes", order=next(_cinder_order),
-               tenant_resource=True)
-class CinderVolume(base.ResourceManager):
+               depends_on=_cinder_depends_on,
+               tenant_resource=True, batch_size=20)
+class CinderVolume(ListDeletedMixin, base.ResourceManager):
     pass
 
 
 @base.resource("cinder", "quotas", order=next(_cinder_order),
+               depends_on=_cinder_depends_on,
                admin_required=True, tenant_resource=True)
 class CinderQuotas(QuotaMixin, base.ResourceManager):
     pass
@@ -343,22 +438,26 @@ class CinderQuotas(QuotaMixin, base.ResourceManager):
 
 # MANILA
 
+_manila_depends_on = ["heat"]
 _manila_order = get_order(450)
 
 
 @base.resource("manila", "shares", order=next(_manila_order),
+               depends_on=_manila_depends_on,
                tenant_resource=True)
 class ManilaShare(base.ResourceManager):
     pass
 
 
 @base.resource("manila", "share_networks", order=next(_manila_order),
+               depends_on=_manila_depends_on,
                tenant_resource=True)
 class ManilaShareNetwork(base.ResourceManager):
     pass
 
 
 @base.resource("manila", "security_services", order=next(_manila_order),
+               depends_on=_manila_depends_on,
                tenant_resource=True)
 class ManilaSecurityService(base.ResourceManager):
     pass
@@ -366,7 +465,8 @@ class ManilaSecurityService(base.ResourceManager):
 
 # GLANCE
 
-@base.resource("glance", "images", order=500, tenant_resource=True)
+@base.resource("glance", "images", order=500, tenant_resource=True,
+               depends_on=[])
 class GlanceImage(base.ResourceManager):
 
     def list(self):
@@ -375,40 +475,47 @@ class GlanceImage(base.ResourceManager):
 
 # SAHARA
 
+_sahara_depends_on = ["heat"]
 _sahara_order = get_order(600)
 
 
 @base.resource("sahara", "job_executions", order=next(_sahara_order),
+               depends_on=_sahara_depends_on,
                tenant_resource=True)
 class SaharaJobExecution(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
 @base.resource("sahara", "jobs", order=next(_sahara_order),
+               depends_on=_sahara_depends_on,
                tenant_resource=True)
 class SaharaJob(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
 @base.resource("sahara", "job_binary_internals", order=next(_sahara_order),
+               depends_on=_sahara_depends_on,
                tenant_resource=True)
 class SaharaJobBinaryInternals(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
 @base.resource("sahara", "job_binaries", order=next(_sahara_order),
+               depends_on=_sahara_depends_on,
                tenant_resource=True)
 class SaharaJobBinary(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
 @base.resource("sahara", "data_sources", order=next(_sahara_order),
+               depends_on=_sahara_depends_on,
                tenant_resource=True)
 class SaharaDataSource(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
 @base.resource("sahara", "clusters", order=next(_sahara_order),
+               depends_on=_sahara_depends_on,
                tenant_resource=True)
 class SaharaCluster(base.ResourceManager):
 
@@ -418,6 +525,8 @@ class SaharaCluster(base.ResourceManager):
     # saharaclient/api/base.py#L145
 
     def is_deleted(self):
+        from saharaclient.api import base as saharaclient_base
+
         try:
             self._manager().get(self.id())
             return False
@@ -426,12 +535,14 @@ class SaharaCluster(base.ResourceManager):
 
 
 @base.resource("sahara", "cluster_templates", order=next(_sahara_order),
+               depends_on=_sahara_depends_on,
                tenant_resource=True)
 class SaharaClusterTemplate(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
 @base.resource("sahara", "node_group_templates", order=next(_sahara_order),
+               depends_on=_sahara_depends_on,
                tenant_resource=True)
 class SaharaNodeGroup(SynchronizedDeletion, base.ResourceManager):
     pass
@@ -439,7 +550,8 @@ class SaharaNodeGroup(SynchronizedDeletion, base.ResourceManager):
 
 # CEILOMETER
 
-@base.resource("ceilometer", "alarms", order=700, tenant_resource=True)
+@base.resource("ceilometer", "alarms", order=700, tenant_resource=True,
+               depends_on=[])
 class CeilometerAlarms(SynchronizedDeletion, base.ResourceManager):
 
     def id(self):
@@ -456,7 +568,7 @@ class CeilometerAlarms(SynchronizedDeletion, base.ResourceManager):
 
 # ZAQAR
 
-@base.resource("zaqar", "queues", order=800)
+@base.resource("zaqar", "queues", order=800, depends_on=[])
 class ZaqarQueues(SynchronizedDeletion, base.ResourceManager):
 
     def list(self):
@@ -465,6 +577,7 @@ class ZaqarQueues(SynchronizedDeletion, base.ResourceManager):
 
 # DESIGNATE
 
+_designate_depends_on = []
 _designate_order = get_order(900)
 
 
@@ -476,17 +589,20 @@ class DesignateResource(SynchronizedDeletion, base.ResourceManager):
                        self._resource)
 
 
-@base.resource("designate_v1", "domains", order=next(_designate_order))
+@base.resource("designate_v1", "domains", order=next(_designate_order),
+               depends_on=_designate_depends_on)
 class DesignateDomain(DesignateResource):
     pass
 
 
-@base.resource("designate_v2", "zones", order=next(_designate_order))
+@base.resource("designate_v2", "zones", order=next(_designate_order),
+               depends_on=_designate_depends_on)
 class DesignateZones(DesignateResource):
     pass
 
 
 @base.resource("designate_v1", "servers", order=next(_designate_order),
+               depends_on=_designate_depends_on,
                admin_required=True, perform_for_admin_only=True)
 class DesignateServer(DesignateResource):
     pass
@@ -494,8 +610,33 @@ class DesignateServer(DesignateResource):
 
 # SWIFT
 
+_swift_depends_on = []
 _swift_order = get_order(1000)
 
+# NOTE: Whether post_account() of python-swiftclient can send data, which is
+#       required by bulk deletion. It is checked on first bulk deletion, so
+#       swiftclient is not imported with cleanup.
+_swift_post_account_sends_data = None
+
+# NOTE: Limits of bulk deletion requests per cloud, None if bulk deletion
+#       is not supported
+_bulk_delete_limits = {}
+
+
+def _get_bulk_delete_limit(manager):
+    credential_key = _credential_key(manager)
+    key = credential_key and credential_key[:2]
+    if key in _bulk_delete_limits:
+        return _bulk_delete_limits[key]
+    capabilities = manager._manager().get_capabilities()
+    limit = None
+    if "bulk_delete" in capabilities:
+        limit = capabilities["bulk_delete"].get(
+            "max_deletes_per_request", 10000)
+    if key is not None:
+        _bulk_delete_limits[key] = limit
+    return limit
+
 
 class SwiftMixin(SynchronizedDeletion, base.ResourceManager):
 
@@ -513,11 +654,51 @@ class SwiftMixin(SynchronizedDeletion, base.ResourceManager):
         # should pass as first argument container and second is object name.
         delete_method(*self.raw_resource)
 
+    def get(self, resource_id):
+        # NOTE: Swift resources are recorded to the journal as
+        #       "<container>" or "<container>/<object>"
+        return resource_id.split("/", 1)
+
 
 @base.resource("swift", "object", order=next(_swift_order),
-               tenant_resource=True)
+               depends_on=_swift_depends_on,
+               tenant_resource=True, batch_size=1000)
 class SwiftObject(SwiftMixin):
 
+    def bulk_delete(self, resources):
+        """Delete objects using bulk operations middleware.
+
+        Capabilities of the cluster are requested once per cloud.
+        """
+        global _swift_post_account_sends_data
+        if _swift_post_account_sends_data is None:
+            from swiftclient import client as swift_client
+
+            post_account = getattr(swift_client.Connection, "post_account",
+                                   None)
+            _swift_post_account_sends_data = bool(
+                post_account
+                and "data" in inspect.getargspec(post_account).args)
+        if not _swift_post_account_sends_data:
+            raise NotImplementedError()
+        limit = _get_bulk_delete_limit(self)
+        if limit is None:
+            raise NotImplementedError()
+
+        for i in range(0, len(resources), limit):
+            data = "".join(
+                parse.quote(("/%s/%s" % (container, obj)).encode("utf-8"))
+                + "\n" for container, obj in resources[i:i + limit])
+            headers, body = self._manager().post_account(
+                headers={"Accept": "application/json",
+                         "Content-Type": "text/plain"},
+                query_string="bulk-delete",
+                data=data.encode("utf-8"))
+            result = json.loads(body.decode("utf-8"))
+            if result.get("Errors"):
+                raise exceptions.RallyException(
+                    "Failed to delete swift objects: %s" % result["Errors"])
+
     def list(self):
         object_list = []
         containers = self._manager().get_account(full_listing=True)[1]
@@ -531,6 +712,7 @@ class SwiftObject(SwiftMixin):
 
 
 @base.resource("swift", "container", order=next(_swift_order),
+               depends_on=_swift_depends_on,
                tenant_resource=True)
 class SwiftContainer(SwiftMixin):
 
@@ -541,7 +723,8 @@ class SwiftContainer(SwiftMixin):
 
 # MISTRAL
 
-@base.resource("mistral", "workbooks", order=1100, tenant_resource=True)
+@base.resource("mistral", "workbooks", order=1100, tenant_resource=True,
+               depends_on=[])
 class MistralWorkbooks(SynchronizedDeletion, base.ResourceManager):
     def delete(self):
         self._manager().delete(self.raw_resource.name)
@@ -549,17 +732,20 @@ class MistralWorkbooks(SynchronizedDeletion, base.ResourceManager):
 
 # MURANO
 
+_murano_depends_on = ["heat"]
 _murano_order = get_order(1200)
 
 
 @base.resource("murano", "environments", tenant_resource=True,
-               order=next(_murano_order))
+               order=next(_murano_order),
+               depends_on=_murano_depends_on)
 class MuranoEnvironments(SynchronizedDeletion, base.ResourceManager):
     pass
 
 
 @base.resource("murano", "packages", tenant_resource=True,
-               order=next(_murano_order))
+               order=next(_murano_order),
+               depends_on=_murano_depends_on)
 class MuranoPackages(base.ResourceManager):
     def list(self):
         return filter(lambda x: x.name != "Core library",
@@ -572,7 +758,8 @@ _ironic_order = get_order(1300)
 
 
 @base.resource("ironic", "node", admin_required=True,
-               order=next(_ironic_order), perform_for_admin_only=True)
+               order=next(_ironic_order),
+               depends_on=["nova.servers"], perform_for_admin_only=True)
 class IronicNodes(base.ResourceManager):
 
     def id(self):
@@ -581,7 +768,7 @@ class IronicNodes(base.ResourceManager):
 
 # FUEL
 
-@base.resource("fuel", "environment", order=1400,
+@base.resource("fuel", "environment", order=1400, depends_on=[],
                admin_required=True, perform_for_admin_only=True)
 class FuelEnvironment(base.ResourceManager):
     """Fuel environment.
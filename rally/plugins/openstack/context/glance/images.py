@@ -12,11 +12,14 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import json
+
 from rally.common.i18n import _
 from rally.common import logging
 from rally.common import utils as rutils
 from rally import consts
 from rally.plugins.openstack.context.cleanup import manager as resource_manager
+from rally.plugins.openstack.context.keystone import users
 from rally.plugins.openstack.scenarios.glance import utils as glance_utils
 from rally.task import context
 
@@ -74,6 +77,7 @@ class ImageGenerator(context.Context):
         image_container = self.config["image_container"]
         images_per_tenant = self.config["images_per_tenant"]
         image_name = self.config.get("image_name")
+        pool_key = self._pool_key()
 
         for user, tenant_id in rutils.iterate_per_tenants(
                 self.context["users"]):
@@ -91,7 +95,17 @@ class ImageGenerator(context.Context):
                             "arbitrary arguments with 'image_args' instead")
                 kwargs["min_disk"] = self.config["min_disk"]
 
-            for i in range(images_per_tenant):
+            pooled = users.get_pooled_tenant(self.context, tenant_id)
+            if pooled is not None:
+                # NOTE: Pooled images are reused by tasks with the same
+                #       config and aren't recorded to the cleanup journal.
+                pooled_images = pooled.setdefault("images", {})
+                current_images = pooled_images.setdefault(pool_key, [])
+                glance_scenario = glance_utils.GlanceScenario(
+                    {"user": user, "task": self.context["task"],
+                     "pooled": True})
+
+            for i in range(len(current_images), images_per_tenant):
                 if image_name and i > 0:
                     cur_name = image_name + str(i)
                 elif image_name:
@@ -104,10 +118,20 @@ class ImageGenerator(context.Context):
                     name=cur_name, **kwargs)
                 current_images.append(image.id)
 
-            self.context["tenants"][tenant_id]["images"] = current_images
+            self.context["tenants"][tenant_id]["images"] = (
+                current_images[:images_per_tenant])
+
+    def _pool_key(self):
+        return json.dumps(dict((key, value)
+                               for key, value in self.config.items()
+                               if key != "images_per_tenant"),
+                          sort_keys=True)
 
     @logging.log_task_wrapper(LOG.info, _("Exit context: `Images`"))
     def cleanup(self):
         # TODO(boris-42): Delete only resources created by this context
-        resource_manager.cleanup(names=["glance.images"],
-                                 users=self.context.get("users", []))
+        resource_manager.cleanup(
+            names=["glance.images"],
+            users=[user for user in self.context.get("users", [])
+                   if users.get_pooled_tenant(
+                       self.context, user["tenant_id"]) is None])
@@ -14,7 +14,9 @@
 #    under the License.
 
 import collections
+import itertools
 import random
+import time
 import uuid
 
 from oslo_config import cfg
@@ -40,6 +42,16 @@ USER_CONTEXT_OPTS = [
                default=30,
                help="How many concurrent threads use for serving users "
                     "context"),
+    cfg.FloatOpt("resource_management_rate",
+                 default=0,
+                 help="Maximum number of keystone requests per second made "
+                      "by users context, 0 means unlimited. The rate is "
+                      "lowered while keystone responds with 429 or 5xx "
+                      "statuses."),
+    cfg.IntOpt("resource_management_retries",
+               default=5,
+               help="How many times to retry keystone requests of users "
+                    "context, that failed with 429 or 5xx statuses."),
     cfg.StrOpt("project_domain",
                default="default",
                help="ID of domain in which projects will be created."),
@@ -53,6 +65,44 @@ CONF.register_opts(USER_CONTEXT_OPTS,
                    group=cfg.OptGroup(name="users_context",
                                       title="benchmark context options"))
 
+POOLED_TENANT = "tenant"
+
+RETRY_BACKOFF = 1.0
+MAX_RETRY_BACKOFF = 30.0
+
+
+def _status_code(e):
+    code = getattr(e, "http_status", None) or getattr(e, "code", None)
+    return code if isinstance(code, int) else None
+
+
+def _is_overloaded(e):
+    """Whether keystone rejected the request because it is overloaded.
+
+    Rejected requests are not processed, so they are safe to repeat.
+    """
+    return _status_code(e) in (429, 503)
+
+
+def _is_server_error(e):
+    """Whether the request failed, possibly after it was processed."""
+    return (_status_code(e) or 0) >= 500
+
+
+def get_pooled_tenant(context, tenant_id):
+    """Return pool data of the tenant leased from a resource pool.
+
+    Contexts keep resources that are created in pooled tenants in this
+    data, so the resources are reused by next tasks.
+
+    :returns: data dict or None if the tenant is not leased from a pool
+              or the pool is drained
+    """
+    pool = context.get("resource_pool")
+    if not pool or pool["drain"] or tenant_id not in pool["tenants"]:
+        return None
+    return pool["tenants"][tenant_id]["data"]
+
 
 class UserContextMixin(object):
 
@@ -94,12 +144,30 @@ class UserGenerator(UserContextMixin, context.Context):
                 "type": "integer",
                 "minimum": 1
             },
+            "resource_management_rate": {
+                "type": "number",
+                "minimum": 0
+            },
+            "resource_management_retries": {
+                "type": "integer",
+                "minimum": 0
+            },
             "project_domain": {
                 "type": "string",
             },
             "user_domain": {
                 "type": "string",
             },
+            "resource_pool": {
+                "type": "string",
+            },
+            "drain_resource_pool": {
+                "type": "boolean",
+            },
+            "resource_pool_lease_timeout": {
+                "type": "integer",
+                "minimum": 1
+            },
         },
         "additionalProperties": False
     }
@@ -109,6 +177,10 @@ class UserGenerator(UserContextMixin, context.Context):
         "users_per_tenant": 1,
         "resource_management_workers":
             cfg.CONF.users_context.resource_management_workers,
+        "resource_management_rate":
+            cfg.CONF.users_context.resource_management_rate,
+        "resource_management_retries":
+            cfg.CONF.users_context.resource_management_retries,
         "project_domain": cfg.CONF.users_context.project_domain,
         "user_domain": cfg.CONF.users_context.user_domain
     }
@@ -116,6 +188,74 @@ class UserGenerator(UserContextMixin, context.Context):
     def __init__(self, context):
         super(UserGenerator, self).__init__(context)
         self.credential = self.context["admin"]["credential"]
+        self._rate_limiter = None
+        if self.config["resource_management_rate"]:
+            self._rate_limiter = rutils.RateLimiter(
+                self.config["resource_management_rate"])
+
+    def _keystone_call(self, func, *args, **kwargs):
+        """Call keystone with rate limit, retrying if it is overloaded.
+
+        Requests failed with 429 or 5xx statuses are retried with
+        exponential backoff and lower the rate of next requests. Other
+        5xx statuses than 503 don't mean that the request wasn't processed,
+        so if lookup is given, the resource is looked up before retrying
+        its creation.
+
+        :param func: keystone call
+        :param args: arguments of the call
+        :param lookup: function returning the resource created by the call
+                       or None if it doesn't exist
+        """
+        lookup = kwargs.pop("lookup", None)
+        retries = self.config["resource_management_retries"]
+        for attempt in range(retries + 1):
+            if self._rate_limiter:
+                self._rate_limiter.acquire()
+            try:
+                result = func(*args)
+            except Exception as e:
+                overloaded = _is_overloaded(e)
+                if attempt == retries or not (overloaded or
+                                              _is_server_error(e)):
+                    raise
+                if lookup and not overloaded:
+                    existing = self._lookup(lookup)
+                    if existing is not None:
+                        return existing
+                if self._rate_limiter:
+                    self._rate_limiter.decrease()
+                backoff = min(MAX_RETRY_BACKOFF, RETRY_BACKOFF * 2 ** attempt)
+                delay = max(getattr(e, "retry_after", None) or 0,
+                            backoff * random.uniform(0.5, 1.0))
+                LOG.debug("Keystone is overloaded (%(error)s), retrying in "
+                          "%(delay).1f seconds" % {"error": e,
+                                                   "delay": delay})
+                time.sleep(delay)
+            else:
+                if self._rate_limiter:
+                    self._rate_limiter.increase()
+                return result
+
+    def _lookup(self, lookup):
+        # NOTE: If the lookup fails, the call is not retried, since it is
+        #       unknown whether the resource was created.
+        if self._rate_limiter:
+            self._rate_limiter.acquire()
+        return lookup()
+
+    @staticmethod
+    def _find_by_name(resources, name):
+        for resource in resources:
+            if resource.name == name:
+                return resource
+        return None
+
+    @staticmethod
+    def _log_progress(resources, done, total):
+        if done == total or done % max(1, total // 10) == 0:
+            LOG.info(_("Created %(done)d of %(total)d %(resources)s") %
+                     {"done": done, "total": total, "resources": resources})
 
     def _remove_default_security_group(self):
         """Delete default security group for tenants."""
@@ -162,13 +302,16 @@ class UserGenerator(UserContextMixin, context.Context):
                                 "Exception: %(ex)s" %
                                 {"tenant_id": network_tenant_id, "ex": ex})
 
-    def _create_tenants(self):
+    def _create_tenants(self, count=None):
         threads = self.config["resource_management_workers"]
+        if count is None:
+            count = self.config["tenants"]
 
         tenants = collections.deque()
+        created = itertools.count(1)
 
         def publish(queue):
-            for i in range(self.config["tenants"]):
+            for i in range(count):
                 args = (self.config["project_domain"], self.task["uuid"], i)
                 queue.append(args)
 
@@ -177,10 +320,15 @@ class UserGenerator(UserContextMixin, context.Context):
             if "client" not in cache:
                 clients = osclients.Clients(self.credential)
                 cache["client"] = keystone.wrap(clients.keystone())
-            tenant = cache["client"].create_project(
-                self.generate_random_name(), domain)
+            client = cache["client"]
+            name = self.generate_random_name()
+            tenant = self._keystone_call(
+                client.create_project, name, domain,
+                lookup=lambda: self._find_by_name(client.list_projects(),
+                                                  name))
             tenant_dict = {"id": tenant.id, "name": tenant.name}
             tenants.append(tenant_dict)
+            self._log_progress("tenants", next(created), count)
 
         # NOTE(msdubov): consume() will fill the tenants list in the closure.
         broker.run(publish, consume, threads)
@@ -190,16 +338,28 @@ class UserGenerator(UserContextMixin, context.Context):
 
         return tenants_dict
 
-    def _create_users(self):
+    def _create_users(self, users_per_tenant=None):
+        """Create users of tenants.
+
+        :param users_per_tenant: dict with amount of users to create per
+                                 tenant ID, defaults to users_per_tenant of
+                                 config for every tenant
+        """
         # NOTE(msdubov): This should be called after _create_tenants().
         threads = self.config["resource_management_workers"]
-        users_per_tenant = self.config["users_per_tenant"]
 
         users = collections.deque()
+        created = itertools.count(1)
+        total = []
 
         def publish(queue):
-            for tenant_id in self.context["tenants"]:
-                for user_id in range(users_per_tenant):
+            counts = users_per_tenant
+            if counts is None:
+                counts = dict((tenant_id, self.config["users_per_tenant"])
+                              for tenant_id in self.context["tenants"])
+            total.append(sum(counts.values()))
+            for tenant_id, count in counts.items():
+                for user_id in range(count):
                     username = self.generate_random_name()
                     password = str(uuid.uuid4())
                     args = (username, password, self.config["project_domain"],
@@ -212,9 +372,11 @@ class UserGenerator(UserContextMixin, context.Context):
                 clients = osclients.Clients(self.credential)
                 cache["client"] = keystone.wrap(clients.keystone())
             client = cache["client"]
-            user = client.create_user(username, password,
-                                      "%s@email.me" % username,
-                                      tenant_id, user_dom)
+            user = self._keystone_call(
+                client.create_user, username, password,
+                "%s@email.me" % username, tenant_id, user_dom,
+                lookup=lambda: self._find_by_name(client.list_users(),
+                                                  username))
             user_credential = objects.Credential(
                 client.auth_url, user.name, password,
                 self.context["tenants"][tenant_id]["name"],
@@ -226,6 +388,7 @@ class UserGenerator(UserContextMixin, context.Context):
             users.append({"id": user.id,
                           "credential": user_credential,
                           "tenant_id": tenant_id})
+            self._log_progress("users", next(created), total[0])
 
         # NOTE(msdubov): consume() will fill the users list in the closure.
         broker.run(publish, consume, threads)
@@ -244,7 +407,7 @@ class UserGenerator(UserContextMixin, context.Context):
             if "client" not in cache:
                 clients = osclients.Clients(self.credential)
                 cache["client"] = keystone.wrap(clients.keystone())
-            cache["client"].delete_project(tenant_id)
+            self._keystone_call(cache["client"].delete_project, tenant_id)
 
         broker.run(publish, consume, threads)
         self.context["tenants"] = {}
@@ -260,11 +423,106 @@ class UserGenerator(UserContextMixin, context.Context):
             if "client" not in cache:
                 clients = osclients.Clients(self.credential)
                 cache["client"] = keystone.wrap(clients.keystone())
-            cache["client"].delete_user(user_id)
+            self._keystone_call(cache["client"].delete_user, user_id)
 
         broker.run(publish, consume, threads)
         self.context["users"] = []
 
+    def _setup_pool(self):
+        """Lease tenants and users from the pool, create missing ones."""
+        pool = objects.ResourcePool(self.task["deployment_uuid"],
+                                    self.config["resource_pool"])
+        drain = self.config.get("drain_resource_pool", False)
+        count = (len(pool.list(POOLED_TENANT)) if drain
+                 else self.config["tenants"])
+        leases = pool.lease(
+            POOLED_TENANT, count, self.task["uuid"],
+            lease_timeout=self.config.get("resource_pool_lease_timeout"))
+        self.context["resource_pool"] = {
+            "name": pool.name, "drain": drain,
+            "tenants": dict((lease["data"]["tenant"]["id"], lease)
+                            for lease in leases)}
+        LOG.debug("Leased %(leased)d tenants from resource pool %(pool)s" %
+                  {"leased": len(leases), "pool": pool.name})
+
+        missing_users = {}
+        for tenant_id, lease in self.context["resource_pool"][
+                "tenants"].items():
+            self.context["tenants"][tenant_id] = dict(lease["data"]["tenant"])
+            users = lease["data"]["users"]
+            if not drain:
+                users = users[:self.config["users_per_tenant"]]
+                missing_users[tenant_id] = (
+                    self.config["users_per_tenant"] - len(users))
+            for user in users:
+                self.context["users"].append({
+                    "id": user["id"], "tenant_id": tenant_id,
+                    "credential": objects.Credential(**user["credential"])})
+        if drain:
+            return
+
+        created = self._create_tenants(
+            count=self.config["tenants"] - len(leases))
+        for tenant_id, tenant in created.items():
+            data = {"tenant": tenant, "users": []}
+            self.context["tenants"][tenant_id] = dict(tenant)
+            self.context["resource_pool"]["tenants"][tenant_id] = {
+                "id": pool.add(POOLED_TENANT, data, self.task["uuid"]),
+                "data": data}
+            missing_users[tenant_id] = self.config["users_per_tenant"]
+
+        for user in self._create_users(missing_users):
+            self.context["users"].append(user)
+            self.context["resource_pool"]["tenants"][user["tenant_id"]][
+                "data"]["users"].append({
+                    "id": user["id"],
+                    "credential": user["credential"].to_dict(
+                        include_permission=True)})
+
+    def _release_pool(self):
+        """Return leased tenants with their data to the pool."""
+        pool = objects.ResourcePool(self.task["deployment_uuid"],
+                                    self.context["resource_pool"]["name"])
+        for lease in self.context["resource_pool"]["tenants"].values():
+            pool.release(lease["id"], lease["data"])
+
+    def _delete_pooled_resources(self):
+        """Delete networks and images kept in data of drained tenants.
+
+        Contexts don't see pooled resources of drained tenants (see
+        get_pooled_tenant()), so they are deleted here before tenants.
+        """
+        clients = osclients.Clients(self.credential)
+        net_wrapper = None
+        tenant_users = dict((user["tenant_id"], user)
+                            for user in self.context["users"])
+        for tenant_id, lease in self.context["resource_pool"][
+                "tenants"].items():
+            data = lease["data"]
+            for networks in data.pop("networks", {}).values():
+                for net in networks:
+                    if net_wrapper is None:
+                        net_wrapper = network.wrap(clients, self)
+                    with logging.ExceptionLogger(
+                            LOG, _("Failed to delete pooled network %(net)s "
+                                   "of tenant %(tenant)s")
+                            % {"net": net["id"], "tenant": tenant_id}):
+                        net_wrapper.delete_network(net)
+            images = [image_id for image_ids in data.pop("images",
+                                                         {}).values()
+                      for image_id in image_ids]
+            if not images:
+                continue
+            user = tenant_users.get(tenant_id)
+            glance = (osclients.Clients(user["credential"]) if user
+                      else clients).glance()
+            for image_id in images:
+                with logging.ExceptionLogger(
+                        LOG, _("Failed to delete pooled image %(image)s of "
+                               "tenant %(tenant)s")
+                        % {"image": image_id, "tenant": tenant_id}):
+                    glance.images.delete(image_id)
+
     @logging.log_task_wrapper(LOG.info, _("Enter context: `users`"))
     def setup(self):
         """Create tenants and users, using the broker pattern."""
@@ -273,9 +531,15 @@ class UserGenerator(UserContextMixin, context.Context):
 
         threads = self.config["resource_management_workers"]
 
-        LOG.debug("Creating %(tenants)d tenants using %(threads)s threads" %
-                  {"tenants": self.config["tenants"], "threads": threads})
-        self.context["tenants"] = self._create_tenants()
+        if self.config.get("resource_pool"):
+            self._setup_pool()
+            if self.context["resource_pool"]["drain"]:
+                return
+        else:
+            LOG.debug("Creating %(tenants)d tenants using %(threads)s "
+                      "threads" % {"tenants": self.config["tenants"],
+                                   "threads": threads})
+            self.context["tenants"] = self._create_tenants()
 
         if len(self.context["tenants"]) < self.config["tenants"]:
             raise exceptions.ContextSetupFailure(
@@ -283,9 +547,10 @@ class UserGenerator(UserContextMixin, context.Context):
                 msg=_("Failed to create the requested number of tenants."))
 
         users_num = self.config["users_per_tenant"] * self.config["tenants"]
-        LOG.debug("Creating %(users)d users using %(threads)s threads" %
-                  {"users": users_num, "threads": threads})
-        self.context["users"] = self._create_users()
+        if not self.config.get("resource_pool"):
+            LOG.debug("Creating %(users)d users using %(threads)s threads" %
+                      {"users": users_num, "threads": threads})
+            self.context["users"] = self._create_users()
 
         if len(self.context["users"]) < users_num:
             raise exceptions.ContextSetupFailure(
@@ -295,6 +560,15 @@ class UserGenerator(UserContextMixin, context.Context):
     @logging.log_task_wrapper(LOG.info, _("Exit context: `users`"))
     def cleanup(self):
         """Delete tenants and users, using the broker pattern."""
+        pool = self.context.get("resource_pool")
+        if pool and not pool["drain"]:
+            self._release_pool()
+            return
+        if pool:
+            self._delete_pooled_resources()
         self._remove_default_security_group()
         self._delete_users()
         self._delete_tenants()
+        if pool:
+            for lease in pool["tenants"].values():
+                objects.ResourcePool.delete(lease["id"])
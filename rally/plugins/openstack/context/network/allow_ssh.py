@@ -83,7 +83,7 @@ def _prepare_open_secgroup(credential, secgroup_name):
     return rally_open.to_dict()
 
 
-@context.configure(name="allow_ssh", order=320)
+@context.configure(name="allow_ssh", order=310)
 class AllowSSH(context.Context):
     """Sets up security groups for all users to access VM via SSH."""
 
@@ -13,13 +13,19 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+
+from oslo_config import cfg
 import six
 
+from rally.common import broker
 from rally.common.i18n import _
 from rally.common import logging
 from rally.common import utils
 from rally import consts
+from rally import exceptions
 from rally import osclients
+from rally.plugins.openstack.context.keystone import users
 from rally.plugins.openstack.wrappers import network as network_wrapper
 from rally.task import context
 
@@ -47,6 +53,10 @@ class Network(context.Context):
             "network_create_args": {
                 "type": "object",
                 "additionalProperties": True
+            },
+            "resource_management_workers": {
+                "type": "integer",
+                "minimum": 1
             }
         },
         "additionalProperties": False
@@ -56,40 +66,88 @@ class Network(context.Context):
         "start_cidr": "10.2.0.0/24",
         "networks_per_tenant": 1,
         "subnets_per_network": 1,
-        "network_create_args": {}
+        "network_create_args": {},
+        "resource_management_workers":
+            cfg.CONF.users_context.resource_management_workers
     }
 
-    @logging.log_task_wrapper(LOG.info, _("Enter context: `network`"))
-    def setup(self):
+    def _wrapper(self, cache):
         # NOTE(rkiran): Some clients are not thread-safe. Thus during
         #               multithreading/multiprocessing, it is likely the
         #               sockets are left open. This problem is eliminated by
-        #               creating a connection in setup and cleanup separately.
-        net_wrapper = network_wrapper.wrap(
-            osclients.Clients(self.context["admin"]["credential"]),
-            self, config=self.config)
-        for user, tenant_id in (utils.iterate_per_tenants(
-                self.context.get("users", []))):
-            self.context["tenants"][tenant_id]["networks"] = []
-            for i in range(self.config["networks_per_tenant"]):
+        #               creating a connection in every thread separately.
+        if "wrapper" not in cache:
+            cache["wrapper"] = network_wrapper.wrap(
+                osclients.Clients(self.context["admin"]["credential"]),
+                self, config=self.config)
+        return cache["wrapper"]
+
+    @logging.log_task_wrapper(LOG.info, _("Enter context: `network`"))
+    def setup(self):
+        """Create networks of tenants, using the broker pattern."""
+        threads = self.config["resource_management_workers"]
+        networks_per_tenant = self.config["networks_per_tenant"]
+        pool_key = json.dumps(
+            dict((key, value) for key, value in self.config.items()
+                 if key not in ("networks_per_tenant",
+                                "resource_management_workers")),
+            sort_keys=True)
+        tenant_ids = [tenant_id for user, tenant_id in (
+            utils.iterate_per_tenants(self.context.get("users", [])))]
+
+        def publish(queue):
+            queue.extend(tenant_ids)
+
+        def consume(cache, tenant_id):
+            networks = []
+            pooled = users.get_pooled_tenant(self.context, tenant_id)
+            if pooled is not None:
+                # NOTE: Pooled networks are reused by tasks with the same
+                #       config.
+                pooled_networks = pooled.setdefault("networks", {})
+                networks = pooled_networks.setdefault(pool_key, [])
+            missing = networks_per_tenant - len(networks)
+            if missing > 0:
                 # NOTE(amaretskiy): add_router and subnets_num take effect
                 #                   for Neutron only.
-                network = net_wrapper.create_network(
-                    tenant_id,
+                networks.extend(self._wrapper(cache).create_networks(
+                    tenant_id, missing,
                     add_router=True,
                     subnets_num=self.config["subnets_per_network"],
-                    network_create_args=self.config["network_create_args"])
-                self.context["tenants"][tenant_id]["networks"].append(network)
+                    network_create_args=self.config["network_create_args"]))
+            self.context["tenants"][tenant_id]["networks"] = (
+                networks[:networks_per_tenant])
+
+        broker.run(publish, consume, threads)
+
+        failed = [tenant_id for tenant_id in tenant_ids
+                  if len(self.context["tenants"][tenant_id].get(
+                      "networks", [])) < networks_per_tenant]
+        if failed:
+            raise exceptions.ContextSetupFailure(
+                ctx_name=self.get_name(),
+                msg=_("Failed to create networks for tenants: %s")
+                % ", ".join(sorted(failed)))
 
     @logging.log_task_wrapper(LOG.info, _("Exit context: `network`"))
     def cleanup(self):
-        net_wrapper = network_wrapper.wrap(
-            osclients.Clients(self.context["admin"]["credential"]),
-            self, config=self.config)
-        for tenant_id, tenant_ctx in six.iteritems(self.context["tenants"]):
-            for network in tenant_ctx.get("networks", []):
-                with logging.ExceptionLogger(
-                        LOG,
-                        _("Failed to delete network for tenant %s")
-                        % tenant_id):
-                    net_wrapper.delete_network(network)
+        """Delete networks of tenants, using the broker pattern."""
+        threads = self.config["resource_management_workers"]
+
+        def publish(queue):
+            for tenant_id, tenant_ctx in six.iteritems(
+                    self.context["tenants"]):
+                if users.get_pooled_tenant(self.context,
+                                           tenant_id) is not None:
+                    continue
+                for network in tenant_ctx.get("networks", []):
+                    queue.append((tenant_id, network))
+
+        def consume(cache, args):
+            tenant_id, network = args
+            with logging.ExceptionLogger(
+                    LOG,
+                    _("Failed to delete network for tenant %s") % tenant_id):
+                self._wrapper(cache).delete_network(network)
+
+        broker.run(publish, consume, threads)
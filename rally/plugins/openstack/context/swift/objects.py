@@ -41,6 +41,10 @@ class SwiftObjectGenerator(swift_utils.SwiftObjectMixin, context.Context):
                 "type": "integer",
                 "minimum": 1
             },
+            "segment_size": {
+                "type": "integer",
+                "minimum": 1
+            },
             "resource_management_workers": {
                 "type": "integer",
                 "minimum": 1
@@ -79,10 +83,9 @@ class SwiftObjectGenerator(swift_utils.SwiftObjectMixin, context.Context):
         objects_num = containers_num * objects_per_container
         LOG.debug("Creating %d objects using %d threads." % (objects_num,
                                                              threads))
-        objects_count = len(self._create_objects(self.context,
-                                                 objects_per_container,
-                                                 self.config["object_size"],
-                                                 threads))
+        objects_count = len(self._create_objects(
+            self.context, objects_per_container, self.config["object_size"],
+            threads, segment_size=self.config.get("segment_size")))
         if objects_count != objects_num:
             raise exceptions.ContextSetupFailure(
                 ctx_name=self.get_name(),
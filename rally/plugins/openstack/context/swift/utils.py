@@ -13,12 +13,47 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import tempfile
-
 from rally.common import broker
+from rally.common.i18n import _
+from rally.common import logging
 from rally.common import utils as rutils
 from rally.plugins.openstack.scenarios.swift import utils as swift_utils
 
+LOG = logging.getLogger(__name__)
+
+
+class PayloadReader(object):
+    """File-like object reading the beginning of a shared payload.
+
+    Readers are memoryviews of the same buffer, so concurrent uploads
+    don't duplicate the payload and don't share a file position; only
+    chunks returned by read() are copied.
+    """
+
+    def __init__(self, payload, size):
+        self._view = memoryview(payload)[:size]
+        self._pos = 0
+
+    def __len__(self):
+        return len(self._view)
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = len(self._view) - self._pos
+        chunk = self._view[self._pos:self._pos + size]
+        self._pos += len(chunk)
+        return chunk.tobytes()
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            offset += self._pos
+        elif whence == 2:
+            offset += len(self._view)
+        self._pos = min(max(0, offset), len(self._view))
+
 
 class SwiftObjectMixin(object):
     """Mix-in method for Swift Object Context."""
@@ -58,46 +93,114 @@ class SwiftObjectMixin(object):
 
         return containers
 
+    def _create_segments_containers(self, context, threads):
+        """Create containers for segments of dynamic large objects.
+
+        Segments are stored in a separate container, so they are neither
+        listed nor downloaded along with objects of the container.
+
+        :param context: dict, Rally context environment
+        :param threads: int, number of threads to use for broker pattern
+        """
+        def publish(queue):
+            for tenant_id in context["tenants"]:
+                containers = context["tenants"][tenant_id]["containers"]
+                for container in containers:
+                    queue.append(container)
+
+        def consume(cache, container):
+            user = container["user"]
+            if user["id"] not in cache:
+                cache[user["id"]] = swift_utils.SwiftScenario(
+                    {"user": user, "task": context.get("task", {})})
+            container["segments_container"] = (
+                cache[user["id"]]._create_segments_container(
+                    container["container"]))
+            container["segments"] = []
+
+        broker.run(publish, consume, threads)
+
+    @staticmethod
+    def _upload_segmented_object(scenario, container, payload, object_size,
+                                 segment_size):
+        """Upload a dynamic large object by segments.
+
+        Segments are stored in the segments container with names prefixed
+        by the object name and are appended to "segments" of the container.
+
+        :returns: name of the manifest object
+        """
+        object_name = scenario.generate_random_name()
+        swift = scenario.clients("swift")
+        for i, offset in enumerate(range(0, object_size, segment_size)):
+            size = min(segment_size, object_size - offset)
+            segment_name = "%s/%08d" % (object_name, i)
+            swift.put_object(container["segments_container"], segment_name,
+                             PayloadReader(payload, size),
+                             content_length=size)
+            container["segments"].append(segment_name)
+        swift.put_object(container["container"], object_name, "",
+                         headers={"X-Object-Manifest": "%s/%s/" % (
+                             container["segments_container"], object_name)})
+        return object_name
+
     def _create_objects(self, context, objects_per_container, object_size,
-                        threads):
+                        threads, segment_size=None):
         """Create objects and store results in Rally context.
 
+        Objects are uploaded from one in-memory payload shared by all
+        threads, objects bigger than segment_size are uploaded as dynamic
+        large objects, so the payload is never bigger than a segment.
+
         :param context: dict, Rally context environment
         :param objects_per_container: int, number of objects to create
                                       per container
         :param object_size: int, size of created swift objects in byte
         :param threads: int, number of threads to use for broker pattern
+        :param segment_size: int, maximum size of uploaded segments in byte
 
         :returns: list of tuples containing (account, container, object)
         """
         objects = []
+        segmented = segment_size and object_size > segment_size
+        payload = bytearray(segment_size if segmented else object_size)
+
+        def publish(queue):
+            for tenant_id in context["tenants"]:
+                containers = context["tenants"][tenant_id]["containers"]
+                for container in containers:
+                    for i in range(objects_per_container):
+                        queue.append(container)
 
-        with tempfile.TemporaryFile() as dummy_file:
-            # set dummy file to specified object size
-            dummy_file.truncate(object_size)
-
-            def publish(queue):
-                for tenant_id in context["tenants"]:
-                    containers = context["tenants"][tenant_id]["containers"]
-                    for container in containers:
-                        for i in range(objects_per_container):
-                            queue.append(container)
-
-            def consume(cache, container):
-                user = container["user"]
-                if user["id"] not in cache:
-                    cache[user["id"]] = swift_utils.SwiftScenario(
-                        {"user": user, "task": context.get("task", {})})
-                dummy_file.seek(0)
+        def consume(cache, container):
+            user = container["user"]
+            if user["id"] not in cache:
+                cache[user["id"]] = swift_utils.SwiftScenario(
+                    {"user": user, "task": context.get("task", {})})
+            if segmented:
+                object_name = self._upload_segmented_object(
+                    cache[user["id"]], container, payload, object_size,
+                    segment_size)
+            else:
                 object_name = cache[user["id"]]._upload_object(
                     container["container"],
-                    dummy_file)[1]
-                container["objects"].append(object_name)
-                objects.append((user["tenant_id"], container["container"],
-                                object_name))
+                    PayloadReader(payload, object_size),
+                    content_length=object_size)[1]
+            container["objects"].append(object_name)
+            objects.append((user["tenant_id"], container["container"],
+                            object_name))
 
+        with rutils.Timer() as timer:
+            if segmented:
+                self._create_segments_containers(context, threads)
             broker.run(publish, consume, threads)
 
+        megabytes = len(objects) * object_size / 1024.0 ** 2
+        LOG.info(_("Uploaded %(count)d objects, %(size).1f MB in "
+                   "%(duration).1f seconds, %(rate).1f MB/s") % {
+                       "count": len(objects), "size": megabytes,
+                       "duration": timer.duration(),
+                       "rate": megabytes / max(timer.duration(), 1e-6)})
         return objects
 
     def _delete_containers(self, context, threads):
@@ -120,6 +223,9 @@ class SwiftObjectMixin(object):
                 cache[user["id"]] = swift_utils.SwiftScenario(
                     {"user": user, "task": context.get("task", {})})
             cache[user["id"]]._delete_container(container["container"])
+            if "segments_container" in container:
+                cache[user["id"]]._delete_container(
+                    container["segments_container"])
             tenant_containers.remove(container)
 
         broker.run(publish, consume, threads)
@@ -134,18 +240,22 @@ class SwiftObjectMixin(object):
             for tenant_id in context["tenants"]:
                 containers = context["tenants"][tenant_id]["containers"]
                 for container in containers:
-                    for object_name in container["objects"][:]:
-                        args = object_name, container
-                        queue.append(args)
+                    for key in ("objects", "segments"):
+                        for object_name in container.get(key, [])[:]:
+                            args = object_name, container, key
+                            queue.append(args)
 
         def consume(cache, args):
-            object_name, container = args
+            object_name, container, key = args
             user = container["user"]
             if user["id"] not in cache:
                 cache[user["id"]] = swift_utils.SwiftScenario(
                     {"user": user, "task": context.get("task", {})})
-            cache[user["id"]]._delete_object(container["container"],
-                                             object_name)
-            container["objects"].remove(object_name)
+            if key == "segments":
+                container_name = container["segments_container"]
+            else:
+                container_name = container["container"]
+            cache[user["id"]]._delete_object(container_name, object_name)
+            container[key].remove(object_name)
 
         broker.run(publish, consume, threads)
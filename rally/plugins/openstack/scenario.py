@@ -14,6 +14,7 @@
 #    under the License.
 
 from rally import osclients
+from rally.plugins.openstack.context.cleanup import journal
 from rally.task import scenario
 
 # NOTE(boris-42): Shortcut to remove import of both rally.task.scenario and
@@ -26,6 +27,7 @@ class OpenStackScenario(scenario.Scenario):
 
     def __init__(self, context=None, admin_clients=None, clients=None):
         super(OpenStackScenario, self).__init__(context)
+        self._journal_records = []
         if context:
             api_info = {}
             if "api_versions" in context.get("config", {}):
@@ -81,3 +83,28 @@ class OpenStackScenario(scenario.Scenario):
         client = getattr(self._admin_clients, client_type)
 
         return client(version) if version is not None else client()
+
+    def _record_resource(self, service, resource, resource_id):
+        """Records created resource to the cleanup journal of the task.
+
+        Resources created inside atomic actions are written to the journal
+        once the outermost action is finished, so writes are not included
+        into durations of actions.
+
+        :param service: service name of the cleanup resource manager
+        :param resource: resource name of the cleanup resource manager
+        :param resource_id: ID of the created resource
+        """
+        if not journal.is_enabled(self.context):
+            return
+        self._journal_records.append((service, resource, resource_id))
+        if not self._atomic_action_running():
+            self._flush_journal_records()
+
+    def _flush_journal_records(self):
+        records, self._journal_records = self._journal_records, []
+        if records:
+            journal.record_resources(self.context, records)
+
+    def _atomic_actions_finished(self):
+        self._flush_journal_records()
@@ -133,6 +133,7 @@ class CinderScenario(scenario.OpenStackScenario):
 
         client = cinder_wrapper.wrap(self._clients.cinder, self)
         volume = client.create_volume(size, **kwargs)
+        self._record_resource("cinder", "volumes", volume.id)
 
         # NOTE(msdubov): It is reasonable to wait 5 secs before starting to
         #                check whether the volume is ready => less API calls.
@@ -222,6 +223,8 @@ class CinderScenario(scenario.OpenStackScenario):
         """
         resp, img = volume.upload_to_image(force, self.generate_random_name(),
                                            container_format, disk_format)
+        image_id = img["os-volume_upload_image"]["image_id"]
+        self._record_resource("glance", "images", image_id)
         # NOTE (e0ne): upload_to_image changes volume status to uploading so
         # we need to wait until it will be available.
         volume = bench_utils.wait_for(
@@ -231,7 +234,6 @@ class CinderScenario(scenario.OpenStackScenario):
             timeout=CONF.benchmark.cinder_volume_create_timeout,
             check_interval=CONF.benchmark.cinder_volume_create_poll_interval
         )
-        image_id = img["os-volume_upload_image"]["image_id"]
         image = self.clients("glance").images.get(image_id)
         image = bench_utils.wait_for(
             image,
@@ -88,6 +88,7 @@ class GlanceScenario(scenario.OpenStackScenario):
                 kw["copy_from"] = image_location
 
             image = self.clients("glance").images.create(**kw)
+            self._record_resource("glance", "images", image.id)
 
             time.sleep(CONF.benchmark.glance_image_create_prepoll_delay)
 
@@ -90,8 +90,11 @@ class NeutronScenario(scenario.OpenStackScenario):
         :returns: neutron network dict
         """
         network_create_args["name"] = self.generate_random_name()
-        return self.clients("neutron").create_network(
+        network = self.clients("neutron").create_network(
             {"network": network_create_args})
+        self._record_resource("neutron", "network",
+                              network["network"]["id"])
+        return network
 
     @atomic.optional_action_timer("neutron.list_networks")
     def _list_networks(self, **kwargs):
@@ -146,8 +149,10 @@ class NeutronScenario(scenario.OpenStackScenario):
         subnet_create_args["name"] = self.generate_random_name()
         subnet_create_args.setdefault("ip_version", self.SUBNET_IP_VERSION)
 
-        return self.clients("neutron").create_subnet(
+        subnet = self.clients("neutron").create_subnet(
             {"subnet": subnet_create_args})
+        self._record_resource("neutron", "subnet", subnet["subnet"]["id"])
+        return subnet
 
     @atomic.action_timer("neutron.list_subnets")
     def _list_subnets(self):
@@ -195,8 +200,10 @@ class NeutronScenario(scenario.OpenStackScenario):
                     router_create_args.setdefault("external_gateway_info",
                                                   gw_info)
 
-        return self.clients("neutron").create_router(
+        router = self.clients("neutron").create_router(
             {"router": router_create_args})
+        self._record_resource("neutron", "router", router["router"]["id"])
+        return router
 
     @atomic.action_timer("neutron.list_routers")
     def _list_routers(self):
@@ -236,7 +243,9 @@ class NeutronScenario(scenario.OpenStackScenario):
         """
         port_create_args["network_id"] = network["network"]["id"]
         port_create_args["name"] = self.generate_random_name()
-        return self.clients("neutron").create_port({"port": port_create_args})
+        port = self.clients("neutron").create_port({"port": port_create_args})
+        self._record_resource("neutron", "port", port["port"]["id"])
+        return port
 
     @atomic.action_timer("neutron.list_ports")
     def _list_ports(self):
@@ -137,6 +137,7 @@ class NovaScenario(scenario.OpenStackScenario):
 
         server = self.clients("nova").servers.create(
             server_name, image_id, flavor_id, **kwargs)
+        self._record_resource("nova", "servers", server.id)
 
         time.sleep(CONF.benchmark.nova_server_boot_prepoll_delay)
         server = utils.wait_for(
@@ -488,6 +489,7 @@ class NovaScenario(scenario.OpenStackScenario):
         """
         image_uuid = self.clients("nova").servers.create_image(server,
                                                                server.name)
+        self._record_resource("glance", "images", image_uuid)
         image = self.clients("nova").images.get(image_uuid)
         check_interval = CONF.benchmark.nova_server_image_create_poll_interval
         image = utils.wait_for(
@@ -568,6 +570,8 @@ class NovaScenario(scenario.OpenStackScenario):
         #                created servers manually.
         servers = [s for s in self.clients("nova").servers.list()
                    if s.name.startswith(name_prefix)]
+        for server in servers:
+            self._record_resource("nova", "servers", server.id)
         time.sleep(CONF.benchmark.nova_server_boot_prepoll_delay)
         servers = [utils.wait_for(
             server,
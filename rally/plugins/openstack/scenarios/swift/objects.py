@@ -129,7 +129,9 @@ class SwiftObjects(utils.SwiftScenario):
     @scenario.configure(context={"swift_objects": {}})
     def list_objects_in_containers(self):
         """List objects in all containers."""
-        containers = self._list_containers()[1]
+        containers = [container
+                      for container in self._list_containers()[1]
+                      if not self._is_segments_container(container["name"])]
 
         key_suffix = "container"
         if len(containers) > 1:
@@ -144,7 +146,9 @@ class SwiftObjects(utils.SwiftScenario):
     @scenario.configure(context={"swift_objects": {}})
     def list_and_download_objects_in_containers(self):
         """List and download objects in all containers."""
-        containers = self._list_containers()[1]
+        containers = [container
+                      for container in self._list_containers()[1]
+                      if not self._is_segments_container(container["name"])]
 
         list_key_suffix = "container"
         if len(containers) > 1:
@@ -16,6 +16,11 @@
 from rally.plugins.openstack import scenario
 from rally.task import atomic
 
+# NOTE: Segments of dynamic large objects are stored in a separate container
+#       named by the container of the manifest and this suffix, like
+#       python-swiftclient does.
+SEGMENTS_SUFFIX = "_segments"
+
 
 class SwiftScenario(scenario.OpenStackScenario):
     """Base class for Swift scenarios with basic atomic actions."""
@@ -52,8 +57,27 @@ class SwiftScenario(scenario.OpenStackScenario):
         container_name = self.generate_random_name()
 
         self.clients("swift").put_container(container_name, **kwargs)
+        self._record_resource("swift", "container", container_name)
         return container_name
 
+    def _create_segments_container(self, container_name, **kwargs):
+        """Create a container for segments of dynamic large objects.
+
+        :param container_name: str, name of the container of manifests
+        :param kwargs: dict, other optional parameters to put_container
+
+        :returns: name of the segments container
+        """
+        segments_container = container_name + SEGMENTS_SUFFIX
+        self.clients("swift").put_container(segments_container, **kwargs)
+        self._record_resource("swift", "container", segments_container)
+        return segments_container
+
+    @staticmethod
+    def _is_segments_container(container_name):
+        """Whether container stores segments of dynamic large objects."""
+        return container_name.endswith(SEGMENTS_SUFFIX)
+
     @atomic.optional_action_timer("swift.delete_container")
     def _delete_container(self, container_name, **kwargs):
         """Delete a container with given name.
@@ -100,9 +124,11 @@ class SwiftScenario(scenario.OpenStackScenario):
         """
         object_name = self.generate_random_name()
 
-        return (self.clients("swift").put_object(container_name, object_name,
-                                                 content, **kwargs),
-                object_name)
+        etag = self.clients("swift").put_object(container_name, object_name,
+                                                content, **kwargs)
+        self._record_resource("swift", "object",
+                              "%s/%s" % (container_name, object_name))
+        return etag, object_name
 
     @atomic.optional_action_timer("swift.download_object")
     def _download_object(self, container_name, object_name, **kwargs):
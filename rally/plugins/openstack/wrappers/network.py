@@ -14,6 +14,7 @@
 #    under the License.
 
 import abc
+import sys
 
 import netaddr
 import six
@@ -25,7 +26,6 @@ from rally import consts
 from rally import exceptions
 from rally.task import utils as task_utils
 
-from neutronclient.common import exceptions as neutron_exceptions
 from novaclient import exceptions as nova_exceptions
 
 
@@ -92,6 +92,17 @@ class NetworkWrapper(object):
     def create_network(self):
         """Create network."""
 
+    def create_networks(self, tenant_id, count, **kwargs):
+        """Create several networks.
+
+        :param tenant_id: str, tenant ID
+        :param count: int, number of networks to create
+        :param kwargs: Additional options, see create_network()
+        :returns: list of network dicts
+        """
+        return [self.create_network(tenant_id, **kwargs)
+                for i in range(count)]
+
     @abc.abstractmethod
     def delete_network(self):
         """Delete network."""
@@ -237,6 +248,10 @@ class NeutronWrapper(NetworkWrapper):
             "router:external": True})["networks"]
 
     def get_network(self, net_id=None, name=None):
+        # NOTE: Client libraries are imported on first use, so loading of
+        #       wrappers doesn't import clients of all services
+        from neutronclient.common import exceptions as neutron_exceptions
+
         net = None
         try:
             if net_id:
@@ -310,11 +325,8 @@ class NeutronWrapper(NetworkWrapper):
                        See above for recognized keyword args.
         :returns: dict, network data
         """
-        network_args = {"network": kwargs.get("network_create_args", {})}
-        network_args["network"].update({
-            "tenant_id": tenant_id,
-            "name": self.owner.generate_random_name()})
-        network = self.client.create_network(network_args)["network"]
+        network = self.client.create_network(
+            {"network": self._network_args(tenant_id, **kwargs)})["network"]
 
         router = None
         if kwargs.get("add_router", False):
@@ -324,17 +336,8 @@ class NeutronWrapper(NetworkWrapper):
         subnets_num = kwargs.get("subnets_num", 0)
         for i in range(subnets_num):
             subnet_args = {
-                "subnet": {
-                    "tenant_id": tenant_id,
-                    "network_id": network["id"],
-                    "name": self.owner.generate_random_name(),
-                    "ip_version": self.SUBNET_IP_VERSION,
-                    "cidr": self._generate_cidr(),
-                    "enable_dhcp": True,
-                    "dns_nameservers": kwargs.get("dns_nameservers",
-                                                  ["8.8.8.8", "8.8.4.4"])
-                }
-            }
+                "subnet": self._subnet_args(tenant_id, network["id"],
+                                            **kwargs)}
             subnet = self.client.create_subnet(subnet_args)["subnet"]
             subnets.append(subnet["id"])
 
@@ -342,6 +345,109 @@ class NeutronWrapper(NetworkWrapper):
                 self.client.add_interface_router(router["id"],
                                                  {"subnet_id": subnet["id"]})
 
+        return self._marshal_network(network, subnets, router, tenant_id)
+
+    def create_networks(self, tenant_id, count, **kwargs):
+        """Create several networks using bulk requests.
+
+        All networks are created by one request, and all their subnets by
+        another one. Routers don't support bulk creation, so they are
+        created one by one. If creation of subnets or routers fails,
+        created networks and routers are deleted.
+
+        :param tenant_id: str, tenant ID
+        :param count: int, number of networks to create
+        :param kwargs: Additional options, see create_network()
+        :returns: list of network dicts
+        """
+        if count < 2:
+            return super(NeutronWrapper, self).create_networks(
+                tenant_id, count, **kwargs)
+
+        networks = self.client.create_network(
+            {"networks": [self._network_args(tenant_id, **kwargs)
+                          for i in range(count)]})["networks"]
+
+        subnets = dict((network["id"], []) for network in networks)
+        routers = {}
+        interfaces = []
+        try:
+            subnets_args = [
+                self._subnet_args(tenant_id, network["id"], **kwargs)
+                for network in networks
+                for i in range(kwargs.get("subnets_num", 0))]
+            if subnets_args:
+                for subnet in self.client.create_subnet(
+                        {"subnets": subnets_args})["subnets"]:
+                    subnets[subnet["network_id"]].append(subnet["id"])
+
+            gateway = {}
+            if kwargs.get("add_router", False):
+                for net in self.external_networks:
+                    gateway["external_gateway_info"] = {
+                        "network_id": net["id"], "enable_snat": True}
+
+            for network in networks:
+                if kwargs.get("add_router", False):
+                    router = self.create_router(tenant_id=tenant_id,
+                                                **gateway)
+                    routers[network["id"]] = router
+                    for subnet_id in subnets[network["id"]]:
+                        self.client.add_interface_router(
+                            router["id"], {"subnet_id": subnet_id})
+                        interfaces.append((router["id"], subnet_id))
+        except Exception:
+            exc_info = sys.exc_info()
+            self._rollback_networks(networks, routers, interfaces)
+            six.reraise(*exc_info)
+
+        return [self._marshal_network(network, subnets[network["id"]],
+                                      routers.get(network["id"]), tenant_id)
+                for network in networks]
+
+    def _rollback_networks(self, networks, routers, interfaces):
+        """Delete networks and routers created by failed create_networks().
+
+        Subnets are deleted together with their networks.
+        """
+        LOG.warning(_("Failed to create %d networks, deleting created "
+                      "resources") % len(networks))
+        calls = (
+            [(self.client.remove_interface_router,
+              (router_id, {"subnet_id": subnet_id}))
+             for router_id, subnet_id in interfaces] +
+            [(self.client.delete_router, (router["id"],))
+             for router in routers.values()] +
+            [(self.client.delete_network, (network["id"],))
+             for network in networks])
+        for func, args in calls:
+            try:
+                func(*args)
+            except Exception as e:
+                LOG.warning(_("Failed to delete network resource %(id)s: "
+                              "%(error)s") % {"id": args[0], "error": e})
+
+    def _network_args(self, tenant_id, **kwargs):
+        # NOTE: network_create_args is copied, because it is shared by
+        #       networks created concurrently for different tenants
+        network_args = dict(kwargs.get("network_create_args", {}))
+        network_args.update({
+            "tenant_id": tenant_id,
+            "name": self.owner.generate_random_name()})
+        return network_args
+
+    def _subnet_args(self, tenant_id, network_id, **kwargs):
+        return {"tenant_id": tenant_id,
+                "network_id": network_id,
+                "name": self.owner.generate_random_name(),
+                "ip_version": self.SUBNET_IP_VERSION,
+                "cidr": self._generate_cidr(),
+                "enable_dhcp": True,
+                "dns_nameservers": kwargs.get("dns_nameservers",
+                                              ["8.8.8.8", "8.8.4.4"])}
+
+    @staticmethod
+    def _marshal_network(network, subnets, router, tenant_id):
         return {"id": network["id"],
                 "name": network["name"],
                 "status": network["status"],
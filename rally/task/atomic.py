@@ -16,6 +16,7 @@
 import functools
 
 from rally.common import costilius
+from rally.common import tracing
 from rally.common import utils
 
 
@@ -23,11 +24,37 @@ class ActionTimerMixin(object):
 
     def __init__(self):
         self._atomic_actions = costilius.OrderedDict()
+        self._atomic_actions_trace = []
 
     def atomic_actions(self):
-        """Returns the content of each atomic action."""
+        """Returns the content of each atomic action.
+
+        Durations of repeated calls of an atomic action are summed up,
+        see atomic_actions_trace() for durations of separate calls.
+        """
         return self._atomic_actions
 
+    def atomic_actions_trace(self):
+        """Returns calls of atomic actions in order of their start.
+
+        Each call is a dict with name of the action, index of the parent
+        call in the trace (or None), time of start and finish and failure
+        flag.
+        """
+        return self._atomic_actions_trace
+
+    def _atomic_action_running(self):
+        """Returns whether any atomic action is running now."""
+        return any(span["finished_at"] is None
+                   for span in self._atomic_actions_trace)
+
+    def _atomic_actions_finished(self):
+        """Called when the outermost running atomic action is finished.
+
+        Work that should not be included into durations of atomic actions
+        may be postponed till this moment.
+        """
+
 
 class ActionTimer(utils.Timer):
     """A class to measure the duration of atomic operations
@@ -38,6 +65,8 @@ class ActionTimer(utils.Timer):
     for i in range(repetitions):
         with atomic.ActionTimer(instance_of_action_timer, "name_of_action"):
             self.clients(<client>).<operation>
+
+    Repeated calls of the same action are stored under the same name.
     """
 
     def __init__(self, instance, name):
@@ -48,27 +77,47 @@ class ActionTimer(utils.Timer):
         """
         super(ActionTimer, self).__init__()
         self.instance = instance
-        self.name = self._get_atomic_action_name(instance, name)
-        self.instance._atomic_actions[self.name] = None
-
-    @classmethod
-    def _get_atomic_action_name(cls, instance, name):
-        # TODO(boris-42): It was quite bad idea to store atomic actions
-        #                 inside {}. We should refactor this in 0.2.0 release
-        #                 and store them inside array, that will allow us to
-        #                 store atomic actions with the same name
-        if name not in instance._atomic_actions:
-            return name
-
-        name_template = name + " (%i)"
-        i = 2
-        while name_template % i in instance._atomic_actions:
-            i += 1
-        return name_template % i
+        self.name = name
+        self.instance._atomic_actions.setdefault(self.name, None)
+        self._span = None
+
+    def _parent(self):
+        trace = self.instance._atomic_actions_trace
+        for idx in range(len(trace) - 1, -1, -1):
+            if trace[idx]["finished_at"] is None:
+                return idx
+        return None
+
+    def _has_running_parent(self, parent):
+        # NOTE: Duration of the nested call of an action is already
+        #       included into duration of the outer call of the same action
+        trace = self.instance._atomic_actions_trace
+        while parent is not None:
+            if trace[parent]["name"] == self.name:
+                return True
+            parent = trace[parent]["parent"]
+        return False
+
+    def __enter__(self):
+        tracing.push_action(self.name)
+        super(ActionTimer, self).__enter__()
+        self._span = {"name": self.name, "parent": self._parent(),
+                      "started_at": self.start, "finished_at": None,
+                      "failed": False}
+        self.instance._atomic_actions_trace.append(self._span)
+        return self
 
     def __exit__(self, type_, value, tb):
         super(ActionTimer, self).__exit__(type_, value, tb)
-        self.instance._atomic_actions[self.name] = self.duration()
+        tracing.pop_action()
+        self._span["finished_at"] = self.finish
+        self._span["failed"] = type_ is not None
+        if not self._has_running_parent(self._span["parent"]):
+            self.instance._atomic_actions[self.name] = (
+                (self.instance._atomic_actions[self.name] or 0)
+                + self.duration())
+        if self._span["parent"] is None:
+            self.instance._atomic_actions_finished()
 
 
 def action_timer(name):
@@ -15,6 +15,9 @@
 
 import abc
 import copy
+import itertools
+import sys
+import threading
 
 import jsonschema
 import six
@@ -38,7 +41,9 @@ def configure(name, order, hidden=False):
     :param name: Name of the class, used in the input task
     :param order: As far as we can use multiple context classes that sometimes
                   depend on each other we have to specify order of execution.
-                  Contexts with smaller order are run first
+                  Contexts with smaller order are run first. Contexts with
+                  the same order are set up and cleaned up concurrently, so
+                  they shouldn't depend on each other
     :param hidden: If it is true you won't be able to specify context via
                    task config
     """
@@ -160,27 +165,67 @@ class ContextManager(object):
         ctxlst = map(Context.get, self.context_obj["config"])
         return sorted(map(lambda ctx: ctx(self.context_obj), ctxlst))
 
+    def _get_context_groups(self):
+        """Return lists of contexts with the same order, sorted by order."""
+        return [list(group) for order, group in itertools.groupby(
+            self._get_sorted_context_lst(), lambda ctx: ctx.get_order())]
+
+    @staticmethod
+    def _run_concurrently(contexts, func):
+        """Call func for every context, in separate threads if needed.
+
+        All calls are finished before the first raised exception, if any,
+        is re-raised. Other exceptions are logged.
+        """
+        if len(contexts) == 1:
+            func(contexts[0])
+            return
+        errors = []
+
+        def run(ctx):
+            try:
+                func(ctx)
+            except Exception:
+                errors.append((ctx, sys.exc_info()))
+
+        threads = [threading.Thread(target=run, args=(ctx,))
+                   for ctx in contexts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for ctx, exc_info in errors[1:]:
+            LOG.error("Context %s failed: %s" % (ctx.get_name(), exc_info[1]),
+                      exc_info=exc_info)
+        if errors:
+            six.reraise(*errors[0][1])
+
     def setup(self):
         """Creates benchmark environment from config."""
 
         self._visited = []
-        for ctx in self._get_sorted_context_lst():
-            self._visited.append(ctx)
-            ctx.setup()
+        for group in self._get_context_groups():
+            # NOTE: Contexts are marked as visited before setup, so the ones
+            #       that failed or are set up partially are cleaned up too.
+            self._visited.append(group)
+            self._run_concurrently(group, lambda ctx: ctx.setup())
 
         return self.context_obj
 
     def cleanup(self):
         """Destroys benchmark environment."""
 
-        ctxlst = self._visited or self._get_sorted_context_lst()
-        for ctx in ctxlst[::-1]:
+        def cleanup(ctx):
             try:
                 ctx.cleanup()
             except Exception as e:
                 LOG.error("Context %s failed during cleanup." % ctx.get_name())
                 LOG.exception(e)
 
+        groups = self._visited or self._get_context_groups()
+        for group in groups[::-1]:
+            self._run_concurrently(group, cleanup)
+
     def map_for_scenario(self):
         """Returns scenario's specific context from full context.
 
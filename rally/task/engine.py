@@ -13,15 +13,19 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import copy
 import json
+import socket
 import threading
 import time
 import traceback
 
 import jsonschema
+from oslo_config import cfg
 import six
 
+from rally.common import broker
 from rally.common.i18n import _
 from rally.common import logging
 from rally.common import objects
@@ -31,18 +35,33 @@ from rally import osclients
 from rally.plugins.openstack.context.keystone import existing_users
 from rally.plugins.openstack.context.keystone import users as users_ctx
 from rally.task import context
+from rally.task import metrics
 from rally.task import runner
 from rally.task import scenario
 from rally.task import sla
+from rally.task import types
 
 
 LOG = logging.getLogger(__name__)
 
+TASK_ENGINE_OPTS = [
+    cfg.IntOpt("validation_threads", default=20,
+               help="Maximum amount of threads that are validating workloads "
+                    "of a task simultaneously")
+]
+
+CONF = cfg.CONF
+benchmark_group = cfg.OptGroup(name="benchmark",
+                               title="benchmark options")
+CONF.register_group(benchmark_group)
+CONF.register_opts(TASK_ENGINE_OPTS, group=benchmark_group)
+
 
 class ResultConsumer(object):
     """ResultConsumer class stores results from ScenarioRunner, checks SLA."""
 
-    def __init__(self, key, task, runner, abort_on_sla_failure):
+    def __init__(self, key, task, runner, abort_on_sla_failure,
+                 metrics=None):
         """ResultConsumer constructor.
 
         :param key: Scenario identifier
@@ -51,6 +70,8 @@ class ResultConsumer(object):
                        consumed
         :param abort_on_sla_failure: True if the execution should be stopped
                                      when some SLA check fails
+        :param metrics: metrics.WorkloadMetrics instance that is fed with
+                        results
         """
 
         self.key = key
@@ -58,6 +79,7 @@ class ResultConsumer(object):
         self.runner = runner
         self.sla_checker = sla.SLAChecker(key["kw"])
         self.abort_on_sla_failure = abort_on_sla_failure
+        self.metrics = metrics
         self.is_done = threading.Event()
         self.unexpected_failure = {}
         self.results = []
@@ -78,6 +100,8 @@ class ResultConsumer(object):
                 results = self.runner.result_queue.popleft()
                 self.results.extend(results)
                 for r in results:
+                    if self.metrics:
+                        self.metrics.add(r)
                     success = self.sla_checker.add_iteration(r)
                     if self.abort_on_sla_failure and not success:
                         self.sla_checker.set_aborted_on_sla()
@@ -193,15 +217,19 @@ class TaskEngine(object):
     @logging.log_task_wrapper(LOG.info,
                               _("Task validation of scenarios names."))
     def _validate_config_scenarios_name(self, config):
-        available = set(s.get_name() for s in scenario.Scenario.get_all())
-
-        specified = set()
+        # NOTE: Scenarios are looked up one by one instead of listing all of
+        #       them, so only modules of used scenarios are imported when
+        #       plugins are loaded lazily.
+        missing = set()
         for subtask in config.subtasks:
             for s in subtask.workloads:
-                specified.add(s.name)
+                try:
+                    scenario.Scenario.get(s.name)
+                except exceptions.PluginNotFound:
+                    missing.add(s.name)
 
-        if not specified.issubset(available):
-            names = ", ".join(specified - available)
+        if missing:
+            names = ", ".join(missing)
             raise exceptions.NotFoundScenarios(names=names)
 
     @logging.log_task_wrapper(LOG.info, _("Task validation of syntax."))
@@ -254,20 +282,56 @@ class TaskEngine(object):
         with self._get_user_ctx_for_validation(ctx_conf) as ctx:
             ctx.setup()
             admin = osclients.Clients(self.admin)
-            user = osclients.Clients(ctx_conf["users"][0]["credential"])
 
+            # NOTE: Result of validation depends only on the workload and
+            #       on the role of the user, so it is enough to validate
+            #       every unique workload once per role.
+            users = collections.OrderedDict()
             for u in ctx_conf["users"]:
-                user = osclients.Clients(u["credential"])
-                for subtask in config.subtasks:
-                    for pos, workload in enumerate(subtask.workloads):
-                        self._validate_config_semantic_helper(
-                            admin, user, workload,
-                            pos, deployment)
+                users.setdefault(u["credential"].permission, u)
+            users = [osclients.Clients(u["credential"])
+                     for u in users.values()]
+
+            checks = []
+            validated = set()
+            for subtask in config.subtasks:
+                for pos, workload in enumerate(subtask.workloads):
+                    key = json.dumps([workload.name, workload.to_dict()],
+                                     sort_keys=True)
+                    if key in validated:
+                        continue
+                    validated.add(key)
+                    for i, user in enumerate(users):
+                        # NOTE: admin validators are checked only once
+                        checks.append((admin if i == 0 else None, user,
+                                       workload, pos))
+
+            errors = [None] * len(checks)
+
+            def publish(queue):
+                queue.extend(enumerate(checks))
+
+            def consume(cache, args):
+                i, (admin, user, workload, pos) = args
+                try:
+                    self._validate_config_semantic_helper(
+                        admin, user, workload, pos, deployment)
+                except Exception as e:
+                    errors[i] = e
+
+            broker.run(publish, consume, consumers_count=max(
+                min(len(checks), CONF.benchmark.validation_threads), 1))
+
+            for error in errors:
+                if error is not None:
+                    raise error
 
     @logging.log_task_wrapper(LOG.info, _("Task validation."))
     def validate(self):
         """Perform full task configuration validation."""
         self.task.update_status(consts.TaskStatus.VERIFYING)
+        # NOTE: Resources could be changed since the previous task
+        types.RESOURCE_CATALOG.invalidate()
         try:
             self._validate_config_scenarios_name(self.config)
             self._validate_config_syntax(self.config)
@@ -299,17 +363,11 @@ class TaskEngine(object):
 
         return context_obj
 
-    @logging.log_task_wrapper(LOG.info, _("Benchmarking."))
-    def run(self):
-        """Run the benchmark according to the test configuration.
+    def _run_workloads(self, task_metrics):
+        """Run workloads of all subtasks.
 
-        Test configuration is specified on engine initialization.
-
-        :returns: List of dicts, each dict containing the results of all the
-                  corresponding benchmark test launches
+        :returns: False if the task was aborted
         """
-        self.task.update_status(consts.TaskStatus.RUNNING)
-
         for subtask in self.config.subtasks:
             for pos, workload in enumerate(subtask.workloads):
 
@@ -317,7 +375,7 @@ class TaskEngine(object):
                         self.task["uuid"]):
                     LOG.info("Received aborting signal.")
                     self.task.update_status(consts.TaskStatus.ABORTED)
-                    return
+                    return False
 
                 key = workload.make_key(pos)
                 LOG.info("Running benchmark with key: \n%s"
@@ -325,14 +383,45 @@ class TaskEngine(object):
                 runner_obj = self._get_runner(workload.runner)
                 context_obj = self._prepare_context(
                     workload.context, workload.name, self.admin)
+                workload_metrics = task_metrics.add_workload(
+                    workload.name, pos, runner=runner_obj)
                 try:
                     with ResultConsumer(key, self.task, runner_obj,
-                                        self.abort_on_sla_failure):
+                                        self.abort_on_sla_failure,
+                                        metrics=workload_metrics):
                         with context.ContextManager(context_obj):
                             runner_obj.run(workload.name, context_obj,
                                            workload.args)
                 except Exception as e:
                     LOG.exception(e)
+        return True
+
+    @logging.log_task_wrapper(LOG.info, _("Benchmarking."))
+    def run(self):
+        """Run the benchmark according to the test configuration.
+
+        Test configuration is specified on engine initialization.
+
+        :returns: List of dicts, each dict containing the results of all the
+                  corresponding benchmark test launches
+        """
+        self.task.update_status(consts.TaskStatus.RUNNING)
+
+        task_metrics = metrics.TaskMetrics(self.task["uuid"])
+        server = None
+        if CONF.benchmark.metrics_port:
+            try:
+                server = metrics.MetricsServer(task_metrics)
+            except socket.error as e:
+                LOG.warning(_("Failed to start live metrics endpoint: %s")
+                            % e)
+        if server:
+            with server:
+                completed = self._run_workloads(task_metrics)
+        else:
+            completed = self._run_workloads(task_metrics)
+        if not completed:
+            return
 
         if objects.Task.get_status(
                 self.task["uuid"]) != consts.TaskStatus.ABORTED:
@@ -0,0 +1,279 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Live metrics of running workloads.
+
+ResultConsumer feeds results of iterations to WorkloadMetrics, while
+MetricsServer exposes them via HTTP in Prometheus text format (/metrics)
+and JSON (/metrics.json), which is used by `rally task watch`.
+"""
+
+import collections
+import json
+import threading
+import time
+
+from oslo_config import cfg
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
+from rally.common import logging
+from rally.common import streaming_algorithms as streaming
+from rally.task.processing import utils
+
+
+LOG = logging.getLogger(__name__)
+
+METRICS_OPTS = [
+    cfg.StrOpt("metrics_host", default="127.0.0.1",
+               help="Address of HTTP endpoint with live metrics of running "
+                    "workloads"),
+    cfg.IntOpt("metrics_port", default=0,
+               help="Port of HTTP endpoint with live metrics of running "
+                    "workloads, 0 disables the endpoint"),
+    cfg.IntOpt("metrics_window", default=1000,
+               help="Amount of the latest iterations used to calculate "
+                    "live percentiles of durations")
+]
+
+CONF = cfg.CONF
+benchmark_group = cfg.OptGroup(name="benchmark",
+                               title="benchmark options")
+CONF.register_group(benchmark_group)
+CONF.register_opts(METRICS_OPTS, group=benchmark_group)
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+class _Latency(object):
+    """Durations: mean and max of all values, percentiles of latest ones."""
+
+    def __init__(self, window):
+        self.mean = streaming.MeanComputation()
+        self.max = streaming.MaxComputation()
+        self.latest = collections.deque(maxlen=window)
+
+    def add(self, value):
+        self.mean.add(value)
+        self.max.add(value)
+        self.latest.append(value)
+
+    def result(self):
+        result = {"mean": self.mean.result(), "max": self.max.result()}
+        for percent in PERCENTILES:
+            result["p%d" % (percent * 100)] = utils.percentile(
+                list(self.latest), percent)
+        return result
+
+
+class WorkloadMetrics(object):
+    """Live metrics of one workload."""
+
+    def __init__(self, name, position, runner=None, window=None):
+        """Init metrics.
+
+        :param name: scenario name of the workload
+        :param position: position of the workload in the task
+        :param runner: ScenarioRunner of the workload, that is used to
+                       get amount of in-flight iterations
+        :param window: amount of the latest iterations used to calculate
+                       percentiles, defaults to CONF.benchmark.metrics_window
+        """
+        self.name = name
+        self.position = position
+        self.runner = runner
+        self._window = window or CONF.benchmark.metrics_window
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+        self._iterations = streaming.IncrementComputation()
+        self._failures = streaming.IncrementComputation()
+        self._duration = _Latency(self._window)
+        self._atomic_actions = collections.OrderedDict()
+
+    def add(self, result):
+        """Add result of an iteration."""
+        with self._lock:
+            self._iterations.add()
+            if result["error"]:
+                self._failures.add()
+                return
+            self._duration.add(result["duration"])
+            for action, duration in result["atomic_actions"].items():
+                if duration is None:
+                    continue
+                if action not in self._atomic_actions:
+                    self._atomic_actions[action] = _Latency(self._window)
+                self._atomic_actions[action].add(duration)
+
+    def snapshot(self):
+        """Return current metrics as a dict."""
+        with self._lock:
+            iterations = self._iterations.result()
+            failures = self._failures.result()
+            elapsed = time.time() - self._started_at
+            in_flight = None
+            if self.runner is not None:
+                in_flight = self.runner.in_flight_iterations()
+            return {
+                "name": self.name,
+                "position": self.position,
+                "iterations": iterations,
+                "failures": failures,
+                "error_rate": (float(failures) / iterations
+                               if iterations else 0),
+                "iterations_per_second": (float(iterations) / elapsed
+                                          if elapsed else 0),
+                "in_flight": in_flight,
+                "duration": self._duration.result(),
+                "atomic_actions": collections.OrderedDict(
+                    (action, latency.result())
+                    for action, latency in self._atomic_actions.items())}
+
+
+class TaskMetrics(object):
+    """Live metrics of workloads of a task."""
+
+    def __init__(self, task_uuid):
+        self.task_uuid = task_uuid
+        self.workloads = []
+        self._lock = threading.Lock()
+
+    def add_workload(self, name, position, runner=None):
+        """Start collecting metrics of a new workload."""
+        workload = WorkloadMetrics(name, position, runner=runner)
+        with self._lock:
+            self.workloads.append(workload)
+        return workload
+
+    def snapshot(self):
+        with self._lock:
+            workloads = list(self.workloads)
+        return {"task": self.task_uuid,
+                "workloads": [w.snapshot() for w in workloads]}
+
+
+def _escape(value):
+    return (str(value).replace("\\", "\\\\").replace("\"", "\\\"")
+            .replace("\n", "\\n"))
+
+
+def _labels(**labels):
+    return "{%s}" % ",".join("%s=\"%s\"" % (k, _escape(v))
+                             for k, v in sorted(labels.items()))
+
+
+def to_prometheus(snapshot):
+    """Format TaskMetrics.snapshot() in Prometheus text format."""
+    metrics = collections.OrderedDict()
+
+    def add(metric, metric_type, help_, value, **labels):
+        if value is None:
+            return
+        if metric not in metrics:
+            metrics[metric] = ["# HELP %s %s" % (metric, help_),
+                               "# TYPE %s %s" % (metric, metric_type)]
+        metrics[metric].append("%s%s %s" % (metric, _labels(**labels),
+                                            repr(float(value))))
+
+    def add_latency(metric, help_, latency, **labels):
+        for percent in PERCENTILES:
+            add(metric, "summary", help_, latency["p%d" % (percent * 100)],
+                quantile=percent, **labels)
+        add(metric + "_mean", "gauge", "Mean of " + help_.lower(),
+            latency["mean"], **labels)
+        add(metric + "_max", "gauge", "Max of " + help_.lower(),
+            latency["max"], **labels)
+
+    for w in snapshot["workloads"]:
+        labels = {"task": snapshot["task"], "workload": w["name"],
+                  "position": w["position"]}
+        add("rally_workload_iterations_total", "counter",
+            "Finished iterations.", w["iterations"], **labels)
+        add("rally_workload_failures_total", "counter",
+            "Failed iterations.", w["failures"], **labels)
+        add("rally_workload_error_rate", "gauge",
+            "Ratio of failed iterations.", w["error_rate"], **labels)
+        add("rally_workload_iterations_per_second", "gauge",
+            "Finished iterations per second.", w["iterations_per_second"],
+            **labels)
+        add("rally_workload_in_flight_iterations", "gauge",
+            "Started but not finished iterations.", w["in_flight"], **labels)
+        add_latency("rally_workload_duration_seconds",
+                    "Duration of successful iterations.", w["duration"],
+                    **labels)
+        for action, latency in w["atomic_actions"].items():
+            add_latency("rally_atomic_action_duration_seconds",
+                        "Duration of atomic actions.", latency,
+                        action=action, **labels)
+
+    lines = []
+    for metric_lines in metrics.values():
+        lines.extend(metric_lines)
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        snapshot = self.server.task_metrics.snapshot()
+        if self.path == "/metrics":
+            body = to_prometheus(snapshot)
+            content_type = "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body = json.dumps(snapshot)
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        body = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        LOG.debug("Metrics endpoint: " + format, *args)
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn,
+                           BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class MetricsServer(object):
+    """HTTP endpoint with live metrics, that is served in a thread."""
+
+    def __init__(self, task_metrics, host=None, port=None):
+        self.server = _ThreadingHTTPServer(
+            (host or CONF.benchmark.metrics_host,
+             CONF.benchmark.metrics_port if port is None else port),
+            _MetricsRequestHandler)
+        self.server.task_metrics = task_metrics
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+
+    @property
+    def url(self):
+        return "http://%s:%s" % self.server.server_address[:2]
+
+    def __enter__(self):
+        self.thread.start()
+        LOG.info("Live metrics are available at %s/metrics", self.url)
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
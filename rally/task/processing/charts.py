@@ -384,6 +384,101 @@ class MainStatsTable(Table):
                     self._data[name][idx][0].add(value)
 
 
+class AtomicCallsTable(Table):
+    """Durations of separate calls of atomic actions.
+
+    Unlike MainStatsTable, that uses durations of atomic actions summed up
+    per iteration, this table is built from atomic actions traces. Calls
+    are aggregated as they come, so percentiles are estimated with
+    streaming.QuantileComputation instead of keeping every span.
+    """
+
+    columns = ["Action", "Min (sec)", "Median (sec)", "90%ile (sec)",
+               "95%ile (sec)", "Max (sec)", "Avg (sec)", "Failed", "Calls",
+               "Calls per iteration"]
+
+    def _map_iteration_values(self, iteration):
+        return [(span["name"], span)
+                for span in iteration.get("atomic_actions_trace", [])]
+
+    @staticmethod
+    def _quantile(percent):
+        return lambda st, has_result: (round(st.quantile(percent), 3)
+                                       if has_result else "n/a")
+
+    def _init_row(self):
+        iters_num = self._workload_info["iterations_count"]
+        durations = streaming.QuantileComputation(0.5)
+        calls = streaming.IncrementComputation()
+        return [
+            [streaming.MinComputation(), None],
+            [durations, None],
+            [durations, self._quantile(0.9)],
+            [durations, self._quantile(0.95)],
+            [streaming.MaxComputation(), None],
+            [streaming.MeanComputation(), None],
+            [streaming.IncrementComputation(),
+             lambda st, has_result: st.result()],
+            [calls, lambda st, has_result: st.result()],
+            [calls, lambda st, has_result: round(
+                float(st.result()) / iters_num, 2)]]
+
+    def add_iteration(self, iteration):
+        for name, span in self._map_iteration_values(iteration):
+            if name not in self._data:
+                self._data[name] = self._init_row()
+            (min_, durations, _p90, _p95, max_, mean,
+             failed, calls, _per_iter) = [ins for ins, fn in self._data[name]]
+            if span["duration"] is not None:
+                for ins in (min_, durations, max_, mean):
+                    ins.add(span["duration"])
+            if span["failed"]:
+                failed.add()
+            calls.add()
+
+
+class CorrectedDurationTable(Table):
+    """Raw and coordinated omission corrected durations of iterations.
+
+    Expected interval for back-filling of iterations without planned start
+    is the median duration of previous successful iterations, the same as
+    in max_corrected_duration SLA.
+    """
+
+    columns = ["Durations", "Min (sec)", "Median (sec)", "90%ile (sec)",
+               "95%ile (sec)", "99%ile (sec)", "Max (sec)", "Avg (sec)",
+               "Count"]
+
+    def __init__(self, *args, **kwargs):
+        super(CorrectedDurationTable, self).__init__(*args, **kwargs)
+        self._durations = streaming.CorrectedDurationComputation()
+
+    def _map_iteration_values(self, iteration):
+        return {"duration": iteration["duration"],
+                "timestamp": iteration["timestamp"],
+                "scheduled_at": iteration.get("scheduled_at")}
+
+    def add_iteration(self, iteration):
+        if not iteration["error"]:
+            self._durations.add(self._map_iteration_values(iteration))
+
+    @staticmethod
+    def _row(name, durations, total):
+        if not durations.count:
+            return [name] + ["n/a"] * 7 + [0]
+        return [name] + [round(value, 3) for value in (
+            durations.quantile(0), durations.quantile(0.5),
+            durations.quantile(0.9), durations.quantile(0.95),
+            durations.quantile(0.99), durations.quantile(1),
+            total / durations.count)] + [durations.count]
+
+    def get_rows(self):
+        return [self._row("raw", self._durations.raw,
+                          self._durations.raw_sum),
+                self._row("corrected", self._durations.corrected,
+                          self._durations.corrected_sum)]
+
+
 class OutputChart(Chart):
     """Base class for charts related to scenario output."""
 
@@ -22,18 +22,44 @@ from rally.task.processing import charts
 from rally.ui import utils as ui_utils
 
 
+def _atomic_actions_waterfall(trace):
+    """Table of atomic action calls of the iteration in order of start.
+
+    Nested calls are named by path from the outermost call.
+    """
+    paths = []
+    rows = []
+    for span in trace:
+        path = span["name"]
+        if span["parent"] is not None:
+            path = "%s > %s" % (paths[span["parent"]], path)
+        paths.append(path)
+        rows.append([path, round(span["offset"], 3),
+                     "n/a" if span["duration"] is None
+                     else round(span["duration"], 3),
+                     "yes" if span["failed"] else "no"])
+    return {"title": "Atomic actions",
+            "description": "Calls of atomic actions in order of start",
+            "widget": "Table",
+            "data": {"cols": ["Action", "Started at (sec)", "Duration (sec)",
+                              "Failed"],
+                      "rows": rows}}
+
+
 def _process_scenario(data, pos):
     main_area = charts.MainStackedAreaChart(data["info"])
     main_hist = charts.MainHistogramChart(data["info"])
     main_stat = charts.MainStatsTable(data["info"])
+    corrected_stat = charts.CorrectedDurationTable(data["info"])
     load_profile = charts.LoadProfileChart(data["info"])
     atomic_pie = charts.AtomicAvgChart(data["info"])
     atomic_area = charts.AtomicStackedAreaChart(data["info"])
     atomic_hist = charts.AtomicHistogramChart(data["info"])
+    atomic_calls = charts.AtomicCallsTable(data["info"])
 
     errors = []
     output_errors = []
-    additive_output_charts = []
+    additive_output_charts = collections.OrderedDict()
     complete_output = []
     for idx, itr in enumerate(data["iterations"]):
         if itr["error"]:
@@ -41,10 +67,15 @@ def _process_scenario(data, pos):
             errors.append({"iteration": idx,
                            "type": typ, "message": msg, "traceback": trace})
 
-        for i, additive in enumerate(itr["output"]["additive"]):
-            try:
-                additive_output_charts[i].add_iteration(additive["data"])
-            except IndexError:
+        for additive in itr["output"]["additive"]:
+            # NOTE: Iterations may have different sets of charts, e.g.
+            #       failed ones don't have scenario output, so charts are
+            #       matched by title and plugin rather than by position.
+            chart_key = (additive["title"], additive["chart_plugin"])
+            if chart_key in additive_output_charts:
+                additive_output_charts[chart_key].add_iteration(
+                    additive["data"])
+            else:
                 data_ = {}
                 keys = []
                 for key, value in additive["data"]:
@@ -59,7 +90,7 @@ def _process_scenario(data, pos):
                 chart = chart_cls(info, title=additive["title"],
                                   description=additive["description"])
                 chart.add_iteration(additive["data"])
-                additive_output_charts.append(chart)
+                additive_output_charts[chart_key] = chart
 
         complete_charts = []
         for complete in itr["output"]["complete"]:
@@ -67,15 +98,20 @@ def _process_scenario(data, pos):
             chart_cls = plugin.Plugin.get(complete_chart.pop("chart_plugin"))
             complete_chart["widget"] = chart_cls.widget
             complete_charts.append(complete_chart)
+        if itr.get("atomic_actions_trace"):
+            complete_charts.append(
+                _atomic_actions_waterfall(itr["atomic_actions_trace"]))
         complete_output.append(complete_charts)
 
-        for chart in (main_area, main_hist, main_stat, load_profile,
-                      atomic_pie, atomic_area, atomic_hist):
+        for chart in (main_area, main_hist, main_stat, corrected_stat,
+                      load_profile, atomic_pie, atomic_area, atomic_hist,
+                      atomic_calls):
             chart.add_iteration(itr)
 
     kw = data["key"]["kw"]
     cls, method = data["key"]["name"].split(".")
-    additive_output = [chart.render() for chart in additive_output_charts]
+    additive_output = [chart.render()
+                       for chart in additive_output_charts.values()]
     iterations_count = data["info"]["iterations_count"]
     return {
         "cls": cls,
@@ -93,8 +129,10 @@ def _process_scenario(data, pos):
         "load_profile": load_profile.render(),
         "atomic": {"histogram": atomic_hist.render(),
                    "iter": atomic_area.render(),
-                   "pie": atomic_pie.render()},
+                   "pie": atomic_pie.render(),
+                   "calls": atomic_calls.render()},
         "table": main_stat.render(),
+        "corrected_table": corrected_stat.render(),
         "additive_output": additive_output,
         "complete_output": complete_output,
         "output_errors": output_errors,
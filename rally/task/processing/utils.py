@@ -14,6 +14,7 @@
 #    under the License.
 
 import math
+import random
 
 from rally.common import costilius
 from rally.common.i18n import _
@@ -74,6 +75,64 @@ def percentile(values, percent):
     return (d0 + d1)
 
 
+def mann_whitney(values, baseline):
+    """One-sided Mann-Whitney U test.
+
+    Normal approximation with correction for ties is used, so both lists
+    should have at least about 10 values.
+
+    :parameter values: non-empty list of numbers
+    :parameter baseline: non-empty list of numbers
+
+    :returns: p-value of the hypothesis that values are not stochastically
+              greater than baseline ones
+    """
+    n1 = len(values)
+    n2 = len(baseline)
+    merged = sorted([(v, 0) for v in values] + [(v, 1) for v in baseline])
+    rank_sum = 0.0
+    ties = 0.0
+    i = 0
+    while i < len(merged):
+        j = i
+        while j < len(merged) and merged[j][0] == merged[i][0]:
+            j += 1
+        rank = (i + j + 1) / 2.0
+        rank_sum += rank * sum(1 for v in merged[i:j] if v[1] == 0)
+        ties += (j - i) ** 3 - (j - i)
+        i = j
+    u = rank_sum - n1 * (n1 + 1) / 2.0
+    n = n1 + n2
+    variance = n1 * n2 / 12.0 * ((n + 1) - ties / (n * (n - 1) or 1))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2.0 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def bootstrap(values, baseline, statistic, confidence=0.95, rounds=1000,
+              seed=None):
+    """Bootstrap confidence interval of statistic of two samples.
+
+    :parameter values: non-empty list of numbers
+    :parameter baseline: non-empty list of numbers
+    :parameter statistic: function of resampled values and baseline
+    :parameter confidence: confidence level of the interval
+    :parameter rounds: amount of resamplings
+    :parameter seed: seed of random generator
+
+    :returns: (lower, upper) bounds of the two-sided interval
+    """
+    rand = random.Random(seed)
+    results = []
+    for i in range(rounds):
+        results.append(statistic(
+            [rand.choice(values) for v in values],
+            [rand.choice(baseline) for v in baseline]))
+    alpha = (1 - confidence) / 2.0
+    return percentile(results, alpha), percentile(results, 1 - alpha)
+
+
 # TODO(amaretskiy): This function is deprecated and should be removed
 #                   after it becomes not used by rally.cli.commands.task
 def get_atomic_actions_data(raw_data):
@@ -0,0 +1,245 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Profiling of scenario iterations.
+
+Profiling is enabled by "profile" section of runner config:
+
+    "runner": {
+        "type": "constant",
+        "times": 100,
+        "profile": {"sample_rate": 0.1, "mode": "sampling"}
+    }
+
+Every profiled iteration is saved to a separate file in the directory of
+the workload (<profiles_dir>/<task uuid>/<scenario name>/<run index>), so
+iterations that are run by different processes don't need to share state.
+Profiles are aggregated by `rally task profile`.
+
+Durations of profiled iterations include profiler overhead, so results of
+these iterations are marked with "profiled": true.
+"""
+
+import collections
+import cProfile
+import errno
+import os
+import pstats
+import sys
+import threading
+
+from oslo_config import cfg
+
+from rally.common.i18n import _
+from rally.common import logging
+
+
+LOG = logging.getLogger(__name__)
+
+PROFILER_OPTS = [
+    cfg.StrOpt("profiles_dir", default="~/.rally/profiles",
+               help="Directory where profiles of scenario iterations are "
+                    "stored")
+]
+
+CONF = cfg.CONF
+benchmark_group = cfg.OptGroup(name="benchmark",
+                               title="benchmark options")
+CONF.register_group(benchmark_group)
+CONF.register_opts(PROFILER_OPTS, group=benchmark_group)
+
+CPROFILE = "cprofile"
+SAMPLING = "sampling"
+
+CONFIG_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "sample_rate": {
+            "type": "number",
+            "exclusiveMinimum": True,
+            "minimum": 0,
+            "maximum": 1
+        },
+        "mode": {
+            "enum": [CPROFILE, SAMPLING]
+        },
+        "interval": {
+            "type": "number",
+            "exclusiveMinimum": True,
+            "minimum": 0
+        }
+    },
+    "additionalProperties": False
+}
+
+
+def task_dir(task_uuid):
+    return os.path.join(os.path.expanduser(CONF.benchmark.profiles_dir),
+                        task_uuid)
+
+
+def list_workloads(task_uuid):
+    """Return (scenario name, run index, directory) of profiled workloads."""
+    path = task_dir(task_uuid)
+    if not os.path.isdir(path):
+        return []
+    workloads = []
+    for name in sorted(os.listdir(path)):
+        for index in sorted(os.listdir(os.path.join(path, name)), key=int):
+            workloads.append((name, int(index),
+                              os.path.join(path, name, index)))
+    return workloads
+
+
+def _makedirs(path):
+    try:
+        os.makedirs(path)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+
+
+class IterationProfiler(object):
+    """Profiles a fraction of scenario iterations."""
+
+    def __init__(self, directory, sample_rate=1.0, mode=CPROFILE,
+                 interval=0.005):
+        """Init profiler.
+
+        :param directory: directory to save profiles of iterations to
+        :param sample_rate: fraction of iterations to profile
+        :param mode: "cprofile" to use deterministic profiler or
+                     "sampling" to sample stacks every interval seconds
+        :param interval: interval between stack samples in sampling mode
+        """
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.interval = interval
+
+    @classmethod
+    def for_workload(cls, task_uuid, name, config):
+        """Create profiler that saves profiles to a new workload directory.
+
+        :param task_uuid: UUID of the task
+        :param name: name of the scenario
+        :param config: "profile" section of runner config
+        """
+        path = os.path.join(task_dir(task_uuid), name)
+        _makedirs(path)
+        directory = os.path.join(path, str(len(os.listdir(path))))
+        _makedirs(directory)
+        return cls(directory, **config)
+
+    def is_sampled(self, iteration):
+        # NOTE: Sampling by iteration number spreads profiled iterations
+        #       evenly and doesn't need state shared between processes.
+        return (int((iteration + 1) * self.sample_rate) >
+                int(iteration * self.sample_rate))
+
+    def run(self, iteration, func, *args, **kwargs):
+        """Call func, profile the call if the iteration is sampled."""
+        if not self.is_sampled(iteration):
+            return func(*args, **kwargs)
+        if self.mode == SAMPLING:
+            return self._run_sampling(iteration, func, *args, **kwargs)
+        return self._run_cprofile(iteration, func, *args, **kwargs)
+
+    def _path(self, iteration, extension):
+        return os.path.join(self.directory, "%d-%d.%s"
+                            % (os.getpid(), iteration, extension))
+
+    def _run_cprofile(self, iteration, func, *args, **kwargs):
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(func, *args, **kwargs)
+        finally:
+            self._save(profile.dump_stats, self._path(iteration, "prof"))
+
+    def _run_sampling(self, iteration, func, *args, **kwargs):
+        stacks = collections.Counter()
+        done = threading.Event()
+        thread_id = threading.current_thread().ident
+        call_frames = []
+
+        def call():
+            call_frames.append(sys._getframe())
+            return func(*args, **kwargs)
+
+        def sample():
+            while not done.wait(self.interval):
+                if not call_frames:
+                    continue
+                frame = sys._current_frames().get(thread_id)
+                stack = []
+                while frame is not None and frame is not call_frames[0]:
+                    code = frame.f_code
+                    stack.append("%s (%s:%d)" % (
+                        code.co_name, os.path.basename(code.co_filename),
+                        code.co_firstlineno))
+                    frame = frame.f_back
+                # NOTE: Stacks that don't reach call() are sampled before
+                #       or after the call of func
+                if frame is not None and stack:
+                    stacks[";".join(reversed(stack))] += 1
+
+        sampler = threading.Thread(target=sample)
+        sampler.daemon = True
+        sampler.start()
+        try:
+            return call()
+        finally:
+            done.set()
+            sampler.join()
+            self._save(lambda path: save_stacks(stacks, path),
+                       self._path(iteration, "stacks"))
+
+    def _save(self, dump, path):
+        try:
+            dump(path)
+        except (IOError, OSError) as e:
+            LOG.warning(_("Failed to save profile %(path)s: %(e)s")
+                        % {"path": path, "e": e})
+
+
+def save_stacks(stacks, path):
+    """Save stacks in collapsed format, that is used by flamegraph.pl."""
+    with open(path, "w") as f:
+        for stack, count in sorted(stacks.items()):
+            f.write("%s %d\n" % (stack, count))
+
+
+def load_stacks(directory):
+    """Aggregate stacks of all iterations profiled in sampling mode."""
+    stacks = collections.Counter()
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".stacks"):
+            with open(os.path.join(directory, filename)) as f:
+                for line in f:
+                    stack, _sep, count = line.rstrip("\n").rpartition(" ")
+                    stacks[stack] += int(count)
+    return stacks
+
+
+def load_pstats(directory):
+    """Aggregate profiles of all iterations profiled in cprofile mode.
+
+    :returns: pstats.Stats or None if there are no profiles
+    """
+    paths = [os.path.join(directory, filename)
+             for filename in sorted(os.listdir(directory))
+             if filename.endswith(".prof")]
+    if not paths:
+        return None
+    return pstats.Stats(*paths)
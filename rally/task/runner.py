@@ -16,16 +16,21 @@
 import abc
 import collections
 import multiprocessing
+import os
+import threading
 import time
 
 import jsonschema
+from oslo_config import cfg
 
 from rally.common import logging
 from rally.common import objects
 from rally.common.plugin import plugin
+from rally.common import tracing
 from rally.common import utils as rutils
 from rally import consts
 from rally.task import context
+from rally.task import profiler
 from rally.task import scenario
 from rally.task import types
 from rally.task import utils
@@ -33,6 +38,36 @@ from rally.task import utils
 
 LOG = logging.getLogger(__name__)
 
+RUNNER_OPTS = [
+    cfg.IntOpt("iteration_log_sample", default=1,
+               help="Log start and end of every N-th scenario iteration, "
+                    "0 disables logging of successful iterations. Failed "
+                    "iterations are always logged"),
+    cfg.IntOpt("iteration_log_rate", default=0,
+               help="Maximum amount of scenario iteration log lines per "
+                    "second in one runner process, 0 means no limit"),
+    cfg.BoolOpt("async_runner_logging", default=True,
+                help="Write logs of runner processes from a background "
+                     "thread, so scenario iterations don't wait for it"),
+    cfg.BoolOpt("runner_stats", default=False,
+                help="Add charts with CPU usage, threads, scheduling delays "
+                     "and result queue of runner processes to output of "
+                     "iterations, that show if load generator is saturated"),
+    cfg.BoolOpt("http_tracing", default=False,
+                help="Trace HTTP requests made by scenario iterations and "
+                     "add their times per atomic action and endpoint to "
+                     "output of iterations"),
+    cfg.BoolOpt("http_tracing_requests", default=False,
+                help="Also add a table with every traced HTTP request to "
+                     "output of each iteration, requires http_tracing")
+]
+
+CONF = cfg.CONF
+benchmark_group = cfg.OptGroup(name="benchmark",
+                               title="benchmark options")
+CONF.register_group(benchmark_group)
+CONF.register_opts(RUNNER_OPTS, group=benchmark_group)
+
 
 def format_result_on_timeout(exc, timeout):
     return {
@@ -48,22 +83,69 @@ def _get_scenario_context(context_obj):
     return context.ContextManager(context_obj).map_for_scenario()
 
 
+class _IterationLogFilter(object):
+    """Decides which scenario iterations are logged.
+
+    Iterations are sampled by CONF.benchmark.iteration_log_sample and
+    limited by CONF.benchmark.iteration_log_rate lines per second.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._second = None
+        self._lines = 0
+
+    def __call__(self, iteration, error=False):
+        if error:
+            return True
+        sample = CONF.benchmark.iteration_log_sample
+        if sample <= 0 or iteration % sample:
+            return False
+        rate = CONF.benchmark.iteration_log_rate
+        if rate <= 0:
+            return True
+        with self._lock:
+            second = int(time.time())
+            if second != self._second:
+                self._second = second
+                self._lines = 0
+            self._lines += 1
+            return self._lines <= rate
+
+
+_should_log_iteration = _IterationLogFilter()
+
+# NOTE: Profiler of the running workload. It is set before runner starts
+#       worker processes, so they inherit it.
+_profiler = None
+
+
 def _run_scenario_once(args):
     iteration, cls, method_name, context_obj, kwargs = args
 
-    LOG.info("Task %(task)s | ITER: %(iteration)s START" %
-             {"task": context_obj["task"]["uuid"], "iteration": iteration})
+    task_uuid = context_obj["task"]["uuid"]
+    if _should_log_iteration(iteration):
+        LOG.info("Task %(task)s | ITER: %(iteration)s START",
+                 {"task": task_uuid, "iteration": iteration})
 
     context_obj["iteration"] = iteration
     scenario_inst = cls(context_obj)
 
     error = []
     output = {"additive": [], "complete": []}
+    profiled = bool(_profiler and _profiler.is_sampled(iteration))
+    if CONF.benchmark.http_tracing:
+        tracing.start()
     try:
         with rutils.Timer() as timer:
             # NOTE(amaretskiy): Output as return value is deprecated
             #     but supported for backward compatibility
-            deprecated_output = getattr(scenario_inst, method_name)(**kwargs)
+            if profiled:
+                deprecated_output = _profiler.run(
+                    iteration, getattr(scenario_inst, method_name), **kwargs)
+            else:
+                deprecated_output = getattr(scenario_inst,
+                                            method_name)(**kwargs)
             warning = ""
             if deprecated_output:
                 warning = ("Returning output data by scenario is deprecated "
@@ -87,21 +169,174 @@ def _run_scenario_once(args):
         if logging.is_debug():
             LOG.exception(e)
     finally:
-        status = "Error %s: %s" % tuple(error[0:2]) if error else "OK"
-        LOG.info("Task %(task)s | ITER: %(iteration)s END: %(status)s" %
-                 {"task": context_obj["task"]["uuid"], "iteration": iteration,
-                  "status": status})
-
-        return {"duration": timer.duration() - scenario_inst.idle_duration(),
-                "timestamp": timer.timestamp(),
-                "idle_duration": scenario_inst.idle_duration(),
-                "error": error,
-                "output": output,
-                "atomic_actions": scenario_inst.atomic_actions()}
-
-
-def _worker_thread(queue, args):
-    queue.put(_run_scenario_once(args))
+        if CONF.benchmark.http_tracing:
+            _add_http_requests_output(
+                output, tracing.stop(),
+                with_requests=CONF.benchmark.http_tracing_requests)
+        if _should_log_iteration(iteration, error=bool(error)):
+            status = "Error %s: %s" % tuple(error[0:2]) if error else "OK"
+            LOG.info("Task %(task)s | ITER: %(iteration)s END: %(status)s",
+                     {"task": task_uuid, "iteration": iteration,
+                      "status": status})
+
+        result = {
+            "duration": timer.duration() - scenario_inst.idle_duration(),
+            "timestamp": timer.timestamp(),
+            "idle_duration": scenario_inst.idle_duration(),
+            "error": error,
+            "output": output,
+            "atomic_actions": scenario_inst.atomic_actions(),
+            "atomic_actions_trace": _format_atomic_actions_trace(
+                scenario_inst.atomic_actions_trace(), timer.timestamp())}
+        # NOTE: Duration of profiled iteration includes profiler overhead
+        if profiled:
+            result["profiled"] = True
+        return result
+
+
+def _format_atomic_actions_trace(trace, started_at):
+    """Make times of atomic action calls relative to iteration start."""
+    return [{"name": span["name"],
+             "parent": span["parent"],
+             "offset": span["started_at"] - started_at,
+             "duration": (None if span["finished_at"] is None
+                          else span["finished_at"] - span["started_at"]),
+             "failed": span["failed"]}
+            for span in trace]
+
+
+def _add_http_requests_output(output, traced, with_requests=False):
+    """Add HTTP requests made by the iteration to its output.
+
+    Times are summarized per atomic action and endpoint, so slow
+    service API can be told from slow keystone or slow network. The same
+    additive charts are added even if there are no requests, so they are
+    merged consistently across iterations.
+
+    :param output: output of the iteration
+    :param traced: list of traced requests
+    :param with_requests: whether to add a table with every request
+    """
+    durations = collections.OrderedDict()
+    ttfbs = collections.OrderedDict()
+    rows = []
+    for req in traced:
+        name = "%s %s" % (req["method"], req["endpoint"])
+        if req["action"]:
+            name = "%s | %s" % (req["action"], name)
+        # NOTE: Additive output expects one value per name per iteration
+        durations[name] = durations.get(name, 0) + req["duration"]
+        if req["ttfb"] is not None:
+            ttfbs.setdefault(name, []).append(req["ttfb"])
+        if with_requests:
+            rows.append([req["action"] or "", req["method"], req["endpoint"],
+                         "" if req["status"] is None else req["status"],
+                         req["bytes"],
+                         "" if req["ttfb"] is None else round(req["ttfb"], 3),
+                         round(req["duration"], 3)])
+    output["additive"].append({
+        "title": "HTTP requests: total time, sec",
+        "description": "Time of HTTP requests including reading of "
+                       "response, summed up per iteration by atomic action "
+                       "and endpoint",
+        "chart_plugin": "StatsTable",
+        "data": [[name, value] for name, value in durations.items()]})
+    output["additive"].append({
+        "title": "HTTP requests: time to first byte, sec",
+        "description": "Mean time between sending HTTP request and "
+                       "receiving response headers, by atomic action and "
+                       "endpoint",
+        "chart_plugin": "StatsTable",
+        "data": [[name, sum(values) / len(values)]
+                 for name, values in ttfbs.items()]})
+    if not with_requests:
+        return
+    output["complete"].append({
+        "title": "HTTP requests",
+        "description": "HTTP requests made by the iteration",
+        "chart_plugin": "Table",
+        "data": {"cols": ["Atomic action", "Method", "Endpoint", "Status",
+                          "Bytes", "Time to first byte, sec",
+                          "Total time, sec"],
+                 "rows": rows}})
+
+
+class _ProcessStats(object):
+    """Samples CPU usage of the current process between calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._cpu_time = None
+        self._time = None
+
+    def _sample_cpu(self):
+        times = os.times()
+        return times[0] + times[1], time.time()
+
+    def cpu_usage(self):
+        """Return CPU usage (in percents) since the previous call."""
+        with self._lock:
+            cpu_time, now = self._sample_cpu()
+            usage = 0.0
+            # NOTE: Sample of the parent process is useless after fork
+            if self._pid == os.getpid() and now > self._time:
+                usage = 100.0 * (cpu_time - self._cpu_time) / (
+                    now - self._time)
+            self._pid = os.getpid()
+            self._cpu_time, self._time = cpu_time, now
+            return usage
+
+
+_process_stats = _ProcessStats()
+
+
+def _add_runner_output(result, title, description, data):
+    result["output"]["additive"].append({
+        "title": title,
+        "description": description,
+        "chart_plugin": "StackedArea",
+        "data": data})
+
+
+def _add_worker_stats(result, scheduling_delay):
+    """Add stats of the runner worker process to the iteration output."""
+    _add_runner_output(
+        result, "Runner: worker process CPU usage, %",
+        "CPU usage of the runner process that ran the iteration. Values "
+        "close to 100% mean that Rally itself can be a bottleneck",
+        [["cpu", _process_stats.cpu_usage()]])
+    _add_runner_output(
+        result, "Runner: worker process threads",
+        "Amount of threads in the runner process at the end of iteration",
+        [["threads", threading.active_count()]])
+    if scheduling_delay is not None:
+        _add_runner_output(
+            result, "Runner: scheduling delay, sec",
+            "Delay between the planned and the real start of the iteration, "
+            "caused by busy runner process",
+            [["delay", max(scheduling_delay, 0.0)]])
+
+
+def _worker_thread(queue, args, scheduled_at=None, intended=False):
+    """Run iteration and put its result to the queue.
+
+    :param queue: queue for results
+    :param args: args for _run_scenario_once
+    :param scheduled_at: time when the iteration should have been started
+    :param intended: whether scheduled_at is planned by the load profile
+                     independently of previous iterations, then it is saved
+                     in the result to correct latency for coordinated
+                     omission
+    """
+    started_at = time.time()
+    result = _run_scenario_once(args)
+    if intended and scheduled_at is not None:
+        result["scheduled_at"] = scheduled_at
+    if CONF.benchmark.runner_stats:
+        _add_worker_stats(
+            result, scheduled_at and started_at - scheduled_at)
+    queue.put(result)
 
 
 def _log_worker_info(**info):
@@ -114,6 +349,12 @@ def _log_worker_info(**info):
     LOG.debug("Starting a worker.\n\t%s" % info_message)
 
 
+def _run_worker_process(worker_process, *args, **kwargs):
+    """Run the worker process target with asynchronous logging."""
+    with logging.AsyncLogging():
+        worker_process(*args, **kwargs)
+
+
 class ScenarioRunnerResult(dict):
     """Class for all scenario runners' result."""
 
@@ -127,6 +368,12 @@ class ScenarioRunnerResult(dict):
             "timestamp": {
                 "type": "number"
             },
+            "scheduled_at": {
+                "type": "number"
+            },
+            "profiled": {
+                "type": "boolean"
+            },
             "idle_duration": {
                 "type": "number"
             },
@@ -137,6 +384,7 @@ class ScenarioRunnerResult(dict):
                     ".*": {"type": ["number", "null"]}
                 }
             },
+            "atomic_actions_trace": objects.task.ATOMIC_ACTIONS_TRACE_SCHEMA,
             "error": {
                 "type": "array",
                 "items": {
@@ -185,11 +433,21 @@ class ScenarioRunner(plugin.Plugin):
         self.run_duration = 0
         self.batch_size = batch_size
         self.result_batch = []
+        self.iterations_count = 0
+        self.failed_iterations_count = 0
+        # NOTE: Runners that count started iterations in a shared counter
+        #       (utils.RAMInt) set it here, see in_flight_iterations()
+        self.iteration_gen = None
 
     @staticmethod
     def validate(config):
         """Validates runner's part of task config."""
         runner = ScenarioRunner.get(config.get("type", "serial"))
+        config = dict(config)
+        # NOTE: "profile" section is supported by all runners
+        if "profile" in config:
+            jsonschema.validate(config.pop("profile"),
+                                profiler.CONFIG_SCHEMA)
         jsonschema.validate(config, runner.CONFIG_SCHEMA)
 
     @abc.abstractmethod
@@ -213,12 +471,40 @@ class ScenarioRunner(plugin.Plugin):
         # NOTE(boris-42): processing @types decorators
         args = types.preprocess(name, context, args)
 
-        with rutils.Timer() as timer:
-            self._run_scenario(cls, method_name, context, args)
+        global _profiler
+        if "profile" in self.config:
+            _profiler = profiler.IterationProfiler.for_workload(
+                self.task["uuid"], name, self.config["profile"])
+        try:
+            with rutils.Timer() as timer:
+                self._run_scenario(cls, method_name, context, args)
+        finally:
+            _profiler = None
 
         self.run_duration = timer.duration()
+        # NOTE: Logging of iterations could be sampled, so the summary is
+        #       the only complete record of them in the log.
+        LOG.info("Task %(task)s | %(name)s: %(iterations)d iterations, "
+                 "%(failed)d failed, %(duration).2f sec",
+                 {"task": self.task["uuid"], "name": name,
+                  "iterations": self.iterations_count,
+                  "failed": self.failed_iterations_count,
+                  "duration": self.run_duration})
         return self.run_duration
 
+    def in_flight_iterations(self):
+        """Return amount of started iterations that have no result yet.
+
+        :returns: int or None if the runner doesn't count started iterations
+        """
+        if self.iteration_gen is None:
+            return None
+        started = int(self.iteration_gen)
+        if "times" in self.config:
+            # NOTE: Workers take one number more than they run
+            started = min(started, self.config["times"])
+        return max(started - self.iterations_count, 0)
+
     def abort(self):
         """Abort the execution of further benchmark scenario iterations."""
         self.aborted.set()
@@ -238,8 +524,14 @@ class ScenarioRunner(plugin.Plugin):
         for i in range(processes_to_start):
             kwrgs = {"processes_to_start": processes_to_start,
                      "processes_counter": i}
-            process = multiprocessing.Process(target=worker_process,
-                                              args=next(worker_args_gen),
+            args = next(worker_args_gen)
+            if CONF.benchmark.async_runner_logging:
+                args = (worker_process,) + tuple(args)
+                worker_process_target = _run_worker_process
+            else:
+                worker_process_target = worker_process
+            process = multiprocessing.Process(target=worker_process_target,
+                                              args=args,
                                               kwargs={"info": kwrgs})
             process.start()
             process_pool.append(process)
@@ -261,11 +553,35 @@ class ScenarioRunner(plugin.Plugin):
                 time.sleep(0.001)
 
             while not result_queue.empty():
-                self._send_result(result_queue.get())
+                result = result_queue.get()
+                if CONF.benchmark.runner_stats:
+                    self._add_result_queue_stats(result, result_queue)
+                self._send_result(result)
 
         self._flush_results()
         result_queue.close()
 
+    @staticmethod
+    def _add_result_queue_stats(result, result_queue):
+        """Add lag and depth of the result queue to the iteration output."""
+        if "timestamp" in result:
+            finished_at = (result["timestamp"] + result["duration"] +
+                           result["idle_duration"])
+            _add_runner_output(
+                result, "Runner: result queue lag, sec",
+                "Time between the end of the iteration and receiving its "
+                "result by the runner",
+                [["lag", max(time.time() - finished_at, 0.0)]])
+        try:
+            depth = result_queue.qsize()
+        except NotImplementedError:
+            # NOTE: qsize() is not implemented on Mac OS X
+            return
+        _add_runner_output(
+            result, "Runner: result queue depth",
+            "Amount of results that are waiting to be received by the runner",
+            [["results", depth]])
+
     def _flush_results(self):
         if self.result_batch:
             sorted_batch = sorted(self.result_batch)
@@ -282,6 +598,9 @@ class ScenarioRunner(plugin.Plugin):
 
         r = ScenarioRunnerResult(result)
         self.result_batch.append(r)
+        self.iterations_count += 1
+        if r["error"]:
+            self.failed_iterations_count += 1
 
         if len(self.result_batch) >= self.batch_size:
             sorted_batch = sorted(self.result_batch,
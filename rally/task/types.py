@@ -18,6 +18,8 @@ import copy
 import operator
 import os.path
 import re
+import threading
+import time
 
 import requests
 
@@ -79,6 +81,97 @@ class ResourceType(object):
         """
 
 
+class ResourceIndex(object):
+    """Resources indexed by id and by name.
+
+    Regular expression lookups are memoized, so resolving the same pattern
+    many times costs a single scan of the resources.
+    """
+
+    def __init__(self, resources):
+        self.resources = list(resources)
+        self.by_id = {}
+        self.by_name = {}
+        for resource in self.resources:
+            self.by_id.setdefault(getattr(resource, "id", None),
+                                  []).append(resource)
+            self.by_name.setdefault(resource.name, []).append(resource)
+        self._matches = {}
+
+    def search(self, pattern):
+        """Return resources whose names match the regular expression."""
+        if pattern not in self._matches:
+            compiled = re.compile(pattern)
+            self._matches[pattern] = [resource for resource in self.resources
+                                      if compiled.search(resource.name)]
+        return self._matches[pattern]
+
+
+class ResourceCatalog(object):
+    """Cache of listed cloud resources shared by validators and types.
+
+    Listings are cached per credential and kind of resources for `ttl`
+    seconds. A lookup that fails against a cached listing is retried once
+    against a fresh one, so resources created after the listing (e.g. by
+    contexts) are still found.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._indexes = {}
+
+    def _get(self, clients, kind, list_resources):
+        key = (clients.credential, kind)
+        with self._lock:
+            created_at, index = self._indexes.get(key, (None, None))
+        if index is not None and time.time() - created_at < self.ttl:
+            return index, False
+
+        index = ResourceIndex(list_resources())
+        with self._lock:
+            self._indexes[key] = (time.time(), index)
+        return index, True
+
+    def lookup(self, clients, kind, list_resources, find):
+        """Find resources in the cached listing.
+
+        :param clients: osclients.Clients instance
+        :param kind: name of the kind of resources, e.g. "flavors"
+        :param list_resources: callable that lists all resources of the kind
+        :param find: callable that takes ResourceIndex and returns the
+                     result of the lookup or raises InvalidScenarioArgument
+        :returns: result of find()
+        """
+        if getattr(clients, "credential", None) is None:
+            return find(ResourceIndex(list_resources()))
+
+        index, fresh = self._get(clients, kind, list_resources)
+        try:
+            return find(index)
+        except exceptions.InvalidScenarioArgument:
+            if fresh:
+                raise
+            self.invalidate(clients, kind)
+            index, fresh = self._get(clients, kind, list_resources)
+            return find(index)
+
+    def invalidate(self, clients=None, kind=None):
+        """Drop cached listings.
+
+        :param clients: drop only listings of credential of these clients
+        :param kind: drop only listings of this kind
+        """
+        with self._lock:
+            for key in list(self._indexes):
+                if ((clients is None or key[0] is clients.credential)
+                        and (kind is None or key[1] == kind)):
+                    del self._indexes[key]
+
+
+RESOURCE_CATALOG = ResourceCatalog()
+
+
 def obj_from_name(resource_config, resources, typename):
     """Return the resource whose name matches the pattern.
 
@@ -89,15 +182,17 @@ def obj_from_name(resource_config, resources, typename):
     not match unambiguously.
 
     :param resource_config: resource to be transformed
-    :param resources: iterable containing all resources
+    :param resources: iterable containing all resources or ResourceIndex
     :param typename: name which describes the type of resource
 
     :returns: resource object uniquely mapped to `name` or `regex`
     """
+    if not isinstance(resources, ResourceIndex):
+        resources = ResourceIndex(resources)
+
     if "name" in resource_config:
         # In a case of pattern string exactly matches resource name
-        matching_exact = [resource for resource in resources
-                          if resource.name == resource_config["name"]]
+        matching_exact = resources.by_name.get(resource_config["name"], [])
         if len(matching_exact) == 1:
             return matching_exact[0]
         elif len(matching_exact) > 1:
@@ -119,18 +214,16 @@ def obj_from_name(resource_config, resources, typename):
             "in '{resource_config}' ".format(typename=typename.title(),
                                              resource_config=resource_config))
 
-    pattern = re.compile(patternstr)
-    matching = [resource for resource in resources
-                if re.search(pattern, resource.name)]
+    matching = resources.search(patternstr)
     if not matching:
         raise exceptions.InvalidScenarioArgument(
             "{typename} with pattern '{pattern}' not found".format(
-                typename=typename.title(), pattern=pattern.pattern))
+                typename=typename.title(), pattern=patternstr))
     elif len(matching) > 1:
         raise exceptions.InvalidScenarioArgument(
             "{typename} with name '{pattern}' is ambiguous, possible matches "
             "by id: {ids}".format(typename=typename.title(),
-                                  pattern=pattern.pattern,
+                                  pattern=patternstr,
                                   ids=", ".join(map(operator.attrgetter("id"),
                                                     matching))))
     return matching[0]
@@ -142,14 +235,16 @@ def obj_from_id(resource_config, resources, typename):
     resource_config has to contain `id`, as it is used to lookup a resource.
 
     :param resource_config: resource to be transformed
-    :param resources: iterable containing all resources
+    :param resources: iterable containing all resources or ResourceIndex
     :param typename: name which describes the type of resource
 
     :returns: resource object mapped to `id`
     """
+    if not isinstance(resources, ResourceIndex):
+        resources = ResourceIndex(resources)
+
     if "id" in resource_config:
-        matching = [resource for resource in resources
-                    if resource.id == resource_config["id"]]
+        matching = resources.by_id.get(resource_config["id"], [])
         if len(matching) == 1:
             return matching[0]
         elif len(matching) > 1:
@@ -212,10 +307,11 @@ class FlavorResourceType(ResourceType):
         """
         resource_id = resource_config.get("id")
         if not resource_id:
-            novaclient = clients.nova()
-            resource_id = _id_from_name(resource_config=resource_config,
-                                        resources=novaclient.flavors.list(),
-                                        typename="flavor")
+            resource_id = RESOURCE_CATALOG.lookup(
+                clients, "flavors", clients.nova().flavors.list,
+                lambda flavors: _id_from_name(resource_config=resource_config,
+                                              resources=flavors,
+                                              typename="flavor"))
         return resource_id
 
 
@@ -236,10 +332,11 @@ class EC2FlavorResourceType(ResourceType):
         resource_name = resource_config.get("name")
         if not resource_name:
             # NOTE(wtakase): gets resource name from OpenStack id
-            novaclient = clients.nova()
-            resource_name = _name_from_id(resource_config=resource_config,
-                                          resources=novaclient.flavors.list(),
-                                          typename="flavor")
+            resource_name = RESOURCE_CATALOG.lookup(
+                clients, "flavors", clients.nova().flavors.list,
+                lambda flavors: _name_from_id(resource_config=resource_config,
+                                              resources=flavors,
+                                              typename="flavor"))
         return resource_name
 
 
@@ -256,11 +353,11 @@ class ImageResourceType(ResourceType):
         """
         resource_id = resource_config.get("id")
         if not resource_id:
-            glanceclient = clients.glance()
-            resource_id = _id_from_name(resource_config=resource_config,
-                                        resources=list(
-                                            glanceclient.images.list()),
-                                        typename="image")
+            resource_id = RESOURCE_CATALOG.lookup(
+                clients, "images", clients.glance().images.list,
+                lambda images: _id_from_name(resource_config=resource_config,
+                                             resources=images,
+                                             typename="image"))
         return resource_id
 
 
@@ -280,19 +377,19 @@ class EC2ImageResourceType(ResourceType):
         """
         if "name" not in resource_config and "regex" not in resource_config:
             # NOTE(wtakase): gets resource name from OpenStack id
-            glanceclient = clients.glance()
-            resource_name = _name_from_id(resource_config=resource_config,
-                                          resources=list(
-                                              glanceclient.images.list()),
-                                          typename="image")
+            resource_name = RESOURCE_CATALOG.lookup(
+                clients, "images", clients.glance().images.list,
+                lambda images: _name_from_id(resource_config=resource_config,
+                                             resources=images,
+                                             typename="image"))
             resource_config["name"] = resource_name
 
         # NOTE(wtakase): gets EC2 resource id from name or regex
-        ec2client = clients.ec2()
-        resource_ec2_id = _id_from_name(resource_config=resource_config,
-                                        resources=list(
-                                            ec2client.get_all_images()),
-                                        typename="ec2_image")
+        resource_ec2_id = RESOURCE_CATALOG.lookup(
+            clients, "ec2_images", clients.ec2().get_all_images,
+            lambda images: _id_from_name(resource_config=resource_config,
+                                         resources=images,
+                                         typename="ec2_image"))
         return resource_ec2_id
 
 
@@ -309,11 +406,11 @@ class VolumeTypeResourceType(ResourceType):
         """
         resource_id = resource_config.get("id")
         if not resource_id:
-            cinderclient = clients.cinder()
-            resource_id = _id_from_name(resource_config=resource_config,
-                                        resources=cinderclient.
-                                        volume_types.list(),
-                                        typename="volume_type")
+            resource_id = RESOURCE_CATALOG.lookup(
+                clients, "volume_types", clients.cinder().volume_types.list,
+                lambda volume_types: _id_from_name(
+                    resource_config=resource_config,
+                    resources=volume_types, typename="volume_type"))
         return resource_id
 
 
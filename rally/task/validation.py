@@ -613,7 +613,9 @@ def volume_type_exists(config, clients, deployment, param_name):
     """
     val = config.get("args", {}).get(param_name)
     if val:
-        volume_types_list = clients.cinder().volume_types.list()
+        volume_types_list = types.RESOURCE_CATALOG.lookup(
+            clients, "volume_types", clients.cinder().volume_types.list,
+            lambda volume_types: volume_types.resources)
         if len(volume_types_list) < 1:
             message = (_("Must have at least one volume type created "
                          "when specifying use of volume types."))
@@ -0,0 +1,76 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# NOTE: Imports CLI, loads plugins lazily and resolves scenarios of a small
+#       nova-only task, like `rally task start` does before running it.
+STARTUP_SCRIPT = """
+import json
+import sys
+import time
+
+started_at = time.time()
+
+from rally.cli import main  # noqa
+from rally import plugins
+from rally.task import scenario
+
+plugins.load(lazy=True)
+for name in ("NovaServers.boot_and_delete_server", "Dummy.dummy"):
+    scenario.Scenario.get(name)
+
+print(json.dumps({"duration": time.time() - started_at,
+                  "modules": sorted(m for m in sys.modules
+                                    if sys.modules[m] is not None)}))
+"""
+
+UNRELATED_CLIENTS = ("boto", "designateclient", "heatclient",
+                     "muranoclient", "saharaclient", "swiftclient",
+                     "zaqarclient")
+
+
+class StartupTestCase(unittest.TestCase):
+
+    def setUp(self):
+        super(StartupTestCase, self).setUp()
+        self.home = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.home)
+
+    def _start(self):
+        env = dict(os.environ, HOME=self.home)
+        output = subprocess.check_output(
+            [sys.executable, "-c", STARTUP_SCRIPT], env=env)
+        return json.loads(output.decode("utf-8").splitlines()[-1])
+
+    def test_startup_imports_only_used_clients(self):
+        # NOTE: The first start builds the plugin index
+        first = self._start()
+        second = self._start()
+
+        sys.stdout.write("\nStartup time: %.3fs (%d modules), "
+                         "with plugin index: %.3fs (%d modules)\n"
+                         % (first["duration"], len(first["modules"]),
+                            second["duration"], len(second["modules"])))
+
+        self.assertLess(len(second["modules"]), len(first["modules"]))
+        self.assertIn("novaclient", second["modules"])
+        imported = set(m.split(".")[0] for m in second["modules"])
+        self.assertEqual(set(), imported.intersection(UNRELATED_CLIENTS))
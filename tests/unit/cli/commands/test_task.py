@@ -18,6 +18,7 @@ import datetime as date
 import os.path
 
 import mock
+import requests
 
 from rally.cli.commands import task
 from rally import consts
@@ -245,6 +246,12 @@ class TaskCommandsTestCase(test.TestCase):
         self.assertRaises(exceptions.InvalidArgumentsException,
                           self.task.abort, None)
 
+    @mock.patch("rally.cli.commands.task.api")
+    def test_cleanup(self, mock_api):
+        test_uuid = "e2e1f6a4-b4f2-4b1d-9d3c-1b6f3b7d5c21"
+        self.task.cleanup(test_uuid)
+        mock_api.Task.cleanup.assert_called_once_with(test_uuid)
+
     def test_status(self):
         test_uuid = "a3e7cefb-bec2-4802-89f6-410cc31f71af"
         value = {"task_id": "task", "status": "status"}
@@ -259,6 +266,95 @@ class TaskCommandsTestCase(test.TestCase):
         self.assertRaises(exceptions.InvalidArgumentsException,
                           self.task.status, None)
 
+    @mock.patch("rally.cli.commands.task.time.sleep")
+    @mock.patch("rally.cli.commands.task.requests.get")
+    @mock.patch("rally.cli.commands.task.api.Task")
+    def test_watch(self, mock_task, mock_requests_get, mock_sleep):
+        task_id = "a3e7cefb-bec2-4802-89f6-410cc31f71af"
+        mock_task.get.side_effect = [{"status": consts.TaskStatus.RUNNING},
+                                     {"status": consts.TaskStatus.FINISHED}]
+        latency = {"mean": 1.5, "max": 2, "p50": 1.5, "p95": 1.95,
+                   "p99": 1.99}
+        mock_requests_get.return_value.json.return_value = {
+            "task": task_id,
+            "workloads": [{"name": "Dummy.dummy", "position": 0,
+                           "iterations": 2, "failures": 0, "error_rate": 0,
+                           "iterations_per_second": 1.0, "in_flight": None,
+                           "duration": latency,
+                           "atomic_actions": {"foo": latency}}]}
+
+        self.assertIsNone(self.task.watch(task_id, url="http://foo:8000/",
+                                          interval=3))
+
+        mock_requests_get.assert_has_calls(
+            [mock.call("http://foo:8000/metrics.json", timeout=3)] * 2,
+            any_order=True)
+        mock_sleep.assert_called_once_with(3)
+
+    @mock.patch("rally.cli.commands.task.requests.get")
+    @mock.patch("rally.cli.commands.task.api.Task")
+    def test_watch_another_task(self, mock_task, mock_requests_get):
+        mock_task.get.return_value = {"status": consts.TaskStatus.RUNNING}
+        mock_requests_get.return_value.json.return_value = {
+            "task": "another_task", "workloads": []}
+
+        self.assertEqual(1, self.task.watch("task_id", url="http://foo"))
+
+    @mock.patch("rally.cli.commands.task.cfg.CONF")
+    @mock.patch("rally.cli.commands.task.requests.get")
+    @mock.patch("rally.cli.commands.task.api.Task")
+    def test_watch_default_url(self, mock_task, mock_requests_get,
+                               mock_conf):
+        mock_task.get.return_value = {"status": consts.TaskStatus.FINISHED}
+        mock_requests_get.side_effect = requests.ConnectionError
+        mock_conf.benchmark.metrics_port = 0
+        self.assertEqual(1, self.task.watch("task_id"))
+        self.assertFalse(mock_requests_get.called)
+
+        mock_conf.benchmark.metrics_host = "127.0.0.1"
+        mock_conf.benchmark.metrics_port = 8000
+        self.assertIsNone(self.task.watch("task_id", once=True))
+        mock_requests_get.assert_called_once_with(
+            "http://127.0.0.1:8000/metrics.json", timeout=2.0)
+
+    @mock.patch("rally.cli.commands.task.profiler")
+    def test_profile(self, mock_profiler):
+        mock_profiler.list_workloads.return_value = [
+            ("Foo.bar", 0, "/foo/0"), ("Foo.bar", 1, "/foo/1"),
+            ("Foo.baz", 0, "/baz/0")]
+        stats = mock.Mock()
+        mock_profiler.load_pstats.side_effect = [stats, None]
+        mock_profiler.load_stacks.return_value = {"a;b": 2}
+
+        self.assertIsNone(self.task.profile("task_uuid", scenario="Foo.bar",
+                                            out_format="pstats",
+                                            out="/tmp/out.prof"))
+
+        mock_profiler.list_workloads.assert_called_once_with("task_uuid")
+        mock_profiler.load_pstats.assert_has_calls(
+            [mock.call("/foo/0"), mock.call("/foo/1")])
+        self.assertFalse(stats.add.called)
+        stats.dump_stats.assert_called_once_with("/tmp/out.prof")
+
+    @mock.patch("rally.cli.commands.task.profiler")
+    def test_profile_stacks(self, mock_profiler):
+        mock_profiler.list_workloads.return_value = [("Foo.bar", 0, "/foo/0"),
+                                                     ("Foo.bar", 1, "/foo/1")]
+        mock_profiler.load_pstats.return_value = None
+        mock_profiler.load_stacks.side_effect = [{"a;b": 2}, {"a;b": 1}]
+
+        with mock.patch("rally.cli.commands.task.open",
+                        mock.mock_open(), create=True) as mock_open:
+            self.task.profile("task_uuid", out_format="stacks",
+                              out="/tmp/stacks")
+        mock_open.return_value.writelines.assert_called_once_with(
+            ["a;b 3\n"])
+
+        mock_profiler.load_stacks.side_effect = [{}, {}]
+        self.assertEqual(1, self.task.profile("task_uuid",
+                                              out_format="stacks"))
+        self.assertEqual(1, self.task.profile("task_uuid", run=2))
+
     @mock.patch("rally.cli.commands.task.api.Task")
     def test_detailed(self, mock_task):
         test_uuid = "c0d874d4-7195-4fd5-8688-abe82bfad36f"
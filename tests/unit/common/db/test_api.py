@@ -15,8 +15,10 @@
 
 """Tests for db.api layer."""
 
+import mock
 from six import moves
 
+from rally.common import costilius
 from rally.common import db
 from rally import consts
 from rally import exceptions
@@ -363,6 +365,72 @@ class ResourceTestCase(test.DBTestCase):
         self.assertRaises(exceptions.ResourceNotFound,
                           db.resource_delete, 123456789)
 
+    def test_update(self):
+        deployment = db.deployment_create({})
+        res = db.resource_create({"deployment_uuid": deployment["uuid"],
+                                  "info": {"a": 1}})
+
+        db.resource_update(res["id"], {"info": {"a": 2}})
+
+        resources = db.resource_get_all(deployment["uuid"])
+        self.assertEqual({"a": 2}, resources[0]["info"])
+
+    def test_update_not_found(self):
+        self.assertRaises(exceptions.ResourceNotFound,
+                          db.resource_update, 123456789, {})
+
+    def test_lease(self):
+        deployment = db.deployment_create({})
+        ids = [db.resource_create({"deployment_uuid": deployment["uuid"],
+                                   "provider_name": "pool:foo",
+                                   "type": "tenant",
+                                   "info": {"leased_by": owner}})["id"]
+               for owner in (None, "a", "b", None, None)]
+        db.resource_create({"deployment_uuid": deployment["uuid"],
+                            "provider_name": "pool:bar", "type": "tenant",
+                            "info": {"leased_by": None}})
+
+        leased = db.resource_lease(deployment["uuid"], "pool:foo", "tenant",
+                                   3, "c", released=["b"])
+
+        self.assertEqual([ids[0], ids[2], ids[3]],
+                         [r["id"] for r in leased])
+        self.assertEqual(["c", "a", "c", "c", None],
+                         [r["info"]["leased_by"] for r in db.resource_get_all(
+                             deployment["uuid"], provider_name="pool:foo")])
+        self.assertEqual([ids[4]], [r["id"] for r in db.resource_lease(
+            deployment["uuid"], "pool:foo", "tenant", 3, "d")])
+        self.assertEqual([], db.resource_lease(
+            deployment["uuid"], "pool:foo", "tenant", 3, "e"))
+
+    def test_lease_skips_concurrently_leased(self):
+        deployment = db.deployment_create({})
+        ids = [db.resource_create({"deployment_uuid": deployment["uuid"],
+                                   "provider_name": "pool:foo",
+                                   "type": "tenant",
+                                   "info": {"leased_by": None}})["id"]
+               for i in range(2)]
+        json_loads = costilius.json_loads
+
+        def concurrent_lease(*args, **kwargs):
+            # NOTE: Another process leases the first resource after it
+            #       was read by this one
+            if not concurrent_lease.called:
+                concurrent_lease.called = True
+                db.resource_update(ids[0], {"info": {"leased_by": "a"}})
+            return json_loads(*args, **kwargs)
+
+        concurrent_lease.called = False
+        with mock.patch("rally.common.db.sqlalchemy.api.costilius."
+                        "json_loads", side_effect=concurrent_lease):
+            leased = db.resource_lease(deployment["uuid"], "pool:foo",
+                                       "tenant", 2, "b")
+
+        self.assertEqual([ids[1]], [r["id"] for r in leased])
+        self.assertEqual(["a", "b"],
+                         [r["info"]["leased_by"] for r in db.resource_get_all(
+                             deployment["uuid"], provider_name="pool:foo")])
+
     def test_get_all(self):
         deployment0 = db.deployment_create({})
         deployment1 = db.deployment_create({})
@@ -478,4 +546,4 @@ class WorkerTestCase(test.DBTestCase):
         self.assertNotEqual(self.worker["updated_at"], worker["updated_at"])
 
     def test_update_worker_not_found(self):
-        self.assertRaises(exceptions.WorkerNotFound, db.update_worker, "fake")
\ No newline at end of file
+        self.assertRaises(exceptions.WorkerNotFound, db.update_worker, "fake")
@@ -0,0 +1,89 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tests for resource pools."""
+
+import datetime
+
+from oslo_utils import timeutils
+
+from rally.common import db
+from rally.common import objects
+from rally import consts
+from tests.unit import test
+
+
+class ResourcePoolTestCase(test.DBTestCase):
+
+    def setUp(self):
+        super(ResourcePoolTestCase, self).setUp()
+        self.deployment_uuid = db.deployment_create({})["uuid"]
+        self.pool = objects.ResourcePool(self.deployment_uuid, "ci")
+
+    def _task(self, status):
+        return db.task_create({"deployment_uuid": self.deployment_uuid,
+                               "status": status})["uuid"]
+
+    def test_add_and_lease(self):
+        running = self._task(consts.TaskStatus.RUNNING)
+        other = self._task(consts.TaskStatus.RUNNING)
+        first = self.pool.add("tenant", {"id": "t1"}, running)
+        second = self.pool.add("tenant", {"id": "t2"}, running)
+        self.pool.add("image", {"id": "i1"}, running)
+
+        self.assertEqual([], self.pool.lease("tenant", 2, other))
+
+        self.pool.release(second, {"id": "t2", "images": ["i2"]})
+
+        self.assertEqual([{"id": second,
+                           "data": {"id": "t2", "images": ["i2"]}}],
+                         self.pool.lease("tenant", 2, other))
+        self.assertEqual([(first, running), (second, other)],
+                         [(r["id"], r["leased_by"])
+                          for r in self.pool.list("tenant")])
+        self.assertEqual(
+            [], objects.ResourcePool(self.deployment_uuid, "foo").list())
+
+    def test_lease_of_finished_task(self):
+        for status in (consts.TaskStatus.FINISHED, consts.TaskStatus.FAILED,
+                       consts.TaskStatus.ABORTED):
+            self.pool.add("tenant", {}, self._task(status))
+        self.pool.add("tenant", {}, "not-existing-task")
+        self.pool.add("tenant", {}, self._task(consts.TaskStatus.RUNNING))
+
+        self.assertEqual(4, len(self.pool.lease("tenant", 10, "task")))
+
+    def test_lease_timeout(self):
+        now = timeutils.utcnow()
+        self.addCleanup(timeutils.clear_time_override)
+        timeutils.set_time_override(now - datetime.timedelta(seconds=600))
+        killed = self._task(consts.TaskStatus.RUNNING)
+        timeutils.set_time_override(now)
+        running = self._task(consts.TaskStatus.RUNNING)
+        self.pool.add("tenant", {"id": "t1"}, killed)
+        self.pool.add("tenant", {"id": "t2"}, running)
+
+        self.assertEqual([], self.pool.lease("tenant", 2, "task"))
+        self.assertEqual([], self.pool.lease("tenant", 2, "task",
+                                             lease_timeout=900))
+        self.assertEqual([{"id": "t1"}],
+                         [r["data"] for r in self.pool.lease(
+                             "tenant", 2, "task", lease_timeout=300)])
+
+    def test_delete(self):
+        resource_id = self.pool.add("tenant", {}, None)
+
+        self.pool.delete(resource_id)
+
+        self.assertEqual([], self.pool.list())
@@ -0,0 +1,118 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+
+import fixtures
+import mock
+
+from rally.common.plugin import index
+from rally.common.plugin import plugin
+from tests.unit import test
+
+
+INDEX = "rally.common.plugin.index"
+
+
+@plugin.configure(name="test_index_base_plugin")
+class IndexBasePlugin(plugin.Plugin):
+    pass
+
+
+@plugin.configure(name="test_index_plugin", namespace="foo")
+class IndexPlugin(IndexBasePlugin):
+    pass
+
+
+class PluginIndexTestCase(test.TestCase):
+
+    def setUp(self):
+        super(PluginIndexTestCase, self).setUp()
+        self.plugins = [
+            {"bases": ["a.Base", "a.Sub"], "name": "p1",
+             "namespace": "default", "module": "m1"},
+            {"bases": ["a.Base"], "name": "p2", "namespace": "foo",
+             "module": "m2"},
+            {"bases": ["a.Base"], "name": "p3", "namespace": "foo",
+             "module": "m2"}]
+        self.index = index.PluginIndex({"m1": 1, "m2": 2}, self.plugins)
+        self.base = type("Base", (object, ), {"__module__": "a"})
+
+    @mock.patch("%s._modules_mtimes" % INDEX)
+    def test_build(self, mock__modules_mtimes):
+        module = IndexPlugin.__module__
+        mock__modules_mtimes.return_value = {module: 42}
+
+        plugin_index = index.PluginIndex.build(
+            ["package"], [IndexPlugin, mock.MagicMock(__module__="other")])
+
+        mock__modules_mtimes.assert_called_once_with(["package"])
+        self.assertEqual({module: 42}, plugin_index.modules)
+        self.assertEqual(
+            [{"bases": sorted(["%s.IndexPlugin" % module,
+                               "%s.IndexBasePlugin" % module,
+                               "rally.common.plugin.plugin.Plugin"]),
+              "name": "test_index_plugin", "namespace": "foo",
+              "module": module}],
+            plugin_index.plugins)
+        self.assertEqual([module],
+                         plugin_index.find_modules(plugin.Plugin))
+
+    def test_save_and_load(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            "dir", "plugins.index")
+        self.index.save(path)
+
+        loaded = index.PluginIndex.load(path)
+        self.assertEqual(self.index.modules, loaded.modules)
+        self.assertEqual(self.index.plugins, loaded.plugins)
+
+    def test_load_broken(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            "plugins.index")
+        self.assertIsNone(index.PluginIndex.load(path))
+        with open(path, "w") as f:
+            f.write("{\"modules\": ")
+        self.assertIsNone(index.PluginIndex.load(path))
+
+    @mock.patch("%s._modules_mtimes" % INDEX)
+    def test_is_valid(self, mock__modules_mtimes):
+        mock__modules_mtimes.return_value = {"m1": 1, "m2": 2}
+        self.assertTrue(self.index.is_valid(["package"]))
+        mock__modules_mtimes.return_value = {"m1": 1, "m2": 3}
+        self.assertFalse(self.index.is_valid(["package"]))
+        mock__modules_mtimes.return_value = {"m1": 1}
+        self.assertFalse(self.index.is_valid(["package"]))
+
+    def test_find_modules(self):
+        self.assertEqual(["m1", "m2"], self.index.find_modules(self.base))
+        self.assertEqual(["m2"], self.index.find_modules(self.base,
+                                                         namespace="foo"))
+        self.assertEqual(["m1"], self.index.find_modules(self.base,
+                                                         name="p1"))
+        self.assertEqual([], self.index.find_modules(self.base, name="p1",
+                                                     namespace="foo"))
+        self.assertEqual([], self.index.find_modules(plugin.Plugin))
+
+    @mock.patch("%s.importutils.import_module" % INDEX)
+    def test_import_modules(self, mock_import_module):
+        self.assertTrue(self.index.import_modules(self.base, name="p2"))
+        mock_import_module.assert_called_once_with("m2")
+        self.assertFalse(self.index.import_modules(self.base, name="p4"))
+
+    def test_activate(self):
+        self.addCleanup(index.activate, None)
+        self.assertIsNone(index.get_active())
+        index.activate(self.index)
+        self.assertEqual(self.index, index.get_active())
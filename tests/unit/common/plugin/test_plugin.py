@@ -13,6 +13,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
+
 from rally.common.plugin import plugin
 from rally import exceptions
 from tests.unit import test
@@ -146,6 +148,47 @@ class PluginTestCase(test.TestCase):
         self.assertRaises(exceptions.PluginWithSuchNameExists,
                           plugin.configure("test_2_plugins_with_same_name"), B)
 
+    def test_get_registered(self):
+
+        @plugin.configure(name="test_registered_plugin", namespace="foo")
+        class RegisteredPlugin(SomePlugin):
+            pass
+
+        for base in (plugin.Plugin, BasePlugin, SomePlugin, RegisteredPlugin):
+            self.assertEqual(RegisteredPlugin,
+                             base.get("test_registered_plugin"))
+            self.assertEqual(RegisteredPlugin,
+                             base.get("test_registered_plugin",
+                                      namespace="foo"))
+        self.assertRaises(exceptions.PluginNotFound, BasePlugin.get,
+                          "test_registered_plugin", namespace="default")
+        self.assertRaises(exceptions.PluginNotFound, DeprecatedPlugin.get,
+                          "test_registered_plugin")
+
+        RegisteredPlugin.unregister()
+        self.assertEqual([], [key for key in plugin._REGISTRY
+                              if key[2] == "test_registered_plugin"])
+
+    @mock.patch("rally.common.plugin.plugin.index.get_active")
+    def test_get_from_index(self, mock_get_active):
+        mock_index = mock_get_active.return_value
+
+        self.assertEqual(SomePlugin, BasePlugin.get("test_some_plugin"))
+        self.assertFalse(mock_index.import_modules.called)
+
+        mock_index.import_modules.return_value = True
+        self.assertRaises(exceptions.PluginNotFound,
+                          BasePlugin.get, "non_existing", namespace="foo")
+        mock_index.import_modules.assert_called_once_with(
+            BasePlugin, name="non_existing", namespace="foo")
+
+    @mock.patch("rally.common.plugin.plugin.index.get_active")
+    def test_get_all_from_index(self, mock_get_active):
+        self.assertEqual(set([SomePlugin, DeprecatedPlugin]),
+                         set(BasePlugin.get_all(namespace="default")))
+        mock_get_active.return_value.import_modules.assert_called_once_with(
+            BasePlugin, namespace="default")
+
     def test_get_name(self):
         self.assertEqual("test_some_plugin", SomePlugin.get_name())
 
@@ -85,3 +85,38 @@ class LogTestCase(test.TestCase):
         self.assertEqual(some_method(2, 2, z=3), 7)
         mock_log.assert_called_once_with(
             "Deprecated test (args `z' deprecated in Rally v0.0.1)")
+
+
+class AsyncLoggingTestCase(test.TestCase):
+
+    def test_async_logging(self):
+        logger = logging.log.getLogger("rally.test_async_logging")
+        logger.setLevel(logging.INFO)
+        handler = logging.CatcherHandler()
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+
+        args = {"x": 1}
+        with logging.AsyncLogging(logger) as async_logging:
+            self.assertEqual([async_logging.handler], logger.handlers)
+            logger.info("x = %(x)s", args)
+            args["x"] = 2
+
+        self.assertEqual([handler], logger.handlers)
+        self.assertEqual(["x = 1"], [r.msg for r in handler.buffer])
+        self.assertIsNone(handler.buffer[0].args)
+
+    def test_queue_handler_respects_levels(self):
+        info_handler = logging.CatcherHandler()
+        info_handler.setLevel(logging.INFO)
+        debug_handler = logging.CatcherHandler()
+        queue_handler = logging.QueueHandler([info_handler, debug_handler])
+
+        for level in (logging.DEBUG, logging.INFO):
+            queue_handler.handle(logging.log.LogRecord(
+                "rally", level, __file__, 1, "msg %s", (level,), None))
+        queue_handler.close()
+
+        self.assertEqual(["msg %s" % logging.INFO],
+                         [r.msg for r in info_handler.buffer])
+        self.assertEqual(2, len(debug_handler.buffer))
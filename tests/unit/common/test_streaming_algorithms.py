@@ -246,6 +246,185 @@ class PercentileComputationTestCase(test.TestCase):
         self.assertIsNone(comp.result())
 
 
+@ddt.ddt
+class QuantileComputationTestCase(test.TestCase):
+
+    @ddt.data(0.01, 0.25, 0.5, 0.9, 0.95, 0.99, 0.999)
+    def test_add_and_result(self, percent):
+        values = [(i % 997) * 0.37 + (i % 13) for i in range(10000)]
+        comp = algo.QuantileComputation(percent, accuracy=0.01)
+        for value in values:
+            comp.add(value)
+
+        expected = sorted(values)[int(percent * (len(values) - 1))]
+        self.assertLessEqual(abs(comp.result() - expected), expected * 0.01)
+        self.assertEqual(10000, comp.count)
+
+    def test_result_bounds(self):
+        comp = algo.QuantileComputation(0.5)
+        self.assertIsNone(comp.result())
+
+        comp.add(0)
+        comp.add(0)
+        comp.add(5)
+        self.assertEqual(0, comp.result())
+        comp.add(5)
+        comp.add(5)
+        self.assertEqual(5, comp.result())
+
+        comp = algo.QuantileComputation(0.5)
+        comp.add(3.14)
+        self.assertEqual(3.14, comp.result())
+
+    def test_bounded_memory(self):
+        comp = algo.QuantileComputation(0.99, max_buckets=10)
+        for i in range(1, 10000):
+            comp.add(i * 0.5)
+
+        self.assertEqual(10, len(comp._buckets))
+        self.assertLessEqual(abs(comp.result() - 4950), 4950 * 0.01)
+
+    def test_merge(self):
+        values = [(i * 7919) % 1000 / 10.0 for i in range(1000)]
+        single = algo.QuantileComputation(0.95)
+        comps = [algo.QuantileComputation(0.95) for i in range(4)]
+        for i, value in enumerate(values):
+            single.add(value)
+            comps[i % 4].add(value)
+        for comp in comps[1:]:
+            comps[0].merge(comp)
+
+        self.assertEqual(single.result(), comps[0].result())
+        self.assertEqual(single.count, comps[0].count)
+
+    def test_merge_raises(self):
+        self.assertRaises(ValueError, algo.QuantileComputation(0.5).merge,
+                          algo.QuantileComputation(0.5, accuracy=0.05))
+
+    @ddt.data({"percent": 0}, {"percent": 1},
+              {"percent": 0.5, "accuracy": 0})
+    def test_init_raises(self, kwargs):
+        self.assertRaises(ValueError, algo.QuantileComputation, **kwargs)
+
+    def test_add_raises(self):
+        comp = algo.QuantileComputation(0.5)
+        self.assertRaises(TypeError, comp.add, "foo")
+
+    @ddt.data((100, 0.5, 200), (3.5, 1, 3), (1, 0.3, 4), (0.4, 0.1, 5))
+    @ddt.unpack
+    def test_add_range(self, first, step, count):
+        single = algo.QuantileComputation(0.5)
+        comp = algo.QuantileComputation(0.5)
+        for i in range(count):
+            single.add(first - i * step)
+        comp.add_range(first, step, count)
+
+        self.assertEqual(single._buckets, comp._buckets)
+        self.assertEqual(single._zeros, comp._zeros)
+        self.assertEqual(single.count, comp.count)
+        for percent in (0, 0.1, 0.5, 0.99, 1):
+            self.assertAlmostEqual(single.quantile(percent),
+                                   comp.quantile(percent))
+
+
+@ddt.ddt
+class CorrectedDurationComputationTestCase(test.TestCase):
+
+    @ddt.data(
+        ({"duration": 3, "timestamp": 12, "scheduled_at": 10}, 1, [5]),
+        ({"duration": 3, "timestamp": 9, "scheduled_at": 10}, None, [3]),
+        ({"duration": 3.5, "timestamp": 12}, 1, [3.5, 2.5, 1.5]),
+        ({"duration": 0.5, "timestamp": 12}, 1, [0.5]),
+        ({"duration": 3.5, "timestamp": 12}, None, [3.5])
+    )
+    @ddt.unpack
+    def test_add(self, iteration, interval, expected):
+        comp = algo.CorrectedDurationComputation(interval)
+        comp.add(iteration)
+
+        self.assertEqual(len(expected), comp.corrected.count)
+        self.assertEqual(sum(expected), comp.corrected_sum)
+        self.assertEqual(max(expected), comp.corrected.quantile(1))
+        self.assertEqual(min(expected), comp.corrected.quantile(0))
+        self.assertEqual(1, comp.raw.count)
+        self.assertEqual(iteration["duration"], comp.raw_sum)
+
+    def test_add_median_interval(self):
+        comp = algo.CorrectedDurationComputation()
+        for duration in (1, 1, 1, 10, 4):
+            comp.add({"duration": duration, "timestamp": 0})
+
+        self.assertEqual(1, comp.interval())
+        # NOTE: 10 is back-filled with 9..1 and 4 with 3..1
+        self.assertEqual(17, comp.corrected.count)
+        self.assertEqual(68, comp.corrected_sum)
+
+    def test_add_limit(self):
+        comp = algo.CorrectedDurationComputation(0.0001)
+        comp.add({"duration": 100, "timestamp": 1})
+        self.assertEqual(algo.MAX_BACKFILLED_VALUES + 1,
+                         comp.corrected.count)
+
+    def test_merge(self):
+        single = algo.CorrectedDurationComputation(1)
+        first = algo.CorrectedDurationComputation(1)
+        second = algo.CorrectedDurationComputation(1)
+        for i, duration in enumerate((3, 1, 4, 1, 5)):
+            single.add({"duration": duration, "timestamp": i})
+            (first if i % 2 else second).add({"duration": duration,
+                                              "timestamp": i})
+        first.merge(second)
+
+        for attr in ("raw", "corrected"):
+            self.assertEqual(getattr(single, attr)._buckets,
+                             getattr(first, attr)._buckets)
+        self.assertEqual(single.corrected_sum, first.corrected_sum)
+        self.assertEqual(single.raw_sum, first.raw_sum)
+
+
+class SampleComputationTestCase(test.TestCase):
+
+    def test_add_and_result(self):
+        comp = algo.SampleComputation(10, seed=1)
+        for i in range(5):
+            comp.add(i)
+        self.assertEqual([0, 1, 2, 3, 4], comp.result())
+
+        for i in range(5, 10000):
+            comp.add(i)
+        self.assertEqual(10, len(comp.result()))
+        self.assertEqual(10000, comp.count)
+        self.assertTrue(all(0 <= v < 10000 for v in comp.result()))
+        self.assertGreater(max(comp.result()), 1000)
+
+    def test_merge(self):
+        small = algo.SampleComputation(100, seed=1)
+        large = algo.SampleComputation(100, seed=1)
+        for i in range(100):
+            small.add(-1)
+        for i in range(900):
+            large.add(1)
+
+        small.merge(large)
+
+        self.assertEqual(1000, small.count)
+        self.assertEqual(100, len(small.result()))
+        self.assertTrue(5 < small.result().count(-1) < 20)
+
+    def test_merge_not_full(self):
+        comp = algo.SampleComputation(10)
+        other = algo.SampleComputation(10)
+        comp.add(1)
+        other.add(2)
+
+        comp.merge(other)
+
+        self.assertEqual([1, 2], sorted(comp.result()))
+
+    def test_add_raises(self):
+        self.assertRaises(TypeError, algo.SampleComputation(1).add, "foo")
+
+
 class IncrementComputationTestCase(test.TestCase):
 
     def test_add_and_result(self):
@@ -0,0 +1,126 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import threading
+
+import ddt
+import mock
+import requests
+
+from rally.common import tracing
+from tests.unit import test
+
+
+@ddt.ddt
+class TracingTestCase(test.TestCase):
+
+    def setUp(self):
+        super(TracingTestCase, self).setUp()
+        self.addCleanup(tracing.stop)
+
+    @ddt.data(
+        ("http://nova:8774/v2/6f70656e737461636b20342065766572/servers/42"
+         "?all_tenants=1", "nova:8774/v2/{id}/servers/{id}"),
+        ("https://neutron:9696/v2.0/ports/"
+         "0e2e39a8-8a4c-4ea7-8d5e-2d2a7fdb0b9a.json",
+         "neutron:9696/v2.0/ports/0e2e39a8-8a4c-4ea7-8d5e-2d2a7fdb0b9a.json"),
+        ("http://glance:9292/v2/images/0e2e39a8-8a4c-4ea7-8d5e-2d2a7fdb0b9a",
+         "glance:9292/v2/images/{id}"),
+        ("http://keystone:5000/v3/auth/tokens", "keystone:5000/v3/auth/tokens")
+    )
+    @ddt.unpack
+    def test_endpoint_template(self, url, expected):
+        self.assertEqual(expected, tracing.endpoint_template(url))
+
+    def test_record(self):
+        tracing.record("GET", "http://a/b", 200, 10, 0.1, 0.2)
+        self.assertEqual([], tracing.stop())
+
+        tracing.start()
+        tracing.push_action("foo")
+        tracing.record("GET", "http://a/b/1", 200, 10, 0.1, 0.2)
+        tracing.pop_action()
+        tracing.record("POST", "http://a/b", None, 0, None, 0.3)
+
+        self.assertEqual(
+            [{"action": "foo", "method": "GET", "endpoint": "a/b/{id}",
+              "status": 200, "bytes": 10, "ttfb": 0.1, "duration": 0.2},
+             {"action": None, "method": "POST", "endpoint": "a/b",
+              "status": None, "bytes": 0, "ttfb": None, "duration": 0.3}],
+            tracing.stop())
+        self.assertEqual([], tracing.stop())
+
+    def test_record_per_thread(self):
+        tracing.start()
+        thread = threading.Thread(
+            target=tracing.record,
+            args=("GET", "http://a/b", 200, 10, 0.1, 0.2))
+        thread.start()
+        thread.join()
+
+        self.assertEqual([], tracing.stop())
+
+
+class TracingSessionTestCase(test.TestCase):
+
+    def setUp(self):
+        super(TracingSessionTestCase, self).setUp()
+        self.addCleanup(tracing.stop)
+        tracing.start()
+        tracing.push_action("nova.list_servers")
+
+    @mock.patch("requests.Session.send")
+    def test_send(self, mock_session_send):
+        resp = mock_session_send.return_value
+        resp.status_code = 200
+        resp.content = b"{}"
+        resp.elapsed = datetime.timedelta(seconds=0.5)
+
+        session = tracing.TracingSession()
+        request = requests.Request("GET", "http://nova/servers").prepare()
+        self.assertEqual(resp, session.send(request, timeout=1))
+
+        mock_session_send.assert_called_once_with(request, timeout=1)
+        [traced] = tracing.stop()
+        self.assertEqual({"action": "nova.list_servers", "method": "GET",
+                          "endpoint": "nova/servers", "status": 200,
+                          "bytes": 2, "ttfb": 0.5}, dict(
+                              (k, v) for k, v in traced.items()
+                              if k != "duration"))
+        self.assertGreaterEqual(traced["duration"], 0)
+
+    @mock.patch("requests.Session.send")
+    def test_send_stream(self, mock_session_send):
+        resp = mock_session_send.return_value
+        resp.headers = {"Content-Length": "42"}
+        resp.elapsed = datetime.timedelta(seconds=0.5)
+
+        session = tracing.TracingSession()
+        request = requests.Request("GET", "http://swift/obj").prepare()
+        session.send(request, stream=True)
+
+        self.assertEqual(42, tracing.stop()[0]["bytes"])
+
+    @mock.patch("requests.Session.send")
+    def test_send_fails(self, mock_session_send):
+        mock_session_send.side_effect = requests.ConnectionError
+
+        session = tracing.TracingSession()
+        request = requests.Request("GET", "http://nova/servers").prepare()
+        self.assertRaises(requests.ConnectionError, session.send, request)
+
+        [traced] = tracing.stop()
+        self.assertIsNone(traced["status"])
+        self.assertIsNone(traced["ttfb"])
@@ -170,6 +170,28 @@ class EditDistanceTestCase(test.TestCase):
         self.assertEqual(2, dist)
 
 
+class RetryTestCase(test.TestCase):
+
+    def test_retry(self):
+        func = mock.Mock(side_effect=[ValueError, ValueError, "result"])
+
+        self.assertEqual("result", utils.retry(3, func, "foo", bar="spam"))
+        self.assertEqual([mock.call("foo", bar="spam")] * 3,
+                         func.call_args_list)
+
+    def test_retry_failure(self):
+        func = mock.Mock(side_effect=ValueError)
+
+        self.assertRaises(ValueError, utils.retry, 3, func)
+        self.assertEqual(3, func.call_count)
+
+    def test_retry_not_implemented(self):
+        func = mock.Mock(side_effect=NotImplementedError)
+
+        self.assertRaises(NotImplementedError, utils.retry, 3, func)
+        func.assert_called_once_with()
+
+
 class TenantIteratorTestCase(test.TestCase):
 
     def test_iterate_per_tenant(self):
@@ -216,6 +238,45 @@ class RAMIntTestCase(test.TestCase):
         self.assertEqual(0, int(ri))
 
 
+class RateLimiterTestCase(test.TestCase):
+
+    @mock.patch("rally.common.utils.time")
+    def test_acquire(self, mock_time):
+        mock_time.time.return_value = 100
+        limiter = utils.RateLimiter(10, burst=2)
+
+        limiter.acquire()
+        limiter.acquire()
+        self.assertFalse(mock_time.sleep.called)
+        limiter.acquire()
+        limiter.acquire()
+        self.assertEqual([mock.call(0.1), mock.call(0.2)],
+                         mock_time.sleep.call_args_list)
+
+        mock_time.time.return_value = 110
+        mock_time.sleep.reset_mock()
+        limiter.acquire()
+        self.assertFalse(mock_time.sleep.called)
+
+    @mock.patch("rally.common.utils.time")
+    def test_decrease_and_increase(self, mock_time):
+        mock_time.time.return_value = 100
+        limiter = utils.RateLimiter(10, min_rate=3)
+
+        limiter.decrease()
+        self.assertEqual(5, limiter.rate)
+        limiter.decrease()
+        self.assertEqual(3, limiter.rate)
+
+        limiter.acquire()
+        limiter.acquire()
+        mock_time.sleep.assert_called_once_with(1 / 3.0)
+
+        for i in range(100):
+            limiter.increase()
+        self.assertEqual(10, limiter.rate)
+
+
 @ddt.ddt
 class RandomNameTestCase(test.TestCase):
 
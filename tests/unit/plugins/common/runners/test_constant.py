@@ -84,7 +84,8 @@ class ConstantScenarioRunnerTestCase(test.TestCase):
             scenario_context = mock_runner._get_scenario_context(context)
             call = mock.call(args=(mock_queue,
                                    (i, "Dummy", "dummy",
-                                    scenario_context, ())),
+                                    scenario_context, ()),
+                                   mock_time.time.return_value),
                              target=mock_runner._worker_thread)
             self.assertIn(call, mock_thread.mock_calls)
 
@@ -96,10 +97,9 @@ class ConstantScenarioRunnerTestCase(test.TestCase):
 
         runner._worker_thread(mock_queue, args)
 
-        self.assertEqual(1, mock_queue.put.call_count)
-
-        expected_calls = [mock.call(("some_args",))]
-        self.assertEqual(expected_calls, mock__run_scenario_once.mock_calls)
+        mock_queue.put.assert_called_once_with(
+            mock__run_scenario_once.return_value)
+        mock__run_scenario_once.assert_called_once_with(("some_args",))
 
     def test__run_scenario(self):
         runner_obj = constant.ConstantScenarioRunner(self.task, self.config)
@@ -118,10 +118,17 @@ class RPSScenarioRunnerTestCase(test.TestCase):
             scenario_context = mock_runner._get_scenario_context(context)
             call = mock.call(args=(mock_queue,
                                    (i, "Dummy", "dummy",
-                                    scenario_context, ())),
+                                    scenario_context, ()), mock.ANY,
+                                   True),
                              target=mock_runner._worker_thread)
             self.assertIn(call, mock_thread.mock_calls)
 
+        scheduled_at = [c[1]["args"][2] for c in mock_thread.call_args_list
+                        if c[1]["target"] == mock_runner._worker_thread]
+        self.assertEqual(
+            [0.1] * (times - 1),
+            [round(b - a, 3) for a, b in zip(scheduled_at, scheduled_at[1:])])
+
     @mock.patch(RUNNERS + "rps.runner._run_scenario_once")
     def test__worker_thread(self, mock__run_scenario_once):
         mock_queue = mock.MagicMock()
@@ -130,10 +137,9 @@ class RPSScenarioRunnerTestCase(test.TestCase):
 
         runner._worker_thread(mock_queue, args)
 
-        self.assertEqual(1, mock_queue.put.call_count)
-
-        expected_calls = [mock.call(("some_args",))]
-        self.assertEqual(expected_calls, mock__run_scenario_once.mock_calls)
+        mock_queue.put.assert_called_once_with(
+            mock__run_scenario_once.return_value)
+        mock__run_scenario_once.assert_called_once_with(("some_args",))
 
     @mock.patch(RUNNERS + "rps.time.sleep")
     def test__run_scenario(self, mock_sleep):
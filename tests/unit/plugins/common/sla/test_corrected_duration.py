@@ -0,0 +1,97 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+
+import ddt
+import jsonschema
+
+from rally.plugins.common.sla import corrected_duration
+from tests.unit import test
+
+
+@ddt.ddt
+class MaxCorrectedDurationTestCase(test.TestCase):
+
+    @ddt.data({"max": 0}, {"percentile": 95}, {"max": 1, "percentile": 100},
+              {"max": 1, "foo": 1})
+    def test_config_schema(self, config):
+        self.assertRaises(jsonschema.ValidationError,
+                          corrected_duration.MaxCorrectedDuration.validate,
+                          {"max_corrected_duration": config})
+
+    def test_add_iteration_intended_start(self):
+        sla = corrected_duration.MaxCorrectedDuration(
+            {"max": 2.5, "percentile": 75})
+
+        self.assertTrue(sla.add_iteration(
+            {"duration": 1, "timestamp": 10, "scheduled_at": 10}))
+        self.assertTrue(sla.add_iteration(
+            {"duration": 1, "timestamp": 12, "scheduled_at": 11}))
+        self.assertTrue(sla.add_iteration(
+            {"duration": 10, "timestamp": 13, "error": ["error"]}))
+        self.assertTrue(sla.add_iteration(
+            {"duration": 1, "timestamp": 15, "scheduled_at": 12}))
+        self.assertFalse(sla.add_iteration(
+            {"duration": 1, "timestamp": 16, "scheduled_at": 13}))
+        self.assertEqual("75% of corrected durations 4.00s <= 2.50s - "
+                         "Failed", sla.details())
+
+    def test_add_iteration_backfill(self):
+        sla = corrected_duration.MaxCorrectedDuration(
+            {"max": 2.5, "percentile": 75, "expected_interval": 1})
+
+        for i in range(3):
+            self.assertTrue(sla.add_iteration(
+                {"duration": 1, "timestamp": i}))
+        # NOTE: Back-filled with 4, 3, 2 and 1
+        self.assertFalse(sla.add_iteration({"duration": 5, "timestamp": 3}))
+        self.assertEqual(8, sla.durations.corrected.count)
+        self.assertEqual(18, sla.durations.corrected_sum)
+
+    def test_add_iteration_median_interval(self):
+        sla = corrected_duration.MaxCorrectedDuration({"max": 10})
+
+        sla.add_iteration({"duration": 2, "timestamp": 1})
+        sla.add_iteration({"duration": 7, "timestamp": 2})
+        sla.add_iteration({"duration": 1, "timestamp": 3})
+
+        # NOTE: 7 is back-filled with 5 and 3, interval for 1 is the
+        #       median of 2 and 7
+        self.assertEqual(5, sla.durations.corrected.count)
+        self.assertEqual(18, sla.durations.corrected_sum)
+
+    def test_result_no_iterations(self):
+        sla = corrected_duration.MaxCorrectedDuration({"max": 1})
+
+        self.assertTrue(sla.result()["success"])
+        self.assertEqual("95% of corrected durations <= 1.00s - Passed",
+                         sla.details())
+
+    def test_merge(self):
+        iterations = [{"duration": d, "timestamp": 0, "scheduled_at": 0}
+                      for d in (3, 1, 4, 1, 5, 9, 2, 6)]
+        single = corrected_duration.MaxCorrectedDuration({"max": 5})
+        first = corrected_duration.MaxCorrectedDuration({"max": 5})
+        second = corrected_duration.MaxCorrectedDuration({"max": 5})
+        for itr in iterations:
+            single.add_iteration(itr)
+        for itr in iterations[:3]:
+            first.add_iteration(itr)
+        for itr in iterations[3:]:
+            second.add_iteration(itr)
+
+        self.assertEqual(single.success, first.merge(second))
+        self.assertEqual(single.durations.corrected.count,
+                         first.durations.corrected.count)
+        self.assertEqual(single.value, first.value)
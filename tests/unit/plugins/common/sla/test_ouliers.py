@@ -42,7 +42,8 @@ class OutliersTestCase(test.TestCase):
         sla1 = outliers.Outliers({"max": 1})
         sla2 = outliers.Outliers({"max": 2})
         iteration_durations = [3.1, 4.2, 3.6, 4.5, 2.8, 3.3, 4.1, 3.8, 4.3,
-                               2.9, 10.2, 11.2, 3.4]  # outliers: 10.2, 11.2
+                               2.9, 3.4] * 3 + [10.2, 11.2]
+        # NOTE: outliers: 10.2, 11.2
         for sla in [sla1, sla2]:
             for d in iteration_durations:
                 sla.add_iteration({"duration": d})
@@ -54,10 +55,10 @@ class OutliersTestCase(test.TestCase):
     def test_result_large_sigmas(self):
         sla = outliers.Outliers({"max": 1, "sigmas": 5})
         iteration_durations = [3.1, 4.2, 3.6, 4.5, 2.8, 3.3, 4.1, 3.8, 4.3,
-                               2.9, 10.2, 11.2, 3.4]
+                               2.9, 3.4] * 3 + [10.2, 11.2]
         for d in iteration_durations:
             sla.add_iteration({"duration": d})
-        # NOTE(msdubov): No outliers registered since sigmas = 5 (not 2)
+        # NOTE(msdubov): No outliers registered since sigmas = 5 (not 3)
         self.assertTrue(sla.result()["success"])
         self.assertEqual("Passed", sla.status())
 
@@ -74,7 +75,7 @@ class OutliersTestCase(test.TestCase):
         self.assertTrue(sla.result()["success"])
 
     def test_result_few_iterations_small_min_iterations(self):
-        sla = outliers.Outliers({"max": 0, "min_iterations": 5})
+        sla = outliers.Outliers({"max": 0, "min_iterations": 5, "sigmas": 2})
         iteration_durations = [3.1, 4.2, 4.7, 3.6, 15.14, 2.8]
         for d in iteration_durations:
             sla.add_iteration({"duration": d})
@@ -92,6 +93,16 @@ class OutliersTestCase(test.TestCase):
         self.assertFalse(sla.add_iteration({"duration": 11.2}))
         self.assertFalse(sla.add_iteration({"duration": 3.4}))
 
+    def test_result_is_exact(self):
+        sla = outliers.Outliers({"max": 0})
+        # NOTE: Approximation counts the first iterations as outliers,
+        #       since the threshold is computed by few close durations
+        for d in [3.0, 3.0, 3.1, 3.0, 10.0] + [3.0, 10.0] * 10:
+            sla.add_iteration({"duration": d})
+        self.assertFalse(sla.success)
+        self.assertTrue(sla.result()["success"])
+        self.assertEqual(0, sla.outliers)
+
     @ddt.data([[3.1, 4.2, 3.6, 4.5, 2.8, 3.3, 4.1, 3.8, 4.3, 2.9, 10.2],
                [3.1, 4.2, 3.6, 4.5, 2.8, 3.3, 20.1, 3.8, 4.3, 2.9, 24.2],
                [3.1, 4.2, 3.6, 4.5, 2.8, 3.3, 4.1, 30.8, 4.3, 49.9, 69.2]])
@@ -114,16 +125,7 @@ class OutliersTestCase(test.TestCase):
         for sla in slas[1:]:
             merged_sla.merge(sla)
 
-        self.assertEqual(single_sla.success, merged_sla.success)
+        self.assertEqual(single_sla.result(), merged_sla.result())
         self.assertEqual(single_sla.iterations, merged_sla.iterations)
-
-        # self.assertEqual(single_sla.threshold, merged_sla.threshold)
-
-        # NOTE(ikhudoshyn): We are unable to implement
-        # rally.plugins.common.sla.outliers.Outliers.merge(..) correctly
-        # (see my comment for the method)
-        # The assert above will fail with the majority of data
-        # The line below passes with this particular data
-        # but may fail as well on another data
-
+        self.assertAlmostEqual(single_sla.threshold, merged_sla.threshold)
         self.assertEqual(single_sla.outliers, merged_sla.outliers)
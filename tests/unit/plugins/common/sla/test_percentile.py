@@ -0,0 +1,123 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+
+import ddt
+import jsonschema
+
+from rally.plugins.common.sla import percentile
+from tests.unit import test
+
+
+def _span(name, duration, failed=False):
+    return {"name": name, "parent": None, "offset": 0, "duration": duration,
+            "failed": failed}
+
+
+@ddt.ddt
+class MaxDurationPercentilesTestCase(test.TestCase):
+
+    @ddt.data({}, {"total": {}}, {"total": {"p100": 1}},
+              {"total": {"p0": 1}}, {"total": {"p95": 0}},
+              {"total": {"95": 1}}, {"min_iterations": 0},
+              {"min_iterations": 2.5, "total": {"p95": 1}})
+    def test_config_schema_invalid(self, config):
+        self.assertRaises(jsonschema.ValidationError,
+                          percentile.MaxDurationPercentiles.validate,
+                          {"max_duration_percentiles": config})
+
+    def test_config_schema(self):
+        percentile.MaxDurationPercentiles.validate(
+            {"max_duration_percentiles": {
+                "total": {"p95": 60},
+                "nova.boot_server": {"p50": 10, "p99.9": 30}}})
+        percentile.MaxDurationPercentiles.validate(
+            {"max_duration_percentiles": {
+                "total": {"p95": 60}, "min_iterations": 10}})
+
+    def test_add_iteration(self):
+        sla = percentile.MaxDurationPercentiles({"total": {"p50": 2}})
+
+        self.assertTrue(sla.add_iteration({"duration": 1,
+                                           "atomic_actions": {}}))
+        self.assertTrue(sla.add_iteration({"duration": 3,
+                                           "atomic_actions": {}}))
+        self.assertTrue(sla.add_iteration({"duration": 9, "error": ["e"],
+                                           "atomic_actions": {}}))
+        self.assertFalse(sla.add_iteration({"duration": 4,
+                                            "atomic_actions": {}}))
+        self.assertTrue(sla.add_iteration({"duration": 1,
+                                           "atomic_actions": {}}))
+        self.assertEqual("50%ile of total 1.00s <= 2.00s - Passed",
+                         sla.details())
+
+    def test_add_iteration_min_iterations(self):
+        sla = percentile.MaxDurationPercentiles(
+            {"total": {"p90": 2}, "foo": {"p50": 1}, "min_iterations": 5})
+        self.assertEqual(5, sla.min_iterations)
+        self.assertEqual(["foo", "total"],
+                         [action for action, p in sla.criteria])
+
+        for i in range(4):
+            self.assertTrue(sla.add_iteration(
+                {"duration": 9 if i == 0 else 1, "atomic_actions": {}}))
+        self.assertFalse(sla.add_iteration({"duration": 1,
+                                            "atomic_actions": {}}))
+        for i in range(5):
+            sla.add_iteration({"duration": 1, "atomic_actions": {}})
+        self.assertTrue(sla.success)
+
+    def test_add_iteration_atomic_actions(self):
+        sla = percentile.MaxDurationPercentiles(
+            {"foo": {"p50": 2, "p90": 5}})
+
+        sla.add_iteration({"duration": 10,
+                           "atomic_actions": {"foo": 1, "bar": 9}})
+        sla.add_iteration({"duration": 10, "atomic_actions": {"foo": None}})
+        self.assertTrue(sla.success)
+        self.assertEqual(1, sla.sketches["foo"].count)
+
+        self.assertFalse(sla.add_iteration(
+            {"duration": 10, "error": ["e"], "atomic_actions": {"foo": 5},
+             "atomic_actions_trace": [_span("foo", 3), _span("foo", 4),
+                                      _span("foo", 9, failed=True)]}))
+        self.assertEqual(3, sla.sketches["foo"].count)
+        self.assertEqual([[2, 2], [5, 0]], list(sla.criteria.values()))
+
+    def test_details_no_iterations(self):
+        sla = percentile.MaxDurationPercentiles(
+            {"total": {"p95": 1}, "foo": {"p99": 2}})
+
+        self.assertTrue(sla.result()["success"])
+        self.assertEqual("99%ile of foo n/a <= 2.00s, "
+                         "95%ile of total n/a <= 1.00s - Passed",
+                         sla.details())
+
+    def test_merge(self):
+        iterations = [{"duration": d, "atomic_actions": {"foo": d / 2.0}}
+                      for d in (3, 1, 4, 1, 5, 9, 2, 6, 5, 3)]
+        config = {"total": {"p80": 5.5}, "foo": {"p50": 1.6}}
+        single = percentile.MaxDurationPercentiles(config)
+        first = percentile.MaxDurationPercentiles(config)
+        second = percentile.MaxDurationPercentiles(config)
+        for itr in iterations:
+            single.add_iteration(itr)
+        for itr in iterations[:4]:
+            first.add_iteration(itr)
+        for itr in iterations[4:]:
+            second.add_iteration(itr)
+
+        self.assertEqual(single.success, first.merge(second))
+        self.assertEqual(single.criteria, first.criteria)
+        self.assertEqual(single.details(), first.details())
@@ -0,0 +1,132 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import os
+
+import ddt
+import fixtures
+import jsonschema
+import mock
+
+from rally import exceptions
+from rally.plugins.common.sla import regression
+from tests.unit import test
+
+
+def _iterations(scale, count=100):
+    return [{"duration": scale * (1 + i % 10 / 10.0), "error": [],
+             "atomic_actions": {"foo": scale * (0.5 + i % 5 / 10.0)}}
+            for i in range(count)]
+
+
+@ddt.ddt
+class MaxRegressionTestCase(test.TestCase):
+
+    def setUp(self):
+        super(MaxRegressionTestCase, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 "results.json")
+        self._save_baseline([("Dummy.dummy", 0, _iterations(1.0))])
+
+    def _save_baseline(self, workloads):
+        with open(self.path, "w") as f:
+            json.dump([{"key": {"name": name, "pos": pos, "kw": {}},
+                        "result": raw, "sla": [], "load_duration": 1,
+                        "full_duration": 2}
+                       for name, pos, raw in workloads], f)
+
+    def _check(self, iterations, **config):
+        config.setdefault("baseline", self.path)
+        regression.MaxRegression.validate({"max_regression": config})
+        sla = regression.MaxRegression(config)
+        for iteration in iterations:
+            self.assertTrue(sla.add_iteration(iteration))
+        return sla.result()
+
+    @ddt.data({}, {"baseline": "uuid", "method": "foo"},
+              {"baseline": "uuid", "confidence": 1},
+              {"baseline": "uuid", "actions": []},
+              {"baseline": "uuid", "foo": 1})
+    def test_config_schema_invalid(self, config):
+        self.assertRaises(jsonschema.ValidationError,
+                          regression.MaxRegression.validate,
+                          {"max_regression": config})
+
+    @ddt.data(regression.BOOTSTRAP, regression.MANN_WHITNEY)
+    def test_result(self, method):
+        result = self._check(_iterations(1.05), method=method)
+        self.assertTrue(result["success"], result["detail"])
+
+        result = self._check(_iterations(1.3), method=method)
+        self.assertFalse(result["success"])
+        self.assertIn("foo ", result["detail"])
+        self.assertIn("total ", result["detail"])
+
+        result = self._check(_iterations(1.3), method=method,
+                             max_increase=50)
+        self.assertTrue(result["success"], result["detail"])
+
+    def test_result_detail(self):
+        result = self._check(_iterations(1.3), actions=["total"])
+
+        self.assertTrue(result["detail"].startswith(
+            "total 95%ile +30.0% (95% CI +"))
+        self.assertTrue(result["detail"].endswith("%) > +10% - Failed"))
+
+    def test_result_not_enough_durations(self):
+        result = self._check(_iterations(2.0, count=5))
+
+        self.assertTrue(result["success"])
+        self.assertEqual("Not enough durations to compare with baseline - "
+                         "Passed", result["detail"])
+
+    def test_result_baseline_not_found(self):
+        result = self._check(_iterations(1.0), baseline=self.path,
+                             workload="Dummy.foo")
+
+        self.assertFalse(result["success"])
+        self.assertIn("Failed to load baseline", result["detail"])
+
+    def test_merge(self):
+        sla = regression.MaxRegression({"baseline": self.path})
+        other = regression.MaxRegression({"baseline": self.path})
+        for i, iteration in enumerate(_iterations(1.3)):
+            (sla if i % 2 else other).add_iteration(iteration)
+
+        self.assertTrue(sla.merge(other))
+
+        self.assertEqual(100, sla.samples["total"].count)
+        self.assertFalse(sla.result()["success"])
+
+    @mock.patch("rally.plugins.common.sla.regression.objects.Task")
+    def test_load_baseline_task(self, mock_task):
+        mock_task.get.return_value.get_results.return_value = [
+            {"key": {"name": "Dummy.dummy", "pos": 0}, "data": {"raw": [1]}},
+            {"key": {"name": "Dummy.dummy", "pos": 1}, "data": {"raw": [2]}},
+            {"key": {"name": "Dummy.foo", "pos": 2}, "data": {"raw": [3]}}]
+
+        self.assertEqual([2], regression.load_baseline("uuid", pos=1))
+        self.assertEqual([3], regression.load_baseline("uuid", "Dummy.foo"))
+        self.assertRaises(exceptions.NotFoundException,
+                          regression.load_baseline, "uuid", "Dummy.dummy")
+        mock_task.get.assert_called_with("uuid")
+
+    def test_load_baseline_file(self):
+        self._save_baseline([("Dummy.dummy", 0, [1]),
+                             ("Dummy.dummy", 1, [2])])
+
+        self.assertEqual([2], regression.load_baseline(self.path, pos=1))
+        self.assertRaises(exceptions.NotFoundException,
+                          regression.load_baseline, self.path)
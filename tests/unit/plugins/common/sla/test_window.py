@@ -0,0 +1,161 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+
+import ddt
+import jsonschema
+
+from rally.plugins.common.sla import window
+from tests.unit import test
+
+
+def _iteration(finished_at, duration=1, error=None):
+    return {"timestamp": finished_at - duration, "duration": duration,
+            "error": error or [], "atomic_actions": {}}
+
+
+@ddt.ddt
+class WindowTestCase(test.TestCase):
+
+    @ddt.data({}, {"window": 60}, {"max_failure_rate": 1},
+              {"window": 0, "max_failure_rate": 1},
+              {"window": 60, "max_failure_rate": 101},
+              {"window": 60, "max_percentiles": {"p100": 1}},
+              {"window": 60, "max_failure_rate": 1, "foo": 1})
+    def test_config_schema_invalid(self, config):
+        self.assertRaises(jsonschema.ValidationError,
+                          window.Window.validate, {"window": config})
+
+    def test_config_schema(self):
+        window.Window.validate(
+            {"window": {"window": 300, "step": 60, "min_iterations": 10,
+                        "grace": 30,
+                        "max_failure_rate": 1,
+                        "max_percentiles": {"p95": 10, "p99.9": 30}}})
+
+    def test_tumbling_failure_rate(self):
+        sla = window.Window({"window": 10, "max_failure_rate": 30})
+
+        for finished_at in (101, 102, 105):
+            self.assertTrue(sla.add_iteration(_iteration(finished_at)))
+        self.assertTrue(sla.add_iteration(_iteration(108, error=["e"])))
+        self.assertTrue(sla.add_iteration(_iteration(111, error=["e"])))
+        self.assertTrue(sla.add_iteration(_iteration(112, error=["e"])))
+        # NOTE: A window is checked once the step after it is finished
+        self.assertTrue(sla.add_iteration(_iteration(121)))
+        self.assertFalse(sla.add_iteration(_iteration(135, error=["e"])))
+
+        result = sla.result()
+        self.assertFalse(result["success"])
+        self.assertEqual([{"started_at": 110.0, "finished_at": 120.0,
+                           "detail": "failure rate 100.0% > 30.0%"},
+                          {"started_at": 130.0, "finished_at": 140.0,
+                           "detail": "failure rate 100.0% > 30.0%"}],
+                         result["violations"])
+        self.assertEqual("failure rate <= 30.0% in every 10s window - "
+                         "2 of 4 windows violated - Failed", result["detail"])
+        self.assertEqual(0, result["late_iterations"])
+
+    def test_sliding_percentiles(self):
+        sla = window.Window({"window": 30, "step": 10, "min_iterations": 2,
+                             "max_percentiles": {"p50": 2}})
+
+        for finished_at, duration in ((5, 1), (15, 1), (25, 5), (26, 5),
+                                      (45, 1), (46, 1), (75, 5)):
+            sla.add_iteration(_iteration(finished_at, duration))
+
+        result = sla.result()
+        # NOTE: Only window [10, 40) is violated, windows with the only
+        #       iteration are not checked
+        self.assertEqual([{"started_at": 10.0, "finished_at": 40.0,
+                           "detail": "50%ile 5.00s > 2.00s"}],
+                         result["violations"])
+        self.assertEqual(1, sla.violated_windows)
+        self.assertEqual(6, sla.windows)
+
+    def test_ring_is_bounded(self):
+        sla = window.Window({"window": 30, "step": 10,
+                             "max_failure_rate": 0})
+
+        for finished_at in range(0, 1000, 3):
+            sla.add_iteration(_iteration(finished_at))
+            self.assertLessEqual(len(sla.buckets), 4)
+
+        self.assertTrue(sla.result()["success"])
+        self.assertEqual(100, sla.windows)
+
+    def test_late_iterations_within_grace(self):
+        sla = window.Window({"window": 10, "grace": 15,
+                             "max_failure_rate": 0})
+
+        sla.add_iteration(_iteration(5))
+        sla.add_iteration(_iteration(25))
+        sla.add_iteration(_iteration(8, error=["e"]))
+
+        result = sla.result()
+        self.assertFalse(result["success"])
+        self.assertEqual(0, result["late_iterations"])
+
+    def test_late_iterations_are_reported(self):
+        sla = window.Window({"window": 10, "max_failure_rate": 0})
+
+        sla.add_iteration(_iteration(5))
+        sla.add_iteration(_iteration(25))
+        self.assertTrue(sla.add_iteration(_iteration(8, error=["e"])))
+        sla.add_iteration(_iteration(9))
+
+        result = sla.result()
+        self.assertTrue(result["success"])
+        self.assertEqual(2, result["late_iterations"])
+        self.assertEqual("failure rate <= 0.0% in every 10s window - "
+                         "0 of 2 windows violated - 2 late iterations "
+                         "(1 failed) are not checked - Passed",
+                         result["detail"])
+
+    def test_violations_are_capped(self):
+        sla = window.Window({"window": 10, "max_failure_rate": 0})
+
+        for finished_at in range(0, 20 * window.MAX_VIOLATIONS, 20):
+            sla.add_iteration(_iteration(finished_at, error=["e"]))
+
+        self.assertEqual(window.MAX_VIOLATIONS, len(sla.result()[
+            "violations"]))
+
+        sla.add_iteration(_iteration(10 ** 6, error=["e"]))
+
+        self.assertEqual(window.MAX_VIOLATIONS, len(sla.result()[
+            "violations"]))
+        self.assertEqual(window.MAX_VIOLATIONS + 1, sla.violated_windows)
+
+    def test_merge(self):
+        config = {"window": 10, "max_failure_rate": 40}
+        single = window.Window(config)
+        first = window.Window(config)
+        second = window.Window(config)
+
+        for sla, finished_at, error in ((first, 5, None),
+                                        (first, 6, ["e"]),
+                                        (first, 15, ["e"]),
+                                        (first, 16, None),
+                                        (first, 21, None),
+                                        (second, 41, ["e"]),
+                                        (second, 42, None)):
+            single.add_iteration(_iteration(finished_at, error=error))
+            sla.add_iteration(_iteration(finished_at, error=error))
+
+        self.assertFalse(first.merge(second))
+        self.assertEqual(single.result(), first.result())
+        self.assertEqual([0.0, 40.0],
+                         [v["started_at"]
+                          for v in first.result()["violations"]])
@@ -17,6 +17,7 @@ import copy
 import mock
 import six
 
+from rally import exceptions
 from rally.plugins.openstack.context.ceilometer import samples
 from rally.plugins.openstack.scenarios.ceilometer import utils as ceilo_utils
 from tests.unit import test
@@ -56,6 +57,7 @@ class CeilometerSampleGeneratorTestCase(test.TestCase):
                     "resources_per_tenant": resources_per_tenant,
                     "samples_per_resource": samples_per_resource,
                     "timestamp_interval": 60,
+                    "resource_management_workers": 4,
                     "metadata_list": [
                         {"status": "active", "name": "fake_resource",
                          "deleted": "False",
@@ -151,6 +153,75 @@ class CeilometerSampleGeneratorTestCase(test.TestCase):
             ceilometer_ctx.setup()
             self.assertEqual(new_context, ceilometer_ctx.context)
 
+    @mock.patch("%s.samples.ceilo_utils.CeilometerScenario"
+                "._create_samples" % CTX)
+    def test__store_batch_samples(
+            self, mock_ceilometer_scenario__create_samples):
+        mock_create_samples = mock_ceilometer_scenario__create_samples
+        mock_create_samples.side_effect = lambda batch: (
+            1 / 0 if batch == ["fail"] else ["created-%s" % batch[0]])
+        u1 = {"id": "u1", "credential": mock.MagicMock()}
+        u2 = {"id": "u2", "credential": mock.MagicMock()}
+        batches = iter([(u1, "t1", 0, 1, ["a", "b"]),
+                        (u1, "t1", 0, 2, ["c"]),
+                        (u1, "t1", 0, 3, ["fail"]),
+                        (u2, "t2", 0, 1, ["d", "e"]),
+                        (u2, "t2", 1, 1, ["fail"])])
+        tenants, context = self._gen_context(1, 1, 1, 1)
+        ceilometer_ctx = samples.CeilometerSampleGenerator(context)
+
+        created, lost, stored = ceilometer_ctx._store_batch_samples(
+            batches, 3)
+
+        self.assertEqual({("t1", 0): ["created-c"],
+                          ("t2", 0): ["created-d"]}, created)
+        self.assertEqual({("t1", 0): 1, ("t2", 1): 1}, lost)
+        self.assertEqual(5, stored)
+        self.assertEqual(5, mock_create_samples.call_count)
+
+    @mock.patch("%s.samples.ceilo_utils.CeilometerScenario"
+                "._create_samples" % CTX)
+    def test_setup_batches_lost(self,
+                                mock_ceilometer_scenario__create_samples):
+        tenants, context = self._gen_context(1, 1, 2, 3)
+        context["config"]["ceilometer"].update(batch_size=1,
+                                               batches_allow_lose=1)
+        calls = iter(range(6))
+        mock_ceilometer_scenario__create_samples.side_effect = lambda batch: (
+            1 / 0 if next(calls) == 0 else
+            [mock.Mock(resource_id=batch[0]["resource_id"])])
+
+        ceilometer_ctx = samples.CeilometerSampleGenerator(context)
+        ceilometer_ctx.setup()
+
+        self.assertEqual(2, len(context["tenants"]["0"]["resources"]))
+        self.assertEqual(2, len(context["tenants"]["0"]["samples"]))
+
+        context["config"]["ceilometer"]["batches_allow_lose"] = 0
+        calls = iter(range(6))
+        ceilometer_ctx = samples.CeilometerSampleGenerator(context)
+        self.assertRaises(exceptions.ContextSetupFailure,
+                          ceilometer_ctx.setup)
+
+    @mock.patch("%s.samples.ceilo_utils.CeilometerScenario"
+                "._create_samples" % CTX)
+    def test__store_batch_samples_generation_fails(
+            self, mock_ceilometer_scenario__create_samples):
+        user = {"id": "u1", "credential": mock.MagicMock()}
+
+        def batches():
+            yield user, "t1", 0, 1, ["a"]
+            raise ValueError("bad metadata")
+
+        tenants, context = self._gen_context(1, 1, 1, 1)
+        ceilometer_ctx = samples.CeilometerSampleGenerator(context)
+
+        e = self.assertRaises(ValueError, ceilometer_ctx._store_batch_samples,
+                              batches(), 3)
+        self.assertEqual("bad metadata", str(e))
+        mock_ceilometer_scenario__create_samples.assert_called_once_with(
+            ["a"])
+
     def test_cleanup(self):
         tenants, context = self._gen_context(2, 5, 3, 3)
         ceilometer_ctx = samples.CeilometerSampleGenerator(context)
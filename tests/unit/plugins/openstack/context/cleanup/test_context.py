@@ -45,7 +45,10 @@ class AdminCleanupTestCase(test.TestCase):
                           context.AdminCleanup.validate, {})
 
     @mock.patch("%s.manager.find_resource_managers" % BASE,
-                return_value=[mock.MagicMock(), mock.MagicMock()])
+                return_value=[mock.MagicMock(_order=1, _depends_on=None,
+                                             _threads=5),
+                              mock.MagicMock(_order=2, _depends_on=None,
+                                             _threads=5)])
     @mock.patch("%s.manager.SeekAndDestroy" % BASE)
     def test_cleanup(self, mock_seek_and_destroy, mock_find_resource_managers):
 
@@ -66,12 +69,12 @@ class AdminCleanupTestCase(test.TestCase):
                 mock_find_resource_managers.return_value[0],
                 ctx["admin"],
                 ctx["users"]),
-            mock.call().exterminate(),
+            mock.call().exterminate(consumers_count=5),
             mock.call(
                 mock_find_resource_managers.return_value[1],
                 ctx["admin"],
                 ctx["users"]),
-            mock.call().exterminate()
+            mock.call().exterminate(consumers_count=5)
         ])
 
 
@@ -97,7 +100,10 @@ class UserCleanupTestCase(test.TestCase):
                           context.UserCleanup.validate, {})
 
     @mock.patch("%s.manager.find_resource_managers" % BASE,
-                return_value=[mock.MagicMock(), mock.MagicMock()])
+                return_value=[mock.MagicMock(_order=1, _depends_on=None,
+                                             _threads=5),
+                              mock.MagicMock(_order=2, _depends_on=None,
+                                             _threads=5)])
     @mock.patch("%s.manager.SeekAndDestroy" % BASE)
     def test_cleanup(self, mock_seek_and_destroy, mock_find_resource_managers):
 
@@ -117,9 +123,25 @@ class UserCleanupTestCase(test.TestCase):
             mock.call(
                 mock_find_resource_managers.return_value[0],
                 None, ctx["users"]),
-            mock.call().exterminate(),
+            mock.call().exterminate(consumers_count=5),
             mock.call(
                 mock_find_resource_managers.return_value[1],
                 None, ctx["users"]),
-            mock.call().exterminate()
+            mock.call().exterminate(consumers_count=5)
         ])
+
+    @mock.patch("%s.journal.CONF" % BASE)
+    @mock.patch("%s.manager.cleanup" % BASE)
+    def test_cleanup_with_journal(self, mock_cleanup, mock_conf):
+        mock_conf.cleanup.use_journal = True
+        ctx = {
+            "config": {"cleanup": ["a"]},
+            "users": [],
+            "task": {"uuid": "task_uuid"}
+        }
+
+        context.UserCleanup(ctx).cleanup()
+
+        mock_cleanup.assert_called_once_with(
+            names=["a"], admin_required=False, users=[],
+            task_uuid="task_uuid")
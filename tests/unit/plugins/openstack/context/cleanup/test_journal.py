@@ -0,0 +1,106 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+
+import mock
+from oslo_config import fixture
+
+from rally.plugins.openstack.context.cleanup import journal
+from tests.unit import test
+
+
+BASE = "rally.plugins.openstack.context.cleanup.journal"
+
+
+class JournalTestCase(test.TestCase):
+
+    def test_record_and_load(self):
+        journal.record("task", "nova", "servers", "id1", tenant_id="t1")
+        journal.record("task", "cinder", "volumes", "id2")
+
+        self.assertEqual(
+            [{"service": "nova", "resource": "servers", "id": "id1",
+              "tenant_id": "t1"},
+             {"service": "cinder", "resource": "volumes", "id": "id2",
+              "tenant_id": None}],
+            journal.load("task"))
+        self.assertEqual([], journal.load("another_task"))
+
+    @mock.patch("%s.LOG" % BASE)
+    def test_record_failed(self, mock_log):
+        journal.record("task", "nova", "servers", object())
+        self.assertEqual(1, mock_log.warning.call_count)
+        self.assertEqual([], journal.load("task"))
+
+    @mock.patch("%s.LOG" % BASE)
+    def test_load_skips_broken_lines(self, mock_log):
+        journal.record("task", "nova", "servers", "id1")
+        with open(journal._path("task"), "a") as f:
+            f.write("{\"service\": \"nova\", \"reso")
+
+        self.assertEqual(1, len(journal.load("task")))
+        self.assertEqual(1, mock_log.warning.call_count)
+
+    @mock.patch("%s.record_many" % BASE)
+    def test_record_resource(self, mock_record_many):
+        self.useFixture(fixture.Config()).config(use_journal=True,
+                                                 group="cleanup")
+        journal.record_resource({"task": {"uuid": "task"},
+                                 "tenant": {"id": "t1"}},
+                                "nova", "servers", "id1")
+        journal.record_resources({"task": {"uuid": "task"},
+                                  "user": {"tenant_id": "t2"}},
+                                 [("nova", "servers", "id2"),
+                                  ("nova", "servers", "id3")])
+        journal.record_resource({}, "nova", "servers", "id4")
+
+        mock_record_many.assert_has_calls([
+            mock.call("task", [("nova", "servers", "id1")], tenant_id="t1"),
+            mock.call("task", [("nova", "servers", "id2"),
+                               ("nova", "servers", "id3")], tenant_id="t2")])
+        self.assertEqual(2, mock_record_many.call_count)
+
+    @mock.patch("%s.record_many" % BASE)
+    def test_record_resource_journal_disabled(self, mock_record_many):
+        journal.record_resource({"task": {"uuid": "task"}},
+                                "nova", "servers", "id1")
+        self.assertFalse(mock_record_many.called)
+
+        journal.record_resource({"task": {"uuid": "task"},
+                                 "resource_pool": {}},
+                                "nova", "servers", "id2")
+        mock_record_many.assert_called_once_with(
+            "task", [("nova", "servers", "id2")], tenant_id=None)
+
+    def test_discard(self):
+        journal.record("task", "nova", "servers", "id1")
+        journal.record("task", "cinder", "volumes", "id2")
+
+        journal.discard("task", ["nova.servers"])
+        self.assertEqual(
+            [{"service": "cinder", "resource": "volumes", "id": "id2",
+              "tenant_id": None}],
+            journal.load("task"))
+
+        journal.discard("task", ["cinder.volumes"])
+        self.assertFalse(os.path.exists(journal._path("task")))
+
+    def test_delete(self):
+        journal.record("task", "nova", "servers", "id1")
+        self.assertTrue(os.path.exists(journal._path("task")))
+
+        journal.delete("task")
+        self.assertFalse(os.path.exists(journal._path("task")))
+        journal.delete("task")
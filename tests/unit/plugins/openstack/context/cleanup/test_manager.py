@@ -47,25 +47,26 @@ class SeekAndDestroyTestCase(test.TestCase):
             manager.SeekAndDestroy._get_cached_client(users[1], cache=cache))
 
     @mock.patch("%s.LOG" % BASE)
-    def test__delete_single_resource(self, mock_log):
+    def test__delete_resources_single(self, mock_log):
         mock_resource = mock.MagicMock(_max_attempts=3, _timeout=10,
                                        _interval=0.01)
         mock_resource.delete.side_effect = [Exception, Exception, True]
         mock_resource.is_deleted.side_effect = [False, False, True]
 
-        manager.SeekAndDestroy(None, None, None)._delete_single_resource(
-            mock_resource)
+        destroyer = manager.SeekAndDestroy(None, None, None)
+        destroyer._delete_resources([mock_resource])
 
         mock_resource.delete.assert_has_calls([mock.call()] * 3)
         self.assertEqual(mock_resource.delete.call_count, 3)
         mock_resource.is_deleted.assert_has_calls([mock.call()] * 3)
         self.assertEqual(mock_resource.is_deleted.call_count, 3)
+        self.assertEqual(0, destroyer.failed)
 
         # NOTE(boris-42): No logs and no exceptions means no bugs!
         self.assertEqual(0, mock_log.call_count)
 
     @mock.patch("%s.LOG" % BASE)
-    def test__delete_single_resource_timeout(self, mock_log):
+    def test__delete_resources_timeout(self, mock_log):
 
         mock_resource = mock.MagicMock(_max_attempts=1, _timeout=0.02,
                                        _interval=0.025)
@@ -73,22 +74,23 @@ class SeekAndDestroyTestCase(test.TestCase):
         mock_resource.delete.return_value = True
         mock_resource.is_deleted.side_effect = [False, False, True]
 
-        manager.SeekAndDestroy(None, None, None)._delete_single_resource(
-            mock_resource)
+        destroyer = manager.SeekAndDestroy(None, None, None)
+        destroyer._delete_resources([mock_resource])
 
         mock_resource.delete.assert_called_once_with()
         mock_resource.is_deleted.assert_called_once_with()
 
         self.assertEqual(1, mock_log.warning.call_count)
+        self.assertEqual(1, destroyer.failed)
 
     @mock.patch("%s.LOG" % BASE)
-    def test__delete_single_resource_excpetion_in_is_deleted(self, mock_log):
+    def test__delete_resources_excpetion_in_is_deleted(self, mock_log):
         mock_resource = mock.MagicMock(_max_attempts=3, _timeout=10,
                                        _interval=0)
         mock_resource.delete.return_value = True
         mock_resource.is_deleted.side_effect = [Exception] * 4
-        manager.SeekAndDestroy(None, None, None)._delete_single_resource(
-            mock_resource)
+        manager.SeekAndDestroy(None, None, None)._delete_resources(
+            [mock_resource])
 
         mock_resource.delete.assert_called_once_with()
         self.assertEqual(4, mock_resource.is_deleted.call_count)
@@ -96,8 +98,54 @@ class SeekAndDestroyTestCase(test.TestCase):
         self.assertEqual(5, mock_log.warning.call_count)
         self.assertEqual(4, mock_log.exception.call_count)
 
+    @mock.patch("%s.LOG" % BASE)
+    def test__delete_resources_bulk(self, mock_log):
+        mock_resources = [
+            mock.MagicMock(_max_attempts=3, _timeout=10, _interval=0,
+                           raw_resource="r%d" % i,
+                           **{"id.return_value": "id%d" % i})
+            for i in range(3)]
+        mock_resources[0].bulk_delete.side_effect = [Exception, None]
+        mock_resources[0].list_deleted.side_effect = [
+            ["id1"], ["id0", "id2"]]
+
+        manager.SeekAndDestroy(None, None, None)._delete_resources(
+            mock_resources)
+
+        mock_resources[0].bulk_delete.assert_has_calls(
+            [mock.call(["r0", "r1", "r2"])] * 2)
+        mock_resources[0].list_deleted.assert_has_calls([
+            mock.call(["id0", "id1", "id2"]), mock.call(["id0", "id2"])])
+        for mock_resource in mock_resources:
+            self.assertFalse(mock_resource.delete.called)
+            self.assertFalse(mock_resource.is_deleted.called)
+        self.assertFalse(mock_log.warning.called)
+
+    @mock.patch("%s.LOG" % BASE)
+    def test__delete_resources_bulk_not_supported(self, mock_log):
+        mock_resources = [
+            mock.MagicMock(_max_attempts=3, _timeout=10, _interval=0,
+                           **{"id.return_value": "id%d" % i})
+            for i in range(3)]
+        for mock_resource in mock_resources:
+            mock_resource.bulk_delete.side_effect = NotImplementedError
+            mock_resource.list_deleted.side_effect = NotImplementedError
+        mock_resources[1].delete.side_effect = Exception
+        mock_resources[2].is_deleted.side_effect = [False, True]
+
+        manager.SeekAndDestroy(None, None, None)._delete_resources(
+            mock_resources)
+
+        for mock_resource in mock_resources:
+            self.assertTrue(mock_resource.delete.called)
+        self.assertEqual(3, mock_resources[1].delete.call_count)
+        self.assertEqual(1, mock_resources[0].is_deleted.call_count)
+        self.assertFalse(mock_resources[1].is_deleted.called)
+        self.assertEqual(2, mock_resources[2].is_deleted.call_count)
+        self.assertEqual(1, mock_log.warning.call_count)
+
     def _manager(self, list_side_effect, **kw):
-        mock_mgr = mock.MagicMock()
+        mock_mgr = mock.MagicMock(_batch_size=1)
         mock_mgr().list.side_effect = list_side_effect
         mock_mgr.reset_mock()
 
@@ -119,7 +167,22 @@ class SeekAndDestroyTestCase(test.TestCase):
         mock__get_cached_client.assert_called_once_with(admin)
         mock_mgr.assert_called_once_with(
             admin=mock__get_cached_client.return_value)
-        self.assertEqual(queue, [(admin, None, x) for x in range(1, 4)])
+        self.assertEqual(queue, [(admin, None, [x]) for x in range(1, 4)])
+
+    @mock.patch("%s.SeekAndDestroy._get_cached_client" % BASE)
+    def test__gen_publisher_batches(self, mock__get_cached_client):
+        mock_mgr = self._manager([[1, 2, 3, 4, 5]],
+                                 _perform_for_admin_only=False,
+                                 _batch_size=2)
+        admin = mock.MagicMock()
+        publish = manager.SeekAndDestroy(
+            mock_mgr, admin, None)._gen_publisher()
+
+        queue = []
+        publish(queue)
+        self.assertEqual(queue, [(admin, None, [1, 2]),
+                                 (admin, None, [3, 4]),
+                                 (admin, None, [5])])
 
     @mock.patch("%s.SeekAndDestroy._get_cached_client" % BASE)
     def test__gen_publisher_admin_only(self, mock__get_cached_client):
@@ -134,7 +197,7 @@ class SeekAndDestroyTestCase(test.TestCase):
         mock__get_cached_client.assert_called_once_with(admin)
         mock_mgr.assert_called_once_with(
             admin=mock__get_cached_client.return_value)
-        self.assertEqual(queue, [(admin, None, x) for x in range(1, 4)])
+        self.assertEqual(queue, [(admin, None, [x]) for x in range(1, 4)])
 
     @mock.patch("%s.SeekAndDestroy._get_cached_client" % BASE)
     def test__gen_publisher_user_resource(self, mock__get_cached_client):
@@ -168,8 +231,8 @@ class SeekAndDestroyTestCase(test.TestCase):
             mock.call(users[0]),
             mock.call(users[1])
         ])
-        expected_queue = [(admin, users[0], x) for x in range(1, 4)]
-        expected_queue += [(admin, users[1], x) for x in range(4, 6)]
+        expected_queue = [(admin, users[0], [x]) for x in range(1, 4)]
+        expected_queue += [(admin, users[1], [x]) for x in range(4, 6)]
         self.assertEqual(queue, expected_queue)
 
     @mock.patch("%s.SeekAndDestroy._get_cached_client" % BASE)
@@ -206,11 +269,73 @@ class SeekAndDestroyTestCase(test.TestCase):
             mock.call(users[0]),
             mock.call(users[2])
         ])
-        self.assertEqual(queue, [(None, users[0], x) for x in range(1, 4)])
+        self.assertEqual(queue, [(None, users[0], [x]) for x in range(1, 4)])
+
+    @mock.patch("%s.SeekAndDestroy._get_cached_client" % BASE)
+    def test__gen_publisher_records(self, mock__get_cached_client):
+        mock_mgr = self._manager([], _batch_size=2)
+        admin = {"credential": "admin_credential"}
+        users = [{"tenant_id": "t1", "id": 1}]
+        records = [{"id": "a", "tenant_id": "t1"},
+                   {"id": "b", "tenant_id": "t2"},
+                   {"id": "c", "tenant_id": "t1"},
+                   {"id": "d", "tenant_id": "t1"}]
+        publish = manager.SeekAndDestroy(
+            mock_mgr, admin, users, records=records)._gen_publisher()
+
+        queue = []
+        publish(queue)
+
+        self.assertFalse(mock_mgr.called)
+        self.assertEqual(
+            [(admin, users[0], ["a", "c"]),
+             (admin, users[0], ["d"]),
+             (admin, {"credential": "admin_credential", "tenant_id": "t2"},
+              ["b"])],
+            queue)
+
+    def test__get_recorded_resources(self):
+        not_found = Exception("Not found")
+        not_found.code = 404
+        mock_mgr = mock.MagicMock()
+        mock_mgr.get.side_effect = ["res1", not_found, Exception("Oops"),
+                                    "res4"]
+
+        destroyer = manager.SeekAndDestroy(None, None, None)
+        self.assertEqual(
+            ["res1", "res4"],
+            destroyer._get_recorded_resources(mock_mgr,
+                                              ["1", "2", "3", "4"]))
+        self.assertEqual(1, destroyer.failed)
+        mock_mgr.get.assert_has_calls(
+            [mock.call("1"), mock.call("2"), mock.call("3"), mock.call("4")])
+
+    @mock.patch("%s.SeekAndDestroy._get_cached_client" % BASE)
+    @mock.patch("%s.SeekAndDestroy._delete_resources" % BASE)
+    def test__gen_consumer_records(self, mock__delete_resources,
+                                   mock__get_cached_client):
+        mock_mgr = mock.MagicMock(__name__="Test")
+        mock_mgr.return_value.get.side_effect = lambda x: "raw_%s" % x
+        user = {"id": "a", "tenant_id": "uuid1"}
+
+        consumer = manager.SeekAndDestroy(
+            mock_mgr, None, None, records=[])._gen_consumer()
+        consumer({}, (None, user, ["1", "2"]))
+
+        mock_mgr.assert_has_calls([
+            mock.call(resource="raw_1",
+                      admin=mock__get_cached_client.return_value,
+                      user=mock__get_cached_client.return_value,
+                      tenant_uuid="uuid1"),
+            mock.call(resource="raw_2",
+                      admin=mock__get_cached_client.return_value,
+                      user=mock__get_cached_client.return_value,
+                      tenant_uuid="uuid1")], any_order=True)
+        self.assertEqual(1, mock__delete_resources.call_count)
 
     @mock.patch("%s.SeekAndDestroy._get_cached_client" % BASE)
-    @mock.patch("%s.SeekAndDestroy._delete_single_resource" % BASE)
-    def test__gen_consumer(self, mock__delete_single_resource,
+    @mock.patch("%s.SeekAndDestroy._delete_resources" % BASE)
+    def test__gen_consumer(self, mock__delete_resources,
                            mock__get_cached_client):
         mock_mgr = mock.MagicMock(__name__="Test")
 
@@ -220,7 +345,7 @@ class SeekAndDestroyTestCase(test.TestCase):
         user1 = {"id": "a", "tenant_id": "uuid1"}
         cache = {}
 
-        consumer(cache, (admin, user1, "res"))
+        consumer(cache, (admin, user1, ["res"]))
         mock_mgr.assert_called_once_with(
             resource="res",
             admin=mock__get_cached_client.return_value,
@@ -230,14 +355,14 @@ class SeekAndDestroyTestCase(test.TestCase):
             mock.call(admin, cache=cache),
             mock.call(user1, cache=cache)
         ])
-        mock__delete_single_resource.assert_called_once_with(
-            mock_mgr.return_value)
+        mock__delete_resources.assert_called_once_with(
+            [mock_mgr.return_value])
 
         mock_mgr.reset_mock()
         mock__get_cached_client.reset_mock()
-        mock__delete_single_resource.reset_mock()
+        mock__delete_resources.reset_mock()
 
-        consumer(cache, (admin, None, "res2"))
+        consumer(cache, (admin, None, ["res2"]))
         mock_mgr.assert_called_once_with(
             resource="res2",
             admin=mock__get_cached_client.return_value,
@@ -248,8 +373,8 @@ class SeekAndDestroyTestCase(test.TestCase):
             mock.call(admin, cache=cache),
             mock.call(None, cache=cache)
         ])
-        mock__delete_single_resource.assert_called_once_with(
-            mock_mgr.return_value)
+        mock__delete_resources.assert_called_once_with(
+            [mock_mgr.return_value])
 
     @mock.patch("%s.SeekAndDestroy._gen_consumer" % BASE)
     @mock.patch("%s.SeekAndDestroy._gen_publisher" % BASE)
@@ -333,22 +458,169 @@ class ResourceManagerTestCase(test.TestCase):
                          manager.find_resource_managers(names=["fake"],
                                                         admin_required=False))
 
+    def test_build_dependency_graph(self):
+        heat = self._get_res_mock(_service="heat", _resource="stacks",
+                                  _order=1, _depends_on=[])
+        server = self._get_res_mock(_service="nova", _resource="servers",
+                                    _order=2, _depends_on=["heat"])
+        keypair = self._get_res_mock(_service="nova", _resource="keypairs",
+                                     _order=3, _depends_on=["heat"])
+        image = self._get_res_mock(_service="glance", _resource="images",
+                                   _order=4, _depends_on=[])
+        port = self._get_res_mock(_service="neutron", _resource="port",
+                                  _order=5, _depends_on=["nova.servers"])
+        legacy = self._get_res_mock(_service="foo", _resource="bar",
+                                    _order=6, _depends_on=None)
+        early = self._get_res_mock(_service="baz", _resource="qux",
+                                   _order=0, _depends_on=["glance"])
+
+        graph = manager.build_dependency_graph(
+            [heat, server, keypair, image, port, legacy, early])
+
+        self.assertEqual(set(), graph[heat])
+        self.assertEqual({heat}, graph[server])
+        self.assertEqual({heat, server}, graph[keypair])
+        self.assertEqual(set(), graph[image])
+        self.assertEqual({server}, graph[port])
+        self.assertEqual({early, heat, server, keypair, image, port},
+                         graph[legacy])
+        self.assertEqual(set(), graph[early])
+
+    def test_threads_budget(self):
+        budget = manager.ThreadsBudget(10)
+
+        self.assertEqual(7, budget.acquire(7))
+        self.assertEqual(3, budget.acquire(5))
+        self.assertEqual(0, budget.free)
+        budget.release(3)
+        self.assertEqual(1, budget.acquire(0))
+        budget.release(1)
+        budget.release(7)
+        self.assertEqual(10, budget.free)
+
     @mock.patch("%s.SeekAndDestroy" % BASE)
-    @mock.patch("%s.find_resource_managers" % BASE,
-                return_value=[mock.MagicMock(), mock.MagicMock()])
+    @mock.patch("%s.find_resource_managers" % BASE)
     def test_cleanup(self, mock_find_resource_managers, mock_seek_and_destroy):
+        mgr1 = self._get_res_mock(_service="a", _resource="1", _order=1,
+                                  _depends_on=None, _threads=5)
+        mgr2 = self._get_res_mock(_service="b", _resource="2", _order=2,
+                                  _depends_on=None, _threads=5)
+        mock_find_resource_managers.return_value = [mgr1, mgr2]
+
         manager.cleanup(names=["a", "b"], admin_required=True,
                         admin="admin", users=["user"])
 
         mock_find_resource_managers.assert_called_once_with(["a", "b"], True)
 
         mock_seek_and_destroy.assert_has_calls([
-            mock.call(
-                mock_find_resource_managers.return_value[0], "admin", ["user"]
-            ),
-            mock.call().exterminate(),
-            mock.call(
-                mock_find_resource_managers.return_value[1], "admin", ["user"]
-            ),
-            mock.call().exterminate()
+            mock.call(mgr1, "admin", ["user"]),
+            mock.call().exterminate(consumers_count=5),
+            mock.call(mgr2, "admin", ["user"]),
+            mock.call().exterminate(consumers_count=5)
+        ])
+
+    @mock.patch("%s.journal.discard" % BASE)
+    @mock.patch("%s.journal.load" % BASE)
+    @mock.patch("%s.SeekAndDestroy" % BASE)
+    @mock.patch("%s.find_resource_managers" % BASE)
+    def test_cleanup_with_journal(self, mock_find_resource_managers,
+                                  mock_seek_and_destroy, mock_load,
+                                  mock_discard):
+        mgr1 = self._get_res_mock(_service="nova", _resource="servers",
+                                  _order=1, _depends_on=[], _threads=5)
+        mgr2 = self._get_res_mock(_service="nova", _resource="keypairs",
+                                  _order=2, _depends_on=[], _threads=5)
+        mock_find_resource_managers.return_value = [mgr1, mgr2]
+        records = [{"service": "nova", "resource": "servers", "id": "1",
+                    "tenant_id": "t"}]
+        mock_load.return_value = records
+        mock_seek_and_destroy.return_value.failed = 0
+
+        manager.cleanup(names=["nova"], admin="admin", users=["user"],
+                        task_uuid="task_uuid")
+
+        mock_load.assert_called_once_with("task_uuid")
+        mock_seek_and_destroy.assert_has_calls([
+            mock.call(mgr1, "admin", ["user"], records=records),
+            mock.call().exterminate(consumers_count=5),
+            mock.call(mgr2, "admin", ["user"]),
+            mock.call().exterminate(consumers_count=5)
         ])
+        mock_discard.assert_called_once_with("task_uuid", ["nova.servers"])
+
+        mock_discard.reset_mock()
+        mock_seek_and_destroy.return_value.failed = 1
+        manager.cleanup(names=["nova"], admin="admin", users=["user"],
+                        task_uuid="task_uuid")
+        self.assertFalse(mock_discard.called)
+
+    @mock.patch("%s.cleanup" % BASE)
+    @mock.patch("%s.journal.load" % BASE)
+    @mock.patch("%s.keystone.wrap" % BASE)
+    @mock.patch("%s.osclients.Clients" % BASE)
+    def test_cleanup_task(self, mock_clients, mock_wrap, mock_load,
+                          mock_cleanup):
+        mock_load.side_effect = [
+            [{"service": "nova", "resource": "servers", "id": "1",
+              "tenant_id": "t1"},
+             {"service": "swift", "resource": "object", "id": "c/o",
+              "tenant_id": "t2"}],
+            []]
+        keystone = mock_wrap.return_value
+        keystone.list_projects.return_value = [
+            mock.Mock(id="t1"), mock.Mock(id="t2")]
+        keystone.create_user.return_value = mock.Mock(id="u2")
+        admin = {"credential": mock.MagicMock()}
+
+        self.assertEqual([], manager.cleanup_task("task_uuid", admin))
+
+        self.assertEqual(1, keystone.create_user.call_count)
+        self.assertEqual("t2", keystone.create_user.call_args[0][3])
+        users = mock_cleanup.call_args[1]["users"]
+        self.assertEqual([("u2", "t2")],
+                         [(u["id"], u["tenant_id"]) for u in users])
+        mock_cleanup.assert_called_once_with(
+            names=sorted(manager.journal.RECORDED_RESOURCES), admin=admin,
+            users=users, task_uuid="task_uuid")
+        keystone.delete_user.assert_called_once_with("u2")
+
+    @mock.patch("%s.CONF" % BASE)
+    @mock.patch("%s.SeekAndDestroy" % BASE)
+    @mock.patch("%s.find_resource_managers" % BASE)
+    def test_cleanup_waits_for_dependencies(self, mock_find_resource_managers,
+                                            mock_seek_and_destroy, mock_conf):
+        mock_conf.cleanup.cleanup_threads = 7
+        mgrs = [self._get_res_mock(_service="s%d" % i, _resource="r",
+                                   _order=i, _depends_on=deps, _threads=5)
+                for i, deps in enumerate([[], ["s0"], [], ["s1", "s2"]])]
+        mock_find_resource_managers.return_value = mgrs
+
+        cleaned = []
+        mock_seek_and_destroy.side_effect = (
+            lambda mgr, *args: mock.MagicMock(
+                exterminate=lambda **kw: cleaned.append(mgr)))
+        manager.cleanup(names=["s0", "s1", "s2", "s3"])
+
+        self.assertEqual(set(mgrs), set(cleaned))
+        self.assertLess(cleaned.index(mgrs[0]), cleaned.index(mgrs[1]))
+        self.assertLess(cleaned.index(mgrs[1]), cleaned.index(mgrs[3]))
+        self.assertLess(cleaned.index(mgrs[2]), cleaned.index(mgrs[3]))
+
+    @mock.patch("%s.SeekAndDestroy" % BASE)
+    @mock.patch("%s.find_resource_managers" % BASE)
+    def test_cleanup_continues_after_failure(self,
+                                             mock_find_resource_managers,
+                                             mock_seek_and_destroy):
+        mgr1 = self._get_res_mock(_service="a", _resource="1", _order=1,
+                                  _depends_on=[], _threads=5)
+        mgr2 = self._get_res_mock(_service="b", _resource="2", _order=2,
+                                  _depends_on=["a"], _threads=5)
+        mock_find_resource_managers.return_value = [mgr1, mgr2]
+        mock_seek_and_destroy.return_value.exterminate.side_effect = [
+            ValueError("Oops"), None]
+
+        self.assertRaises(ValueError, manager.cleanup, names=["a", "b"])
+
+        self.assertEqual(2, mock_seek_and_destroy.call_count)
+        self.assertEqual(
+            2, mock_seek_and_destroy.return_value.exterminate.call_count)
@@ -13,12 +13,15 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+
 from boto import exception as boto_exception
 import mock
 from neutronclient.common import exceptions as neutron_exceptions
 
 from rally.common.plugin import discover
 from rally.common import utils
+from rally import exceptions
 from rally.plugins.openstack.context.cleanup import base
 from rally.plugins.openstack.context.cleanup import resources
 from tests.unit import test
@@ -39,7 +42,8 @@ class AllResourceManagerTestCase(test.TestCase):
                 "_admin_required", "_perform_for_admin_only",
                 "_tenant_resource", "_service", "_resource", "_order",
                 "_max_attempts", "_timeout", "_interval", "_threads",
-                "_manager", "id", "is_deleted", "delete", "list",
+                "_depends_on", "_batch_size", "bulk_delete", "list_deleted",
+                "_manager", "id", "is_deleted", "delete", "list", "get",
                 "supports_extension"
             ])
 
@@ -51,6 +55,23 @@ class AllResourceManagerTestCase(test.TestCase):
                  " Remove them to pass this test")
                 % {"name": manager_name, "opts": ", ".join(extra_opts)})
 
+    def test_res_manager_depends_on(self):
+        names = {}
+        for res_mgr in discover.itersubclasses(base.ResourceManager):
+            names[res_mgr._service] = min(
+                res_mgr._order, names.get(res_mgr._service, res_mgr._order))
+            names["%s.%s" % (res_mgr._service,
+                             res_mgr._resource)] = res_mgr._order
+
+        for res_mgr in discover.itersubclasses(base.ResourceManager):
+            for name in res_mgr._depends_on or []:
+                self.assertIn(name, names,
+                              "ResourceManager %s depends on unknown "
+                              "resource manager %s" % (res_mgr, name))
+                self.assertLess(names[name], res_mgr._order,
+                                "ResourceManager %s depends on %s that has "
+                                "higher order" % (res_mgr, name))
+
 
 class SynchronizedDeletionTestCase(test.TestCase):
 
@@ -58,6 +79,53 @@ class SynchronizedDeletionTestCase(test.TestCase):
         self.assertTrue(resources.SynchronizedDeletion().is_deleted())
 
 
+class ListDeletedMixinTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ListDeletedMixinTestCase, self).setUp()
+        self.addCleanup(resources._listings.clear)
+
+    def test_list_deleted(self):
+        server = resources.NovaServer()
+        server.list = mock.MagicMock(return_value=[mock.MagicMock(id="b")])
+
+        self.assertEqual(["a", "c"], server.list_deleted(["a", "b", "c"]))
+        server.list.assert_called_once_with()
+
+    @mock.patch("%s.time.time" % BASE)
+    def test_list_deleted_shares_listing(self, mock_time):
+        def server(username, listed):
+            # NOTE: Every consumer thread has its own clients
+            client = mock.Mock()
+            client.credential = mock.Mock(
+                auth_url="http://keystone", region_name="r",
+                username=username, tenant_name="t")
+            server = resources.NovaServer(user=client, tenant_uuid="t")
+            server.list = mock.MagicMock(
+                return_value=[mock.MagicMock(id=id_) for id_ in listed])
+            return server
+
+        first = server("foo", ["b"])
+        second = server("foo", [])
+        other = server("bar", [])
+
+        mock_time.return_value = 10
+        self.assertEqual(["a"], first.list_deleted(["a", "b"]))
+        self.assertEqual(["c"], second.list_deleted(["b", "c"]))
+        self.assertEqual(["b"], other.list_deleted(["b"]))
+        first.list.assert_called_once_with()
+        self.assertFalse(second.list.called)
+        other.list.assert_called_once_with()
+
+        mock_time.return_value = 10 + first._interval
+        self.assertEqual(["b", "c"], second.list_deleted(["b", "c"]))
+        second.list.assert_called_once_with()
+
+        mock_time.return_value = 20 + resources._LISTINGS_MAX_AGE
+        self.assertEqual(["b"], other.list_deleted(["b"]))
+        self.assertEqual(1, len(resources._listings))
+
+
 class QuotaMixinTestCase(test.TestCase):
 
     def test_id(self):
@@ -513,6 +581,10 @@ class SwiftMixinTestCase(test.TestCase):
 
 class SwiftObjectTestCase(test.TestCase):
 
+    def setUp(self):
+        super(SwiftObjectTestCase, self).setUp()
+        self.addCleanup(resources._bulk_delete_limits.clear)
+
     @mock.patch("%s.SwiftMixin._manager" % BASE)
     def test_list(self, mock_swift_mixin__manager):
         containers = [mock.MagicMock(), mock.MagicMock()]
@@ -526,6 +598,67 @@ class SwiftObjectTestCase(test.TestCase):
         self.assertEqual(len(containers) * len(objects),
                          len(resources.SwiftObject().list()))
 
+    @mock.patch("%s.SwiftMixin._manager" % BASE)
+    def test_bulk_delete(self, mock_swift_mixin__manager):
+        swift = mock_swift_mixin__manager.return_value
+        swift.get_capabilities.return_value = {
+            "bulk_delete": {"max_deletes_per_request": 2}}
+        swift.post_account.return_value = (
+            {}, json.dumps({"Number Deleted": 2,
+                            "Errors": []}).encode("utf-8"))
+
+        resources.SwiftObject().bulk_delete(
+            [["c1", "o1"], ["c1", "o 2"], ["c2", "o3"]])
+
+        headers = {"Accept": "application/json",
+                   "Content-Type": "text/plain"}
+        swift.post_account.assert_has_calls([
+            mock.call(headers=headers, query_string="bulk-delete",
+                      data=b"/c1/o1\n/c1/o%202\n"),
+            mock.call(headers=headers, query_string="bulk-delete",
+                      data=b"/c2/o3\n")])
+
+    @mock.patch("%s.SwiftMixin._manager" % BASE)
+    def test_bulk_delete_errors(self, mock_swift_mixin__manager):
+        swift = mock_swift_mixin__manager.return_value
+        swift.get_capabilities.return_value = {"bulk_delete": {}}
+        swift.post_account.return_value = (
+            {}, json.dumps(
+                {"Errors": [["/c1/o1", "409 Conflict"]]}).encode("utf-8"))
+
+        self.assertRaises(exceptions.RallyException,
+                          resources.SwiftObject().bulk_delete, [["c1", "o1"]])
+
+    @mock.patch("%s.SwiftMixin._manager" % BASE)
+    def test_bulk_delete_not_supported(self, mock_swift_mixin__manager):
+        swift = mock_swift_mixin__manager.return_value
+        swift.get_capabilities.return_value = {}
+
+        self.assertRaises(NotImplementedError,
+                          resources.SwiftObject().bulk_delete, [["c1", "o1"]])
+
+    @mock.patch("%s.SwiftMixin._manager" % BASE)
+    def test_bulk_delete_caches_capabilities(self, mock_swift_mixin__manager):
+        swift = mock_swift_mixin__manager.return_value
+        swift.get_capabilities.return_value = {}
+
+        for username in ("foo", "bar"):
+            client = mock.Mock()
+            client.credential = mock.Mock(auth_url="http://keystone",
+                                          region_name="r", username=username)
+            self.assertRaises(NotImplementedError,
+                              resources.SwiftObject(user=client).bulk_delete,
+                              [["c1", "o1"]])
+        swift.get_capabilities.assert_called_once_with()
+
+    @mock.patch("%s.SwiftMixin._manager" % BASE)
+    def test_bulk_delete_old_swiftclient(self, mock_swift_mixin__manager):
+        with mock.patch("%s._swift_post_account_sends_data" % BASE, False):
+            self.assertRaises(NotImplementedError,
+                              resources.SwiftObject().bulk_delete,
+                              [["c1", "o1"]])
+        self.assertFalse(mock_swift_mixin__manager.called)
+
 
 class SwiftContainerTestCase(test.TestCase):
 
@@ -162,3 +162,47 @@ class ImageGeneratorTestCase(test.ScenarioTestCase):
         images_ctx.cleanup()
         mock_cleanup.assert_called_once_with(names=["glance.images"],
                                              users=self.context["users"])
+
+    @mock.patch("%s.utils.GlanceScenario._create_image" % SCN)
+    def test_setup_pooled(self, mock_glance_scenario__create_image):
+        mock_glance_scenario__create_image.return_value.id = "new"
+        config = {"image_url": "mock_url", "image_type": "qcow2",
+                  "image_container": "bare", "images_per_tenant": 2}
+        pooled = {"images": {}}
+        self.context.update({
+            "config": {"images": config},
+            "users": [{"id": "u1", "tenant_id": "t1", "credential": "c"},
+                      {"id": "u2", "tenant_id": "t2", "credential": "c"}],
+            "tenants": {"t1": {}, "t2": {}},
+            "resource_pool": {"name": "ci", "drain": False,
+                              "tenants": {"t1": {"id": 1, "data": pooled}}}
+        })
+        images_ctx = images.ImageGenerator(self.context)
+        pooled["images"][images_ctx._pool_key()] = ["pooled"]
+
+        images_ctx.setup()
+
+        self.assertEqual(["pooled", "new"],
+                         self.context["tenants"]["t1"]["images"])
+        self.assertEqual(["new", "new"],
+                         self.context["tenants"]["t2"]["images"])
+        self.assertEqual({images_ctx._pool_key(): ["pooled", "new"]},
+                         pooled["images"])
+
+    @mock.patch("%s.images.resource_manager.cleanup" % CTX)
+    def test_cleanup_pooled(self, mock_cleanup):
+        users = [{"id": "u1", "tenant_id": "t1", "credential": "c"},
+                 {"id": "u2", "tenant_id": "t2", "credential": "c"}]
+        self.context.update({
+            "config": {"images": {"image_url": "mock_url",
+                                  "image_type": "qcow2",
+                                  "image_container": "bare"}},
+            "users": users,
+            "resource_pool": {"name": "ci", "drain": False,
+                              "tenants": {"t1": {"id": 1, "data": {}}}}
+        })
+
+        images.ImageGenerator(self.context).cleanup()
+
+        mock_cleanup.assert_called_once_with(names=["glance.images"],
+                                             users=users[1:])
@@ -242,6 +242,103 @@ class UserGeneratorTestCase(test.ScenarioTestCase):
             self.assertIn("id", user)
             self.assertIn("credential", user)
 
+    @mock.patch("%s.time.sleep" % CTX)
+    @mock.patch("%s.rutils.RateLimiter" % CTX)
+    def test__keystone_call(self, mock_rate_limiter, mock_sleep):
+        self.context["config"]["users"].update(
+            resource_management_rate=10, resource_management_retries=2)
+        user_generator = users.UserGenerator(self.context)
+        limiter = mock_rate_limiter.return_value
+        unavailable = Exception()
+        unavailable.http_status = 503
+        over_limit = Exception()
+        over_limit.http_status = 429
+        over_limit.retry_after = 7
+        func = mock.Mock(side_effect=[unavailable, over_limit, "result"])
+
+        self.assertEqual("result",
+                         user_generator._keystone_call(func, "foo", "bar"))
+
+        mock_rate_limiter.assert_called_once_with(10)
+        self.assertEqual([mock.call("foo", "bar")] * 3,
+                         func.call_args_list)
+        self.assertEqual(3, limiter.acquire.call_count)
+        self.assertEqual(2, limiter.decrease.call_count)
+        limiter.increase.assert_called_once_with()
+        self.assertEqual(2, mock_sleep.call_count)
+        self.assertTrue(0.5 <= mock_sleep.call_args_list[0][0][0] <= 1)
+        mock_sleep.assert_called_with(7)
+
+    @mock.patch("%s.time.sleep" % CTX)
+    def test__keystone_call_failure(self, mock_sleep):
+        self.context["config"]["users"]["resource_management_retries"] = 1
+        user_generator = users.UserGenerator(self.context)
+        overloaded = Exception()
+        overloaded.http_status = 500
+        conflict = Exception()
+        conflict.http_status = 409
+
+        func = mock.Mock(side_effect=[overloaded, overloaded])
+        self.assertRaises(Exception, user_generator._keystone_call, func)
+        self.assertEqual(2, func.call_count)
+
+        func = mock.Mock(side_effect=[conflict])
+        self.assertRaises(Exception, user_generator._keystone_call, func)
+        self.assertEqual(1, func.call_count)
+        self.assertEqual(1, mock_sleep.call_count)
+
+    @mock.patch("%s.time.sleep" % CTX)
+    def test__keystone_call_with_lookup(self, mock_sleep):
+        self.context["config"]["users"]["resource_management_retries"] = 2
+        user_generator = users.UserGenerator(self.context)
+        unavailable = Exception()
+        unavailable.http_status = 503
+        server_error = Exception()
+        server_error.http_status = 500
+
+        func = mock.Mock(side_effect=[unavailable, server_error])
+        lookup = mock.Mock(return_value="existing")
+        self.assertEqual("existing",
+                         user_generator._keystone_call(func, "foo",
+                                                       lookup=lookup))
+        self.assertEqual([mock.call("foo")] * 2, func.call_args_list)
+        lookup.assert_called_once_with()
+        self.assertEqual(1, mock_sleep.call_count)
+
+        func = mock.Mock(side_effect=[server_error, "result"])
+        lookup = mock.Mock(return_value=None)
+        self.assertEqual("result",
+                         user_generator._keystone_call(func, "foo",
+                                                       lookup=lookup))
+        lookup.assert_called_once_with()
+
+        func = mock.Mock(side_effect=[server_error, "result"])
+        lookup = mock.Mock(side_effect=[unavailable])
+        self.assertRaises(Exception, user_generator._keystone_call, func,
+                          lookup=lookup)
+        func.assert_called_once_with()
+
+    def test__find_by_name(self):
+        foo = mock.Mock()
+        foo.name = "foo"
+        bar = mock.Mock()
+        bar.name = "bar"
+
+        self.assertEqual(
+            bar, users.UserGenerator._find_by_name([foo, bar], "bar"))
+        self.assertIsNone(users.UserGenerator._find_by_name([foo], "bar"))
+
+    @mock.patch("%s.LOG" % CTX)
+    def test__log_progress(self, mock_log):
+        for done in range(1, 26):
+            users.UserGenerator._log_progress("users", done, 25)
+
+        self.assertEqual(
+            ["Created %d of 25 users" % done for done in (2, 4, 6, 8, 10,
+                                                          12, 14, 16, 18,
+                                                          20, 22, 24, 25)],
+            [c[0][0] for c in mock_log.info.call_args_list])
+
     @mock.patch("%s.keystone" % CTX)
     def test__delete_tenants(self, mock_keystone):
         user_generator = users.UserGenerator(self.context)
@@ -403,3 +500,105 @@ class UserGeneratorTestCase(test.ScenarioTestCase):
 
         for user in users_:
             self.assertEqual("public", user["credential"].endpoint_type)
+
+    def _pool_context(self, **config):
+        credential = objects.Credential("foo_url", "foo", "foo_pass")
+        self.context["config"]["users"].update(resource_pool="ci",
+                                               tenants=2, users_per_tenant=2,
+                                               **config)
+        self.context["admin"]["credential"] = credential
+        self.context["task"]["deployment_uuid"] = "deployment_id"
+        self.context["tenants"] = {}
+        return credential.to_dict(include_permission=True)
+
+    @mock.patch("%s.objects.ResourcePool" % CTX)
+    @mock.patch("%s.keystone" % CTX)
+    def test_setup_and_cleanup_with_pool(self, mock_keystone,
+                                         mock_resource_pool):
+        credential = self._pool_context()
+        wrapped_keystone = mock_keystone.wrap.return_value
+        wrapped_keystone.create_project.return_value = mock.Mock(id="t2")
+        wrapped_keystone.create_user.side_effect = [
+            mock.Mock(id="u%d" % i) for i in range(3)]
+        pool = mock_resource_pool.return_value
+        pool.name = "ci"
+        leased = {"id": 1,
+                  "data": {"tenant": {"id": "t1", "name": "tenant1"},
+                           "users": [{"id": "u", "credential": credential}],
+                           "images": {"foo": ["image"]}}}
+        pool.lease.return_value = [leased]
+        pool.add.return_value = 2
+
+        with users.UserGenerator(self.context) as ctx:
+            ctx.setup()
+
+            mock_resource_pool.assert_called_once_with("deployment_id", "ci")
+            pool.lease.assert_called_once_with(users.POOLED_TENANT, 2,
+                                               "task_id", lease_timeout=None)
+            self.assertEqual(["t1", "t2"], sorted(ctx.context["tenants"]))
+            self.assertEqual(4, len(ctx.context["users"]))
+            self.assertEqual(
+                ["u", "u0", "u1", "u2"],
+                sorted(user["id"] for user in ctx.context["users"]))
+            self.assertEqual(
+                {"foo": ["image"]},
+                users.get_pooled_tenant(ctx.context, "t1")["images"])
+            pool.add.assert_called_once_with(
+                users.POOLED_TENANT, mock.ANY, "task_id")
+            self.assertEqual(
+                2, len(users.get_pooled_tenant(ctx.context, "t2")["users"]))
+
+        self.assertEqual(
+            [mock.call(1, leased["data"]),
+             mock.call(2, users.get_pooled_tenant(ctx.context, "t2"))],
+            sorted(pool.release.call_args_list))
+        self.assertFalse(wrapped_keystone.delete_project.called)
+        self.assertFalse(wrapped_keystone.delete_user.called)
+
+    @mock.patch("%s.osclients.Clients" % CTX)
+    @mock.patch("%s.network.wrap" % CTX)
+    @mock.patch("%s.objects.ResourcePool" % CTX)
+    @mock.patch("%s.keystone" % CTX)
+    def test_setup_and_cleanup_drain_pool(self, mock_keystone,
+                                          mock_resource_pool,
+                                          mock_network_wrap, mock_clients):
+        credential = self._pool_context(drain_resource_pool=True,
+                                        resource_pool_lease_timeout=3600)
+        wrapped_keystone = mock_keystone.wrap.return_value
+        # NOTE: Mocks are created before they are called concurrently
+        mock_delete_project = wrapped_keystone.delete_project
+        mock_delete_user = wrapped_keystone.delete_user
+        pool = mock_resource_pool.return_value
+        pool.list.return_value = [{"id": i} for i in range(3)]
+        pool.lease.return_value = [
+            {"id": i, "data": {"tenant": {"id": "t%d" % i, "name": "t"},
+                               "users": [{"id": "u%d" % i,
+                                          "credential": credential}]}}
+            for i in range(3)]
+        pool.lease.return_value[0]["data"].update(
+            networks={"foo": [{"id": "net1"}], "bar": [{"id": "net2"}]},
+            images={"foo": ["image1", "image2"]})
+
+        with users.UserGenerator(self.context) as ctx:
+            ctx.setup()
+
+            pool.lease.assert_called_once_with(users.POOLED_TENANT, 3,
+                                               "task_id", lease_timeout=3600)
+            self.assertEqual(3, len(ctx.context["tenants"]))
+            self.assertEqual(3, len(ctx.context["users"]))
+            self.assertIsNone(users.get_pooled_tenant(ctx.context, "t0"))
+            self.assertFalse(wrapped_keystone.create_project.called)
+
+        delete_network = mock_network_wrap.return_value.delete_network
+        delete_network.assert_has_calls(
+            [mock.call({"id": "net1"}), mock.call({"id": "net2"})],
+            any_order=True)
+        self.assertEqual(2, delete_network.call_count)
+        glance = mock_clients.return_value.glance.return_value
+        glance.images.delete.assert_has_calls(
+            [mock.call("image1"), mock.call("image2")])
+        self.assertEqual(3, mock_delete_project.call_count)
+        self.assertEqual(3, mock_delete_user.call_count)
+        self.assertEqual([mock.call(i) for i in range(3)],
+                         sorted(mock_resource_pool.delete.call_args_list))
+        self.assertFalse(pool.release.called)
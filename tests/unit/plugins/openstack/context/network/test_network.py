@@ -15,7 +15,9 @@
 
 import mock
 import netaddr
+from oslo_config import cfg
 
+from rally import exceptions
 from rally.plugins.openstack.context.network import networks as network_context
 from tests.unit import test
 
@@ -42,6 +44,9 @@ class NetworkTestCase(test.TestCase):
         self.assertEqual(context.config["networks_per_tenant"], 1)
         self.assertEqual(context.config["start_cidr"],
                          network_context.Network.DEFAULT_CONFIG["start_cidr"])
+        self.assertEqual(
+            cfg.CONF.users_context.resource_management_workers,
+            context.config["resource_management_workers"])
 
     @mock.patch("rally.osclients.Clients")
     @mock.patch(NET + "wrap", return_value="foo_service")
@@ -61,9 +66,10 @@ class NetworkTestCase(test.TestCase):
         mock_utils.iterate_per_tenants.return_value = [
             ("foo_user", "foo_tenant"),
             ("bar_user", "bar_tenant")]
-        mock_create = mock.Mock(side_effect=lambda t, **kw: t + "-net")
+        mock_create = mock.Mock(
+            side_effect=lambda t, count, **kw: [t + "-net"] * count)
         mock_utils.generate_random_name = mock.Mock()
-        mock_wrap.return_value = mock.Mock(create_network=mock_create)
+        mock_wrap.return_value = mock.Mock(create_networks=mock_create)
         nets_per_tenant = 2
         net_context = network_context.Network(
             self.get_context(networks_per_tenant=nets_per_tenant,
@@ -72,10 +78,10 @@ class NetworkTestCase(test.TestCase):
         net_context.setup()
 
         create_calls = [
-            mock.call(tenant, add_router=True,
+            mock.call(tenant, nets_per_tenant, add_router=True,
                       subnets_num=1, network_create_args={"fakearg": "fake"})
             for user, tenant in mock_utils.iterate_per_tenants.return_value]
-        mock_create.assert_has_calls(create_calls)
+        mock_create.assert_has_calls(create_calls, any_order=True)
 
         mock_utils.iterate_per_tenants.assert_called_once_with(
             net_context.context["users"])
@@ -87,11 +93,66 @@ class NetworkTestCase(test.TestCase):
         self.assertSequenceEqual(sorted(expected_networks),
                                  sorted(actual_networks))
 
+    @mock.patch("rally.osclients.Clients")
+    @mock.patch(NET + "wrap")
+    def test_setup_failure(self, mock_wrap, mock_clients):
+        mock_wrap.return_value.create_networks.side_effect = (
+            lambda t, count, **kw: [t + "-net"] * count
+            if t == "foo_tenant" else 1 / 0)
+        context = self.get_context()
+        context["tenants"] = {"foo_tenant": {}, "bar_tenant": {}}
+        net_context = network_context.Network(context)
+
+        e = self.assertRaises(exceptions.ContextSetupFailure,
+                              net_context.setup)
+
+        self.assertIn("bar_tenant", "%s" % e)
+        self.assertEqual(
+            ["foo_tenant-net"],
+            net_context.context["tenants"]["foo_tenant"]["networks"])
+
     @mock.patch("rally.osclients.Clients")
     @mock.patch(NET + "wrap")
     def test_cleanup(self, mock_wrap, mock_clients):
+        mock_delete = mock_wrap.return_value.delete_network
         net_context = network_context.Network(self.get_context())
         net_context.cleanup()
-        mock_wrap().delete_network.assert_has_calls(
+        mock_delete.assert_has_calls(
             [mock.call({"id": "foo_net"}), mock.call({"id": "bar_net"})],
             any_order=True)
+
+    @mock.patch("rally.osclients.Clients")
+    @mock.patch(NET + "wrap")
+    def test_setup_and_cleanup_pooled(self, mock_wrap, mock_clients):
+        mock_wrap.return_value.create_networks.side_effect = (
+            lambda t, count, **kw: [t + "-net"] * count)
+        context = self.get_context(networks_per_tenant=2)
+        net_context = network_context.Network(context)
+        pooled = {}
+        context["resource_pool"] = {
+            "name": "ci", "drain": False,
+            "tenants": {"foo_tenant": {"id": 1, "data": pooled}}}
+
+        net_context.setup()
+
+        self.assertEqual(1, len(pooled["networks"]))
+        self.assertEqual(
+            ["foo_tenant-net", "foo_tenant-net"],
+            list(pooled["networks"].values())[0])
+        pool_key = list(pooled["networks"])[0]
+        self.assertNotIn("networks_per_tenant", pool_key)
+        mock_wrap.return_value.create_networks.reset_mock()
+
+        net_context.setup()
+
+        self.assertEqual(["foo_tenant-net", "foo_tenant-net"],
+                         context["tenants"]["foo_tenant"]["networks"])
+        mock_wrap.return_value.create_networks.assert_called_once_with(
+            "bar_tenant", 2, add_router=True, subnets_num=1,
+            network_create_args={})
+
+        mock_delete = mock_wrap.return_value.delete_network
+        net_context.cleanup()
+
+        mock_delete.assert_has_calls([mock.call("bar_tenant-net")] * 2)
+        self.assertEqual(2, mock_delete.call_count)
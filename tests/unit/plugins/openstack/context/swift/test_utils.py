@@ -185,3 +185,95 @@ class SwiftObjectMixinTestCase(test.TestCase):
         for tenant_id in context["tenants"]:
             for container in context["tenants"][tenant_id]["containers"]:
                 self.assertEqual(0, len(container["objects"]))
+
+    @mock.patch("rally.osclients.Clients")
+    def test__create_objects_segmented(self, mock_clients):
+        container = {"user": {"id": "u1", "tenant_id": "1001",
+                              "credential": "c1"},
+                     "container": "c1",
+                     "objects": []}
+        context = test.get_test_context()
+        context["tenants"] = {"1001": {"name": "t1_name",
+                                       "containers": [container]}}
+        mock_swift = mock_clients.return_value.swift.return_value
+        uploaded = []
+        mock_swift.put_object.side_effect = (
+            lambda c, name, contents, **kw: uploaded.append(
+                (c, name, contents if isinstance(contents, str)
+                 else contents.read(), kw)))
+
+        mixin = utils.SwiftObjectMixin()
+        objects_list = mixin._create_objects(context, 1, 10, 1,
+                                             segment_size=4)
+
+        object_name = container["objects"][0]
+        self.assertEqual([("1001", "c1", object_name)], objects_list)
+        mock_swift.put_container.assert_called_once_with("c1_segments")
+        self.assertEqual("c1_segments", container["segments_container"])
+        segments = ["%s/%08d" % (object_name, i) for i in range(3)]
+        self.assertEqual(segments, container["segments"])
+        self.assertEqual(
+            [("c1_segments", segments[0], b"\0" * 4, {"content_length": 4}),
+             ("c1_segments", segments[1], b"\0" * 4, {"content_length": 4}),
+             ("c1_segments", segments[2], b"\0" * 2, {"content_length": 2}),
+             ("c1", object_name, "",
+              {"headers": {
+                  "X-Object-Manifest": "c1_segments/%s/" % object_name}})],
+            uploaded)
+
+    @mock.patch("rally.osclients.Clients")
+    def test__delete_objects_segmented(self, mock_clients):
+        container = {"user": {"id": "u1", "tenant_id": "1001",
+                              "credential": "c1"},
+                     "container": "c1",
+                     "objects": ["o1"],
+                     "segments_container": "c1_segments",
+                     "segments": ["o1/00000000", "o1/00000001"]}
+        context = test.get_test_context()
+        context["tenants"] = {"1001": {"name": "t1_name",
+                                       "containers": [container]}}
+
+        mixin = utils.SwiftObjectMixin()
+        mixin._delete_objects(context, 1)
+
+        mock_swift = mock_clients.return_value.swift.return_value
+        self.assertEqual([mock.call("c1", "o1"),
+                          mock.call("c1_segments", "o1/00000000"),
+                          mock.call("c1_segments", "o1/00000001")],
+                         mock_swift.delete_object.mock_calls)
+        self.assertEqual([], container["objects"])
+        self.assertEqual([], container["segments"])
+
+        mixin._delete_containers(context, 1)
+
+        self.assertEqual([mock.call("c1"), mock.call("c1_segments")],
+                         mock_swift.delete_container.mock_calls)
+        self.assertEqual([], context["tenants"]["1001"]["containers"])
+
+
+class PayloadReaderTestCase(test.TestCase):
+
+    def test_read(self):
+        payload = bytearray(b"0123456789")
+        reader = utils.PayloadReader(payload, 6)
+
+        self.assertEqual(6, len(reader))
+        self.assertEqual(b"0123", reader.read(4))
+        self.assertEqual(4, reader.tell())
+        self.assertEqual(b"45", reader.read())
+        self.assertEqual(b"", reader.read(4))
+
+        reader.seek(1)
+        self.assertEqual(b"12", reader.read(2))
+        reader.seek(-1, 2)
+        self.assertEqual(b"5", reader.read())
+
+    def test_readers_are_independent(self):
+        payload = bytearray(8)
+        first = utils.PayloadReader(payload, 8)
+        second = utils.PayloadReader(payload, 4)
+
+        first.read(6)
+
+        self.assertEqual(b"\0" * 4, second.read())
+        self.assertEqual(b"\0" * 2, first.read())
@@ -196,7 +196,9 @@ class CinderScenarioTestCase(test.ScenarioTestCase):
         self._test_atomic_action_timer(self.scenario.atomic_actions(),
                                        "cinder.extend_volume")
 
-    def test__upload_volume_to_image(self):
+    @mock.patch("rally.plugins.openstack.scenario.journal.record_resources")
+    def test__upload_volume_to_image(self, mock_record_resources):
+        self.scenario.context["resource_pool"] = {}
         volume = mock.Mock()
         image = {"os-volume_upload_image": {"image_id": 1}}
         volume.upload_to_image.return_value = (None, image)
@@ -209,6 +211,8 @@ class CinderScenarioTestCase(test.ScenarioTestCase):
 
         volume.upload_to_image.assert_called_once_with(False, "test_vol",
                                                        "container", "disk")
+        mock_record_resources.assert_called_once_with(
+            self.scenario.context, [("glance", "images", 1)])
         self.mock_wait_for.mock.assert_has_calls([
             mock.call(
                 volume,
@@ -29,7 +29,7 @@ class NeutronScenarioTestCase(test.ScenarioTestCase):
 
     def setUp(self):
         super(NeutronScenarioTestCase, self).setUp()
-        self.network = mock.Mock()
+        self.network = mock.MagicMock()
         self.scenario = utils.NeutronScenario(self.context)
 
     def test__get_network_id(self):
@@ -211,7 +211,7 @@ class NeutronScenarioTestCase(test.ScenarioTestCase):
     @mock.patch(NEUTRON_UTILS + "NeutronScenario.generate_random_name")
     def test_create_router(self, mock_generate_random_name):
         scenario = utils.NeutronScenario(self.context)
-        router = mock.Mock()
+        router = mock.MagicMock()
         mock_generate_random_name.return_value = "random_name"
         self.clients("neutron").create_router.return_value = router
 
@@ -226,7 +226,7 @@ class NeutronScenarioTestCase(test.ScenarioTestCase):
     @mock.patch(NEUTRON_UTILS + "NeutronScenario.generate_random_name")
     def test_create_router_with_ext_gw(self, mock_generate_random_name):
         scenario = utils.NeutronScenario()
-        router = mock.Mock()
+        router = mock.MagicMock()
         external_network = [{"id": "ext-net", "router:external": True}]
         scenario._list_networks = mock.Mock(return_value=external_network)
         mock_generate_random_name.return_value = "random_name"
@@ -247,7 +247,7 @@ class NeutronScenarioTestCase(test.ScenarioTestCase):
     def test_create_router_with_ext_gw_but_no_ext_net(
             self, mock_generate_random_name):
         scenario = utils.NeutronScenario()
-        router = mock.Mock()
+        router = mock.MagicMock()
         external_network = [{"id": "ext-net", "router:external": False}]
         scenario._list_networks = mock.Mock(return_value=external_network)
         mock_generate_random_name.return_value = "random_name"
@@ -263,7 +263,7 @@ class NeutronScenarioTestCase(test.ScenarioTestCase):
 
     def test_create_router_explicit(self):
         scenario = utils.NeutronScenario(self.context)
-        router = mock.Mock()
+        router = mock.MagicMock()
         self.clients("neutron").create_router.return_value = router
 
         # Custom options
@@ -763,7 +763,7 @@ class NeutronLoadbalancerScenarioTestCase(test.ScenarioTestCase):
 
     def setUp(self):
         super(NeutronLoadbalancerScenarioTestCase, self).setUp()
-        self.network = mock.Mock()
+        self.network = mock.MagicMock()
 
     @ddt.data(
         {"networks": [{"subnets": "subnet-id"}]},
@@ -231,10 +231,16 @@ class NovaScenarioTestCase(test.ScenarioTestCase):
         self._test_atomic_action_timer(nova_scenario.atomic_actions(),
                                        "nova.unshelve_server")
 
-    def test__create_image(self):
+    @mock.patch("rally.plugins.openstack.scenario.journal.record_resources")
+    def test__create_image(self, mock_record_resources):
+        self.context["resource_pool"] = {}
         self.clients("nova").images.get.return_value = self.image
         nova_scenario = utils.NovaScenario(context=self.context)
         return_image = nova_scenario._create_image(self.server)
+        mock_record_resources.assert_called_once_with(
+            nova_scenario.context,
+            [("glance", "images",
+              self.clients("nova").servers.create_image.return_value)])
         self.mock_wait_for.mock.assert_called_once_with(
             self.image,
             ready_statuses=["ACTIVE"],
@@ -90,15 +90,15 @@ class SwiftObjectsTestCase(test.ScenarioTestCase):
     def test_list_objects_in_containers(self, num_cons):
         con_list = [{"name": "cooon_%s" % i} for i in range(num_cons)]
         scenario = objects.SwiftObjects()
-        scenario._list_containers = mock.MagicMock(return_value=("header",
-                                                                 con_list))
+        scenario._list_containers = mock.MagicMock(return_value=(
+            "header", con_list + [{"name": "cooon_0_segments"}]))
         scenario._list_objects = mock.MagicMock()
 
         scenario.list_objects_in_containers()
         scenario._list_containers.assert_called_once_with()
         con_calls = [mock.call(container["name"], atomic_action=False)
                      for container in con_list]
-        scenario._list_objects.assert_has_calls(con_calls)
+        self.assertEqual(con_calls, scenario._list_objects.mock_calls)
 
         key_suffix = "container"
         if num_cons > 1:
@@ -112,8 +112,8 @@ class SwiftObjectsTestCase(test.ScenarioTestCase):
         con_list = [{"name": "connn_%s" % i} for i in range(num_cons)]
         obj_list = [{"name": "ooobj_%s" % i} for i in range(num_objs)]
         scenario = objects.SwiftObjects()
-        scenario._list_containers = mock.MagicMock(return_value=("header",
-                                                                 con_list))
+        scenario._list_containers = mock.MagicMock(return_value=(
+            "header", con_list + [{"name": "connn_0_segments"}]))
         scenario._list_objects = mock.MagicMock(return_value=("header",
                                                               obj_list))
         scenario._download_object = mock.MagicMock()
@@ -122,7 +122,9 @@ class SwiftObjectsTestCase(test.ScenarioTestCase):
         scenario._list_containers.assert_called_once_with()
         con_calls = [mock.call(container["name"], atomic_action=False)
                      for container in con_list]
-        scenario._list_objects.assert_has_calls(con_calls)
+        self.assertEqual(con_calls, scenario._list_objects.mock_calls)
+        self.assertEqual(num_cons * num_objs,
+                         scenario._download_object.call_count)
         obj_calls = []
         for container in con_list:
             for obj in obj_list:
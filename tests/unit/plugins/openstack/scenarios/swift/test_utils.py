@@ -69,6 +69,20 @@ class SwiftScenarioTestCase(test.ScenarioTestCase):
         self._test_atomic_action_timer(scenario.atomic_actions(),
                                        "swift.create_container")
 
+    @mock.patch("rally.plugins.openstack.scenario.journal.record_resources")
+    def test__create_segments_container(self, mock_record_resources):
+        self.context["resource_pool"] = {}
+        scenario = utils.SwiftScenario(self.context)
+
+        self.assertEqual("foo_segments",
+                         scenario._create_segments_container("foo"))
+        self.clients("swift").put_container.assert_called_once_with(
+            "foo_segments")
+        mock_record_resources.assert_called_once_with(
+            self.context, [("swift", "container", "foo_segments")])
+        self.assertTrue(scenario._is_segments_container("foo_segments"))
+        self.assertFalse(scenario._is_segments_container("foo"))
+
     def test__delete_container(self):
         container_name = mock.MagicMock()
         scenario = utils.SwiftScenario(context=self.context)
@@ -16,6 +16,7 @@ import mock
 from oslotest import mockpatch
 
 from rally.plugins.openstack import scenario as base_scenario
+from rally.task import atomic
 from tests.unit import test
 
 
@@ -67,3 +68,26 @@ class OpenStackScenarioTestCase(test.TestCase):
         self.assertEqual(self.context, scenario.context)
 
         self.assertEqual("foobar", scenario._clients)
+
+    @mock.patch("rally.plugins.openstack.scenario.journal")
+    def test__record_resource(self, mock_journal):
+        scenario = base_scenario.OpenStackScenario(
+            self.context, clients="foobar")
+        scenario._record_resource("nova", "servers", "id")
+        mock_journal.record_resources.assert_called_once_with(
+            self.context, [("nova", "servers", "id")])
+
+        mock_journal.record_resources.reset_mock()
+        with atomic.ActionTimer(scenario, "outer"):
+            with atomic.ActionTimer(scenario, "inner"):
+                scenario._record_resource("nova", "servers", "id1")
+            scenario._record_resource("nova", "servers", "id2")
+            self.assertFalse(mock_journal.record_resources.called)
+        mock_journal.record_resources.assert_called_once_with(
+            self.context, [("nova", "servers", "id1"),
+                           ("nova", "servers", "id2")])
+
+        mock_journal.record_resources.reset_mock()
+        mock_journal.is_enabled.return_value = False
+        scenario._record_resource("nova", "servers", "id")
+        self.assertFalse(mock_journal.record_resources.called)
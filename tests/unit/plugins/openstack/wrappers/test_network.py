@@ -57,6 +57,15 @@ class NovaNetworkWrapperTestCase(test.TestCase):
         self.assertEqual(service.skip_cidrs, skip_cidrs)
         service.client.networks.list.assert_called_once_with()
 
+    def test_create_networks(self):
+        service = self.get_wrapper()
+        service.create_network = mock.Mock(side_effect=["net-0", "net-1"])
+
+        self.assertEqual(["net-0", "net-1"],
+                         service.create_networks("foo_tenant", 2, foo="bar"))
+        self.assertEqual([mock.call("foo_tenant", foo="bar")] * 2,
+                         service.create_network.mock_calls)
+
     @mock.patch("rally.plugins.openstack.wrappers.network.generate_cidr")
     def test__generate_cidr(self, mock_generate_cidr):
         skip_cidrs = [5, 7]
@@ -378,6 +387,117 @@ class NeutronWrapperTestCase(test.TestCase):
                          [mock.call("foo_router", {"subnet_id": "foo_subnet"})
                           for i in range(subnets_num)])
 
+    def test_create_network_does_not_modify_args(self):
+        service = self.get_wrapper()
+        service.client.create_network.return_value = {
+            "network": {"id": "foo_id", "name": "foo_name",
+                        "status": "foo_status"}}
+        network_create_args = {"foo": "bar"}
+
+        service.create_network("foo_tenant",
+                               network_create_args=network_create_args)
+
+        self.assertEqual({"foo": "bar"}, network_create_args)
+        service.client.create_network.assert_called_once_with({
+            "network": {"foo": "bar", "tenant_id": "foo_tenant",
+                        "name": self.owner.generate_random_name.return_value}})
+
+    def test_create_networks(self):
+        service = self.get_wrapper()
+        service._generate_cidr = mock.Mock(return_value="foo_cidr")
+        service.create_router = mock.Mock(
+            side_effect=[{"id": "router-0"}, {"id": "router-1"}])
+        service.client.list_networks.return_value = {
+            "networks": [{"id": "ext_net"}]}
+        service.client.create_network.return_value = {
+            "networks": [{"id": "net-%d" % i, "name": "name-%d" % i,
+                          "status": "ACTIVE"} for i in range(2)]}
+        service.client.create_subnet.return_value = {
+            "subnets": [{"id": "subnet-%d-%d" % (i, j),
+                         "network_id": "net-%d" % i}
+                        for i in range(2) for j in range(2)]}
+
+        nets = service.create_networks("foo_tenant", 2, add_router=True,
+                                       subnets_num=2,
+                                       network_create_args={"foo": "bar"})
+
+        name = self.owner.generate_random_name.return_value
+        self.assertEqual(
+            [{"id": "net-%d" % i, "name": "name-%d" % i, "status": "ACTIVE",
+              "external": False, "tenant_id": "foo_tenant",
+              "router_id": "router-%d" % i,
+              "subnets": ["subnet-%d-0" % i, "subnet-%d-1" % i]}
+             for i in range(2)], nets)
+        service.client.create_network.assert_called_once_with(
+            {"networks": [{"foo": "bar", "tenant_id": "foo_tenant",
+                           "name": name}] * 2})
+        service.client.create_subnet.assert_called_once_with(
+            {"subnets": [{"name": name,
+                          "enable_dhcp": True,
+                          "network_id": "net-%d" % i,
+                          "tenant_id": "foo_tenant",
+                          "ip_version": service.SUBNET_IP_VERSION,
+                          "dns_nameservers": ["8.8.8.8", "8.8.4.4"],
+                          "cidr": "foo_cidr"}
+                         for i in range(2) for j in range(2)]})
+        service.client.list_networks.assert_called_once_with(
+            **{"router:external": True})
+        service.create_router.assert_has_calls(
+            [mock.call(tenant_id="foo_tenant",
+                       external_gateway_info={"network_id": "ext_net",
+                                              "enable_snat": True})] * 2)
+        self.assertEqual(
+            [mock.call("router-%d" % i,
+                       {"subnet_id": "subnet-%d-%d" % (i, j)})
+             for i in range(2) for j in range(2)],
+            service.client.add_interface_router.mock_calls)
+
+    def test_create_networks_rollback_on_subnets_failure(self):
+        service = self.get_wrapper()
+        service._generate_cidr = mock.Mock(return_value="foo_cidr")
+        service.client.create_network.return_value = {
+            "networks": [{"id": "net-%d" % i} for i in range(2)]}
+        service.client.create_subnet.side_effect = RuntimeError
+        service.client.delete_network.side_effect = [Exception, None]
+
+        self.assertRaises(RuntimeError, service.create_networks,
+                          "foo_tenant", 2, subnets_num=1)
+
+        self.assertEqual([mock.call("net-0"), mock.call("net-1")],
+                         service.client.delete_network.mock_calls)
+        self.assertFalse(service.client.delete_router.called)
+
+    def test_create_networks_rollback_on_router_failure(self):
+        service = self.get_wrapper()
+        service._generate_cidr = mock.Mock(return_value="foo_cidr")
+        service.create_router = mock.Mock(
+            side_effect=[{"id": "router-0"}, RuntimeError])
+        service.client.list_networks.return_value = {"networks": []}
+        service.client.create_network.return_value = {
+            "networks": [{"id": "net-%d" % i} for i in range(2)]}
+        service.client.create_subnet.return_value = {
+            "subnets": [{"id": "subnet-%d" % i, "network_id": "net-%d" % i}
+                        for i in range(2)]}
+
+        self.assertRaises(RuntimeError, service.create_networks,
+                          "foo_tenant", 2, subnets_num=1, add_router=True)
+
+        service.client.remove_interface_router.assert_called_once_with(
+            "router-0", {"subnet_id": "subnet-0"})
+        service.client.delete_router.assert_called_once_with("router-0")
+        self.assertEqual([mock.call("net-0"), mock.call("net-1")],
+                         service.client.delete_network.mock_calls)
+
+    def test_create_networks_single(self):
+        service = self.get_wrapper()
+        service.create_network = mock.Mock(return_value="foo_net")
+
+        self.assertEqual(["foo_net"],
+                         service.create_networks("foo_tenant", 1, foo="bar"))
+        service.create_network.assert_called_once_with("foo_tenant",
+                                                       foo="bar")
+        self.assertFalse(service.client.create_network.called)
+
     @mock.patch("rally.plugins.openstack.wrappers.network.NeutronWrapper"
                 ".supports_extension", return_value=(False, ""))
     def test_delete_network(self, mock_neutron_wrapper_supports_extension):
@@ -0,0 +1,99 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+
+import mock
+
+from rally import plugins
+from tests.unit import test
+
+
+PLUGINS = "rally.plugins"
+
+
+@mock.patch("%s.discover" % PLUGINS)
+@mock.patch("%s.index" % PLUGINS)
+class LoadTestCase(test.TestCase):
+
+    def setUp(self):
+        super(LoadTestCase, self).setUp()
+        self.addCleanup(setattr, plugins, "PLUGINS_LOADED",
+                        plugins.PLUGINS_LOADED)
+        plugins.PLUGINS_LOADED = False
+
+    def test_load(self, mock_index, mock_discover):
+        plugins.load()
+
+        mock_discover.import_modules_from_package.assert_has_calls(
+            [mock.call(package) for package in plugins.PACKAGES])
+        self.assertEqual(2, mock_discover.load_plugins.call_count)
+        self.assertFalse(mock_index.PluginIndex.load.called)
+        self.assertFalse(mock_index.PluginIndex.build.called)
+        self.assertTrue(plugins.PLUGINS_LOADED)
+
+        plugins.load()
+        self.assertEqual(2, mock_discover.load_plugins.call_count)
+
+    def test_load_lazy(self, mock_index, mock_discover):
+        mock_index.get_active.return_value = None
+        plugin_index = mock_index.PluginIndex.load.return_value
+        plugin_index.is_valid.return_value = True
+
+        plugins.load(lazy=True)
+
+        mock_index.PluginIndex.load.assert_called_once_with(
+            plugins.index_path())
+        plugin_index.is_valid.assert_called_once_with(plugins.PACKAGES)
+        mock_index.activate.assert_called_once_with(plugin_index)
+        self.assertFalse(mock_discover.import_modules_from_package.called)
+        self.assertEqual(2, mock_discover.load_plugins.call_count)
+        self.assertFalse(plugins.PLUGINS_LOADED)
+
+    def test_load_lazy_rebuilds_index(self, mock_index, mock_discover):
+        mock_index.get_active.return_value = None
+        plugin_index = mock_index.PluginIndex.load.return_value
+        plugin_index.is_valid.return_value = False
+        mock_discover.itersubclasses.return_value = []
+
+        plugins.load(lazy=True)
+
+        self.assertFalse(mock_index.activate.called)
+        mock_discover.import_modules_from_package.assert_has_calls(
+            [mock.call(package) for package in plugins.PACKAGES])
+        mock_index.PluginIndex.build.assert_called_once_with(
+            plugins.PACKAGES, [])
+        mock_index.PluginIndex.build.return_value.save.assert_called_once_with(
+            plugins.index_path())
+        self.assertTrue(plugins.PLUGINS_LOADED)
+
+
+class IndexPathTestCase(test.TestCase):
+
+    @mock.patch("%s.version.version_string" % PLUGINS)
+    @mock.patch("%s.sys" % PLUGINS)
+    def test_index_path(self, mock_sys, mock_version_string):
+        mock_sys.prefix = "/venv1"
+        mock_version_string.return_value = "1.0"
+        path = plugins.index_path()
+
+        self.assertEqual(plugins.INDEX_DIR, os.path.dirname(path))
+        self.assertEqual(path, plugins.index_path())
+
+        mock_sys.prefix = "/venv2"
+        self.assertNotEqual(path, plugins.index_path())
+
+        mock_sys.prefix = "/venv1"
+        mock_version_string.return_value = "1.1"
+        self.assertNotEqual(path, plugins.index_path())
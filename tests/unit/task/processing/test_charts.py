@@ -396,6 +396,55 @@ def generate_iteration(duration, error, *args):
     }
 
 
+class CorrectedDurationTableTestCase(test.TestCase):
+
+    def test_add_iteration_and_render(self):
+        table = charts.CorrectedDurationTable({"iterations_count": 4})
+        table.add_iteration({"duration": 1.0, "timestamp": 1, "error": []})
+        table.add_iteration({"duration": 1.0, "timestamp": 2, "error": []})
+        table.add_iteration({"duration": 3.5, "timestamp": 3, "error": []})
+        table.add_iteration({"duration": 9.0, "timestamp": 4,
+                             "error": ["error"]})
+
+        self.assertEqual(
+            {"cols": ["Durations", "Min (sec)", "Median (sec)",
+                      "90%ile (sec)", "95%ile (sec)", "99%ile (sec)",
+                      "Max (sec)", "Avg (sec)", "Count"],
+             "rows": [["raw", 1.0, 1.0, 1.0, 1.0, 1.0, 3.5, 1.833, 3],
+                      ["corrected", 1.0, 1.507, 2.484, 2.484, 2.484, 3.5,
+                       1.9, 5]]},
+            table.render())
+
+    def test_render_no_iterations(self):
+        table = charts.CorrectedDurationTable({"iterations_count": 0})
+        self.assertEqual([["raw"] + ["n/a"] * 7 + [0],
+                          ["corrected"] + ["n/a"] * 7 + [0]],
+                         table.render()["rows"])
+
+
+class AtomicCallsTableTestCase(test.TestCase):
+
+    def test_add_iteration_and_render(self):
+        def span(name, duration, failed=False):
+            return {"name": name, "parent": None, "offset": 0,
+                    "duration": duration, "failed": failed}
+
+        table = charts.AtomicCallsTable({"iterations_count": 2})
+        table.add_iteration({"atomic_actions_trace": [
+            span("foo", 1.0), span("bar", 4.0), span("foo", 2.0)]})
+        table.add_iteration({"atomic_actions_trace": [
+            span("foo", 3.0), span("bar", None, failed=True)]})
+        table.add_iteration({})
+
+        self.assertEqual(
+            {"cols": ["Action", "Min (sec)", "Median (sec)", "90%ile (sec)",
+                      "95%ile (sec)", "Max (sec)", "Avg (sec)", "Failed",
+                      "Calls", "Calls per iteration"],
+             "rows": [["foo", 1.0, 1.994, 1.994, 1.994, 3.0, 2.0, 0, 3, 1.5],
+                      ["bar", 4.0, 4.0, 4.0, 4.0, 4.0, 4.0, 1, 2, 1.0]]},
+            table.render())
+
+
 @ddt.ddt
 class MainStatsTableTestCase(test.TestCase):
 
@@ -31,6 +31,7 @@ class PlotTestCase(test.TestCase):
     def test__process_scenario(self, mock_charts):
         for mock_ins, ret in [
                 (mock_charts.MainStatsTable, "main_stats"),
+                (mock_charts.CorrectedDurationTable, "corrected_stats"),
                 (mock_charts.MainStackedAreaChart, "main_stacked"),
                 (mock_charts.AtomicStackedAreaChart, "atomic_stacked"),
                 (mock_charts.OutputStackedAreaDeprecatedChart,
@@ -38,7 +39,8 @@ class PlotTestCase(test.TestCase):
                 (mock_charts.LoadProfileChart, "load_profile"),
                 (mock_charts.MainHistogramChart, "main_histogram"),
                 (mock_charts.AtomicHistogramChart, "atomic_histogram"),
-                (mock_charts.AtomicAvgChart, "atomic_avg")]:
+                (mock_charts.AtomicAvgChart, "atomic_avg"),
+                (mock_charts.AtomicCallsTable, "atomic_calls")]:
             setattr(mock_ins.return_value.render, "return_value", ret)
         iterations = [
             {"timestamp": i + 2, "error": [],
@@ -65,7 +67,8 @@ class PlotTestCase(test.TestCase):
                     indent=2),
                 "full_duration": 40, "load_duration": 32,
                 "atomic": {"histogram": "atomic_histogram",
-                           "iter": "atomic_stacked", "pie": "atomic_avg"},
+                           "iter": "atomic_stacked", "pie": "atomic_avg",
+                           "calls": "atomic_calls"},
                 "iterations": {"histogram": "main_histogram",
                                "iter": "main_stacked",
                                "pie": [("success", 10), ("errors", 0)]},
@@ -74,7 +77,63 @@ class PlotTestCase(test.TestCase):
                 "additive_output": [],
                 "complete_output": [[], [], [], [], [], [], [], [], [], []],
                 "output_errors": [],
-                "sla": [], "sla_success": True, "table": "main_stats"})
+                "sla": [], "sla_success": True, "table": "main_stats",
+                "corrected_table": "corrected_stats"})
+
+    @mock.patch(PLOT + "plugin.Plugin.get")
+    @mock.patch(PLOT + "charts")
+    def test__process_scenario_merges_additive_output_by_title(
+            self, mock_charts, mock_plugin_get):
+        def additive(title):
+            return {"title": title, "description": "", "data": [["x", 1]],
+                    "chart_plugin": "StackedArea"}
+
+        foo_chart = mock.Mock(**{"render.return_value": "foo"})
+        bar_chart = mock.Mock(**{"render.return_value": "bar"})
+        mock_plugin_get.return_value.side_effect = [foo_chart, bar_chart]
+        iterations = [
+            {"timestamp": 2, "error": [], "duration": 5, "idle_duration": 0,
+             "output": {"additive": [additive("foo"), additive("bar")],
+                        "complete": []},
+             "atomic_actions": {}},
+            {"timestamp": 3, "error": ["Err", "msg", "trace"], "duration": 5,
+             "idle_duration": 0,
+             "output": {"additive": [additive("bar")], "complete": []},
+             "atomic_actions": {}}]
+        data = {"iterations": iterations, "sla": [],
+                "key": {"kw": {"runner": {"type": "constant"}},
+                        "name": "Foo.bar", "pos": 0},
+                "info": {"atomic": {}, "full_duration": 4,
+                         "load_duration": 3, "iterations_count": 2,
+                         "iterations_passed": 1, "max_duration": 5,
+                         "min_duration": 5, "output_names": [],
+                         "tstamp_end": 8, "tstamp_start": 2}}
+
+        task_data = plot._process_scenario(data, 1)
+
+        self.assertEqual(["foo", "bar"], task_data["additive_output"])
+        self.assertEqual(1, foo_chart.add_iteration.call_count)
+        self.assertEqual(2, bar_chart.add_iteration.call_count)
+
+    def test__atomic_actions_waterfall(self):
+        trace = [
+            {"name": "foo", "parent": None, "offset": 0.1, "duration": 2,
+             "failed": False},
+            {"name": "bar", "parent": 0, "offset": 0.5, "duration": 1,
+             "failed": False},
+            {"name": "bar", "parent": 0, "offset": 1.5, "duration": None,
+             "failed": True}]
+
+        self.assertEqual(
+            {"title": "Atomic actions",
+             "description": "Calls of atomic actions in order of start",
+             "widget": "Table",
+             "data": {"cols": ["Action", "Started at (sec)",
+                               "Duration (sec)", "Failed"],
+                      "rows": [["foo", 0.1, 2, "no"],
+                               ["foo > bar", 0.5, 1, "no"],
+                               ["foo > bar", 1.5, "n/a", "yes"]]}},
+            plot._atomic_actions_waterfall(trace))
 
     @mock.patch(PLOT + "_process_scenario")
     @mock.patch(PLOT + "json.dumps", return_value="json_data")
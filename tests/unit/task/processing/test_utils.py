@@ -70,6 +70,28 @@ class MathTestCase(test.TestCase):
         self.assertRaises(ValueError,
                           utils.median, lst)
 
+    def test_mann_whitney(self):
+        lower = list(range(1, 11))
+        greater = list(range(11, 21))
+
+        self.assertAlmostEqual(9.1e-5, utils.mann_whitney(greater, lower),
+                               places=6)
+        self.assertGreater(utils.mann_whitney(lower, greater), 0.99)
+        self.assertAlmostEqual(0.5, utils.mann_whitney(lower, lower),
+                               delta=0.05)
+        self.assertEqual(1.0, utils.mann_whitney([1] * 10, [1] * 10))
+
+    def test_bootstrap(self):
+        values = [i % 10 for i in range(100)]
+
+        low, high = utils.bootstrap(values, values, lambda v, b: (
+            utils.mean(v) - utils.mean(b)), confidence=0.9, seed=1)
+
+        self.assertTrue(-1 < low < 0 < high < 1)
+        self.assertEqual((low, high), utils.bootstrap(
+            values, values, lambda v, b: utils.mean(v) - utils.mean(b),
+            confidence=0.9, seed=1))
+
 
 @ddt.ddt
 class GraphZipperTestCase(test.TestCase):
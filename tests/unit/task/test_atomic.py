@@ -16,6 +16,7 @@
 import mock
 
 from rally.common import costilius
+from rally.common import tracing
 from rally.task import atomic
 from tests.unit import test
 
@@ -26,6 +27,19 @@ class ActionTimerMixinTestCase(test.TestCase):
         inst = atomic.ActionTimerMixin()
         self.assertEqual(inst._atomic_actions, inst.atomic_actions())
 
+    def test__atomic_actions_finished(self):
+        inst = atomic.ActionTimerMixin()
+        running = []
+        inst._atomic_actions_finished = mock.Mock(
+            side_effect=lambda: running.append(inst._atomic_action_running()))
+
+        with atomic.ActionTimer(inst, "outer"):
+            with atomic.ActionTimer(inst, "inner"):
+                self.assertTrue(inst._atomic_action_running())
+            self.assertFalse(inst._atomic_actions_finished.called)
+        self.assertEqual([False], running)
+        self.assertFalse(inst._atomic_action_running())
+
 
 class AtomicActionTestCase(test.TestCase):
 
@@ -38,9 +52,42 @@ class AtomicActionTestCase(test.TestCase):
                 with atomic.ActionTimer(inst, "some"):
                     pass
 
-        expected = [("test", 20), ("test (2)", 12), ("some", 4)]
+        expected = [("test", 20), ("some", 4)]
         self.assertEqual(costilius.OrderedDict(expected),
                          inst.atomic_actions())
+        self.assertEqual(
+            [{"name": "test", "parent": None, "started_at": 1,
+              "finished_at": 21, "failed": False},
+             {"name": "test", "parent": 0, "started_at": 3,
+              "finished_at": 15, "failed": False},
+             {"name": "some", "parent": 1, "started_at": 6,
+              "finished_at": 10, "failed": False}],
+            inst.atomic_actions_trace())
+
+    @mock.patch("time.time", side_effect=[1, 3, 6, 10, 15, 21])
+    def test_action_timer_context_repeated(self, mock_time):
+        inst = atomic.ActionTimerMixin()
+
+        for i in range(3):
+            with atomic.ActionTimer(inst, "test"):
+                pass
+
+        self.assertEqual(costilius.OrderedDict([("test", 12)]),
+                         inst.atomic_actions())
+        self.assertEqual([(None, 2), (None, 4), (None, 6)],
+                         [(span["parent"],
+                           span["finished_at"] - span["started_at"])
+                          for span in inst.atomic_actions_trace()])
+
+    def test_action_timer_context_tracing(self):
+        inst = atomic.ActionTimerMixin()
+
+        with atomic.ActionTimer(inst, "test"):
+            self.assertEqual("test", tracing.current_action())
+            with atomic.ActionTimer(inst, "some"):
+                self.assertEqual("some", tracing.current_action())
+            self.assertEqual("test", tracing.current_action())
+        self.assertIsNone(tracing.current_action())
 
     @mock.patch("time.time", side_effect=[1, 3])
     def test_action_timer_context_with_exception(self, mock_time):
@@ -58,6 +105,7 @@ class AtomicActionTestCase(test.TestCase):
         expected = [("test", 2)]
         self.assertEqual(costilius.OrderedDict(expected),
                          inst.atomic_actions())
+        self.assertTrue(inst.atomic_actions_trace()[0]["failed"])
 
     @mock.patch("time.time", side_effect=[1, 3])
     def test_action_timer_decorator(self, mock_time):
@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
 
 import jsonschema
 import mock
@@ -181,7 +182,7 @@ class ContextManagerTestCase(test.TestCase):
             [mock.call("a"), mock.call("b")], any_order=True)
         mock_context.assert_has_calls(
             [mock.call(ctx_object), mock.call(ctx_object)], any_order=True)
-        self.assertEqual([mock_context(), mock_context()], manager._visited)
+        self.assertEqual([[mock_context(), mock_context()]], manager._visited)
         mock_context.return_value.assert_has_calls(
             [mock.call.setup(), mock.call.setup()], any_order=True)
 
@@ -218,6 +219,86 @@ class ContextManagerTestCase(test.TestCase):
         mock_context.return_value.assert_has_calls(
             [mock.call.cleanup(), mock.call.cleanup()], any_order=True)
 
+    def _contexts(self, *orders):
+        calls = []
+
+        def fake_context(i, order):
+            ctx = mock.Mock()
+            ctx.get_name.return_value = str(i)
+            ctx.get_order.return_value = order
+            ctx.setup.side_effect = lambda: calls.append(("setup", i))
+            ctx.cleanup.side_effect = lambda: calls.append(("cleanup", i))
+            return ctx
+
+        return calls, [fake_context(i, order)
+                       for i, order in enumerate(orders)]
+
+    @mock.patch("rally.task.context.ContextManager._get_sorted_context_lst")
+    def test_setup_and_cleanup_groups(self, mock__get_sorted_context_lst):
+        calls, contexts = self._contexts(1, 2, 2, 3)
+        mock__get_sorted_context_lst.return_value = contexts
+        # NOTE: Contexts with the same order wait for each other, so the
+        #       test hangs if they are run one by one.
+        barrier = [threading.Event(), threading.Event()]
+        waited = []
+
+        def setup(i):
+            barrier[i - 1].set()
+            waited.append(barrier[2 - i].wait(10))
+            calls.append(("setup", i))
+
+        contexts[1].setup.side_effect = lambda: setup(1)
+        contexts[2].setup.side_effect = lambda: setup(2)
+        manager = context.ContextManager({})
+
+        manager.setup()
+        manager.cleanup()
+
+        self.assertEqual([True, True], waited)
+        self.assertEqual([("setup", 0)], calls[:1])
+        self.assertEqual([("setup", 1), ("setup", 2)], sorted(calls[1:3]))
+        self.assertEqual([("setup", 3), ("cleanup", 3)], calls[3:5])
+        self.assertEqual([("cleanup", 1), ("cleanup", 2)],
+                         sorted(calls[5:7]))
+        self.assertEqual([("cleanup", 0)], calls[7:])
+
+    @mock.patch("rally.task.context.ContextManager._get_sorted_context_lst")
+    def test_setup_fails_in_group(self, mock__get_sorted_context_lst):
+        calls, contexts = self._contexts(1, 2, 2, 3)
+        mock__get_sorted_context_lst.return_value = contexts
+        contexts[1].setup.side_effect = ValueError("foo")
+        contexts[2].cleanup.side_effect = Exception()
+
+        def run():
+            with context.ContextManager({}):
+                pass
+
+        self.assertRaises(ValueError, run)
+
+        self.assertEqual([("setup", 0), ("setup", 2), ("cleanup", 1),
+                          ("cleanup", 0)], calls)
+        contexts[2].cleanup.assert_called_once_with()
+        self.assertFalse(contexts[3].setup.called)
+        self.assertFalse(contexts[3].cleanup.called)
+
+    @mock.patch("rally.task.context.LOG")
+    def test__run_concurrently_logs_other_errors(self, mock_log):
+        calls, contexts = self._contexts(1, 1, 1)
+        contexts[0].setup.side_effect = ValueError("0")
+        contexts[2].setup.side_effect = ValueError("2")
+
+        e = self.assertRaises(
+            ValueError, context.ContextManager._run_concurrently, contexts,
+            lambda ctx: ctx.setup())
+
+        # NOTE: The first failed context is re-raised, the other is logged
+        logged = "2" if str(e) == "0" else "0"
+        mock_log.error.assert_called_once_with(
+            "Context %s failed: %s" % (logged, logged), exc_info=mock.ANY)
+        self.assertEqual(logged,
+                         str(mock_log.error.call_args[1]["exc_info"][1]))
+        self.assertEqual([("setup", 1)], calls)
+
     @mock.patch("rally.task.context.ContextManager.cleanup")
     @mock.patch("rally.task.context.ContextManager.setup")
     def test_with_statement(
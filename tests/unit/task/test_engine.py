@@ -107,9 +107,9 @@ class TaskEngineTestCase(test.TestCase):
         self.assertTrue(task.set_failed.called)
 
     @mock.patch("rally.task.engine.TaskConfig")
-    @mock.patch("rally.task.engine.scenario.Scenario.get_all")
+    @mock.patch("rally.task.engine.scenario.Scenario.get")
     def test__validate_config_scenarios_name(
-            self, mock_scenario_get_all, mock_task_config):
+            self, mock_scenario_get, mock_task_config):
 
         mock_task_instance = mock.MagicMock()
         mock_subtask = mock.MagicMock()
@@ -119,18 +119,14 @@ class TaskEngineTestCase(test.TestCase):
         ]
         mock_task_instance.subtasks = [mock_subtask]
 
-        mock_scenario_get_all.return_value = [
-            mock.MagicMock(get_name=lambda: "e"),
-            mock.MagicMock(get_name=lambda: "b"),
-            mock.MagicMock(get_name=lambda: "a")
-        ]
         eng = engine.TaskEngine(mock.MagicMock(), mock.MagicMock())
         eng._validate_config_scenarios_name(mock_task_instance)
+        mock_scenario_get.assert_has_calls([mock.call("a"), mock.call("b")])
 
     @mock.patch("rally.task.engine.TaskConfig")
-    @mock.patch("rally.task.engine.scenario.Scenario")
+    @mock.patch("rally.task.engine.scenario.Scenario.get")
     def test__validate_config_scenarios_name_non_exsisting(
-            self, mock_scenario, mock_task_config):
+            self, mock_scenario_get, mock_task_config):
 
         mock_task_instance = mock.MagicMock()
         mock_subtask = mock.MagicMock()
@@ -140,12 +136,19 @@ class TaskEngineTestCase(test.TestCase):
             engine.Workload({"name": "nonexist2"})
         ]
         mock_task_instance.subtasks = [mock_subtask]
-        mock_scenario.list_benchmark_scenarios.return_value = ["exist", "aaa"]
+
+        def get(name):
+            if name != "exist":
+                raise exceptions.PluginNotFound(name=name, namespace="any")
+
+        mock_scenario_get.side_effect = get
         eng = engine.TaskEngine(mock.MagicMock(), mock.MagicMock())
 
-        self.assertRaises(exceptions.NotFoundScenarios,
-                          eng._validate_config_scenarios_name,
-                          mock_task_instance)
+        e = self.assertRaises(exceptions.NotFoundScenarios,
+                              eng._validate_config_scenarios_name,
+                              mock_task_instance)
+        self.assertIn("nonexist1", str(e))
+        self.assertIn("nonexist2", str(e))
 
     @mock.patch("rally.task.engine.TaskConfig")
     @mock.patch("rally.task.engine.runner.ScenarioRunner.validate")
@@ -305,6 +308,73 @@ class TaskEngineTestCase(test.TestCase):
         mock__validate_config_semantic_helper.assert_has_calls(
             expected_calls, any_order=True)
 
+    @mock.patch("rally.task.engine.TaskConfig")
+    @mock.patch("rally.task.engine.osclients.Clients")
+    @mock.patch("rally.task.engine.TaskEngine._get_user_ctx_for_validation")
+    @mock.patch("rally.task.engine.TaskEngine"
+                "._validate_config_semantic_helper")
+    @mock.patch("rally.task.engine.objects.Deployment.get",
+                return_value="FakeDeployment")
+    def test__validate_config_semantic_deduplicates(
+            self, mock_deployment_get,
+            mock__validate_config_semantic_helper,
+            mock__get_user_ctx_for_validation, mock_clients,
+            mock_task_config):
+        users = [{"credential": mock.MagicMock(permission="user")}
+                 for i in range(10)]
+        users.append({"credential": mock.MagicMock(permission="other")})
+
+        def get_user_ctx(ctx):
+            ctx["users"] = users
+            return mock.MagicMock()
+
+        mock__get_user_ctx_for_validation.side_effect = get_user_ctx
+        mock_clients.side_effect = lambda credential: credential
+
+        mock_subtask = mock.MagicMock()
+        wconf1 = engine.Workload({"name": "a", "runner": "ra"})
+        wconf2 = engine.Workload({"name": "a", "runner": "ra"})
+        mock_subtask.workloads = [wconf1, wconf2]
+        mock_task_instance = mock.MagicMock(subtasks=[mock_subtask])
+
+        eng = engine.TaskEngine(mock_task_instance, mock.MagicMock())
+        eng.admin = "admin"
+        eng._check_cloud = mock.Mock()
+        eng._validate_config_semantic(mock_task_instance)
+
+        fake_deployment = mock_deployment_get.return_value
+        mock__validate_config_semantic_helper.assert_has_calls([
+            mock.call("admin", users[0]["credential"], wconf1, 0,
+                      fake_deployment),
+            mock.call(None, users[10]["credential"], wconf1, 0,
+                      fake_deployment)], any_order=True)
+        self.assertEqual(2, mock__validate_config_semantic_helper.call_count)
+
+    @mock.patch("rally.task.engine.TaskConfig")
+    @mock.patch("rally.task.engine.osclients.Clients")
+    @mock.patch("rally.task.engine.users_ctx")
+    @mock.patch("rally.task.engine.TaskEngine"
+                "._validate_config_semantic_helper")
+    @mock.patch("rally.task.engine.objects.Deployment.get",
+                return_value="FakeDeployment")
+    def test__validate_config_semantic_invalid(
+            self, mock_deployment_get,
+            mock__validate_config_semantic_helper,
+            mock_users_ctx, mock_clients, mock_task_config):
+        mock_users_ctx.UserGenerator = fakes.FakeUserContext
+        mock__validate_config_semantic_helper.side_effect = [
+            None, exceptions.InvalidTaskConfig(name="b", pos=0, config="",
+                                               reason="")]
+
+        mock_subtask = mock.MagicMock()
+        mock_subtask.workloads = [engine.Workload({"name": "a"}),
+                                  engine.Workload({"name": "b"})]
+        mock_task_instance = mock.MagicMock(subtasks=[mock_subtask])
+
+        eng = engine.TaskEngine(mock_task_instance, mock.MagicMock())
+        self.assertRaises(exceptions.InvalidTaskConfig,
+                          eng._validate_config_semantic, mock_task_instance)
+
     @mock.patch("rally.common.objects.Task.get_status")
     @mock.patch("rally.task.engine.TaskConfig")
     @mock.patch("rally.task.engine.ResultConsumer")
@@ -326,6 +396,43 @@ class TaskEngineTestCase(test.TestCase):
             mock.call(consts.TaskStatus.FINISHED)
         ])
 
+    @mock.patch("rally.task.engine.CONF")
+    @mock.patch("rally.task.engine.metrics")
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.TaskConfig")
+    @mock.patch("rally.task.engine.ResultConsumer")
+    @mock.patch("rally.task.engine.context.ContextManager.cleanup")
+    @mock.patch("rally.task.engine.context.ContextManager.setup")
+    @mock.patch("rally.task.engine.scenario.Scenario")
+    @mock.patch("rally.task.engine.runner.ScenarioRunner")
+    def test_run_with_metrics(
+            self, mock_scenario_runner, mock_scenario,
+            mock_context_manager_setup, mock_context_manager_cleanup,
+            mock_result_consumer, mock_task_config, mock_task_get_status,
+            mock_metrics, mock_conf):
+        mock_conf.benchmark.metrics_port = 8000
+        mock_result_consumer.is_task_in_aborting_status.return_value = False
+        workload = mock.MagicMock()
+        workload.make_key.return_value = {"name": "a.task", "pos": 0}
+        mock_task_config.return_value.subtasks = [
+            mock.MagicMock(workloads=[workload])]
+        task = mock.MagicMock()
+
+        eng = engine.TaskEngine(mock.MagicMock(), task)
+        eng.run()
+
+        task_metrics = mock_metrics.TaskMetrics.return_value
+        mock_metrics.TaskMetrics.assert_called_once_with(task["uuid"])
+        mock_metrics.MetricsServer.assert_called_once_with(task_metrics)
+        server = mock_metrics.MetricsServer.return_value
+        server.__enter__.assert_called_once_with()
+        server.__exit__.assert_called_once_with(None, None, None)
+        task_metrics.add_workload.assert_called_once_with(
+            workload.name, 0, runner=mock_scenario_runner.get.return_value.
+            return_value)
+        self.assertEqual(task_metrics.add_workload.return_value,
+                         mock_result_consumer.call_args[1]["metrics"])
+
     @mock.patch("rally.task.engine.objects.task.Task.get_status")
     @mock.patch("rally.task.engine.TaskConfig")
     @mock.patch("rally.task.engine.LOG")
@@ -505,6 +612,26 @@ class ResultConsumerTestCase(test.TestCase):
                           {"duration": 1, "timestamp": 3}],
                          consumer_obj.results)
 
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
+    @mock.patch("rally.task.sla.SLAChecker")
+    def test_consume_results_with_metrics(
+            self, mock_sla_checker, mock_result_consumer_wait_and_abort,
+            mock_task_get_status):
+        mock_task_get_status.return_value = consts.TaskStatus.RUNNING
+        key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
+        runner = mock.MagicMock()
+        runner.result_queue = collections.deque(
+            [[{"duration": 1, "timestamp": 3}]])
+        workload_metrics = mock.Mock()
+
+        with engine.ResultConsumer(key, mock.MagicMock(), runner, False,
+                                   metrics=workload_metrics):
+            pass
+
+        workload_metrics.add.assert_called_once_with(
+            {"duration": 1, "timestamp": 3})
+
     @mock.patch("rally.common.objects.Task.get_status")
     @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
     @mock.patch("rally.task.sla.SLAChecker")
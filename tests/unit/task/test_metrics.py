@@ -0,0 +1,131 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+import requests
+
+from rally.task import metrics
+from tests.unit import test
+
+
+def _result(duration, error=None, **atomic_actions):
+    return {"duration": duration, "timestamp": 1, "idle_duration": 0,
+            "error": error or [], "output": {},
+            "atomic_actions": atomic_actions}
+
+
+class WorkloadMetricsTestCase(test.TestCase):
+
+    @mock.patch("rally.task.metrics.time.time")
+    def test_snapshot(self, mock_time):
+        mock_time.return_value = 10
+        runner = mock.Mock()
+        runner.in_flight_iterations.return_value = 3
+        workload = metrics.WorkloadMetrics("Dummy.dummy", 1, runner=runner,
+                                           window=3)
+
+        workload.add(_result(4, a=1))
+        for duration in (1, 2, 3):
+            workload.add(_result(duration, a=duration, b=None))
+        workload.add(_result(5, error=["Exception", "msg", "tb"]))
+
+        mock_time.return_value = 12
+        snapshot = workload.snapshot()
+
+        self.assertEqual(
+            {"name": "Dummy.dummy", "position": 1,
+             "iterations": 5, "failures": 1, "error_rate": 0.2,
+             "iterations_per_second": 2.5, "in_flight": 3,
+             "duration": {"mean": 2.5, "max": 4, "p50": 2, "p95": 2.9,
+                          "p99": 2.98},
+             "atomic_actions": {"a": {"mean": 1.75, "max": 3, "p50": 2,
+                                      "p95": 2.9, "p99": 2.98}}},
+            snapshot)
+
+    def test_snapshot_empty(self):
+        snapshot = metrics.WorkloadMetrics("Dummy.dummy", 0).snapshot()
+
+        self.assertEqual(0, snapshot["iterations"])
+        self.assertEqual(0, snapshot["error_rate"])
+        self.assertIsNone(snapshot["in_flight"])
+        self.assertIsNone(snapshot["duration"]["p95"])
+        self.assertEqual({}, snapshot["atomic_actions"])
+
+
+class TaskMetricsTestCase(test.TestCase):
+
+    def test_snapshot(self):
+        task_metrics = metrics.TaskMetrics("task_uuid")
+        workload = task_metrics.add_workload("Dummy.dummy", 0)
+        workload.add(_result(1))
+
+        snapshot = task_metrics.snapshot()
+
+        self.assertEqual("task_uuid", snapshot["task"])
+        self.assertEqual([workload.snapshot()["iterations"]],
+                         [w["iterations"] for w in snapshot["workloads"]])
+
+
+class PrometheusTestCase(test.TestCase):
+
+    def test_to_prometheus(self):
+        latency = {"mean": 1.5, "max": 2, "p50": 1.5, "p95": 1.95,
+                   "p99": 1.99}
+        snapshot = {
+            "task": "uuid",
+            "workloads": [{"name": "Dummy.\"dummy\"", "position": 0,
+                           "iterations": 2, "failures": 0, "error_rate": 0,
+                           "iterations_per_second": 1.0, "in_flight": None,
+                           "duration": latency,
+                           "atomic_actions": {"foo": latency}}]}
+
+        text = metrics.to_prometheus(snapshot)
+
+        task_labels = "task=\"uuid\",workload=\"Dummy.\\\"dummy\\\"\""
+        self.assertIn("# TYPE rally_workload_iterations_total counter\n"
+                      "rally_workload_iterations_total{position=\"0\",%s} "
+                      "2.0\n" % task_labels, text)
+        self.assertIn("rally_workload_duration_seconds{position=\"0\","
+                      "quantile=\"0.95\",%s} 1.95\n" % task_labels, text)
+        self.assertIn("rally_atomic_action_duration_seconds{action=\"foo\","
+                      "position=\"0\",quantile=\"0.5\",%s} 1.5\n"
+                      % task_labels, text)
+        self.assertIn("rally_atomic_action_duration_seconds_max{"
+                      "action=\"foo\",position=\"0\",%s} 2.0\n"
+                      % task_labels, text)
+        self.assertNotIn("in_flight", text)
+        self.assertEqual(1, text.count(
+            "# HELP rally_atomic_action_duration_seconds "))
+
+
+class MetricsServerTestCase(test.TestCase):
+
+    def test_server(self):
+        task_metrics = metrics.TaskMetrics("task_uuid")
+        task_metrics.add_workload("Dummy.dummy", 0).add(_result(1))
+
+        with metrics.MetricsServer(task_metrics, host="127.0.0.1",
+                                   port=0) as server:
+            resp = requests.get(server.url + "/metrics")
+            self.assertEqual(200, resp.status_code)
+            self.assertIn("rally_workload_iterations_total", resp.text)
+
+            resp = requests.get(server.url + "/metrics.json")
+            self.assertEqual(task_metrics.snapshot()["workloads"][0]["name"],
+                             resp.json()["workloads"][0]["name"])
+
+            resp = requests.get(server.url + "/foo")
+            self.assertEqual(404, resp.status_code)
+
+        self.assertFalse(server.thread.is_alive())
@@ -0,0 +1,101 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import time
+
+import fixtures
+from oslo_config import fixture
+
+from rally.task import profiler
+from tests.unit import test
+
+
+def _busy(duration):
+    finish_at = time.time() + duration
+    while time.time() < finish_at:
+        pass
+    return "result"
+
+
+class IterationProfilerTestCase(test.TestCase):
+
+    def setUp(self):
+        super(IterationProfilerTestCase, self).setUp()
+        self.profiles_dir = self.useFixture(fixtures.TempDir()).path
+        self.useFixture(fixture.Config()).config(
+            profiles_dir=self.profiles_dir, group="benchmark")
+
+    def test_for_workload(self):
+        config = {"sample_rate": 0.5, "mode": "sampling"}
+        first = profiler.IterationProfiler.for_workload("uuid", "Foo.bar",
+                                                        config)
+        second = profiler.IterationProfiler.for_workload("uuid", "Foo.bar",
+                                                         config)
+
+        self.assertEqual(os.path.join(self.profiles_dir, "uuid", "Foo.bar",
+                                      "0"), first.directory)
+        self.assertEqual(os.path.join(self.profiles_dir, "uuid", "Foo.bar",
+                                      "1"), second.directory)
+        self.assertEqual(0.5, first.sample_rate)
+        self.assertEqual(profiler.SAMPLING, first.mode)
+        self.assertEqual([("Foo.bar", 0, first.directory),
+                          ("Foo.bar", 1, second.directory)],
+                         profiler.list_workloads("uuid"))
+        self.assertEqual([], profiler.list_workloads("another_uuid"))
+
+    def test_is_sampled(self):
+        prof = profiler.IterationProfiler(self.profiles_dir, sample_rate=0.25)
+        self.assertEqual([3, 7, 11],
+                         [i for i in range(12) if prof.is_sampled(i)])
+
+        prof = profiler.IterationProfiler(self.profiles_dir)
+        self.assertTrue(all(prof.is_sampled(i) for i in range(12)))
+
+    def test_run_cprofile(self):
+        prof = profiler.IterationProfiler(self.profiles_dir, sample_rate=0.5)
+
+        self.assertEqual("result", prof.run(0, _busy, 0))
+        self.assertEqual([], os.listdir(self.profiles_dir))
+        self.assertEqual("result", prof.run(1, _busy, duration=0))
+
+        self.assertEqual(["%d-1.prof" % os.getpid()],
+                         os.listdir(self.profiles_dir))
+        stats = profiler.load_pstats(self.profiles_dir)
+        self.assertIn("_busy", [func[2] for func in stats.stats])
+
+    def test_run_sampling(self):
+        prof = profiler.IterationProfiler(self.profiles_dir,
+                                          mode=profiler.SAMPLING,
+                                          interval=0.001)
+
+        self.assertEqual("result", prof.run(0, _busy, 0.1))
+        self.assertEqual("result", prof.run(1, _busy, 0.1))
+
+        stacks = profiler.load_stacks(self.profiles_dir)
+        self.assertTrue(stacks)
+        for stack in stacks:
+            self.assertTrue(stack.startswith("_busy (test_profiler.py:"))
+        self.assertIsNone(profiler.load_pstats(self.profiles_dir))
+
+    def test_save_stacks(self):
+        path = os.path.join(self.profiles_dir, "1-1.stacks")
+        profiler.save_stacks({"a (f.py:1);b (f.py:2)": 2, "a (f.py:1)": 1},
+                             path)
+
+        with open(path) as f:
+            self.assertEqual("a (f.py:1) 1\na (f.py:1);b (f.py:2) 2\n",
+                             f.read())
+        self.assertEqual({"a (f.py:1);b (f.py:2)": 2, "a (f.py:1)": 1},
+                         profiler.load_stacks(self.profiles_dir))
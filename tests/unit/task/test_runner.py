@@ -16,9 +16,12 @@
 import collections
 import multiprocessing
 
+import fixtures
 import jsonschema
 import mock
+from oslo_config import fixture
 
+from rally.common import tracing
 from rally.plugins.common.runners import serial
 from rally.task import runner
 from rally.task import scenario
@@ -86,7 +89,8 @@ class ScenarioRunnerHelpersTestCase(test.TestCase):
             "idle_duration": 0,
             "error": [],
             "output": {"additive": [], "complete": []},
-            "atomic_actions": {}
+            "atomic_actions": {},
+            "atomic_actions_trace": []
         }
         self.assertEqual(expected_result, result)
 
@@ -108,7 +112,8 @@ class ScenarioRunnerHelpersTestCase(test.TestCase):
                                      "description": "Complete description",
                                      "title": "Complete",
                                      "chart_plugin": "BarPlugin"}]},
-            "atomic_actions": {}
+            "atomic_actions": {},
+            "atomic_actions_trace": []
         }
         self.assertEqual(expected_result, result)
 
@@ -127,7 +132,8 @@ class ScenarioRunnerHelpersTestCase(test.TestCase):
                                      "data": [["a", 1]],
                                      "title": "Scenario output"}],
                        "complete": []},
-            "atomic_actions": {}
+            "atomic_actions": {},
+            "atomic_actions_trace": []
         }
         self.assertEqual(expected_result, result)
 
@@ -142,12 +148,201 @@ class ScenarioRunnerHelpersTestCase(test.TestCase):
             "timestamp": fakes.FakeTimer().timestamp(),
             "idle_duration": 0,
             "output": {"additive": [], "complete": []},
-            "atomic_actions": {}
+            "atomic_actions": {},
+            "atomic_actions_trace": []
         }
         self.assertEqual(expected_result, result)
         self.assertEqual(expected_error[:2],
                          ["Exception", "Something went wrong"])
 
+    @mock.patch(BASE + "rutils.Timer", side_effect=fakes.FakeTimer)
+    @mock.patch(BASE + "LOG")
+    def test_run_scenario_once_sampled_logging(self, mock_log, mock_timer):
+        self.useFixture(fixture.Config()).config(iteration_log_sample=2,
+                                                 group="benchmark")
+        context = {"task": {"uuid": "foo_uuid"}}
+
+        runner._run_scenario_once((1, fakes.FakeScenario, "do_it",
+                                   context, {}))
+        self.assertFalse(mock_log.info.called)
+
+        runner._run_scenario_once((2, fakes.FakeScenario, "do_it",
+                                   context, {}))
+        self.assertEqual(2, mock_log.info.call_count)
+
+        mock_log.info.reset_mock()
+        runner._run_scenario_once((3, fakes.FakeScenario,
+                                   "something_went_wrong", context, {}))
+        mock_log.info.assert_called_once_with(
+            "Task %(task)s | ITER: %(iteration)s END: %(status)s",
+            {"task": "foo_uuid", "iteration": 3,
+             "status": "Error Exception: Something went wrong"})
+
+    @mock.patch(BASE + "rutils.Timer", side_effect=fakes.FakeTimer)
+    def test_run_scenario_once_with_profiler(self, mock_timer):
+        mock_profiler = mock.Mock()
+        mock_profiler.run.return_value = None
+        self.useFixture(fixtures.MockPatchObject(runner, "_profiler",
+                                                 mock_profiler))
+        result = runner._run_scenario_once((1, fakes.FakeScenario, "do_it",
+                                            mock.MagicMock(), {"foo": 1}))
+
+        mock_profiler.is_sampled.assert_called_once_with(1)
+        mock_profiler.run.assert_called_once_with(1, mock.ANY, foo=1)
+        self.assertEqual("do_it", mock_profiler.run.call_args[0][1].__name__)
+        self.assertTrue(result["profiled"])
+        runner.ScenarioRunnerResult(result)
+
+        mock_profiler.reset_mock()
+        mock_profiler.is_sampled.return_value = False
+        result = runner._run_scenario_once((2, fakes.FakeScenario, "do_it",
+                                            mock.MagicMock(), {"foo": 1}))
+        self.assertFalse(mock_profiler.run.called)
+        self.assertNotIn("profiled", result)
+
+    @mock.patch(BASE + "rutils.Timer", side_effect=fakes.FakeTimer)
+    def test_run_scenario_once_with_http_requests(self, mock_timer):
+        def request(**kwargs):
+            tracing.record("GET", "http://nova/servers/1", 200, 10, 0.1, 0.2)
+            tracing.record("GET", "http://nova/servers/2", 200, 10, 0.3, 0.5)
+            tracing.push_action("nova.get_server")
+            tracing.record("GET", "http://nova/servers/1", None, 0, None, 0.3)
+            tracing.pop_action()
+
+        mock_profiler = mock.Mock()
+        mock_profiler.run.side_effect = lambda i, func, **kw: request(**kw)
+        self.useFixture(fixtures.MockPatchObject(runner, "_profiler",
+                                                 mock_profiler))
+        config = self.useFixture(fixture.Config())
+        config.config(http_tracing=True, http_tracing_requests=True,
+                      group="benchmark")
+        result = runner._run_scenario_once((1, fakes.FakeScenario, "do_it",
+                                            mock.MagicMock(), {}))
+
+        self.assertEqual(
+            [{"title": "HTTP requests: total time, sec",
+              "description": mock.ANY,
+              "chart_plugin": "StatsTable",
+              "data": [["GET nova/servers/{id}", 0.7],
+                       ["nova.get_server | GET nova/servers/{id}", 0.3]]},
+             {"title": "HTTP requests: time to first byte, sec",
+              "description": mock.ANY,
+              "chart_plugin": "StatsTable",
+              "data": [["GET nova/servers/{id}", 0.2]]}],
+            result["output"]["additive"])
+        self.assertEqual(
+            [["", "GET", "nova/servers/{id}", 200, 10, 0.1, 0.2],
+             ["", "GET", "nova/servers/{id}", 200, 10, 0.3, 0.5],
+             ["nova.get_server", "GET", "nova/servers/{id}", "", 0, "", 0.3]],
+            result["output"]["complete"][0]["data"]["rows"])
+        self.assertEqual([], tracing.stop())
+        runner.ScenarioRunnerResult(result)
+
+        config.config(http_tracing_requests=False, group="benchmark")
+        mock_profiler.run.side_effect = None
+        result = runner._run_scenario_once((1, fakes.FakeScenario, "do_it",
+                                            mock.MagicMock(), {}))
+        self.assertEqual(
+            [("HTTP requests: total time, sec", []),
+             ("HTTP requests: time to first byte, sec", [])],
+            [(c["title"], c["data"]) for c in result["output"]["additive"]])
+        self.assertEqual([], result["output"]["complete"])
+        runner.ScenarioRunnerResult(result)
+
+        config.config(http_tracing=False, group="benchmark")
+        mock_profiler.run.side_effect = lambda i, func, **kw: request(**kw)
+        result = runner._run_scenario_once((1, fakes.FakeScenario, "do_it",
+                                            mock.MagicMock(), {}))
+        self.assertEqual({"additive": [], "complete": []}, result["output"])
+
+    def test__format_atomic_actions_trace(self):
+        trace = [{"name": "foo", "parent": None, "started_at": 11,
+                  "finished_at": 14, "failed": False},
+                 {"name": "bar", "parent": 0, "started_at": 12,
+                  "finished_at": None, "failed": True}]
+
+        self.assertEqual(
+            [{"name": "foo", "parent": None, "offset": 1, "duration": 3,
+              "failed": False},
+             {"name": "bar", "parent": 0, "offset": 2, "duration": None,
+              "failed": True}],
+            runner._format_atomic_actions_trace(trace, 10))
+
+    @mock.patch(BASE + "time.time", return_value=100)
+    def test_iteration_log_filter(self, mock_time):
+        conf = self.useFixture(fixture.Config())
+        should_log = runner._IterationLogFilter()
+        self.assertTrue(should_log(3))
+
+        conf.config(iteration_log_sample=0, group="benchmark")
+        self.assertFalse(should_log(0))
+        self.assertTrue(should_log(0, error=True))
+
+        conf.config(iteration_log_sample=1, iteration_log_rate=2,
+                    group="benchmark")
+        self.assertEqual([True, True, False],
+                         [should_log(i) for i in range(3)])
+        self.assertTrue(should_log(3, error=True))
+        mock_time.return_value = 101
+        self.assertTrue(should_log(4))
+
+    @mock.patch(BASE + "logging.AsyncLogging")
+    def test__run_worker_process(self, mock_async_logging):
+        worker_process = mock.Mock()
+        runner._run_worker_process(worker_process, 1, info=2)
+        worker_process.assert_called_once_with(1, info=2)
+        mock_async_logging.assert_called_once_with()
+        mock_async_logging.return_value.__enter__.assert_called_once_with()
+
+    @mock.patch(BASE + "time.time")
+    @mock.patch(BASE + "os.times")
+    def test_process_stats_cpu_usage(self, mock_times, mock_time):
+        stats = runner._ProcessStats()
+        mock_times.return_value = (1.0, 0.5, 0, 0, 0)
+        mock_time.return_value = 10.0
+        self.assertEqual(0.0, stats.cpu_usage())
+
+        mock_times.return_value = (1.5, 0.75, 0, 0, 0)
+        mock_time.return_value = 11.0
+        self.assertEqual(75.0, stats.cpu_usage())
+
+    @mock.patch(BASE + "time.time", return_value=12.0)
+    @mock.patch(BASE + "_process_stats")
+    @mock.patch(BASE + "_run_scenario_once")
+    def test__worker_thread_adds_runner_stats(
+            self, mock__run_scenario_once, mock__process_stats, mock_time):
+        mock__run_scenario_once.return_value = {
+            "output": {"additive": [], "complete": []}}
+        mock__process_stats.cpu_usage.return_value = 30.0
+        queue = mock.Mock()
+        config = self.useFixture(fixture.Config())
+        config.config(runner_stats=True, group="benchmark")
+
+        runner._worker_thread(queue, "args", scheduled_at=10.0)
+
+        result = queue.put.call_args[0][0]
+        self.assertEqual(
+            [("Runner: worker process CPU usage, %", [["cpu", 30.0]]),
+             ("Runner: worker process threads", [["threads", mock.ANY]]),
+             ("Runner: scheduling delay, sec", [["delay", 2.0]])],
+            [(c["title"], c["data"]) for c in result["output"]["additive"]])
+
+        config.config(runner_stats=False, group="benchmark")
+        runner._worker_thread(queue, "args")
+        self.assertEqual(3, len(queue.put.call_args[0][0]["output"][
+            "additive"]))
+        self.assertNotIn("scheduled_at", queue.put.call_args[0][0])
+
+    @mock.patch(BASE + "_run_scenario_once")
+    def test__worker_thread_intended_start(self, mock__run_scenario_once):
+        mock__run_scenario_once.return_value = {
+            "output": {"additive": [], "complete": []}}
+        queue = mock.Mock()
+
+        runner._worker_thread(queue, "args", 10.0, True)
+
+        self.assertEqual(10.0, queue.put.call_args[0][0]["scheduled_at"])
+
 
 class ScenarioRunnerResultTestCase(test.TestCase):
 
@@ -216,6 +411,34 @@ class ScenarioRunnerTestCase(test.TestCase):
         runner_obj._run_scenario.assert_called_once_with(
             cls, method_name, context_obj, expected_config_kwargs)
 
+    def test_validate_profile(self):
+        runner.ScenarioRunner.validate(
+            {"type": "constant", "times": 2,
+             "profile": {"sample_rate": 0.5, "mode": "sampling"}})
+        self.assertRaises(jsonschema.ValidationError,
+                          runner.ScenarioRunner.validate,
+                          {"type": "constant", "profile": {"mode": "foo"}})
+
+    @mock.patch(BASE + "types.preprocess", return_value={})
+    @mock.patch(BASE + "profiler.IterationProfiler.for_workload")
+    def test_run_with_profile(self, mock_iteration_profiler_for_workload,
+                              mock_preprocess):
+        config = {"type": "serial", "profile": {"sample_rate": 0.5}}
+        runner_obj = serial.SerialScenarioRunner({"uuid": "task_uuid"},
+                                                 config)
+
+        def _run_scenario(cls, method_name, context, args):
+            self.assertEqual(mock_iteration_profiler_for_workload.return_value,
+                             runner._profiler)
+
+        runner_obj._run_scenario = mock.Mock(side_effect=_run_scenario)
+        runner_obj.run("Dummy.dummy", {}, {})
+
+        self.assertTrue(runner_obj._run_scenario.called)
+        mock_iteration_profiler_for_workload.assert_called_once_with(
+            "task_uuid", "Dummy.dummy", {"sample_rate": 0.5})
+        self.assertIsNone(runner._profiler)
+
     def test_runner_send_result_exception(self):
         runner_obj = serial.SerialScenarioRunner(
             mock.MagicMock(),
@@ -250,6 +473,73 @@ class ScenarioRunnerTestCase(test.TestCase):
         for process in process_pool:
             self.assertIsInstance(process, multiprocessing.Process)
 
+    @mock.patch(BASE + "multiprocessing.Process")
+    def test__create_process_pool_async_logging(self, mock_process):
+        runner_obj = serial.SerialScenarioRunner(
+            mock.MagicMock(),
+            mock.MagicMock())
+        worker_process = mock.Mock()
+
+        runner_obj._create_process_pool(1, worker_process, iter([(1, 2)]))
+        mock_process.assert_called_once_with(
+            target=runner._run_worker_process, args=(worker_process, 1, 2),
+            kwargs={"info": {"processes_to_start": 1,
+                             "processes_counter": 0}})
+
+        mock_process.reset_mock()
+        self.useFixture(fixture.Config()).config(async_runner_logging=False,
+                                                 group="benchmark")
+        runner_obj._create_process_pool(1, worker_process, iter([(1, 2)]))
+        mock_process.assert_called_once_with(
+            target=worker_process, args=(1, 2),
+            kwargs={"info": {"processes_to_start": 1,
+                             "processes_counter": 0}})
+
+    def test_in_flight_iterations(self):
+        runner_obj = serial.SerialScenarioRunner(
+            mock.MagicMock(), {"times": 5})
+        self.assertIsNone(runner_obj.in_flight_iterations())
+
+        runner_obj.iteration_gen = mock.MagicMock()
+        runner_obj.iteration_gen.__int__.return_value = 4
+        runner_obj.iterations_count = 1
+        self.assertEqual(3, runner_obj.in_flight_iterations())
+
+        runner_obj.iteration_gen.__int__.return_value = 7
+        self.assertEqual(4, runner_obj.in_flight_iterations())
+
+    @mock.patch(BASE + "time.time", return_value=10.0)
+    def test__add_result_queue_stats(self, mock_time):
+        result = {"timestamp": 5.0, "duration": 2.0, "idle_duration": 1.0,
+                  "output": {"additive": [], "complete": []}}
+        result_queue = mock.Mock()
+        result_queue.qsize.return_value = 4
+
+        runner.ScenarioRunner._add_result_queue_stats(result, result_queue)
+
+        self.assertEqual(
+            [("Runner: result queue lag, sec", [["lag", 2.0]]),
+             ("Runner: result queue depth", [["results", 4]])],
+            [(c["title"], c["data"]) for c in result["output"]["additive"]])
+
+        result["output"]["additive"] = []
+        result_queue.qsize.side_effect = NotImplementedError
+        runner.ScenarioRunner._add_result_queue_stats(result, result_queue)
+        self.assertEqual(1, len(result["output"]["additive"]))
+
+    def test__send_result_counts_iterations(self):
+        runner_obj = serial.SerialScenarioRunner(
+            mock.MagicMock(),
+            mock.MagicMock())
+        result = {"duration": 1.0, "idle_duration": 0, "timestamp": 1.0,
+                  "output": {"additive": [], "complete": []},
+                  "atomic_actions": {}, "error": []}
+        runner_obj._send_result(result)
+        runner_obj._send_result(dict(result, error=["a", "b", "c"]))
+
+        self.assertEqual(2, runner_obj.iterations_count)
+        self.assertEqual(1, runner_obj.failed_iterations_count)
+
     @mock.patch(BASE + "ScenarioRunner._send_result")
     def test__join_processes(self, mock_scenario_runner__send_result):
         process = mock.MagicMock(is_alive=mock.MagicMock(return_value=False))
@@ -332,6 +332,101 @@ class NeutronNetworkResourceTypeTestCase(test.TestCase):
                           self.clients, resource_config)
 
 
+class ResourceIndexTestCase(test.TestCase):
+
+    def test_index(self):
+        resources = [fakes.FakeResource(name="a", id="1"),
+                     fakes.FakeResource(name="b", id="2"),
+                     fakes.FakeResource(name="b", id="3")]
+        index = types.ResourceIndex(iter(resources))
+
+        self.assertEqual(resources, index.resources)
+        self.assertEqual([resources[0]], index.by_id["1"])
+        self.assertEqual(resources[1:], index.by_name["b"])
+        self.assertEqual(resources[1:], index.search("^b"))
+        self.assertIs(index.search("^b"), index.search("^b"))
+        self.assertEqual("3", types.obj_from_id({"id": "3"}, index, "x").id)
+        self.assertEqual("1", types.obj_from_name({"regex": "a"}, index,
+                                                  "x").id)
+
+
+class ResourceCatalogTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ResourceCatalogTestCase, self).setUp()
+        self.catalog = types.ResourceCatalog(ttl=60)
+        self.clients = mock.MagicMock()
+        self.list_resources = mock.MagicMock(
+            return_value=[fakes.FakeResource(name="a", id="1")])
+
+    def _find(self, name):
+        return lambda index: types.obj_from_name({"name": name}, index,
+                                                 "resource").id
+
+    def test_lookup_is_cached(self):
+        for i in range(3):
+            self.assertEqual("1", self.catalog.lookup(
+                self.clients, "kind", self.list_resources, self._find("a")))
+        self.list_resources.assert_called_once_with()
+
+        other_clients = mock.MagicMock()
+        self.catalog.lookup(other_clients, "kind", self.list_resources,
+                            self._find("a"))
+        self.catalog.lookup(self.clients, "other", self.list_resources,
+                            self._find("a"))
+        self.assertEqual(3, self.list_resources.call_count)
+
+    @mock.patch("rally.task.types.time.time")
+    def test_lookup_expired(self, mock_time):
+        mock_time.return_value = 0
+        self.catalog.lookup(self.clients, "kind", self.list_resources,
+                            self._find("a"))
+        mock_time.return_value = 61
+        self.catalog.lookup(self.clients, "kind", self.list_resources,
+                            self._find("a"))
+        self.assertEqual(2, self.list_resources.call_count)
+
+    def test_lookup_refreshes_on_miss(self):
+        self.catalog.lookup(self.clients, "kind", self.list_resources,
+                            self._find("a"))
+        self.list_resources.return_value = [
+            fakes.FakeResource(name="a", id="1"),
+            fakes.FakeResource(name="b", id="2")]
+
+        self.assertEqual("2", self.catalog.lookup(
+            self.clients, "kind", self.list_resources, self._find("b")))
+        self.assertRaises(exceptions.InvalidScenarioArgument,
+                          self.catalog.lookup, self.clients, "kind",
+                          self.list_resources, self._find("c"))
+        self.assertEqual(3, self.list_resources.call_count)
+
+    def test_lookup_without_credential(self):
+        clients = mock.MagicMock(credential=None)
+        for i in range(2):
+            self.catalog.lookup(clients, "kind", self.list_resources,
+                                self._find("a"))
+        self.assertEqual(2, self.list_resources.call_count)
+
+    def test_invalidate(self):
+        other_clients = mock.MagicMock()
+        for clients in (self.clients, other_clients):
+            self.catalog.lookup(clients, "kind", self.list_resources,
+                                self._find("a"))
+
+        self.catalog.invalidate(self.clients, "kind")
+        self.catalog.lookup(other_clients, "kind", self.list_resources,
+                            self._find("a"))
+        self.assertEqual(2, self.list_resources.call_count)
+        self.catalog.lookup(self.clients, "kind", self.list_resources,
+                            self._find("a"))
+        self.assertEqual(3, self.list_resources.call_count)
+
+        self.catalog.invalidate()
+        self.catalog.lookup(other_clients, "kind", self.list_resources,
+                            self._find("a"))
+        self.assertEqual(4, self.list_resources.call_count)
+
+
 class PreprocessTestCase(test.TestCase):
 
     @mock.patch("rally.task.types.scenario.Scenario.get")
@@ -27,6 +27,7 @@ from rally import exceptions
 import rally.osclients
 from rally.task import validation
 from rally.verification.tempest import tempest
+from tests.unit import fakes
 from tests.unit import test
 
 
@@ -725,7 +726,8 @@ class ValidatorsTestCase(test.TestCase):
                                            param_name="volume_type")
 
         clients = mock.MagicMock()
-        clients.cinder().volume_types.list.return_value = ["type"]
+        clients.cinder().volume_types.list.return_value = [
+            fakes.FakeResource(name="type")]
 
         context = {"args": {"volume_type": True}}
 
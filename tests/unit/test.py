@@ -16,6 +16,7 @@
 import os
 import uuid
 
+import fixtures
 import mock
 from oslo_config import fixture
 from oslotest import base
@@ -44,6 +45,9 @@ class TestCase(base.BaseTestCase):
         super(TestCase, self).setUp()
         self.addCleanup(mock.patch.stopall)
         plugins.load()
+        self.useFixture(fixture.Config()).config(
+            journal_dir=self.useFixture(fixtures.TempDir()).path,
+            group="cleanup")
 
     def _test_atomic_action_timer(self, atomic_actions, name):
         action_duration = atomic_actions.get(name)
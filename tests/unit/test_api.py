@@ -256,6 +256,29 @@ class TaskAPITestCase(test.TestCase):
         mock_task_delete.assert_called_once_with(
             self.task_uuid, status=None)
 
+    @mock.patch("rally.plugins.openstack.context.cleanup.manager."
+                "cleanup_task")
+    @mock.patch("rally.api.objects.Credential")
+    @mock.patch("rally.api.objects.Deployment.get")
+    @mock.patch("rally.api.objects.Task.get")
+    def test_cleanup(self, mock_task_get, mock_deployment_get,
+                     mock_credential, mock_cleanup_task):
+        mock_task_get.return_value = {"deployment_uuid": "deployment_uuid"}
+        mock_deployment_get.return_value = {"admin": {"foo": "bar"}}
+        mock_cleanup_task.return_value = []
+
+        api.Task.cleanup(self.task_uuid)
+
+        mock_task_get.assert_called_once_with(self.task_uuid)
+        mock_deployment_get.assert_called_once_with("deployment_uuid")
+        mock_credential.assert_called_once_with(foo="bar")
+        mock_cleanup_task.assert_called_once_with(
+            self.task_uuid, {"credential": mock_credential.return_value})
+
+        mock_cleanup_task.return_value = [{"id": "foo"}]
+        self.assertRaises(exceptions.RallyException,
+                          api.Task.cleanup, self.task_uuid)
+
 
 class BaseDeploymentTestCase(test.TestCase):
     def setUp(self):
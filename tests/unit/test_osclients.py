@@ -20,6 +20,7 @@ import mock
 from oslo_config import cfg
 
 from rally.common import objects
+from rally.common import tracing
 from rally import consts
 from rally import exceptions
 from rally import osclients
@@ -181,7 +182,8 @@ class OSClientsTestCase(test.TestCase):
             )
             mock_session.assert_called_once_with(
                 auth=token.return_value, verify=False,
-                timeout=cfg.CONF.openstack_client_http_timeout)
+                timeout=cfg.CONF.openstack_client_http_timeout,
+                session=mock.ANY)
 
     @mock.patch.object(DummyClient, "_get_endpoint")
     @mock.patch("keystoneclient.session.Session")
@@ -202,7 +204,8 @@ class OSClientsTestCase(test.TestCase):
             )
             mock_session.assert_called_once_with(
                 auth=token.return_value, verify=False,
-                timeout=cfg.CONF.openstack_client_http_timeout)
+                timeout=cfg.CONF.openstack_client_http_timeout,
+                session=mock.ANY)
 
     @mock.patch("keystoneclient.session.Session")
     def test_get_session_with_auth(self, mock_session):
@@ -214,7 +217,10 @@ class OSClientsTestCase(test.TestCase):
 
         mock_session.assert_called_once_with(
             auth=fake_auth, verify=False,
-            timeout=cfg.CONF.openstack_client_http_timeout)
+            timeout=cfg.CONF.openstack_client_http_timeout,
+            session=mock.ANY)
+        self.assertIsInstance(mock_session.call_args[1]["session"],
+                              tracing.TracingSession)
 
     def test_keystone(self):
         self.assertNotIn("keystone", self.clients.cache)